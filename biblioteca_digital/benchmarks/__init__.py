@@ -0,0 +1,7 @@
+"""
+Benchmarks da Biblioteca Digital
+
+synthetic: gerador de bibliotecas sintéticas
+suite: cenários cronometrados, resultados em JSON e verificação de regressões
+concurrency: carga com vários processos escritores no modo compartilhado
+"""
@@ -0,0 +1,124 @@
+"""
+Benchmark das estratégias de cópia de arquivos
+
+Copia arquivos grandes de livros com cada estratégia de file_copy e mostra
+o tempo e a vazão de cada uma. Por padrão usa os arquivos de data/livros com
+ao menos --min-size-mb; se não houver nenhum, gera arquivos sintéticos.
+
+Uso:
+    python benchmarks/bench_copy.py [--source DIR] [--size-mb N] [--files N] [--repeat N]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from file_copy import COPY_STRATEGIES, copy_file
+
+DEFAULT_SOURCE = Path(__file__).parent.parent / "data" / "livros"
+
+
+def find_large_files(source: Path, min_size: int) -> List[Path]:
+    """Arquivos do diretório com pelo menos min_size bytes"""
+    if not source.is_dir():
+        return []
+    return sorted(p for p in source.iterdir() if p.is_file() and p.stat().st_size >= min_size)
+
+
+def generate_files(directory: Path, count: int, size: int) -> List[Path]:
+    """Gera arquivos sintéticos de livros com conteúdo aleatório"""
+    block = os.urandom(1024 * 1024)
+    files = []
+    for i in range(count):
+        path = directory / f"livro_sintetico_{i}_2020.pdf"
+        with open(path, 'wb') as f:
+            remaining = size
+            while remaining > 0:
+                f.write(block[:remaining])
+                remaining -= len(block)
+        files.append(path)
+    return files
+
+
+def run_strategy(strategy: str, files: List[Path], work_dir: Path, repeat: int) -> Dict:
+    """
+    Copia todos os arquivos com uma estratégia, repetidas vezes
+
+    Returns:
+        Dicionário com o melhor tempo, a vazão e a estratégia efetivamente usada
+    """
+    total_bytes = sum(p.stat().st_size for p in files)
+    best = None
+    used = set()
+    for _ in range(repeat):
+        target = Path(tempfile.mkdtemp(dir=work_dir))
+        try:
+            start = time.perf_counter()
+            for path in files:
+                used.add(copy_file(path, target / path.name, strategy))
+            elapsed = time.perf_counter() - start
+        except OSError as e:
+            return {'strategy': strategy, 'error': str(e)}
+        finally:
+            shutil.rmtree(target)
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        'strategy': strategy,
+        'used': ', '.join(sorted(used)),
+        'seconds': best,
+        'mb_per_second': total_bytes / (1024 * 1024) / best if best else 0.0
+    }
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Compara as estratégias de cópia de arquivos")
+    parser.add_argument('--source', type=Path, default=DEFAULT_SOURCE,
+                        help="Diretório com os arquivos a copiar (padrão: data/livros)")
+    parser.add_argument('--min-size-mb', type=float, default=10,
+                        help="Tamanho mínimo dos arquivos de --source (padrão: 10)")
+    parser.add_argument('--size-mb', type=int, default=256,
+                        help="Tamanho de cada arquivo sintético (padrão: 256)")
+    parser.add_argument('--files', type=int, default=4,
+                        help="Número de arquivos sintéticos (padrão: 4)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repetições por estratégia; vale o melhor tempo (padrão: 3)")
+    parser.add_argument('--work-dir', type=Path, default=None,
+                        help="Diretório das cópias; use o mesmo sistema de arquivos da "
+                             "biblioteca para medir reflinks (padrão: pai de --source)")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or (args.source.parent if args.source.is_dir() else Path.cwd())
+    bench_dir = Path(tempfile.mkdtemp(prefix='bench-copy-', dir=work_dir))
+    try:
+        files = find_large_files(args.source, int(args.min_size_mb * 1024 * 1024))
+        if not files:
+            print(f"Nenhum arquivo grande em {args.source}; gerando {args.files} "
+                  f"arquivo(s) de {args.size_mb} MB")
+            files = generate_files(bench_dir, args.files, args.size_mb * 1024 * 1024)
+
+        total_mb = sum(p.stat().st_size for p in files) / (1024 * 1024)
+        print(f"{len(files)} arquivo(s), {total_mb:.1f} MB, {args.repeat} repetição(ões)\n")
+        print(f"{'Estratégia':<16} {'Tempo (s)':>10} {'MB/s':>10}  Usada")
+        for strategy in COPY_STRATEGIES:
+            result = run_strategy(strategy, files, bench_dir, args.repeat)
+            if 'error' in result:
+                print(f"{strategy:<16} {'-':>10} {'-':>10}  indisponível ({result['error']})")
+            else:
+                print(f"{strategy:<16} {result['seconds']:>10.3f} "
+                      f"{result['mb_per_second']:>10.1f}  {result['used']}")
+    finally:
+        shutil.rmtree(bench_dir)
+
+
+if __name__ == '__main__':
+    main()
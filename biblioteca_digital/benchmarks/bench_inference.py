@@ -0,0 +1,142 @@
+"""
+Benchmark da inferência de metadados por formato
+
+Gera PDFs, EPUBs e DOCX sintéticos com metadados embutidos e importa-os com
+infer_metadata em uma biblioteca nova, no próprio processo e em um pool de
+processos. Mostra, por formato, os arquivos lidos por segundo (tempo de
+leitura somado, isto é, por processo) e, para o lote todo, a vazão da
+importação. Uma segunda importação dos mesmos conteúdos mede o cache.
+
+Uso:
+    python benchmarks/bench_inference.py [--files N] [--pdf-size-kb N] [--workers N]
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from document_manager import DocumentManager
+
+OPF = """<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:title>Livro {i}</dc:title><dc:creator>Autor {i}</dc:creator><dc:date>2015</dc:date>
+  </metadata>
+  <manifest/>
+</package>"""
+
+CONTAINER = """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="content.opf"/></rootfiles>
+</container>"""
+
+CORE = """<?xml version="1.0"?>
+<cp:coreProperties
+    xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"
+    xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/">
+  <dc:title>Artigo {i}</dc:title><dc:creator>Autor {i}</dc:creator>
+  <dcterms:created>2020-01-01T00:00:00Z</dcterms:created>
+</cp:coreProperties>"""
+
+
+def generate_documents(directory: Path, count: int, pdf_size: int) -> List[Dict]:
+    """Gera count documentos de cada formato e devolve as especificações de importação"""
+    body = os.urandom(pdf_size)
+    chapter = "<html><body>" + "<p>texto</p>" * 2000 + "</body></html>"
+    specs = []
+    for i in range(count):
+        pdf = directory / f"tese_{i}.pdf"
+        pdf.write_bytes(b'%%PDF-1.4\n1 0 obj\n<< /Length %d >>\nstream\n' % len(body) + body
+                        + b'\nendstream\nendobj\n2 0 obj\n<< /Title (Tese %d) /Author (Autor %d) '
+                          b'/CreationDate (D:20190101) /Producer (bench) >>\nendobj\n'
+                          b'trailer\n<< /Info 2 0 R >>\n%%%%EOF\n' % (i, i))
+        epub = directory / f"livro_{i}.epub"
+        with zipfile.ZipFile(epub, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('mimetype', 'application/epub+zip')
+            archive.writestr('META-INF/container.xml', CONTAINER)
+            archive.writestr('content.opf', OPF.format(i=i))
+            for n in range(20):
+                archive.writestr(f'capitulo{n}.xhtml', chapter)
+        docx = directory / f"artigo_{i}.docx"
+        with zipfile.ZipFile(docx, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('word/document.xml', '<w:document/>')
+            archive.writestr('docProps/core.xml', CORE.format(i=i))
+        specs += [{'file_path': str(pdf), 'doc_type': 'teses'},
+                  {'file_path': str(epub), 'doc_type': 'livros'},
+                  {'file_path': str(docx), 'doc_type': 'artigos'}]
+    return specs
+
+
+def run_import(base_path: Path, specs: List[Dict], workers: Optional[int]) -> Dict:
+    """Importa o lote e devolve a vazão por formato e a do lote"""
+    manager = DocumentManager(str(base_path), infer_metadata=True)
+    start = time.perf_counter()
+    manager.add_documents(specs, inference_workers=workers)
+    seconds = time.perf_counter() - start
+    operations = manager.metrics.as_dict()['operations']
+    hits = manager.inference_cache.hits
+    manager.close()
+
+    formats = {}
+    for name, operation in operations.items():
+        if name.startswith('infer_metadata.'):
+            total = operation['duration']['sum']
+            formats[name.split('.', 1)[1]] = {
+                'files': operation['calls'],
+                'files_per_second': operation['calls'] / total if total else 0.0,
+                'p95_ms': operation['duration']['p95'] * 1000,
+            }
+    return {'seconds': seconds, 'files_per_second': len(specs) / seconds,
+            'cache_hits': hits, 'formats': formats}
+
+
+def main():
+    """Executa o benchmark e imprime a vazão por formato"""
+    parser = argparse.ArgumentParser(description="Vazão da inferência de metadados por formato")
+    parser.add_argument('--files', type=int, default=200,
+                        help="Arquivos por formato (padrão: 200)")
+    parser.add_argument('--pdf-size-kb', type=int, default=512,
+                        help="Tamanho de cada PDF em KB (padrão: 512)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processos de leitura (padrão: número de CPUs)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix='biblioteca-inferencia-'))
+    try:
+        sources = work_dir / "entrada"
+        sources.mkdir()
+        specs = generate_documents(sources, args.files, args.pdf_size_kb * 1024)
+        print(f"{len(specs)} arquivo(s): {args.files} de cada formato\n")
+
+        runs = [("no processo", 0, "biblioteca-local"),
+                (f"pool ({args.workers or os.cpu_count()})", args.workers, "biblioteca-pool"),
+                ("cache", 0, "biblioteca-cache")]
+        for label, workers, library in runs:
+            if label == "cache":
+                # Os mesmos conteúdos em outra biblioteca, com o cache da anterior
+                (work_dir / library).mkdir()
+                shutil.copy(work_dir / "biblioteca-pool" / "inference_cache.json",
+                            work_dir / library / "inference_cache.json")
+            result = run_import(work_dir / library, specs, workers)
+            print(f"{label:<14} {result['seconds']:>8.2f} s  "
+                  f"{result['files_per_second']:>8.1f} arq/s  "
+                  f"cache: {result['cache_hits']} acerto(s)")
+            for fmt, stats in sorted(result['formats'].items()):
+                print(f"    {fmt:<5} {stats['files']:>6} arquivo(s)  "
+                      f"{stats['files_per_second']:>10.1f} arq/s por processo  "
+                      f"p95 {stats['p95_ms']:>7.2f} ms")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
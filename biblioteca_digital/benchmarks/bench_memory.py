@@ -0,0 +1,177 @@
+"""
+Benchmark de memória dos metadados e do DocumentManager
+
+Compara a memória ocupada por N registros de metadados no formato antigo
+(um dicionário por documento, como lido do metadata.json) e no
+CompactRecordStore (colunas com textos internados e arrays de números),
+medida com tracemalloc; o registro sintético imita os gravados por
+add_document.
+
+Em seguida, mede o gerenciador inteiro: gera uma biblioteca sintética com
+N documentos e, em um processo novo para cada medição, o pico de memória
+residente (RSS) e o tempo para abrir o DocumentManager e para a primeira
+busca, consulta com facetas e estatísticas, que carregam todos os índices
+derivados. A referência é um processo que só lê o metadata.json com
+json.load, como o gerenciador fazia antes das colunas.
+
+Uso:
+    python benchmarks/bench_memory.py [--documents N] [--authors N] [--records-only]
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, SRC_DIR)
+
+from record_store import CompactRecordStore
+
+try:
+    from .synthetic import generate_library
+except ImportError:
+    from synthetic import generate_library
+
+# Executado em um processo novo: tempo e pico de RSS de cada etapa
+PROBE = """
+import sys, time, json, resource
+sys.path.insert(0, {src!r})
+
+def peak_mb():
+    # No Linux, ru_maxrss inclui o pico do processo pai (é mantido pelo
+    # execve); VmHWM é só deste processo
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 2 ** 10
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB nos demais sistemas
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+start = time.perf_counter()
+if {reference!r}:
+    with open({metadata!r}, 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    print(time.perf_counter() - start, peak_mb())
+else:
+    from document_manager import DocumentManager
+    start = time.perf_counter()
+    manager = DocumentManager({base!r})
+    print(time.perf_counter() - start, peak_mb())
+    start = time.perf_counter()
+    manager.search_documents('Silva', limit=20)
+    manager.query_documents({{'type': 'artigos'}}, facets=['year', 'author'], limit=20)
+    manager.get_statistics()
+    print(time.perf_counter() - start, peak_mb())
+"""
+
+TYPES = ['artigos', 'teses', 'livros']
+
+
+def generate_json(count: int, authors: int, seed: int = 42) -> str:
+    """Gera o conteúdo de um metadata.json sintético"""
+    rng = random.Random(seed)
+    start = datetime(2020, 1, 1)
+    data = {}
+    for i in range(count):
+        doc_type = rng.choice(TYPES)
+        year = rng.randint(1950, 2024)
+        data[f"{doc_type}/documento_{i}_{year}.pdf"] = {
+            'type': doc_type,
+            'year': year,
+            'author': f"Autor {rng.randrange(authors)}",
+            'title': f"Título do documento {i}",
+            'added_date': (start + timedelta(seconds=rng.randrange(10 ** 8),
+                                             microseconds=rng.randrange(10 ** 6))).isoformat(),
+            'file_size': rng.randrange(10 ** 4, 10 ** 8),
+        }
+    return json.dumps(data)
+
+
+def measure(build: Callable[[], object]) -> Tuple[int, object]:
+    """Memória alocada (bytes) pelo objeto construído"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def probe(base: Path, reference: bool = False) -> List[Tuple[float, float]]:
+    """Executa a medição em um processo novo: [(segundos, pico de RSS em MB), ...]"""
+    code = PROBE.format(src=SRC_DIR, base=str(base), reference=reference,
+                        metadata=str(base / "metadata.json"))
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    return [tuple(map(float, line.split())) for line in output.splitlines()]
+
+
+def measure_manager(documents: int):
+    """Pico de RSS e tempo do DocumentManager, comparados com o json.load"""
+    work_dir = Path(tempfile.mkdtemp(prefix='bench-memory-'))
+    try:
+        base = work_dir / "biblioteca"
+        mix = {'artigos': 6, 'teses': 1, 'livros': 3}
+        counts = {doc_type: documents * weight // 10 for doc_type, weight in mix.items()}
+        counts['artigos'] += documents - sum(counts.values())
+        generate_library(str(base), counts)
+        # A primeira abertura constrói e grava os índices; as medições os carregam
+        probe(base)
+
+        rows = [('json.load (formato antigo)',) + probe(base, reference=True)[0]]
+        opened, loaded = probe(base)
+        rows.append(('DocumentManager: abertura',) + opened)
+        rows.append(('  + busca, facetas, estat.',) + loaded)
+
+        print(f"\nDocumentManager com {documents} documentos (processo novo por medição)\n")
+        print(f"{'Etapa':<28} {'Tempo (s)':>10} {'Pico RSS (MB)':>14}")
+        for name, seconds, peak in rows:
+            print(f"{name:<28} {seconds:>10.2f} {peak:>14.1f}")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Compara a memória dos formatos de metadados")
+    parser.add_argument('--documents', type=int, default=100_000,
+                        help="Número de documentos (padrão: 100000)")
+    parser.add_argument('--authors', type=int, default=5_000,
+                        help="Número de autores distintos (padrão: 5000)")
+    parser.add_argument('--records-only', action='store_true',
+                        help="Mede apenas os registros, sem gerar a biblioteca")
+    args = parser.parse_args()
+
+    text = generate_json(args.documents, args.authors)
+
+    dict_bytes, records = measure(lambda: json.loads(text))
+    compact_bytes, store = measure(lambda: CompactRecordStore(json.loads(text).items()))
+    assert len(store) == len(records)
+
+    print(f"{args.documents} documentos, {args.authors} autores distintos\n")
+    print(f"{'Formato':<24} {'Total (MB)':>12} {'Bytes/doc':>10}")
+    for name, size in [('dict de dicts', dict_bytes), ('CompactRecordStore', compact_bytes)]:
+        print(f"{name:<24} {size / 2 ** 20:>12.1f} {size / args.documents:>10.0f}")
+    print(f"\nRedução: {dict_bytes / compact_bytes:.1f}x")
+
+    if not args.records_only:
+        measure_manager(args.documents)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark de abertura da biblioteca (partida a frio)
+
+Gera uma biblioteca sintética com N registros de metadados, converte o
+metadata.json para metadata.bin e mede, em um processo novo para cada
+backend, o tempo para abrir o DocumentManager e para ler um registro.
+Cada medição usa um processo próprio, sem nada carregado em memória; o
+cache de páginas do sistema operacional continua valendo entre elas.
+
+Uso:
+    python benchmarks/bench_startup.py [--documents N] [--repeat N]
+"""
+
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, SRC_DIR)
+
+from metadata_store import json_to_binary
+
+# Executado em um processo novo: abre a biblioteca e lê um registro
+PROBE = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+from document_manager import DocumentManager
+imported = time.perf_counter()
+manager = DocumentManager({base!r}, backend={backend!r})
+opened = time.perf_counter()
+record = manager.metadata[{key!r}]
+touched = time.perf_counter()
+print(imported - start, opened - imported, touched - opened)
+"""
+
+
+def generate_library(base: Path, count: int, seed: int = 42) -> str:
+    """Grava o metadata.json sintético e devolve uma chave existente"""
+    rng = random.Random(seed)
+    data = {}
+    for i in range(count):
+        doc_type = rng.choice(['artigos', 'teses', 'livros'])
+        year = rng.randint(1950, 2024)
+        data[f"{doc_type}/documento_{i}_{year}.pdf"] = {
+            'type': doc_type,
+            'year': year,
+            'author': f"Autor {rng.randrange(5000)}",
+            'title': f"Documento {i}",
+            'added_date': f"2024-01-01T00:00:{i % 60:02d}",
+            'file_size': rng.randrange(10 ** 4, 10 ** 8),
+        }
+    base.mkdir(parents=True, exist_ok=True)
+    with open(base / "metadata.json", 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    return rng.choice(list(data))
+
+
+def probe(base: Path, backend: str, key: str) -> Dict[str, float]:
+    """Mede a abertura e a primeira leitura em um processo novo"""
+    code = PROBE.format(src=SRC_DIR, base=str(base), backend=backend, key=key)
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    imported, opened, touched = map(float, output.split())
+    return {'open': opened, 'first_record': touched}
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Mede a abertura da biblioteca por backend")
+    parser.add_argument('--documents', type=int, default=100_000,
+                        help="Número de registros (padrão: 100000)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repetições por backend; vale o melhor tempo (padrão: 3)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix='bench-startup-'))
+    try:
+        base = work_dir / "biblioteca"
+        key = generate_library(base, args.documents)
+        json_to_binary(base / "metadata.json", base / "metadata.bin")
+        json_size = (base / "metadata.json").stat().st_size / 2 ** 20
+        binary_size = (base / "metadata.bin").stat().st_size / 2 ** 20
+        print(f"{args.documents} registros: metadata.json {json_size:.1f} MB, "
+              f"metadata.bin {binary_size:.1f} MB\n")
+
+        print(f"{'Backend':<10} {'Abertura (ms)':>14} {'1º registro (ms)':>17}")
+        for backend in ('json', 'binary'):
+            results = [probe(base, backend, key) for _ in range(args.repeat)]
+            best_open = min(result['open'] for result in results)
+            best_touch = min(result['first_record'] for result in results)
+            print(f"{backend:<10} {best_open * 1000:>14.1f} {best_touch * 1000:>17.3f}")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
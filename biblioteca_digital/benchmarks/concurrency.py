@@ -0,0 +1,246 @@
+"""
+Teste de carga com vários processos escrevendo na mesma biblioteca
+
+Cada processo abre a biblioteca no modo compartilhado e executa a sua
+sequência de inclusões, renomeações e remoções; parte das inclusões usa o
+mesmo nome em todos os processos, disputando os nomes de destino. Ao final
+a biblioteca é reaberta e comparada com o resultado esperado (nenhuma
+alteração pode ter sido perdida), assim como um leitor aberto antes dos
+escritores, que só incorpora as alterações deles. A vazão é medida do
+início simultâneo dos escritores até o término do último.
+
+Uso:
+    python -m benchmarks.concurrency [--writers 1 2 4 8] [--operations 100]
+                                     [--backend json] [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from document_manager import DocumentManager
+
+# Nome incluído por todos os processos (a cada SHARED_NAME_EVERY operações)
+SHARED_NAME = "Comum_2020.pdf"
+SHARED_NAME_EVERY = 10
+DOCUMENT_SIZE = 4096
+
+
+def plan_operations(worker: int, operations: int) -> Tuple[List[Tuple], Set[str], int]:
+    """
+    Sequência de operações de um escritor
+
+    Args:
+        worker: Número do escritor
+        operations: Número de operações
+
+    Returns:
+        Tupla com as operações (('add', nome), ('rename', antigo, novo) ou
+        ('remove', nome)), os nomes próprios que devem existir ao final e
+        quantas inclusões de SHARED_NAME foram feitas
+    """
+    plan = []
+    alive: List[str] = []
+    shared_adds = 0
+    for i in range(operations):
+        if i % SHARED_NAME_EVERY == SHARED_NAME_EVERY - 1:
+            plan.append(('add', SHARED_NAME))
+            shared_adds += 1
+        elif i % 5 == 4 and alive:
+            new_name = f"P{worker}_Renomeado {i}_{2000 + i % 20}.pdf"
+            plan.append(('rename', alive.pop(), new_name))
+            alive.append(new_name)
+        elif i % 7 == 6 and alive:
+            plan.append(('remove', alive.pop(0)))
+        else:
+            name = f"P{worker}_Documento {i}_{2000 + i % 20}.pdf"
+            plan.append(('add', name))
+            alive.append(name)
+    return plan, set(alive), shared_adds
+
+
+def run_writer(base_path: str, backend: str, worker: int, operations: int,
+               compact_threshold: Optional[int], start, results):
+    """Processo escritor: executa o seu plano e informa o tempo de espera pela trava"""
+    try:
+        sources = Path(base_path).parent / f"entrada-{worker}"
+        sources.mkdir(exist_ok=True)
+        plan, _, _ = plan_operations(worker, operations)
+        for operation in plan:
+            if operation[0] == 'add':
+                (sources / operation[1]).write_bytes(b"x" * DOCUMENT_SIZE)
+
+        manager = DocumentManager(base_path, backend=backend, shared=True)
+        if compact_threshold is not None and hasattr(manager.metadata, 'compact_threshold'):
+            manager.metadata.compact_threshold = compact_threshold
+    except BaseException:
+        # Libera os demais, que estariam aguardando este escritor
+        start.abort()
+        raise
+    start.wait()
+
+    for operation in plan:
+        if operation[0] == 'add':
+            manager.add_document(str(sources / operation[1]), 'artigos',
+                                 author=f"Processo {worker}")
+        elif operation[0] == 'rename':
+            manager.rename_document(operation[1], operation[2], 'artigos')
+        else:
+            manager.remove_document(operation[1], 'artigos')
+    manager.close()
+
+    lock_wait = manager.metrics.as_dict()['operations'].get('lock_wait')
+    results.put((worker, lock_wait['duration'] if lock_wait else None))
+
+
+def run_stress(writers: int, operations: int = 100, backend: str = 'json',
+               compact_threshold: Optional[int] = 50,
+               work_dir: Optional[str] = None) -> Dict:
+    """
+    Executa os escritores em paralelo e confere o resultado
+
+    Args:
+        writers: Número de processos escritores
+        operations: Operações por escritor
+        backend: Backend de metadados
+        compact_threshold: Limite de compactação do diário dos escritores,
+            baixo para que compactações aconteçam durante a carga (None
+            mantém o padrão)
+        work_dir: Diretório de trabalho (padrão: temporário, apagado ao final)
+
+    Returns:
+        Dicionário com 'writers', 'operations' (total), 'seconds',
+        'ops_per_second', 'lock_wait_p95_ms', 'lost' (nomes esperados e
+        ausentes), 'unexpected' (presentes e não esperados), 'untracked'
+        (arquivos sem metadados) e 'reader_consistent'
+    """
+    root = Path(work_dir or tempfile.mkdtemp(prefix='biblioteca-concorrencia-'))
+    base_path = root / "biblioteca"
+    context = multiprocessing.get_context('spawn')
+    try:
+        reader = DocumentManager(str(base_path), backend=backend, shared=True)
+        reader.get_statistics()
+
+        start = context.Barrier(writers + 1)
+        results = context.Queue()
+        processes = [
+            context.Process(target=run_writer,
+                            args=(str(base_path), backend, worker, operations,
+                                  compact_threshold, start, results))
+            for worker in range(writers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            start.wait()
+        except threading.BrokenBarrierError:
+            for process in processes:
+                process.join()
+            raise RuntimeError("Um escritor falhou antes do início da carga") from None
+        began = time.perf_counter()
+        lock_waits = []
+        while len(lock_waits) < writers:
+            try:
+                lock_waits.append(results.get(timeout=1))
+            except queue.Empty:
+                # Um escritor que falhou não envia resultado
+                if not any(process.is_alive() for process in processes):
+                    break
+        for process in processes:
+            process.join()
+        seconds = time.perf_counter() - began
+        failed = [process.exitcode for process in processes if process.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"{len(failed)} escritor(es) terminaram com erro")
+
+        expected: Set[str] = set()
+        shared_adds = 0
+        for worker in range(writers):
+            _, alive, adds = plan_operations(worker, operations)
+            expected |= alive
+            shared_adds += adds
+        shared_stem, shared_ext = os.path.splitext(SHARED_NAME)
+        expected.add(SHARED_NAME)
+        expected.update(f"{shared_stem}_{n}{shared_ext}" for n in range(1, shared_adds))
+
+        final = DocumentManager(str(base_path), backend=backend, shared=True)
+        listed = final.list_documents()
+        names = {document['filename'] for document in listed}
+        tracked = {os.path.basename(rel_path) for rel_path in final.metadata}
+        final.close()
+
+        reader_names = {document['filename'] for document in reader.list_documents()}
+        reader_consistent = (reader_names == names and
+                             reader.get_statistics()['total_documents'] == len(names) and
+                             len(reader.search_documents("comum")) == shared_adds and
+                             reader.verify_statistics(repair=False)['consistent'])
+        reader.close()
+
+        p95 = [wait['p95'] for _, wait in lock_waits if wait is not None]
+        total = writers * operations
+        return {
+            'writers': writers,
+            'operations': total,
+            'seconds': round(seconds, 3),
+            'ops_per_second': round(total / seconds, 1) if seconds else 0.0,
+            'lock_wait_p95_ms': round(max(p95) * 1000, 2) if p95 else 0.0,
+            'lost': sorted(expected - names),
+            'unexpected': sorted(names - expected),
+            'untracked': sorted(names - tracked),
+            'reader_consistent': reader_consistent,
+        }
+    finally:
+        if work_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    """Executa a carga para cada número de escritores e imprime a vazão"""
+    parser = argparse.ArgumentParser(
+        description="Vários processos escrevendo na mesma biblioteca (modo compartilhado)")
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Números de processos escritores (padrão: 1 2 4 8)")
+    parser.add_argument('--operations', type=int, default=100,
+                        help="Operações por escritor (padrão: 100)")
+    parser.add_argument('--backend', choices=DocumentManager.METADATA_BACKENDS, default='json')
+    parser.add_argument('--compact-threshold', type=int, default=50,
+                        help="Limite de compactação do diário (padrão: 50)")
+    parser.add_argument('--output', help="Arquivo JSON para gravar os resultados")
+    args = parser.parse_args()
+
+    rows = []
+    for writers in args.writers:
+        row = run_stress(writers, args.operations, args.backend, args.compact_threshold)
+        rows.append(row)
+        status = "ok" if not (row['lost'] or row['unexpected'] or row['untracked']) \
+            and row['reader_consistent'] else "INCONSISTENTE"
+        print(f"{writers:>3} escritor(es)  {row['operations']:>6} operações  "
+              f"{row['seconds']:>8.2f} s  {row['ops_per_second']:>8.1f} op/s  "
+              f"espera p95 {row['lock_wait_p95_ms']:>8.2f} ms  {status}")
+        for field in ('lost', 'unexpected', 'untracked'):
+            if row[field]:
+                print(f"    {field}: {', '.join(row[field][:10])}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'backend': args.backend, 'results': rows}, f, indent=2)
+
+    consistent = all(not (row['lost'] or row['unexpected'] or row['untracked'])
+                     and row['reader_consistent'] for row in rows)
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+"""
+Suíte de benchmarks das operações do DocumentManager
+
+Para cada tamanho de biblioteca, gera uma biblioteca sintética e cronometra
+add_document, rename_document, remove_document, list_documents,
+list_by_year, search_documents e get_statistics. Os resultados (mínimo,
+mediana, p95 e média em ms) são gravados em JSON para comparar execuções;
+com --baseline, a mediana de cada cenário é comparada com a da execução
+anterior e o processo termina com código 1 se alguma piorar além do limite.
+
+Uso:
+    python -m benchmarks.suite [--sizes 1000 100000 1000000] [--output results.json]
+                               [--baseline anterior.json] [--threshold 0.2]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from document_manager import DocumentManager
+
+try:
+    from .synthetic import DEFAULT_COUNTS, SyntheticLibrary, generate_library, write_sparse_file
+except ImportError:
+    from synthetic import DEFAULT_COUNTS, SyntheticLibrary, generate_library, write_sparse_file
+
+RESULTS_VERSION = 1
+
+# Consultas de busca: autores, palavras de título, prefixos e erros de digitação
+QUERIES = ['Silva', 'Redes Neurais', 'Otimização', 'Algoritmos Oliveira', 'Aprendizado',
+           'Compu', 'Sistemas Distribuidos', 'Criptografia 2020', 'Robotca', 'Genética Costa']
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Resume tempos (em segundos) em estatísticas em milissegundos"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'median_ms': round(statistics.median(ordered) * 1000, 4),
+        'p95_ms': round(p95 * 1000, 4),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+    }
+
+
+def time_calls(calls: List[Callable[[], object]]) -> Dict[str, float]:
+    """Cronometra cada chamada individualmente"""
+    samples = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def split_counts(size: int, mix: Dict[str, int]) -> Dict[str, int]:
+    """Divide o total de documentos entre os tipos, proporcionalmente aos pesos"""
+    total = sum(mix.values())
+    counts = {doc_type: size * weight // total for doc_type, weight in mix.items()}
+    first = next(iter(counts))
+    counts[first] += size - sum(counts.values())
+    return counts
+
+
+def run_size(work_dir: Path, size: int, mix: Dict[str, int], backend: str, journal: bool,
+             layout: str, operations: int, repeat: int, seed: int) -> Dict[str, Dict]:
+    """
+    Executa todos os cenários em uma biblioteca com size documentos
+
+    As escritas adicionam, renomeiam e removem os mesmos documentos, de modo
+    que a biblioteca volta ao tamanho original entre os cenários.
+    """
+    library = work_dir / f"biblioteca_{size}"
+    staging = work_dir / f"entrada_{size}"
+    staging.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    generate_library(str(library), split_counts(size, mix), seed=seed,
+                     backend=backend, layout=layout)
+    print(f"  biblioteca gerada em {time.perf_counter() - start:.1f} s", flush=True)
+
+    # Documentos novos, com nomes que não existem na biblioteca gerada
+    incoming = SyntheticLibrary(seed=seed + 1).documents(split_counts(operations, mix))
+    for document in incoming:
+        document['filename'] = f"novo_{document['filename']}"
+        write_sparse_file(staging / document['filename'], document['size'])
+
+    manager = DocumentManager(str(library), journal=journal, backend=backend, layout=layout)
+    results = {}
+    try:
+        # Aquecimento: reconciliação dos diretórios e carga dos índices
+        start = time.perf_counter()
+        manager.list_documents()
+        manager.search_documents(QUERIES[0])
+        manager.get_statistics()
+        results['warmup'] = summarize([time.perf_counter() - start])
+
+        results['add_document'] = time_calls([
+            (lambda d=d: manager.add_document(str(staging / d['filename']), d['type'],
+                                              d['year'], d['author'], d['title']))
+            for d in incoming])
+        results['rename_document'] = time_calls([
+            (lambda d=d: manager.rename_document(d['filename'], f"renomeado_{d['filename']}",
+                                                 d['type']))
+            for d in incoming])
+        results['remove_document'] = time_calls([
+            (lambda d=d: manager.remove_document(f"renomeado_{d['filename']}", d['type']))
+            for d in incoming])
+
+        results['list_documents'] = time_calls([manager.list_documents] * repeat)
+        results['list_documents_filtered'] = time_calls(
+            [lambda: manager.list_documents('artigos', 2020)] * repeat)
+        results['list_by_year'] = time_calls([manager.list_by_year] * repeat)
+        results['search_documents'] = time_calls([
+            (lambda q=query: manager.search_documents(q, limit=20))
+            for _ in range(repeat) for query in QUERIES])
+        results['get_statistics'] = time_calls([manager.get_statistics] * repeat)
+    finally:
+        manager.close()
+        shutil.rmtree(library, ignore_errors=True)
+        shutil.rmtree(staging, ignore_errors=True)
+    return results
+
+
+def run_suite(sizes: List[int], mix: Optional[Dict[str, int]] = None, backend: str = 'json',
+              journal: bool = True, layout: str = 'flat', operations: int = 50,
+              repeat: int = 5, seed: int = 42, work_dir: Optional[str] = None) -> Dict:
+    """
+    Executa a suíte para cada tamanho de biblioteca
+
+    Returns:
+        Resultados no formato gravado em JSON: 'version', 'created',
+        'environment', 'config' e 'results' ({tamanho: {cenário: estatísticas}})
+    """
+    mix = dict(DEFAULT_COUNTS if mix is None else mix)
+    config = {'sizes': sizes, 'mix': mix, 'backend': backend, 'journal': journal,
+              'layout': layout, 'operations': operations, 'repeat': repeat, 'seed': seed}
+    base_dir = Path(work_dir or tempfile.mkdtemp(prefix='bench-suite-'))
+    base_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    try:
+        for size in sizes:
+            print(f"{size} documentos...", flush=True)
+            results[str(size)] = run_size(base_dir, size, mix, backend, journal, layout,
+                                          operations, repeat, seed)
+    finally:
+        if work_dir is None:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.machine(),
+        },
+        'config': config,
+        'results': results,
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2,
+                    min_delta_ms: float = 0.05) -> List[Dict]:
+    """
+    Compara as medianas de duas execuções
+
+    Um cenário regride quando a mediana atual supera a anterior em mais de
+    threshold (fração) e em mais de min_delta_ms, o que evita acusar ruído
+    em operações de microssegundos. Cenários ausentes em uma das execuções
+    são ignorados.
+
+    Returns:
+        Lista com 'size', 'scenario', 'baseline_ms', 'current_ms' e 'change'
+        de cada cenário comparado, com 'regression' indicando a regressão
+    """
+    if baseline.get('version') != current.get('version'):
+        raise ValueError("Resultados de versões diferentes não podem ser comparados")
+
+    comparisons = []
+    for size, scenarios in current['results'].items():
+        previous = baseline['results'].get(size, {})
+        for scenario, stats in scenarios.items():
+            if scenario == 'warmup' or scenario not in previous:
+                continue
+            before = previous[scenario]['median_ms']
+            after = stats['median_ms']
+            change = (after - before) / before if before else 0.0
+            comparisons.append({
+                'size': size,
+                'scenario': scenario,
+                'baseline_ms': before,
+                'current_ms': after,
+                'change': round(change, 4),
+                'regression': change > threshold and after - before > min_delta_ms,
+            })
+    return comparisons
+
+
+def print_results(data: Dict):
+    """Mostra os resultados de uma execução"""
+    print(f"\n{'Tamanho':>9} {'Cenário':<24} {'Mediana (ms)':>13} "
+          f"{'p95 (ms)':>10} {'Mín (ms)':>10}")
+    for size, scenarios in data['results'].items():
+        for scenario, stats in scenarios.items():
+            print(f"{size:>9} {scenario:<24} {stats['median_ms']:>13.3f} "
+                  f"{stats['p95_ms']:>10.3f} {stats['min_ms']:>10.3f}")
+
+
+def print_comparisons(comparisons: List[Dict], threshold: float):
+    """Mostra a comparação com a execução anterior"""
+    print(f"\nComparação com a execução anterior (limite: +{threshold:.0%})")
+    print(f"{'Tamanho':>9} {'Cenário':<24} {'Antes (ms)':>11} {'Agora (ms)':>11} "
+          f"{'Variação':>9}")
+    for item in comparisons:
+        flag = "  REGRESSÃO" if item['regression'] else ""
+        print(f"{item['size']:>9} {item['scenario']:<24} {item['baseline_ms']:>11.3f} "
+              f"{item['current_ms']:>11.3f} {item['change']:>+9.1%}{flag}")
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Cronometra as operações do DocumentManager")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000],
+                        help="Tamanhos de biblioteca (padrão: 1000; ex.: 1000 100000 1000000)")
+    parser.add_argument('--mix', type=int, nargs=3, metavar=('ARTIGOS', 'TESES', 'LIVROS'),
+                        default=list(DEFAULT_COUNTS.values()),
+                        help="Proporção entre artigos, teses e livros (padrão: 600 100 300)")
+    parser.add_argument('--backend', choices=DocumentManager.METADATA_BACKENDS, default='json')
+    parser.add_argument('--no-journal', action='store_true',
+                        help="Reescreve os metadados a cada operação em vez de usar o diário")
+    parser.add_argument('--layout', choices=DocumentManager.LAYOUTS, default='flat')
+    parser.add_argument('--operations', type=int, default=50,
+                        help="Escritas por cenário de escrita (padrão: 50)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Repetições dos cenários de leitura (padrão: 5)")
+    parser.add_argument('--seed', type=int, default=42, help="Semente (padrão: 42)")
+    parser.add_argument('--work-dir', help="Diretório de trabalho (padrão: temporário)")
+    parser.add_argument('--output', help="Arquivo JSON para gravar os resultados")
+    parser.add_argument('--baseline', help="Resultados anteriores para comparação")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Piora máxima aceita na mediana, em fração (padrão: 0.2)")
+    args = parser.parse_args()
+
+    if args.baseline and not os.path.exists(args.baseline):
+        raise FileNotFoundError(f"Resultados não encontrados: {args.baseline}")
+
+    data = run_suite(args.sizes, dict(zip(DEFAULT_COUNTS, args.mix)), backend=args.backend,
+                     journal=not args.no_journal, layout=args.layout,
+                     operations=args.operations, repeat=args.repeat, seed=args.seed,
+                     work_dir=args.work_dir)
+    print_results(data)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+        print(f"\nResultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        # Os tamanhos podem diferir: apenas os comuns às duas execuções são comparados
+        settings = {key: value for key, value in data['config'].items() if key != 'sizes'}
+        if any(baseline.get('config', {}).get(key) != value for key, value in settings.items()):
+            print("\nAviso: a configuração difere da execução anterior")
+        comparisons = compare_results(baseline, data, args.threshold)
+        print_comparisons(comparisons, args.threshold)
+        if any(item['regression'] for item in comparisons):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""
+Gerador de bibliotecas sintéticas
+
+Cria documentos com nomes no padrão recomendado para cada tipo, anos
+concentrados nos últimos anos, autores com popularidade desigual (poucos
+autores com muitos documentos) e tamanhos log-normais por tipo. Os arquivos
+são esparsos: têm o tamanho informado, mas não ocupam blocos no disco.
+
+Uso:
+    python -m benchmarks.synthetic DIR [--artigos N] [--teses N] [--livros N]
+"""
+
+import os
+import sys
+import math
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from document_manager import DocumentManager
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor',
+               'Isabela', 'João', 'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael',
+               'Sofia', 'Tiago', 'Úrsula', 'Vinícius']
+LAST_NAMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves',
+              'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida',
+              'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento',
+              'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes', 'Freitas']
+TITLE_WORDS = ['Redes', 'Neurais', 'Aprendizado', 'Máquina', 'Sistemas', 'Distribuídos',
+               'Análise', 'Algoritmos', 'Dados', 'Computação', 'Paralela', 'Otimização',
+               'Modelos', 'Estatísticos', 'Segurança', 'Criptografia', 'Compiladores',
+               'Linguagens', 'Grafos', 'Banco', 'Visão', 'Robótica', 'Bioinformática',
+               'Economia', 'História', 'Direito', 'Educação', 'Física', 'Química',
+               'Matemática', 'Sustentabilidade', 'Energia', 'Clima', 'Saúde', 'Genética',
+               'Linguística']
+UNIVERSITIES = ['USP', 'UNICAMP', 'UFRJ', 'UFMG', 'UFRGS', 'UnB', 'UFPE', 'UFSC', 'UFBA', 'UFPR']
+
+# Extensões por tipo, com o peso de cada uma
+EXTENSIONS = {
+    'artigos': (['.pdf', '.docx', '.doc', '.txt'], [80, 10, 5, 5]),
+    'teses': (['.pdf', '.docx', '.doc'], [90, 7, 3]),
+    'livros': (['.pdf', '.epub', '.mobi', '.azw3'], [50, 35, 10, 5]),
+}
+
+# Tamanho mediano (bytes) e dispersão log-normal por tipo
+SIZES = {
+    'artigos': (400 * 1024, 0.8),
+    'teses': (3 * 1024 * 1024, 0.7),
+    'livros': (8 * 1024 * 1024, 1.0),
+}
+
+DEFAULT_COUNTS = {'artigos': 600, 'teses': 100, 'livros': 300}
+
+
+class SyntheticLibrary:
+    """Gera documentos sintéticos reprodutíveis a partir de uma semente"""
+
+    def __init__(self, seed: int = 42, authors: int = 2000, newest_year: int = 2024):
+        """
+        Inicializa o gerador
+
+        Args:
+            seed: Semente do gerador aleatório
+            authors: Número de autores distintos
+            newest_year: Ano mais recente dos documentos
+        """
+        self.rng = random.Random(seed)
+        self.newest_year = newest_year
+        self.authors = [(self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES))
+                        for _ in range(authors)]
+        # Popularidade de Zipf: o autor de posição k tem peso 1/k
+        self._author_weights = [1 / (rank + 1) for rank in range(authors)]
+        self._names: Dict[str, int] = {}
+
+    def _author(self) -> Tuple[str, str]:
+        return self.rng.choices(self.authors, weights=self._author_weights)[0]
+
+    def _year(self) -> Optional[int]:
+        """Ano concentrado nos últimos anos; 5% dos documentos sem ano"""
+        if self.rng.random() < 0.05:
+            return None
+        return max(1950, self.newest_year - int(self.rng.expovariate(1 / 8)))
+
+    def _title(self) -> str:
+        return ' '.join(self.rng.sample(TITLE_WORDS, self.rng.randint(2, 5)))
+
+    def _size(self, doc_type: str) -> int:
+        median, sigma = SIZES[doc_type]
+        return max(1024, int(self.rng.lognormvariate(math.log(median), sigma)))
+
+    def _unique(self, filename: str) -> str:
+        """Acrescenta um sufixo a nomes repetidos"""
+        count = self._names.get(filename, 0)
+        self._names[filename] = count + 1
+        if not count:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        return self._unique(f"{stem}_{count}{ext}")
+
+    def document(self, doc_type: str) -> Dict:
+        """
+        Gera um documento no padrão de nomes do tipo
+
+        Returns:
+            Dicionário com 'filename', 'type', 'year', 'author', 'title',
+            'size' e 'added_date'
+        """
+        first, last = self._author()
+        year = self._year()
+        title = self._title()
+        slug = title.replace(' ', '_')
+        year_part = f"_{year}" if year else ""
+        extensions, weights = EXTENSIONS[doc_type]
+        ext = self.rng.choices(extensions, weights=weights)[0]
+
+        if doc_type == 'artigos':
+            filename = f"{last}_{slug}{year_part}{ext}"
+        elif doc_type == 'teses':
+            filename = f"{slug}{year_part}_{self.rng.choice(UNIVERSITIES)}{ext}"
+        else:
+            filename = f"{slug}_{last}{year_part}{ext}"
+
+        added = datetime(self.newest_year, 12, 31) - timedelta(
+            seconds=self.rng.randrange(3 * 365 * 86400))
+        return {
+            'filename': self._unique(filename),
+            'type': doc_type,
+            'year': year,
+            'author': f"{first} {last}",
+            'title': title,
+            'size': self._size(doc_type),
+            'added_date': added.isoformat(),
+        }
+
+    def documents(self, counts: Dict[str, int]) -> List[Dict]:
+        """Gera os documentos de cada tipo, intercalados aleatoriamente"""
+        types = [doc_type for doc_type, count in counts.items() for _ in range(count)]
+        self.rng.shuffle(types)
+        return [self.document(doc_type) for doc_type in types]
+
+
+def write_sparse_file(path: Path, size: int):
+    """Cria um arquivo esparso com o tamanho informado"""
+    with open(path, 'wb') as f:
+        f.truncate(size)
+
+
+def generate_library(base_path: str, counts: Optional[Dict[str, int]] = None, seed: int = 42,
+                     backend: str = 'json', layout: str = 'flat') -> List[str]:
+    """
+    Cria uma biblioteca sintética pronta para o DocumentManager
+
+    Os arquivos são gravados diretamente nos diretórios da biblioteca e os
+    metadados em lote, sem passar pela cópia de add_document; os índices
+    derivados são construídos na primeira abertura.
+
+    Args:
+        base_path: Diretório da biblioteca (criado se necessário)
+        counts: Número de documentos por tipo (padrão: DEFAULT_COUNTS)
+        seed: Semente do gerador
+        backend: Backend de metadados do DocumentManager
+        layout: Layout dos arquivos ('flat' ou 'sharded')
+
+    Returns:
+        Caminhos relativos dos documentos criados
+    """
+    counts = dict(DEFAULT_COUNTS if counts is None else counts)
+    unknown = set(counts) - set(DocumentManager.SUPPORTED_FORMATS)
+    if unknown:
+        raise ValueError(f"Tipo de documento inválido: {sorted(unknown)}")
+
+    generator = SyntheticLibrary(seed=seed, authors=max(50, sum(counts.values()) // 20))
+    manager = DocumentManager(base_path, backend=backend, layout=layout, journal=True)
+    rel_paths = []
+    try:
+        for document in generator.documents(counts):
+            dest = manager._document_path(document['type'], document['filename'])
+            dest.parent.mkdir(exist_ok=True)
+            write_sparse_file(dest, document['size'])
+            rel_path = str(dest.relative_to(manager.base_path))
+            manager.metadata[rel_path] = {
+                'type': document['type'],
+                'year': document['year'],
+                'author': document['author'],
+                'title': document['title'],
+                'added_date': document['added_date'],
+                'file_size': document['size'],
+            }
+            rel_paths.append(rel_path)
+        manager.metadata.compact()
+    finally:
+        manager.close()
+    return rel_paths
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Gera uma biblioteca sintética")
+    parser.add_argument('directory', help="Diretório da biblioteca")
+    for doc_type, count in DEFAULT_COUNTS.items():
+        parser.add_argument(f'--{doc_type}', type=int, default=count,
+                            help=f"Número de {doc_type} (padrão: {count})")
+    parser.add_argument('--seed', type=int, default=42, help="Semente (padrão: 42)")
+    parser.add_argument('--backend', choices=DocumentManager.METADATA_BACKENDS, default='json')
+    parser.add_argument('--layout', choices=DocumentManager.LAYOUTS, default='flat')
+    args = parser.parse_args()
+
+    counts = {doc_type: getattr(args, doc_type) for doc_type in DEFAULT_COUNTS}
+    rel_paths = generate_library(args.directory, counts, seed=args.seed,
+                                 backend=args.backend, layout=args.layout)
+    print(f"{len(rel_paths)} documento(s) gerado(s) em {args.directory}")
+
+
+if __name__ == '__main__':
+    main()
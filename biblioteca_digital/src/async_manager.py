@@ -0,0 +1,250 @@
+"""
+Fachada assíncrona do DocumentManager
+
+Para uso em serviços asyncio: toda operação bloqueante roda em um pool de
+threads limitado, fora do laço de eventos. O DocumentManager não é seguro
+para várias threads, então cada acesso ao seu estado é feito sob uma trava;
+as escritas também passam por uma trava assíncrona, que as executa uma de
+cada vez.
+
+Na inclusão de um documento, a cópia (a parte lenta) é feita para um
+arquivo temporário em .ingest/ sem segurar a trava do estado, e apenas a
+confirmação (mover o arquivo para o destino e registrar os metadados)
+bloqueia as leituras. Assim uma cópia demorada não impede listagens,
+buscas e estatísticas, e nenhuma leitura vê o arquivo pela metade.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import functools
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from document_manager import DocumentManager
+
+
+class AsyncDocumentManager:
+    """Versão com métodos aguardáveis do DocumentManager"""
+
+    # Diretório (dentro da biblioteca) das cópias ainda não confirmadas
+    STAGING_DIR = ".ingest"
+
+    def __init__(self, manager: DocumentManager, max_workers: int = 4):
+        """
+        Inicializa a fachada sobre um gerenciador já aberto
+
+        Args:
+            manager: Gerenciador de documentos; não deve ser usado
+                diretamente enquanto a fachada estiver em uso
+            max_workers: Número máximo de threads para operações bloqueantes
+        """
+        if max_workers < 2:
+            raise ValueError("São necessárias ao menos 2 threads: "
+                             "uma para cópias e outra para leituras")
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='biblioteca-async')
+        self._state_lock = threading.RLock()
+        self._write_lock = asyncio.Lock()
+        self._staging = manager.base_path / self.STAGING_DIR
+        self._staging_counter = 0
+
+    @classmethod
+    async def open(cls, base_path: str = "data", max_workers: int = 4,
+                   **options) -> 'AsyncDocumentManager':
+        """
+        Abre a biblioteca sem bloquear o laço de eventos
+
+        Args:
+            base_path: Caminho base da biblioteca
+            max_workers: Número máximo de threads para operações bloqueantes
+            **options: Demais argumentos do DocumentManager (journal, backend...)
+        """
+        loop = asyncio.get_running_loop()
+        manager = await loop.run_in_executor(
+            None, functools.partial(DocumentManager, base_path, **options))
+        return cls(manager, max_workers=max_workers)
+
+    async def close(self):
+        """Aguarda as escritas em andamento e fecha o gerenciador"""
+        async with self._write_lock:
+            await self._locked(self.manager.close)
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> 'AsyncDocumentManager':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _run(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa uma função bloqueante no pool, sem travar o estado"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor,
+                                          functools.partial(func, *args, **kwargs))
+
+    async def _locked(self, func: Callable, *args, **kwargs) -> Any:
+        """Executa uma função bloqueante no pool, com acesso exclusivo ao estado"""
+        def call():
+            with self._state_lock:
+                return func(*args, **kwargs)
+        return await self._run(call)
+
+    def _staging_path(self, dest_file: Path) -> Path:
+        """Arquivo temporário para a cópia de um documento"""
+        self._staging.mkdir(exist_ok=True)
+        self._staging_counter += 1
+        return self._staging / f"{os.getpid()}-{self._staging_counter}{dest_file.suffix}"
+
+    def _ingest(self, source: Path, staged: Path, record: Dict, fields) -> Dict:
+        """Lê os metadados embutidos e copia o documento para o temporário (sem a trava)"""
+        manager = self.manager
+        manager._apply_inference(record, fields, manager._start_inference(source, fields)())
+        return manager._copy_document(source, staged, record)
+
+    def _commit(self, staged: Path, source: Path, dest_file: Path, record: Dict) -> Path:
+        """
+        Move a cópia para o destino e registra os metadados (sob a trava)
+
+        Returns:
+            Destino final: no modo compartilhado, outro processo pode ter
+            usado o nome escolhido durante a cópia, e outro é escolhido
+        """
+        manager = self.manager
+        with manager.write_lock():
+            if manager._name_taken(record['type'], dest_file):
+                dest_file = manager._free_destination(record['type'], source)
+                dest_file.parent.mkdir(exist_ok=True)
+            mtime_before = manager._directory_mtime(record['type'])
+            os.replace(staged, dest_file)
+            rel_path = str(dest_file.relative_to(manager.base_path))
+            manager._set_record(rel_path, record)
+            manager._directory_changed(record['type'], mtime_before, rel_path)
+            manager._save_metadata()
+        return dest_file
+
+    @staticmethod
+    async def _finish(staged: Path, step) -> Any:
+        """
+        Aguarda uma etapa que usa o arquivo temporário
+
+        Se a tarefa for cancelada, a etapa continua na thread e o temporário
+        é apagado quando ela terminar.
+        """
+        future = asyncio.ensure_future(step)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(lambda _: staged.unlink(missing_ok=True))
+            raise
+
+    async def add_document(self, file_path: str, doc_type: str, year: Optional[int] = None,
+                           author: str = "", title: str = "") -> str:
+        """
+        Adiciona um documento à biblioteca
+
+        Args:
+            file_path: Caminho do arquivo a ser adicionado
+            doc_type: Tipo do documento (artigos, teses, livros)
+            year: Ano de publicação
+            author: Autor do documento
+            title: Título do documento
+
+        Returns:
+            Nome com que o documento foi armazenado
+        """
+        start = time.perf_counter()
+        failed = True
+        try:
+            async with self._write_lock:
+                source, dest_file, record = await self._locked(
+                    self.manager._plan_document, file_path, doc_type, year, author, title)
+                fields = self.manager._inferable_fields(year, author, title)
+                staged = self._staging_path(dest_file)
+                try:
+                    record = await self._finish(staged, self._run(
+                        self._ingest, source, staged, record, fields))
+                    dest_file = await self._finish(staged, self._locked(
+                        self._commit, staged, source, dest_file, record))
+                except asyncio.CancelledError:
+                    raise
+                except BaseException:
+                    staged.unlink(missing_ok=True)
+                    raise
+            failed = False
+            return dest_file.name
+        finally:
+            self.manager.metrics.observe('add_document', time.perf_counter() - start, failed)
+
+    async def add_documents(self, specs: Iterable[Dict]) -> List[Dict]:
+        """
+        Adiciona um lote de documentos, um de cada vez
+
+        Entre um documento e outro as leituras continuam sendo atendidas.
+
+        Args:
+            specs: Especificações com as chaves de add_document (file_path,
+                doc_type, year, author, title)
+
+        Returns:
+            Resultado de cada item ('file_path', 'success', 'filename' e
+            'error'), na ordem recebida
+        """
+        results = []
+        for spec in specs:
+            file_path = spec.get('file_path', '')
+            try:
+                filename = await self.add_document(
+                    file_path, spec.get('doc_type', ''), spec.get('year'),
+                    spec.get('author', ''), spec.get('title', ''))
+            except (OSError, ValueError) as e:
+                results.append({'file_path': file_path, 'success': False,
+                                'filename': None, 'error': str(e)})
+            else:
+                results.append({'file_path': file_path, 'success': True,
+                                'filename': filename, 'error': None})
+        return results
+
+    async def remove_document(self, filename: str, doc_type: str) -> bool:
+        """Remove um documento (ver DocumentManager.remove_document)"""
+        async with self._write_lock:
+            return await self._locked(self.manager.remove_document, filename, doc_type)
+
+    async def rename_document(self, old_name: str, new_name: str, doc_type: str) -> bool:
+        """Renomeia um documento (ver DocumentManager.rename_document)"""
+        async with self._write_lock:
+            return await self._locked(self.manager.rename_document, old_name, new_name, doc_type)
+
+    async def list_documents(self, doc_type: Optional[str] = None,
+                             year: Optional[int] = None) -> List[Dict]:
+        """Lista documentos (ver DocumentManager.list_documents)"""
+        return await self._locked(self.manager.list_documents, doc_type, year)
+
+    async def list_by_type(self) -> Dict[str, List[Dict]]:
+        """Documentos agrupados por tipo"""
+        return await self._locked(self.manager.list_by_type)
+
+    async def list_by_year(self) -> Dict[int, List[Dict]]:
+        """Documentos agrupados por ano"""
+        return await self._locked(self.manager.list_by_year)
+
+    async def query_documents(self, filters: Optional[Dict[str, Any]] = None,
+                              **options) -> Dict:
+        """Consulta com filtros e facetas (ver DocumentManager.query_documents)"""
+        return await self._locked(self.manager.query_documents, filters, **options)
+
+    async def page_documents(self, filters: Optional[Dict[str, Any]] = None,
+                             **options) -> Dict:
+        """Página de documentos com cursor (ver DocumentManager.page_documents)"""
+        return await self._locked(self.manager.page_documents, filters, **options)
+
+    async def search_documents(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Busca documentos (ver DocumentManager.search_documents)"""
+        return await self._locked(self.manager.search_documents, query, limit)
+
+    async def get_statistics(self) -> Dict:
+        """Estatísticas da biblioteca"""
+        return await self._locked(self.manager.get_statistics)
@@ -0,0 +1,115 @@
+"""
+Módulo de armazenamento por conteúdo
+Guarda cada conteúdo distinto uma única vez, identificado pelo seu SHA-256
+"""
+
+import os
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """
+    Repositório de conteúdos (blobs) endereçados pelo hash
+
+    Cada blob fica em <raiz>/<2 primeiros dígitos>/<sha256>. Os documentos
+    da biblioteca são hardlinks para o blob, de modo que nomes e caminhos por
+    tipo continuam iguais para quem usa a biblioteca. O número de links do
+    blob indica quantos documentos ainda o referenciam.
+    """
+
+    def __init__(self, root: Path):
+        """
+        Inicializa o repositório
+
+        Args:
+            root: Diretório raiz dos blobs
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str) -> Path:
+        """Caminho do blob com o hash informado"""
+        return self.root / digest[:2] / digest
+
+    def store(self, source: Path) -> Tuple[str, bool]:
+        """
+        Copia um arquivo para o repositório calculando o hash durante a cópia
+
+        Args:
+            source: Arquivo de origem
+
+        Returns:
+            Tupla com o SHA-256 do conteúdo e se o blob é novo
+        """
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix='.ingest-')
+        try:
+            with open(source, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                while True:
+                    chunk = src.read(COPY_BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    dst.write(chunk)
+
+            blob = self.blob_path(digest.hexdigest())
+            if blob.exists():
+                return digest.hexdigest(), False
+
+            shutil.copystat(source, tmp_name)
+            blob.parent.mkdir(exist_ok=True)
+            try:
+                # Publica sem sobrescrever: outra cópia simultânea pode ter
+                # gravado o mesmo conteúdo primeiro
+                os.link(tmp_name, blob)
+            except FileExistsError:
+                return digest.hexdigest(), False
+            return digest.hexdigest(), True
+        finally:
+            os.unlink(tmp_name)
+
+    def link(self, digest: str, dest: Path) -> bool:
+        """
+        Cria o documento como hardlink para o blob
+
+        Em sistemas de arquivos sem suporte a hardlinks o conteúdo é copiado.
+
+        Args:
+            digest: SHA-256 do blob
+            dest: Caminho do documento na biblioteca
+
+        Returns:
+            True se foi criado um hardlink, False se o conteúdo foi copiado
+        """
+        blob = self.blob_path(digest)
+        try:
+            os.link(blob, dest)
+            return True
+        except OSError:
+            shutil.copy2(blob, dest)
+            return False
+
+    def release(self, digest: str) -> bool:
+        """
+        Apaga o blob se nenhum documento o referencia mais
+
+        Args:
+            digest: SHA-256 do blob
+
+        Returns:
+            True se o blob foi apagado
+        """
+        blob = self.blob_path(digest)
+        try:
+            if blob.stat().st_nlink > 1:
+                return False
+            blob.unlink()
+        except FileNotFoundError:
+            return False
+        return True
@@ -4,22 +4,51 @@ Interface de Linha de Comando (CLI) para o Sistema de Biblioteca Digital
 
 import sys
 import os
+import csv
+import json
+import time
+import shlex
+import argparse
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
 from colorama import Fore, Style, init
-from document_manager import DocumentManager
+from document_manager import DocumentManager, save_library_config
+from cold_storage import CODECS as COLD_CODECS
+from metadata_store import binary_to_json, json_to_binary
+from http_api import create_server
 
 # Inicializa colorama
 init(autoreset=True)
 
+# Biblioteca usada quando nenhum diretório é informado
+DEFAULT_DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Sequência ANSI que limpa a tela e volta o cursor ao início (o colorama a
+# traduz no Windows)
+CLEAR_SCREEN = "\033[2J\033[H"
+
 
 class LibraryCLI:
     """Interface de linha de comando para gerenciamento da biblioteca"""
 
-    def __init__(self):
-        """Inicializa a CLI"""
-        # Define o caminho base relativo ao diretório do projeto
-        base_dir = Path(__file__).parent.parent / "data"
-        self.manager = DocumentManager(str(base_dir))
+    # Documentos exibidos antes de perguntar se deve continuar
+    PAGE_SIZE = 20
+    # Resultados mais relevantes exibidos em uma busca
+    SEARCH_LIMIT = 100
+
+    def __init__(self, base_dir: Optional[Path] = None, shared: bool = False,
+                 infer_metadata: bool = False):
+        """
+        Inicializa a CLI
+
+        Args:
+            base_dir: Diretório da biblioteca (padrão: data/ do projeto)
+            shared: Abre a biblioteca no modo compartilhado entre processos
+            infer_metadata: Lê título, autor e ano não informados dos
+                metadados embutidos nos arquivos
+        """
+        self.manager = DocumentManager(str(base_dir or DEFAULT_DATA_DIR), shared=shared,
+                                       infer_metadata=infer_metadata)
 
     def print_banner(self):
         """Exibe o banner do sistema"""
@@ -45,6 +74,7 @@ class LibraryCLI:
 {Fore.GREEN}7.{Style.RESET_ALL}  🔍 Buscar documentos
 {Fore.GREEN}8.{Style.RESET_ALL}  📊 Estatísticas da biblioteca
 {Fore.GREEN}9.{Style.RESET_ALL}  ❓ Ajuda
+{Fore.GREEN}10.{Style.RESET_ALL} 📈 Métricas das operações
 {Fore.RED}0.{Style.RESET_ALL}  🚪 Sair
 
 {Fore.CYAN}═══════════════════════════════════════════════════════{Style.RESET_ALL}
@@ -59,17 +89,40 @@ class LibraryCLI:
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} TB"
 
-    def display_documents(self, documents: list, title: str = "Documentos"):
-        """Exibe uma lista de documentos formatada"""
-        if not documents:
+    def iter_pages(self, filters: Optional[Dict] = None,
+                   sort_by: Optional[str] = 'title') -> Iterator[Dict]:
+        """Busca os documentos página a página, apenas quando são exibidos"""
+        cursor = None
+        while True:
+            page = self.manager.page_documents(filters, sort_by=sort_by,
+                                               limit=self.PAGE_SIZE, cursor=cursor)
+            yield from page['documents']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    def display_documents(self, documents: Iterable[Dict], title: str = "Documentos"):
+        """
+        Exibe documentos formatados, em páginas de PAGE_SIZE
+
+        Aceita uma lista ou um iterador; entre as páginas o usuário pode
+        continuar ou interromper a exibição.
+        """
+        total = len(documents) if hasattr(documents, '__len__') else None
+        documents = iter(documents)
+        doc = next(documents, None)
+        if doc is None:
             print(f"\n{Fore.YELLOW}Nenhum documento encontrado.{Style.RESET_ALL}")
             return
 
+        count = f" ({total} documento(s))" if total is not None else ""
         print(f"\n{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}")
-        print(f"{Fore.YELLOW}{title} ({len(documents)} documento(s)){Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}{title}{count}{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}")
 
-        for i, doc in enumerate(documents, 1):
+        i = 0
+        while doc is not None:
+            i += 1
             year_str = f"{doc['year']}" if doc['year'] else "N/A"
             size_str = self.format_file_size(doc['size'])
 
@@ -80,6 +133,13 @@ class LibraryCLI:
             print(f"   📅 Ano: {year_str}")
             print(f"   💾 Tamanho: {size_str}")
 
+            doc = next(documents, None)
+            if doc is not None and i % self.PAGE_SIZE == 0:
+                answer = input(f"\n{Fore.GREEN}Enter para mais documentos, 'q' para parar: "
+                               f"{Style.RESET_ALL}").strip().lower()
+                if answer == 'q':
+                    break
+
         print(f"\n{Fore.CYAN}{'=' * 80}{Style.RESET_ALL}")
 
     def add_document_interactive(self):
@@ -153,12 +213,12 @@ class LibraryCLI:
         doc_type = type_map[type_choice]
 
         # Lista documentos desse tipo
-        docs = self.manager.list_documents(doc_type=doc_type)
-        if not docs:
+        if not self.manager.page_documents({'type': doc_type}, limit=1)['documents']:
             print(f"\n{Fore.YELLOW}Nenhum documento deste tipo encontrado.{Style.RESET_ALL}")
             return
 
-        self.display_documents(docs, f"Documentos - {doc_type.capitalize()}")
+        self.display_documents(self.iter_pages({'type': doc_type}),
+                               f"Documentos - {doc_type.capitalize()}")
 
         # Nome do arquivo
         filename = input(f"\n{Fore.GREEN}Nome do arquivo a remover: {Style.RESET_ALL}").strip()
@@ -201,12 +261,12 @@ class LibraryCLI:
         doc_type = type_map[type_choice]
 
         # Lista documentos desse tipo
-        docs = self.manager.list_documents(doc_type=doc_type)
-        if not docs:
+        if not self.manager.page_documents({'type': doc_type}, limit=1)['documents']:
             print(f"\n{Fore.YELLOW}Nenhum documento deste tipo encontrado.{Style.RESET_ALL}")
             return
 
-        self.display_documents(docs, f"Documentos - {doc_type.capitalize()}")
+        self.display_documents(self.iter_pages({'type': doc_type}),
+                               f"Documentos - {doc_type.capitalize()}")
 
         # Nome do arquivo
         old_name = input(f"\n{Fore.GREEN}Nome atual do arquivo: {Style.RESET_ALL}").strip()
@@ -225,17 +285,14 @@ class LibraryCLI:
 
     def list_all_documents(self):
         """Lista todos os documentos"""
-        docs = self.manager.list_documents()
-        self.display_documents(docs, "Todos os Documentos")
+        self.display_documents(self.iter_pages(), "Todos os Documentos")
 
     def list_by_type(self):
         """Lista documentos organizados por tipo"""
         print(f"\n{Fore.YELLOW}═══ DOCUMENTOS POR TIPO ═══{Style.RESET_ALL}\n")
 
-        docs_by_type = self.manager.list_by_type()
-
-        for doc_type, docs in docs_by_type.items():
-            self.display_documents(docs, f"{doc_type.capitalize()}")
+        for doc_type in self.manager.SUPPORTED_FORMATS:
+            self.display_documents(self.iter_pages({'type': doc_type}), f"{doc_type.capitalize()}")
             print()
 
     def list_by_year(self):
@@ -259,7 +316,7 @@ class LibraryCLI:
             print(f"{Fore.RED}Termo de busca não pode ser vazio!{Style.RESET_ALL}")
             return
 
-        results = self.manager.search_documents(query)
+        results = self.manager.search_documents(query, limit=self.SEARCH_LIMIT)
         self.display_documents(results, f"Resultados da busca: '{query}'")
 
     def show_statistics(self):
@@ -271,6 +328,12 @@ class LibraryCLI:
         print(f"{Fore.CYAN}📊 Estatísticas Gerais:{Style.RESET_ALL}")
         print(f"   Total de documentos: {Fore.GREEN}{stats['total_documents']}{Style.RESET_ALL}")
         print(f"   Tamanho total: {Fore.GREEN}{stats['total_size_mb']} MB{Style.RESET_ALL}")
+        if stats['physical_size_bytes'] != stats['total_size_bytes']:
+            print(f"   Espaço ocupado: {Fore.GREEN}{stats['physical_size_mb']} MB"
+                  f"{Style.RESET_ALL}")
+        if stats['compressed_documents']:
+            print(f"   Compactados: {Fore.GREEN}{stats['compressed_documents']} "
+                  f"({stats['compression_ratio']}x){Style.RESET_ALL}")
 
         if stats['oldest_year'] and stats['newest_year']:
             print(f"   Período: {Fore.GREEN}{stats['oldest_year']} - {stats['newest_year']}{Style.RESET_ALL}")
@@ -288,6 +351,35 @@ class LibraryCLI:
 
         print()
 
+    def show_metrics(self):
+        """Exibe os contadores de desempenho das operações desta sessão"""
+        print(f"\n{Fore.YELLOW}═══ MÉTRICAS DAS OPERAÇÕES ═══{Style.RESET_ALL}\n")
+
+        metrics = self.manager.metrics.as_dict()
+        if not metrics['operations']:
+            print(f"{Fore.YELLOW}Nenhuma operação executada nesta sessão.{Style.RESET_ALL}")
+            return
+
+        print(f"{Fore.CYAN}{'Operação':<20} {'Chamadas':>9} {'Erros':>6} "
+              f"{'Média (ms)':>11} {'p95 (ms)':>10} {'Chamadas FS':>12}{Style.RESET_ALL}")
+        for name, operation in metrics['operations'].items():
+            duration = operation['duration']
+            fs_calls = sum(metrics['filesystem_calls'].get(name, {}).values())
+            print(f"{name:<20} {operation['calls']:>9} {operation['errors']:>6} "
+                  f"{duration['mean'] * 1000:>11.3f} {duration['p95'] * 1000:>10.3f} "
+                  f"{fs_calls:>12}")
+
+        metadata = metrics['metadata']
+        print(f"\n{Fore.CYAN}💾 Metadados:{Style.RESET_ALL}")
+        print(f"   Gravações: {Fore.GREEN}{metadata['saves']}{Style.RESET_ALL} "
+              f"({metadata['snapshots']} snapshot(s) completo(s))")
+        print(f"   Duração média: {Fore.GREEN}"
+              f"{metadata['save_duration']['mean'] * 1000:.3f} ms{Style.RESET_ALL}")
+        print(f"   Tamanho: {Fore.GREEN}{self.format_file_size(metadata['size_bytes'])}"
+              f"{Style.RESET_ALL}")
+        print(f"\n{Fore.CYAN}📦 Bytes copiados:{Style.RESET_ALL} "
+              f"{Fore.GREEN}{self.format_file_size(metrics['bytes_copied'])}{Style.RESET_ALL}")
+
     def show_help(self):
         """Exibe ajuda sobre o sistema"""
         help_text = f"""
@@ -303,6 +395,8 @@ class LibraryCLI:
   • Use nomes descritivos para facilitar a busca
   • O sistema mantém backup automático dos metadados
   • Você pode buscar por título, autor ou nome do arquivo
+  • Busque por vários termos ou pelo início das palavras (ex.: "silva prog")
+  • Acentos e pequenos erros de digitação são tolerados (ex.: "jao slva")
 
 {Fore.CYAN}Convenções de nomenclatura recomendadas:{Style.RESET_ALL}
   • Artigos: Autor_Título_Ano.pdf
@@ -341,7 +435,10 @@ class LibraryCLI:
                 self.show_statistics()
             elif choice == '9':
                 self.show_help()
+            elif choice == '10':
+                self.show_metrics()
             elif choice == '0':
+                self.manager.close()
                 print(f"\n{Fore.YELLOW}Obrigado por usar o Sistema de Biblioteca Digital!{Style.RESET_ALL}")
                 print(f"{Fore.GREEN}Até logo! 👋{Style.RESET_ALL}\n")
                 sys.exit(0)
@@ -349,14 +446,573 @@ class LibraryCLI:
                 print(f"\n{Fore.RED}Opção inválida! Tente novamente.{Style.RESET_ALL}")
 
             input(f"\n{Fore.CYAN}Pressione Enter para continuar...{Style.RESET_ALL}")
-            # Limpa a tela (funciona em Unix e Windows)
-            os.system('cls' if os.name == 'nt' else 'clear')
+            # Limpa a tela sem criar um processo a cada ação
+            print(CLEAR_SCREEN, end='', flush=True)
+
+
+def load_import_manifest(manifest_path: str) -> List[Dict]:
+    """
+    Lê o manifesto de importação em lote (JSON ou CSV)
+
+    O JSON deve conter uma lista de objetos e o CSV um cabeçalho com as
+    colunas file_path, doc_type, year, author e title.
+
+    Args:
+        manifest_path: Caminho do arquivo de manifesto
+
+    Returns:
+        Lista de especificações aceitas por DocumentManager.add_documents
+    """
+    path = Path(manifest_path)
+
+    if path.suffix.lower() == '.csv':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError("O manifesto JSON deve conter uma lista de documentos")
+
+    specs = []
+    for row in rows:
+        year = row.get('year')
+        if isinstance(year, str):
+            year = int(year) if year.strip().isdigit() else None
+        specs.append({
+            'file_path': row.get('file_path', ''),
+            'doc_type': row.get('doc_type', ''),
+            'year': year,
+            'author': row.get('author') or '',
+            'title': row.get('title') or ''
+        })
+    return specs
+
+
+def print_import_progress(progress: Dict):
+    """Atualiza a linha de progresso de uma importação em lote"""
+    total = progress['total'] if progress['total'] is not None else '?'
+    line = (f"\r{Fore.CYAN}{progress['completed']}/{total} arquivo(s)  "
+            f"{progress['files_per_second']:.1f} arq/s  "
+            f"{progress['mb_per_second']:.2f} MB/s  "
+            f"{progress['failed']} erro(s){Style.RESET_ALL}")
+    sys.stdout.write(line)
+    if progress['completed'] == progress['total']:
+        sys.stdout.write('\n')
+    sys.stdout.flush()
+
+
+def run_import(manager: DocumentManager, manifest_path: str, workers: int = 4,
+               show_progress: bool = True) -> int:
+    """
+    Importa em lote os documentos de um manifesto, sem interação
+
+    Args:
+        manager: Gerenciador de documentos de destino
+        manifest_path: Caminho do arquivo de manifesto
+        workers: Número de cópias simultâneas
+        show_progress: Exibe a linha de progresso durante a importação
+
+    Returns:
+        Código de saída (0 se todos os itens foram importados)
+    """
+    specs = load_import_manifest(manifest_path)
+    results = manager.add_documents(
+        specs, workers=workers,
+        progress=print_import_progress if show_progress else None
+    )
+
+    failures = [r for r in results if not r['success']]
+    for result in failures:
+        print(f"{Fore.RED}✗ {result['file_path']}: {result['error']}{Style.RESET_ALL}")
+
+    for name, operation in manager.metrics.as_dict()['operations'].items():
+        if name.startswith('infer_metadata.'):
+            seconds = operation['duration']['sum']
+            rate = operation['calls'] / seconds if seconds else 0.0
+            print(f"{Fore.CYAN}Metadados de {name.split('.', 1)[1].upper()}: "
+                  f"{operation['calls']} arquivo(s) lido(s), {rate:.1f} arq/s por processo"
+                  f"{Style.RESET_ALL}")
+
+    print(f"{Fore.GREEN}✓ {len(results) - len(failures)} documento(s) importado(s), "
+          f"{len(failures)} erro(s){Style.RESET_ALL}")
+    return 1 if failures else 0
+
+
+class CommandParser(argparse.ArgumentParser):
+    """Parser que sinaliza erros com ValueError em vez de encerrar o processo"""
+
+    def error(self, message: str):
+        raise ValueError(message)
+
+
+def emit(record: Dict, stream=None):
+    """Escreve um objeto como uma linha de NDJSON"""
+    (stream or sys.stdout).write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+
+def command_add(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Adiciona um documento e informa o nome com que foi armazenado"""
+    result = manager.add_documents([{
+        'file_path': args.file, 'doc_type': args.type, 'year': args.year,
+        'author': args.author, 'title': args.title
+    }], workers=1, inference_workers=0)[0]
+    if not result['success']:
+        raise ValueError(result['error'])
+    yield {'ok': True, 'command': 'add', 'type': args.type, 'filename': result['filename'],
+           'source': args.file}
+
+
+def command_rm(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Remove um documento"""
+    manager.remove_document(args.filename, args.type)
+    yield {'ok': True, 'command': 'rm', 'type': args.type, 'filename': args.filename}
+
+
+def command_mv(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Renomeia um documento"""
+    manager.rename_document(args.old_name, args.new_name, args.type)
+    yield {'ok': True, 'command': 'mv', 'type': args.type, 'old_name': args.old_name,
+           'new_name': args.new_name}
+
+
+def command_ls(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Lista os documentos à medida que são lidos, um por linha"""
+    filters = {}
+    for field in ('type', 'year', 'author', 'year_from', 'year_to'):
+        value = getattr(args, field)
+        if value is not None:
+            filters[field] = value
+    yield from manager.iter_documents(filters or None, sort_by=args.sort, reverse=args.reverse,
+                                      limit=args.limit, offset=args.offset)
+
+
+def command_search(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Busca documentos, um resultado por linha"""
+    yield from manager.search_documents(' '.join(args.query), limit=args.limit)
+
+
+def command_stats(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Estatísticas da biblioteca em uma única linha"""
+    yield manager.get_statistics()
+
+
+def command_import(manager: DocumentManager, args: argparse.Namespace) -> Iterator[Dict]:
+    """Importa um manifesto, uma linha por item; falha se algum item falhar"""
+    results = manager.add_documents(load_import_manifest(args.manifest), workers=args.workers)
+    for result in results:
+        yield {'command': 'import', 'ok': result['success'], **result}
+    failed = sum(1 for result in results if not result['success'])
+    if failed:
+        raise ValueError(f"{failed} de {len(results)} documento(s) não importado(s)")
+
+
+# Comandos que emitem NDJSON e podem ser usados no modo batch
+COMMANDS = {
+    'add': command_add,
+    'rm': command_rm,
+    'mv': command_mv,
+    'ls': command_ls,
+    'search': command_search,
+    'stats': command_stats,
+    'import': command_import,
+}
+
+# Comandos que alteram a biblioteca
+WRITE_COMMANDS = {'add', 'rm', 'mv', 'import'}
+
+
+def add_document_commands(subparsers, batch: bool = False):
+    """
+    Registra os comandos de documentos (add, rm, mv, ls, search, stats, import)
+
+    Args:
+        subparsers: Resultado de add_subparsers
+        batch: Se True, registra a forma usada nas linhas do modo batch, em
+            que import sempre emite NDJSON
+    """
+    types = list(DocumentManager.SUPPORTED_FORMATS)
+    options = {'add_help': False} if batch else {}
+
+    add_parser = subparsers.add_parser('add', help="Adiciona um documento", **options)
+    add_parser.add_argument('file', help="Arquivo a adicionar")
+    add_parser.add_argument('type', choices=types, help="Tipo do documento")
+    add_parser.add_argument('--year', type=int, help="Ano (padrão: extraído do nome)")
+    add_parser.add_argument('--author', default='', help="Autor")
+    add_parser.add_argument('--title', default='', help="Título (padrão: nome do arquivo)")
+
+    rm_parser = subparsers.add_parser('rm', help="Remove um documento", **options)
+    rm_parser.add_argument('type', choices=types, help="Tipo do documento")
+    rm_parser.add_argument('filename', help="Nome do arquivo na biblioteca")
+
+    mv_parser = subparsers.add_parser('mv', help="Renomeia um documento", **options)
+    mv_parser.add_argument('type', choices=types, help="Tipo do documento")
+    mv_parser.add_argument('old_name', help="Nome atual")
+    mv_parser.add_argument('new_name', help="Novo nome")
+
+    ls_parser = subparsers.add_parser('ls', help="Lista documentos em NDJSON", **options)
+    ls_parser.add_argument('--type', action='append', choices=types,
+                           help="Tipo (pode ser repetido)")
+    ls_parser.add_argument('--year', type=int, action='append', help="Ano (pode ser repetido)")
+    ls_parser.add_argument('--author', help="Trecho do nome do autor")
+    ls_parser.add_argument('--year-from', type=int, help="Ano inicial (inclusivo)")
+    ls_parser.add_argument('--year-to', type=int, help="Ano final (inclusivo)")
+    ls_parser.add_argument('--sort', choices=DocumentManager.SORT_FIELDS,
+                           help="Campo de ordenação")
+    ls_parser.add_argument('--reverse', action='store_true', help="Ordem decrescente")
+    ls_parser.add_argument('--limit', type=int, help="Número máximo de documentos")
+    ls_parser.add_argument('--offset', type=int, default=0, help="Documentos a pular")
+
+    search_parser = subparsers.add_parser('search', help="Busca documentos", **options)
+    search_parser.add_argument('query', nargs='+', help="Termos de busca")
+    search_parser.add_argument('--limit', type=int, default=20,
+                               help="Número máximo de resultados (padrão: 20)")
+
+    subparsers.add_parser('stats', help="Estatísticas da biblioteca", **options)
+
+    import_parser = subparsers.add_parser(
+        'import', help="Importa documentos em lote a partir de um manifesto JSON ou CSV", **options
+    )
+    import_parser.add_argument('manifest', help="Caminho do manifesto")
+    import_parser.add_argument(
+        '--workers', type=int, default=4,
+        help="Número de cópias simultâneas (padrão: 4)"
+    )
+    if not batch:
+        import_parser.add_argument(
+            '--quiet', action='store_true', help="Não exibe a linha de progresso"
+        )
+        import_parser.add_argument(
+            '--ndjson', action='store_true',
+            help="Emite o resultado de cada item em NDJSON em vez do texto com progresso"
+        )
+
+
+def build_batch_parser() -> CommandParser:
+    """Cria o parser das linhas do modo batch"""
+    parser = CommandParser(prog='batch', add_help=False)
+    subparsers = parser.add_subparsers(dest='command', parser_class=CommandParser)
+    subparsers.required = True
+    add_document_commands(subparsers, batch=True)
+    return parser
+
+
+def run_command(manager: DocumentManager, args: argparse.Namespace, stream=None,
+                **context) -> bool:
+    """
+    Executa um comando, emitindo sua saída em NDJSON
+
+    Erros do comando são emitidos como {'ok': false, 'command', 'error'},
+    acrescidos de context (no modo batch, o número da linha).
+
+    Returns:
+        True se o comando terminou sem erro
+    """
+    try:
+        for record in COMMANDS[args.command](manager, args):
+            emit(record, stream)
+    except (OSError, ValueError) as e:
+        emit({'ok': False, 'command': args.command, 'error': str(e), **context}, stream)
+        return False
+    return True
+
+
+def run_batch(manager: DocumentManager, lines: Iterable[str], stream=None,
+              stop_on_error: bool = False) -> int:
+    """
+    Executa vários comandos na mesma biblioteca aberta
+
+    Cada linha contém um comando com a sintaxe da linha de comando (por
+    exemplo 'add "Meu Artigo 2020.pdf" artigos --author Silva'). Linhas em
+    branco e iniciadas por '#' são ignoradas. Os metadados são gravados no
+    diário durante o lote e consolidados uma única vez ao final.
+
+    Args:
+        manager: Gerenciador de documentos
+        lines: Linhas com os comandos
+        stream: Destino do NDJSON (padrão: sys.stdout)
+        stop_on_error: Interrompe o lote no primeiro erro
+
+    Returns:
+        Código de saída (0 se todos os comandos tiveram sucesso)
+    """
+    parser = build_batch_parser()
+    failed = False
+    wrote = False
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+        except ValueError as e:
+            emit({'ok': False, 'command': None, 'error': str(e), 'line': number}, stream)
+            ok = False
+        else:
+            wrote = wrote or args.command in WRITE_COMMANDS
+            ok = run_command(manager, args, stream, line=number)
+        failed = failed or not ok
+        if not ok and stop_on_error:
+            break
+    if wrote:
+        manager.compact_metadata()
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Cria o parser dos comandos não interativos"""
+    parser = argparse.ArgumentParser(
+        description="Sistema de Biblioteca Digital",
+        epilog="Os comandos add, rm, mv, ls, search, stats e batch emitem NDJSON "
+               "(um objeto JSON por linha)"
+    )
+    parser.add_argument(
+        '--data', type=Path, default=DEFAULT_DATA_DIR,
+        help="Diretório da biblioteca (padrão: data/ do projeto)"
+    )
+    parser.add_argument(
+        '--shared', action='store_true',
+        help="Permite que outros processos usem a biblioteca ao mesmo tempo "
+             "(escritas sob trava, sem perda de alterações)"
+    )
+    parser.add_argument(
+        '--infer-metadata', action='store_true',
+        help="Lê título, autor e ano não informados dos metadados embutidos "
+             "nos arquivos (PDF, EPUB e DOCX)"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    add_document_commands(subparsers)
+
+    batch_parser = subparsers.add_parser(
+        'batch', help="Executa vários comandos, um por linha, no mesmo processo"
+    )
+    batch_parser.add_argument(
+        'file', nargs='?', default='-',
+        help="Arquivo com os comandos (padrão: entrada padrão)"
+    )
+    batch_parser.add_argument(
+        '--stop-on-error', action='store_true', help="Interrompe no primeiro comando com erro"
+    )
+
+    serve_parser = subparsers.add_parser(
+        'serve', help="Inicia a API HTTP somente leitura (JSON e download dos documentos)"
+    )
+    serve_parser.add_argument('--host', default='127.0.0.1',
+                              help="Endereço de escuta (padrão: 127.0.0.1)")
+    serve_parser.add_argument('--port', type=int, default=8080, help="Porta (padrão: 8080)")
+
+    reconcile_parser = subparsers.add_parser(
+        'reconcile', help="Sincroniza os metadados com os arquivos presentes no disco"
+    )
+    reconcile_parser.add_argument(
+        '--full', action='store_true',
+        help="Confere todos os arquivos, inclusive os alterados sem mudar de nome"
+    )
+
+    layout_parser = subparsers.add_parser(
+        'migrate-layout', help="Converte a organização dos arquivos da biblioteca"
+    )
+    layout_parser.add_argument(
+        'layout', choices=DocumentManager.LAYOUTS,
+        help="'flat' (um diretório por tipo) ou 'sharded' (subdiretórios por fragmento)"
+    )
+
+    tier_parser = subparsers.add_parser(
+        'tier', help="Compacta os documentos sem acesso recente e restaura os acessados"
+    )
+    tier_parser.add_argument(
+        '--codec', choices=list(COLD_CODECS), default='lzma',
+        help="Compactador do armazenamento frio (padrão: lzma)"
+    )
+    tier_parser.add_argument(
+        '--after-days', type=float, default=30,
+        help="Dias sem acesso para compactar um documento (padrão: 30)"
+    )
+    tier_parser.add_argument(
+        '--interval', type=float,
+        help="Repete a cada N segundos até ser interrompido, em modo compartilhado"
+    )
+
+    convert_parser = subparsers.add_parser(
+        'convert-metadata', help="Converte os metadados entre metadata.json e metadata.bin"
+    )
+    convert_parser.add_argument(
+        'target', choices=['binary', 'json'],
+        help="'binary' gera metadata.bin a partir do metadata.json; 'json' faz o inverso"
+    )
+
+    return parser
+
+
+def run_convert_metadata(base_dir: Path, target: str) -> int:
+    """
+    Converte os metadados da biblioteca para o formato indicado
+
+    O formato convertido passa a ser o backend registrado na biblioteca, usado
+    pelas próximas aberturas (inclusive pelos demais comandos).
+
+    Args:
+        base_dir: Diretório da biblioteca
+        target: 'binary' (metadata.json -> metadata.bin) ou 'json' (o inverso)
+
+    Returns:
+        Código de saída
+    """
+    json_file = base_dir / "metadata.json"
+    binary_file = base_dir / "metadata.bin"
+    if target == 'binary':
+        source, destination = json_file, binary_file
+    else:
+        source, destination = binary_file, json_file
+    # Metadados gravados só no diário também são convertidos
+    if not source.exists() and not source.with_name(source.name + '.journal').exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {source}")
+
+    convert = json_to_binary if target == 'binary' else binary_to_json
+    count = convert(source, destination)
+    save_library_config(base_dir, backend=target)
+    print(f"{Fore.GREEN}✓ {count} registro(s) convertido(s) para {destination.name}"
+          f"{Style.RESET_ALL}")
+    return 0
+
+
+def run_reconcile(manager: DocumentManager, full: bool = False) -> int:
+    """
+    Sincroniza os metadados com o disco e mostra o resumo
+
+    Args:
+        manager: Gerenciador de documentos
+        full: Confere todos os arquivos, ignorando o retrato salvo
+
+    Returns:
+        Código de saída
+    """
+    report = manager.reconcile(full=full)
+    for label, key, color in (("+", 'added', Fore.GREEN), ("-", 'removed', Fore.RED),
+                              ("~", 'updated', Fore.YELLOW)):
+        for rel_path in report[key]:
+            print(f"{color}{label} {rel_path}{Style.RESET_ALL}")
+
+    print(f"{Fore.GREEN}✓ {len(report['added'])} registrado(s), "
+          f"{len(report['removed'])} removido(s), {len(report['updated'])} atualizado(s); "
+          f"diretórios percorridos: {', '.join(report['scanned']) or 'nenhum'}{Style.RESET_ALL}")
+    return 0
+
+
+def run_tier(manager: DocumentManager, interval: Optional[float] = None) -> int:
+    """
+    Move documentos entre a biblioteca e o armazenamento frio e mostra o resumo
+
+    Args:
+        manager: Gerenciador de documentos (com cold_storage)
+        interval: Se informado, repete a cada interval segundos até Ctrl+C
+
+    Returns:
+        Código de saída
+    """
+    try:
+        while True:
+            report = manager.tier_documents()
+            for label, key, color in (("v", 'compressed', Fore.CYAN),
+                                      ("~", 'recompressed', Fore.YELLOW),
+                                      ("^", 'restored', Fore.GREEN)):
+                for rel_path in report[key]:
+                    print(f"{color}{label} {rel_path}{Style.RESET_ALL}")
+            print(f"{Fore.GREEN}✓ {len(report['compressed'])} compactado(s), "
+                  f"{len(report['recompressed'])} recompactado(s), "
+                  f"{len(report['restored'])} restaurado(s), {report['skipped']} sem ganho; "
+                  f"{report['saved_bytes'] / (1024 * 1024):.2f} MB liberado(s){Style.RESET_ALL}")
+            if interval is None:
+                return 0
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        # Ctrl+C encerra a execução contínua
+        return 0
 
 
 def main():
     """Função principal"""
+    args = build_parser().parse_args()
+    base_dir = args.data
+    if args.command is not None:
+        try:
+            if args.command == 'batch':
+                manager = DocumentManager(str(base_dir), journal=True, shared=args.shared,
+                                          infer_metadata=args.infer_metadata)
+                try:
+                    if args.file == '-':
+                        exit_code = run_batch(manager, sys.stdin,
+                                              stop_on_error=args.stop_on_error)
+                    else:
+                        with open(args.file, 'r', encoding='utf-8') as f:
+                            exit_code = run_batch(manager, f, stop_on_error=args.stop_on_error)
+                finally:
+                    manager.close()
+                sys.exit(exit_code)
+            if args.command == 'import' and not args.ndjson:
+                manager = DocumentManager(str(base_dir), shared=args.shared,
+                                          infer_metadata=args.infer_metadata)
+                exit_code = run_import(manager, args.manifest, workers=args.workers,
+                                       show_progress=not args.quiet)
+                manager.close()
+                sys.exit(exit_code)
+            if args.command in COMMANDS:
+                manager = DocumentManager(str(base_dir), shared=args.shared,
+                                          infer_metadata=args.infer_metadata)
+                try:
+                    ok = run_command(manager, args)
+                finally:
+                    manager.close()
+                sys.exit(0 if ok else 1)
+            if args.command == 'serve':
+                manager = DocumentManager(str(base_dir), shared=args.shared)
+                server = create_server(manager, args.host, args.port)
+                host, port = server.server_address[:2]
+                print(f"{Fore.GREEN}API disponível em http://{host}:{port}/ "
+                      f"(Ctrl+C encerra){Style.RESET_ALL}")
+                try:
+                    server.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+                finally:
+                    server.server_close()
+                    manager.close()
+                sys.exit(0)
+            if args.command == 'reconcile':
+                manager = DocumentManager(str(base_dir), shared=args.shared)
+                exit_code = run_reconcile(manager, full=args.full)
+                manager.close()
+                sys.exit(exit_code)
+            if args.command == 'migrate-layout':
+                manager = DocumentManager(str(base_dir), shared=args.shared)
+                moved = manager.migrate_layout(args.layout)
+                manager.close()
+                print(f"{Fore.GREEN}✓ Layout '{args.layout}': {moved} arquivo(s) "
+                      f"movido(s){Style.RESET_ALL}")
+                sys.exit(0)
+            if args.command == 'tier':
+                # A execução contínua convive com outros processos na biblioteca
+                manager = DocumentManager(str(base_dir),
+                                          shared=args.shared or args.interval is not None,
+                                          cold_storage=args.codec, cold_after_days=args.after_days)
+                try:
+                    exit_code = run_tier(manager, interval=args.interval)
+                finally:
+                    manager.close()
+                sys.exit(exit_code)
+            if args.command == 'convert-metadata':
+                sys.exit(run_convert_metadata(base_dir, args.target))
+        except BrokenPipeError:
+            # A saída foi fechada antes do fim (ex.: '| head'); não é um erro.
+            # O descarte do buffer restante ao sair iria falhar de novo
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(0)
+        except (OSError, ValueError) as e:
+            print(f"{Fore.RED}Erro: {e}{Style.RESET_ALL}")
+            sys.exit(1)
+
     try:
-        cli = LibraryCLI()
+        cli = LibraryCLI(base_dir, shared=args.shared, infer_metadata=args.infer_metadata)
         cli.run()
     except KeyboardInterrupt:
         print(f"\n\n{Fore.YELLOW}Programa interrompido pelo usuário.{Style.RESET_ALL}")
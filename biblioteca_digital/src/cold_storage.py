@@ -0,0 +1,261 @@
+"""
+Módulo de armazenamento frio
+Guarda documentos pouco acessados compactados e os descompacta sob demanda
+"""
+
+import io
+import os
+import gzip
+import lzma
+import uuid
+import zlib
+import shutil
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Tuple
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Compactadores da biblioteca padrão e a extensão dos arquivos de cada um
+CODECS = {'lzma': '.xz', 'gzip': '.gz', 'zlib': '.zz'}
+
+# Formatos que já são compactados internamente (contêineres ZIP ou PalmDOC)
+COMPRESSED_SUFFIXES = {'.epub', '.docx', '.mobi', '.azw3'}
+
+# Amostra compactada para estimar o ganho, e a razão máxima (compactado /
+# original) que ainda compensa
+PROBE_SIZE = 256 * 1024
+MAX_PROBE_RATIO = 0.9
+
+
+def codec_of(name: str) -> str:
+    """Compactador de um arquivo do armazenamento frio, pela extensão"""
+    suffix = os.path.splitext(name)[1]
+    for codec, codec_suffix in CODECS.items():
+        if codec_suffix == suffix:
+            return codec
+    raise ValueError(f"Arquivo do armazenamento frio inválido: {name}")
+
+
+def worth_compressing(path: Path) -> bool:
+    """
+    Estima se compactar o arquivo reduz o espaço ocupado
+
+    Formatos já compactados são descartados pela extensão; nos demais, o
+    início do arquivo é compactado com zlib no nível mais rápido.
+    """
+    path = Path(path)
+    if path.suffix.lower() in COMPRESSED_SUFFIXES:
+        return False
+    with open(path, 'rb') as f:
+        sample = f.read(PROBE_SIZE)
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) <= len(sample) * MAX_PROBE_RATIO
+
+
+class _ZlibReader(io.RawIOBase):
+    """
+    Leitura descompactada de um fluxo zlib
+
+    O gzip e o lzma têm leitores próprios; este completa o zlib. A posição é
+    emulada como nos outros dois: avançar descompacta e descarta, voltar
+    recomeça do início.
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fp = fileobj
+        self._rewind()
+
+    def _rewind(self):
+        self._fp.seek(0)
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b''
+        self._offset = 0
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self._fp.fileno()
+
+    def readinto(self, b) -> int:
+        while self._offset == len(self._buffer):
+            data = self._decompressor.unconsumed_tail or self._fp.read(COPY_BUFFER_SIZE)
+            if not data:
+                if not self._decompressor.eof:
+                    raise EOFError("Conteúdo compactado incompleto")
+                return 0
+            self._buffer = self._decompressor.decompress(data, COPY_BUFFER_SIZE)
+            self._offset = 0
+
+        size = min(len(b), len(self._buffer) - self._offset)
+        b[:size] = self._buffer[self._offset:self._offset + size]
+        self._offset += size
+        self._pos += size
+        return size
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            while self.read(COPY_BUFFER_SIZE):
+                pass
+            offset += self._pos
+        if offset < self._pos:
+            self._rewind()
+        while self._pos < offset and self.read(min(offset - self._pos, COPY_BUFFER_SIZE)):
+            pass
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._fp.close()
+        super().close()
+
+
+class ColdStore:
+    """
+    Repositório de documentos compactados
+
+    Cada documento fica em <raiz>/<2 primeiros dígitos>/<nome aleatório>
+    com a extensão do compactador (.xz, .gz ou .zz), de modo que um mesmo
+    armazenamento pode misturar compactadores. O arquivo compactado mantém
+    o mtime e o atime do original, e a restauração os devolve.
+    """
+
+    def __init__(self, root: Path):
+        """
+        Inicializa o repositório (o diretório é criado no primeiro uso)
+
+        Args:
+            root: Diretório raiz dos arquivos compactados
+        """
+        self.root = Path(root)
+
+    def path(self, name: str) -> Path:
+        """Caminho de um arquivo compactado"""
+        return self.root / name
+
+    def _write(self, source: BinaryIO, codec: str, times: Tuple[int, int]) -> Tuple[str, int]:
+        """Compacta um fluxo para um novo arquivo e devolve (nome, tamanho)"""
+        if codec not in CODECS:
+            raise ValueError(f"Compactador inválido. Use: {list(CODECS)}")
+        digest = uuid.uuid4().hex
+        name = f"{digest[:2]}/{digest}{CODECS[codec]}"
+        target = self.path(name)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix='.compress-')
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                if codec == 'zlib':
+                    compressor = zlib.compressobj()
+                    while True:
+                        chunk = source.read(COPY_BUFFER_SIZE)
+                        if not chunk:
+                            break
+                        raw.write(compressor.compress(chunk))
+                    raw.write(compressor.flush())
+                else:
+                    writer = (lzma.LZMAFile(raw, 'wb') if codec == 'lzma'
+                              else gzip.GzipFile(fileobj=raw, mode='wb', mtime=0))
+                    with writer:
+                        shutil.copyfileobj(source, writer, COPY_BUFFER_SIZE)
+            os.utime(tmp_name, ns=times)
+            os.replace(tmp_name, target)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return name, target.stat().st_size
+
+    def compress(self, source: Path, codec: str) -> Tuple[str, int]:
+        """
+        Compacta um documento para o repositório
+
+        O original não é alterado: cabe a quem chama apagá-lo depois de
+        registrar o arquivo compactado.
+
+        Args:
+            source: Documento de origem
+            codec: Compactador ('lzma', 'gzip' ou 'zlib')
+
+        Returns:
+            Tupla com o nome do arquivo compactado e o seu tamanho
+        """
+        # Os tempos são lidos antes, pois a leitura pode atualizar o atime
+        stat = os.stat(source)
+        with open(source, 'rb') as src:
+            return self._write(src, codec, (stat.st_atime_ns, stat.st_mtime_ns))
+
+    def recompress(self, name: str, codec: str) -> Tuple[str, int]:
+        """
+        Compacta novamente um arquivo do repositório com outro compactador
+
+        O arquivo anterior é mantido; remova-o com remove() depois de
+        registrar o novo.
+
+        Returns:
+            Tupla com o nome do novo arquivo e o seu tamanho
+        """
+        stat = self.path(name).stat()
+        with self.open(name) as src:
+            return self._write(src, codec, (stat.st_atime_ns, stat.st_mtime_ns))
+
+    def open(self, name: str) -> BinaryIO:
+        """
+        Abre um arquivo do repositório para leitura do conteúdo original
+
+        O conteúdo é descompactado à medida que é lido, sem ocupar memória
+        proporcional ao tamanho do documento.
+        """
+        codec = codec_of(name)
+        path = self.path(name)
+        if codec == 'lzma':
+            return lzma.open(path, 'rb')
+        if codec == 'gzip':
+            return gzip.open(path, 'rb')
+        return io.BufferedReader(_ZlibReader(open(path, 'rb')), COPY_BUFFER_SIZE)
+
+    def restore(self, name: str, dest: Path):
+        """
+        Descompacta um arquivo do repositório para o destino
+
+        O destino é substituído atomicamente e recebe o mtime e o atime do
+        arquivo compactado. O arquivo compactado é mantido.
+
+        Args:
+            name: Nome do arquivo compactado
+            dest: Caminho do documento restaurado
+        """
+        dest = Path(dest)
+        stat = self.path(name).stat()
+        fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix='.restore-')
+        try:
+            with self.open(name) as src, os.fdopen(fd, 'wb') as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            os.utime(tmp_name, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            os.replace(tmp_name, dest)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def remove(self, name: str) -> bool:
+        """
+        Apaga um arquivo do repositório
+
+        Returns:
+            True se o arquivo existia
+        """
+        try:
+            self.path(name).unlink()
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,292 @@
+"""
+Módulo de indexação do conteúdo dos documentos
+Mantém um índice de texto completo persistido em SQLite, com ranking BM25
+"""
+
+import os
+import math
+import heapq
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from search_index import tokenize
+from text_extraction import CHUNK_SIZE, EXTRACTION_ERRORS, iter_text, supports
+
+# Tamanho máximo da palavra final guardada para o trecho seguinte
+_CARRY_LIMIT = 256
+
+
+def count_terms(path: str, chunk_size: int = CHUNK_SIZE) -> Tuple[Dict[str, int], int]:
+    """
+    Conta as ocorrências de cada termo no conteúdo de um documento
+
+    O arquivo é lido em blocos; a palavra final de cada bloco só é contada
+    junto com o bloco seguinte, para não dividir termos.
+
+    Args:
+        path: Caminho do documento
+        chunk_size: Tamanho aproximado de cada leitura, em bytes
+
+    Returns:
+        Tupla com as frequências dos termos e o total de termos
+    """
+    counts: Counter = Counter()
+    carry = ''
+    for chunk in iter_text(path, chunk_size):
+        text = carry + chunk
+        cut = len(text)
+        while cut > 0 and len(text) - cut < _CARRY_LIMIT and text[cut - 1].isalnum():
+            cut -= 1
+        carry = text[cut:]
+        counts.update(tokenize(text[:cut]))
+    counts.update(tokenize(carry))
+    return dict(counts), sum(counts.values())
+
+
+def _extract_worker(job: Tuple[str, str, int]) -> Tuple[str, Dict[str, int], int, Optional[str]]:
+    """Extrai os termos de um documento em um processo do pool"""
+    rel_path, path, chunk_size = job
+    try:
+        counts, length = count_terms(path, chunk_size)
+    except EXTRACTION_ERRORS as e:
+        return rel_path, {}, 0, str(e)
+    return rel_path, counts, length, None
+
+
+class ContentIndex:
+    """
+    Índice de texto completo do conteúdo dos documentos
+
+    Guarda, por documento, a frequência de cada termo e o total de termos,
+    além do tamanho e mtime do arquivo indexado, para reindexar apenas o que
+    mudou. As consultas são classificadas com BM25.
+
+    Documentos cuja extração falhou não são gravados, para serem tentados de
+    novo na próxima atualização; as mensagens da última atualização ficam em
+    'errors'.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            term TEXT NOT NULL,
+            doc_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+    """
+
+    # Parâmetros usuais do BM25
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, db_file: Path):
+        """
+        Abre (ou cria) o índice de conteúdo
+
+        Args:
+            db_file: Caminho do arquivo do banco SQLite do índice
+        """
+        self.db_file = Path(db_file)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.errors: Dict[str, str] = {}
+
+    def close(self):
+        """Fecha o banco do índice"""
+        with self._lock:
+            self.conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def _delete(self, rel_path: str):
+        """Remove um documento e suas ocorrências (sem confirmar a transação)"""
+        row = self.conn.execute(
+            "SELECT id FROM documents WHERE path = ?", (rel_path,)
+        ).fetchone()
+        if row is not None:
+            self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+            self.conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+
+    def store(self, rel_path: str, size: int, mtime_ns: int,
+              counts: Dict[str, int], length: int):
+        """
+        Grava (ou substitui) os termos de um documento
+
+        Args:
+            rel_path: Caminho relativo do documento
+            size: Tamanho do arquivo indexado
+            mtime_ns: Data de modificação do arquivo indexado
+            counts: Frequência de cada termo
+            length: Total de termos do documento
+        """
+        with self._lock, self.conn:
+            self._delete(rel_path)
+            cursor = self.conn.execute(
+                "INSERT INTO documents (path, size, mtime_ns, length) VALUES (?, ?, ?, ?)",
+                (rel_path, size, mtime_ns, length)
+            )
+            doc_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?)",
+                ((term, doc_id, tf) for term, tf in counts.items())
+            )
+
+    def remove(self, rel_path: str):
+        """Remove um documento do índice"""
+        with self._lock, self.conn:
+            self._delete(rel_path)
+
+    def rename(self, old_path: str, new_path: str):
+        """Atualiza o caminho de um documento sem reindexar o conteúdo"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE documents SET path = ? WHERE path = ?", (new_path, old_path)
+            )
+
+    def _indexed_files(self) -> Dict[str, Tuple[int, int]]:
+        """Tamanho e mtime registrados para cada documento indexado"""
+        with self._lock:
+            return {path: (size, mtime_ns) for path, size, mtime_ns in
+                    self.conn.execute("SELECT path, size, mtime_ns FROM documents")}
+
+    def update(self, documents: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+               chunk_size: int = CHUNK_SIZE, keep: Iterable[str] = ()) -> int:
+        """
+        Indexa os documentos novos ou alterados e descarta os ausentes
+
+        A extração de texto roda em um pool de processos; a gravação no
+        índice acontece no processo atual, à medida que os resultados chegam.
+
+        Args:
+            documents: Pares (caminho relativo, caminho absoluto)
+            workers: Número de processos (None usa o número de CPUs; 0
+                extrai no próprio processo)
+            chunk_size: Tamanho de cada leitura dos arquivos, em bytes
+            keep: Caminhos relativos cuja indexação atual é mantida sem
+                consultar o arquivo
+
+        Returns:
+            Número de documentos (re)indexados; os que falharam ficam em
+            'errors', com a mensagem de cada um
+        """
+        self.errors = {}
+        indexed = self._indexed_files()
+        for rel_path in keep:
+            indexed.pop(rel_path, None)
+        jobs = []
+        file_info = {}
+
+        for rel_path, path in documents:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            file_info[rel_path] = (stat.st_size, stat.st_mtime_ns)
+            if indexed.pop(rel_path, None) == file_info[rel_path]:
+                continue
+            if supports(path):
+                jobs.append((rel_path, path, chunk_size))
+            else:
+                # Formato sem extrator: registrado vazio para não ser reprocessado
+                self.store(rel_path, stat.st_size, stat.st_mtime_ns, {}, 0)
+
+        for rel_path in indexed:
+            self.remove(rel_path)
+
+        if not jobs:
+            return 0
+
+        if workers == 0:
+            return self._store_results(map(_extract_worker, jobs), file_info)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return self._store_results(pool.map(_extract_worker, jobs), file_info)
+
+    def _store_results(self, results, file_info: Dict[str, Tuple[int, int]]) -> int:
+        """
+        Grava os resultados da extração no índice
+
+        Falhas não são gravadas (a versão anterior do documento, se houver,
+        sai do índice) e ficam registradas em 'errors'.
+
+        Returns:
+            Número de documentos gravados
+        """
+        stored = 0
+        for rel_path, counts, length, error in results:
+            if error is not None:
+                self.errors[rel_path] = error
+                self.remove(rel_path)
+                continue
+            size, mtime_ns = file_info[rel_path]
+            self.store(rel_path, size, mtime_ns, counts, length)
+            stored += 1
+        return stored
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Busca documentos pelo conteúdo, classificados por BM25
+
+        Args:
+            query: Termos de busca
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de pares (caminho relativo, pontuação), da maior pontuação
+            para a menor
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            total, avg_length = self.conn.execute(
+                "SELECT COUNT(*), AVG(length) FROM documents WHERE length > 0"
+            ).fetchone()
+            if not total:
+                return []
+
+            postings = {
+                term: self.conn.execute(
+                    "SELECT doc_id, tf FROM postings WHERE term = ?", (term,)
+                ).fetchall()
+                for term in terms
+            }
+            doc_ids = {doc_id for rows in postings.values() for doc_id, _ in rows}
+            docs = {}
+            ids = list(doc_ids)
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                for doc_id, path, length in self.conn.execute(
+                        f"SELECT id, path, length FROM documents WHERE id IN ({placeholders})",
+                        batch):
+                    docs[doc_id] = (path, length)
+
+        scores: Dict[int, float] = {}
+        for rows in postings.values():
+            df = len(rows)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for doc_id, tf in rows:
+                length = docs[doc_id][1]
+                norm = tf + self.K1 * (1 - self.B + self.B * length / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / norm
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(docs[doc_id][0], score) for doc_id, score in best]
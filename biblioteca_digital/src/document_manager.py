@@ -4,12 +4,109 @@ Responsável por todas as operações de manipulação de arquivos
 """
 
 import os
-import shutil
 import re
+import json
+import time
+import zlib
+import heapq
+import base64
+import inspect
+import functools
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, BinaryIO, List, Dict, Optional, Iterable, Iterator, Tuple, Set, Callable
 from datetime import datetime
-import json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from metadata_store import MetadataStore, JsonMetadataStore, SqliteMetadataStore, MmapMetadataStore
+from search_index import InvertedIndex, tokenize
+from facet_index import FacetIndex
+from library_stats import LibraryStatistics
+from blob_store import BlobStore
+from cold_storage import CODECS as COLD_CODECS, ColdStore, codec_of, worth_compressing
+from file_copy import COPY_STRATEGIES, copy_file
+from content_index import ContentIndex
+from metrics import OperationMetrics, instrumented
+from file_lock import FileLock
+from metadata_inference import FIELDS as INFERRED_FIELDS, InferenceCache, content_key, infer_worker
+from metadata_inference import supports as inference_supported
+
+# Sequência de exatamente 4 dígitos (não parte de um número maior)
+_YEAR_RE = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+
+# Nome com sufixo de repetição: 'relatorio_3' -> ('relatorio', '3')
+_SUFFIX_RE = re.compile(r'^(.*)_(\d+)$')
+
+
+# Opções registradas na biblioteca (layout, backend de metadados, deduplicação)
+LIBRARY_CONFIG = "library.json"
+
+
+def load_library_config(base_path: Path) -> Dict[str, Any]:
+    """
+    Lê as opções registradas em uma biblioteca
+
+    Args:
+        base_path: Diretório da biblioteca
+
+    Returns:
+        Dicionário com as opções (vazio se nenhuma foi registrada)
+    """
+    try:
+        with open(Path(base_path) / LIBRARY_CONFIG, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_library_config(base_path: Path, **options):
+    """
+    Registra opções de uma biblioteca, mantendo as demais
+
+    Args:
+        base_path: Diretório da biblioteca
+        **options: Opções a gravar (ex.: backend='binary')
+    """
+    config = load_library_config(base_path)
+    config.update(options)
+    config_file = Path(base_path) / LIBRARY_CONFIG
+    tmp_file = config_file.with_name(config_file.name + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    os.replace(tmp_file, config_file)
+
+
+def shared_read(method: Callable) -> Callable:
+    """
+    Incorpora as alterações de outros processos antes de uma consulta
+
+    Só tem efeito no modo compartilhado. Métodos geradores continuam
+    geradores, para que o instrumented os acompanhe como iteradores.
+    """
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.shared:
+                self.refresh()
+            yield from method(self, *args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.shared:
+                self.refresh()
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def shared_write(method: Callable) -> Callable:
+    """Executa uma alteração sob a trava de escrita da biblioteca (ver write_lock)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.write_lock():
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class DocumentManager:
@@ -21,37 +118,638 @@ class DocumentManager:
         'livros': ['.pdf', '.epub', '.mobi', '.azw3']
     }
 
-    def __init__(self, base_path: str = "data"):
+    METADATA_BACKENDS = ['json', 'sqlite', 'binary']
+
+    # 'flat': <tipo>/<arquivo>; 'sharded': <tipo>/<fragmento>/<arquivo>, com o
+    # fragmento derivado do nome (256 subdiretórios por tipo)
+    LAYOUTS = ['flat', 'sharded']
+
+    # Campos aceitos por iter_documents para ordenação e filtragem, e campos
+    # com contagens em query_documents
+    SORT_FIELDS = ['year', 'size', 'added_date', 'title']
+    FILTER_FIELDS = FacetIndex.FILTERS
+    FACET_FIELDS = FacetIndex.FACETS
+
+    def __init__(self, base_path: str = "data", journal: bool = False,
+                 backend: Optional[str] = None, dedup: Optional[bool] = None,
+                 copy_strategy: str = "auto", layout: Optional[str] = None,
+                 metrics: Optional[OperationMetrics] = None, shared: bool = False,
+                 infer_metadata: bool = False, cold_storage: Optional[str] = None,
+                 cold_after_days: float = 30):
         """
         Inicializa o gerenciador de documentos
 
         Args:
             base_path: Caminho base para armazenamento dos documentos
+            journal: Se True, as alterações de metadados são anexadas a um
+                diário em vez de reescrever o metadata.json a cada operação
+            backend: Armazenamento dos metadados ('json', 'sqlite' ou
+                'binary'). O backend SQLite e o binário (metadata.bin,
+                mapeado em memória e decodificado sob demanda) importam o
+                metadata.json existente na primeira abertura. O backend fica
+                registrado na biblioteca (library.json); None usa o
+                registrado ('json' se nenhum)
+            dedup: Se True, cada conteúdo distinto é armazenado uma única vez
+                em .blobs/ e os documentos são hardlinks para ele. A escolha
+                fica registrada na biblioteca (library.json); None usa a
+                registrada (sem deduplicação se nenhuma)
+            copy_strategy: Forma de copiar os documentos ('auto', 'reflink',
+                'copy_file_range', 'sendfile' ou 'shutil'); 'auto' usa a
+                mais eficiente disponível
+            layout: Organização dos arquivos ('flat' ou 'sharded'). None usa
+                a registrada na biblioteca ('flat' se nenhuma); para converter
+                uma biblioteca existente use migrate_layout
+            metrics: Métricas onde registrar as operações (por padrão, uma
+                instância própria, disponível em self.metrics)
+            shared: Se True, a biblioteca pode ser usada ao mesmo tempo por
+                vários processos: as alterações são feitas sob uma trava
+                entre processos (metadata.lock) e cada operação incorpora
+                antes as alterações dos outros. Nos backends JSON e binário
+                implica o modo diário
+            infer_metadata: Se True, título, autor e ano não informados na
+                inclusão são lidos dos metadados embutidos no arquivo (PDF,
+                EPUB e DOCX), com prioridade sobre o ano do nome do arquivo.
+                Os resultados ficam em cache por conteúdo
+                (inference_cache.json)
+            cold_storage: Compactador do armazenamento frio ('lzma', 'gzip'
+                ou 'zlib'). Com ele, tier_documents compacta em .cold/ os
+                documentos não acessados há cold_after_days dias. Documentos
+                já compactados continuam legíveis sem esta opção
+            cold_after_days: Dias sem acesso para um documento ir para o
+                armazenamento frio
         """
+        if backend is not None and backend not in self.METADATA_BACKENDS:
+            raise ValueError(f"Backend de metadados inválido. Use: {self.METADATA_BACKENDS}")
+        if copy_strategy not in COPY_STRATEGIES:
+            raise ValueError(f"Estratégia de cópia inválida. Use: {COPY_STRATEGIES}")
+        if layout is not None and layout not in self.LAYOUTS:
+            raise ValueError(f"Layout inválido. Use: {self.LAYOUTS}")
+        if cold_storage is not None and cold_storage not in COLD_CODECS:
+            raise ValueError(f"Compactador inválido. Use: {list(COLD_CODECS)}")
+        if cold_after_days < 0:
+            raise ValueError("O período sem acesso não pode ser negativo")
+
+        self.metrics = metrics if metrics is not None else OperationMetrics()
         self.base_path = Path(base_path)
         self._ensure_directories()
+        self.layout = self._load_layout(layout)
+        self.backend = self._load_backend(backend)
+        self.dedup = self._load_setting('dedup', dedup, False)
+        # Próximo sufixo _N a tentar para cada (tipo, nome, extensão) repetido,
+        # calculado a partir dos metadados na primeira colisão
+        self._name_counters: Optional[Dict[Tuple[str, str, str], int]] = None
         self.metadata_file = self.base_path / "metadata.json"
+        self.metadata_db = self.base_path / "metadata.db"
+        self.metadata_bin = self.base_path / "metadata.bin"
+        # No modo compartilhado, cada alteração vai para o diário, que os
+        # outros processos leem a partir de onde pararam
+        self.shared = shared
+        self.journal = journal or (shared and self.backend != 'sqlite')
+        self.copy_strategy = copy_strategy
+        self._lock = FileLock(self.base_path / "metadata.lock") if shared else None
         self.metadata = self._load_metadata()
+        # Os blobs existentes continuam sendo liberados mesmo que a
+        # deduplicação tenha sido desligada depois
+        blobs_dir = self.base_path / ".blobs"
+        self.blob_store = BlobStore(blobs_dir) if self.dedup or blobs_dir.is_dir() else None
+        self.inference_cache = (InferenceCache(self.base_path / "inference_cache.json")
+                                if infer_metadata else None)
+        # Armazenamento frio: o registro de um documento compactado guarda o
+        # arquivo em .cold/ ('cold_file') e o tamanho compactado ('stored_size')
+        self.cold_store = ColdStore(self.base_path / ".cold")
+        self.cold_storage = cold_storage
+        self.cold_after_days = cold_after_days
+        # Documentos cuja compactação não compensa: (caminho, tamanho, mtime)
+        self._incompressible: Set[Tuple[str, int, int]] = set()
+
+        # Índices derivados dos metadados, mantidos a cada alteração. Cada
+        # um é carregado (ou reconstruído) no primeiro uso, para que abrir a
+        # biblioteca não dependa do tamanho dos índices
+        self._search_index = InvertedIndex()
+        self._facets = FacetIndex()
+        self._statistics = LibraryStatistics()
+        self.statistics_file = self.base_path / "statistics.json"
+        self._indexes = [
+            (self._search_index, self.base_path / "search_index.json"),
+            (self._facets, self.base_path / "facet_index.json"),
+            (self._statistics, self.statistics_file),
+        ]
+        self._loaded_indexes: Set[int] = set()
+        self._mutated = False
+        # Incrementada a cada registro gravado ou removido nesta sessão; permite
+        # a quem mantém caches saber se os metadados mudaram sem relê-los
+        self.generation = 0
+
+        # Visão da listagem: arquivos sem metadados e metadados sem arquivo,
+        # por tipo, recalculados apenas quando o mtime do diretório muda
+        self._dir_mtimes: Dict[str, Optional[int]] = {}
+        self._untracked: Dict[str, Dict[str, Dict]] = {}
+        self._missing: Dict[str, Set[str]] = {}
+
+        # Retrato do disco usado por reconcile(): mtime de cada diretório e
+        # (inode, tamanho, mtime) de cada arquivo, carregado sob demanda
+        self.scan_snapshot_file = self.base_path / "scan_snapshot.json"
+        self._scan_snapshot: Optional[Dict[str, Dict]] = None
+        self._scan_snapshot_dirty = False
+
+        # Índice de conteúdo: aberto sob demanda, pois depende de indexação
+        self.content_index_file = self.base_path / "content_index.db"
+        self._content_index: Optional[ContentIndex] = None
+        self._content_executor: Optional[ThreadPoolExecutor] = None
 
     def _ensure_directories(self):
         """Garante que os diretórios necessários existam"""
         for doc_type in self.SUPPORTED_FORMATS.keys():
             (self.base_path / doc_type).mkdir(parents=True, exist_ok=True)
 
-    def _load_metadata(self) -> Dict:
-        """Carrega metadados dos documentos"""
-        if self.metadata_file.exists():
+    def _load_layout(self, requested: Optional[str]) -> str:
+        """Layout registrado na biblioteca, conferido com o solicitado"""
+        stored = load_library_config(self.base_path).get('layout')
+        if stored is None:
+            # Versões anteriores registravam o layout em layout.json
+            legacy_file = self.base_path / "layout.json"
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)['layout']
+            except (OSError, ValueError, KeyError):
+                pass
+            else:
+                save_library_config(self.base_path, layout=stored)
+                legacy_file.unlink()
+
+        if requested is not None and stored is not None and stored != requested:
+            raise ValueError(f"A biblioteca usa o layout '{stored}'. "
+                             f"Use migrate_layout('{requested}') para convertê-la")
+        return self._load_setting('layout', requested, 'flat')
+
+    def _load_setting(self, name: str, requested, default):
+        """
+        Valor de uma opção registrada na biblioteca (library.json)
+
+        Um valor solicitado diferente do registrado passa a ser o registrado;
+        None usa o registrado, ou o padrão se nenhum.
+        """
+        stored = load_library_config(self.base_path).get(name, default)
+        if requested is None:
+            return stored
+        if stored != requested:
+            save_library_config(self.base_path, **{name: requested})
+        return requested
+
+    def _load_backend(self, requested: Optional[str]) -> str:
+        """
+        Backend de metadados registrado na biblioteca, conferido com o solicitado
+
+        Sair do JSON é permitido, pois os outros backends importam o
+        metadata.json na primeira abertura; o caminho inverso exige
+        converter os metadados antes.
+        """
+        stored = load_library_config(self.base_path).get('backend', 'json')
+        if stored not in ('json', requested) and requested is not None:
+            raise ValueError(f"A biblioteca usa o backend de metadados '{stored}'. "
+                             f"Converta os metadados antes de abri-la com '{requested}'")
+        return self._load_setting('backend', requested, 'json')
+
+    @staticmethod
+    def _shard(filename: str) -> str:
+        """Subdiretório de fragmento de um nome de arquivo"""
+        return f"{zlib.crc32(filename.encode('utf-8')) & 0xFF:02x}"
+
+    @staticmethod
+    def _is_shard(name: str) -> bool:
+        """Indica se o nome de um subdiretório é de fragmento"""
+        return len(name) == 2 and all(c in '0123456789abcdef' for c in name)
+
+    def _document_path(self, doc_type: str, filename: str) -> Path:
+        """Caminho de um documento no layout da biblioteca"""
+        if self.layout == 'sharded':
+            return self.base_path / doc_type / self._shard(filename) / filename
+        return self.base_path / doc_type / filename
+
+    def _find_document(self, doc_type: str, filename: str) -> Optional[Path]:
+        """
+        Localiza um documento pelo nome
+
+        No layout fragmentado também aceita arquivos deixados diretamente no
+        diretório do tipo. Para documentos no armazenamento frio, devolve o
+        caminho do registro, que não existe no disco.
+        """
+        candidates = [self._document_path(doc_type, filename)]
+        if self.layout == 'sharded':
+            candidates.append(self.base_path / doc_type / filename)
+        for path in candidates:
+            if path.exists():
+                return path
+        if self._cold_record(str(candidates[0].relative_to(self.base_path))) is not None:
+            return candidates[0]
+        return None
+
+    def _cold_record(self, rel_path: str) -> Optional[Dict]:
+        """Registro do documento, se ele estiver no armazenamento frio"""
+        record = self.metadata.get(rel_path)
+        if record is not None and record.get('cold_file'):
+            return record
+        return None
+
+    def _scan_type_files(self, doc_type: str, include_shards: Optional[bool] = None
+                         ) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Percorre os arquivos do diretório de um tipo com os.scandir
+
+        Args:
+            doc_type: Tipo do documento
+            include_shards: Inclui os subdiretórios de fragmento (por padrão,
+                apenas no layout fragmentado)
+
+        Returns:
+            Iterador de pares (caminho relativo ao diretório do tipo, entrada)
+        """
+        if include_shards is None:
+            include_shards = self.layout == 'sharded'
+        shards = []
+        with os.scandir(self.base_path / doc_type) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry.name, entry
+                elif include_shards and self._is_shard(entry.name) and entry.is_dir():
+                    shards.append(entry)
+        for shard in shards:
+            with os.scandir(shard.path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        yield os.path.join(shard.name, entry.name), entry
+
+    def _load_metadata(self) -> MetadataStore:
+        """Carrega metadados dos documentos, aplicando o diário pendente"""
+        if self.backend == 'sqlite':
+            return SqliteMetadataStore(self.metadata_db, migrate_from=self.metadata_file)
+        if self.backend == 'binary':
+            # A criação do arquivo (e a migração) é feita por um processo de cada vez
+            creating = self._lock is not None and not self.metadata_bin.exists()
+            with self._lock if creating else nullcontext():
+                return MmapMetadataStore(self.metadata_bin, journal=self.journal,
+                                         migrate_from=self.metadata_file)
+        return JsonMetadataStore(self.metadata_file, journal=self.journal)
+
+    def _metadata_size(self) -> int:
+        """Tamanho em bytes dos metadados persistidos, incluindo diário e WAL"""
+        main = {'json': self.metadata_file, 'sqlite': self.metadata_db,
+                'binary': self.metadata_bin}[self.backend]
+        size = 0
+        for path in (main, main.with_name(main.name + '.journal'),
+                     main.with_name(main.name + '-wal')):
+            try:
+                size += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return size
+
+    def _flush_metadata(self) -> bool:
+        """Persiste os metadados, registrando a duração e o tamanho da gravação"""
+        with self.metrics.span('metadata.save', record=False, backend=self.backend) as span:
+            snapshot = self.metadata.flush()
+        self.metrics.record_metadata_save(span.duration, self._metadata_size(), snapshot)
+        return snapshot
 
     def _save_metadata(self):
         """Salva metadados dos documentos"""
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, indent=4, ensure_ascii=False)
+        # Os índices acompanham cada snapshot completo; no modo diário e no
+        # SQLite são gravados na compactação e no fechamento
+        if self._flush_metadata():
+            self._save_indexes()
+
+    def _load_index(self, index, index_file: Path):
+        """Carrega um índice persistido ou o reconstrói a partir dos metadados"""
+        if id(index) in self._loaded_indexes:
+            return index
+        fingerprint = self.metadata.fingerprint()
+        if not index.load(index_file, fingerprint):
+            index.rebuild(self.metadata.items())
+            self._persist_index(index, index_file, fingerprint)
+        self._loaded_indexes.add(id(index))
+        return index
+
+    def _persist_index(self, index, index_file: Path, fingerprint: str):
+        """
+        Grava um índice reconstruído
+
+        No modo compartilhado a gravação é feita sob a trava, pois outros
+        processos também gravam os índices; uma leitura não espera por ela e,
+        se outro processo estiver escrevendo, deixa o índice sem gravar.
+        """
+        if self._lock is None:
+            index.save(index_file, fingerprint)
+        elif self._lock.acquire(blocking=False):
+            try:
+                index.save(index_file, fingerprint)
+            finally:
+                self._lock.release()
+
+    def _load_indexes(self):
+        """Carrega todos os índices (antes de qualquer alteração dos metadados)"""
+        for index, index_file in self._indexes:
+            self._load_index(index, index_file)
+
+    @property
+    def search_index(self) -> InvertedIndex:
+        """Índice invertido da busca por título, autor e nome"""
+        return self._load_index(*self._indexes[0])
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Índice de facetas dos filtros e listagens"""
+        return self._load_index(*self._indexes[1])
+
+    @property
+    def statistics(self) -> LibraryStatistics:
+        """Estatísticas mantidas incrementalmente"""
+        return self._load_index(*self._indexes[2])
+
+    def _save_indexes(self):
+        """Persiste os índices carregados junto com a identificação dos metadados"""
+        fingerprint = self.metadata.fingerprint()
+        for index, index_file in self._indexes:
+            if id(index) in self._loaded_indexes:
+                index.save(index_file, fingerprint)
+
+    def _set_record(self, rel_path: str, record: Dict):
+        """Grava o registro de um documento e atualiza os índices"""
+        self._load_indexes()
+        self._mutated = True
+        self.generation += 1
+        self.metadata[rel_path] = record
+        for index, _ in self._indexes:
+            index.add(rel_path, record)
+
+    def _delete_record(self, rel_path: str) -> Dict:
+        """Remove o registro de um documento e atualiza os índices"""
+        self._load_indexes()
+        self._mutated = True
+        self.generation += 1
+        record = self.metadata.pop(rel_path)
+        for index, _ in self._indexes:
+            index.remove(rel_path, record)
+        return record
+
+    def refresh(self) -> bool:
+        """
+        Incorpora as alterações feitas por outros processos na biblioteca
+
+        Apenas o que foi gravado desde a última leitura é lido, e os índices
+        carregados são ajustados nos documentos alterados. Depois de uma
+        compactação feita por outro processo os metadados são relidos, e os
+        índices, recarregados no próximo uso. No modo compartilhado é
+        chamado antes de cada operação.
+
+        Returns:
+            True se havia alterações
+        """
+        changes = self.metadata.refresh()
+        if changes is not None and not changes:
+            return False
+        self.generation += 1
+
+        if changes is None:
+            self._loaded_indexes.clear()
+            self._dir_mtimes.clear()
+            return True
+
+        for rel_path, previous, record in changes:
+            if previous is None and record is None:
+                continue
+            for index, _ in self._indexes:
+                if id(index) not in self._loaded_indexes:
+                    continue
+                if previous is not None:
+                    index.remove(rel_path, previous)
+                if record is not None:
+                    index.add(rel_path, record)
+            # A visão da listagem do tipo é recalculada na próxima consulta
+            self._dir_mtimes.pop((record or previous).get('type'), None)
+        return True
+
+    @contextmanager
+    def write_lock(self) -> Iterator[None]:
+        """
+        Trava de escrita da biblioteca, compartilhada entre processos
+
+        No modo compartilhado, aguarda os outros escritores e incorpora as
+        alterações deles antes de executar o bloco; fora dele não faz nada.
+        A trava é reentrante e as leituras não dependem dela.
+        """
+        if self._lock is None:
+            yield
+            return
+        with self.metrics.span('lock_wait'):
+            self._lock.acquire()
+        try:
+            self.refresh()
+            yield
+        finally:
+            self._lock.release()
+
+    @instrumented
+    @shared_write
+    def compact_metadata(self):
+        """Incorpora o diário de alterações ao armazenamento principal"""
+        # Os índices são validados antes, pois a compactação muda a identificação
+        self._load_indexes()
+        self.metadata.compact()
+        self._save_indexes()
+
+    @instrumented
+    def close(self):
+        """Persiste alterações pendentes e libera o armazenamento de metadados"""
+        if self._content_executor is not None:
+            self._content_executor.shutdown(wait=True)
+            self._content_executor = None
+        if self._content_index is not None:
+            self._content_index.close()
+            self._content_index = None
+
+        with self.write_lock():
+            # Sem alterações, os índices persistidos continuam válidos
+            if self._mutated:
+                self._flush_metadata()
+                self._save_indexes()
+            self._save_scan_snapshot()
+            if self.inference_cache is not None:
+                self.inference_cache.save()
+            self.metadata.close()
+        if self._lock is not None:
+            self._lock.close()
+
+    @property
+    def content_index(self) -> ContentIndex:
+        """Índice de texto completo do conteúdo dos documentos"""
+        if self._content_index is None:
+            self._content_index = ContentIndex(self.content_index_file)
+        return self._content_index
+
+    def _existing_content_index(self) -> Optional[ContentIndex]:
+        """Índice de conteúdo, apenas se já tiver sido criado"""
+        if self._content_index is None and not self.content_index_file.exists():
+            return None
+        return self.content_index
+
+    def _to_document(self, rel_path: str, metadata: Dict) -> Dict:
+        """
+        Monta a representação de um documento a partir dos seus metadados
+
+        Args:
+            rel_path: Caminho relativo do documento
+            metadata: Registro de metadados do documento
+
+        Returns:
+            Dicionário no formato devolvido pelas listagens
+        """
+        filename = os.path.basename(rel_path)
+        return {
+            'filename': filename,
+            'type': metadata.get('type'),
+            'year': metadata.get('year'),
+            'author': metadata.get('author', 'Desconhecido'),
+            'title': metadata.get('title', os.path.splitext(filename)[0]),
+            'size': metadata.get('file_size', 0),
+            'added_date': metadata.get('added_date', 'N/A')
+        }
+
+    def _directory_mtime(self, doc_type: str) -> Optional[int]:
+        """
+        mtime (ns) do diretório de um tipo, ou None se ele não existir
+
+        No layout fragmentado, combina o mtime do diretório do tipo com o de
+        cada subdiretório de fragmento, de modo que qualquer alteração em um
+        deles mude o valor.
+        """
+        type_dir = self.base_path / doc_type
+        try:
+            mtime = os.stat(type_dir).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if self.layout != 'sharded':
+            return mtime
+
+        # Os nomes de fragmento são conhecidos: basta um stat para cada um,
+        # sem percorrer o diretório
+        shard_mtimes = []
+        for shard in range(256):
+            try:
+                shard_mtimes.append(os.stat(type_dir / f"{shard:02x}").st_mtime_ns)
+            except FileNotFoundError:
+                shard_mtimes.append(-1)
+        return hash((mtime, tuple(shard_mtimes)))
+
+    def _reconcile_directory(self, doc_type: str):
+        """
+        Sincroniza a visão da listagem com o diretório de um tipo
+
+        Só percorre o diretório (com os.scandir, sem stat por arquivo) quando
+        o seu mtime mudou desde a última verificação. Apenas arquivos sem
+        metadados têm o tamanho consultado.
+
+        Args:
+            doc_type: Tipo do documento
+        """
+        mtime = self._directory_mtime(doc_type)
+        if doc_type in self._dir_mtimes and self._dir_mtimes[doc_type] == mtime:
+            return
+
+        tracked = set(self.facets.keys(self.facets.select({'type': doc_type})))
+        present = set()
+        untracked = {}
+
+        if mtime is not None:
+            for name, entry in self._scan_type_files(doc_type):
+                rel_path = os.path.join(doc_type, name)
+                present.add(rel_path)
+                if rel_path not in tracked:
+                    untracked[rel_path] = {
+                        'filename': entry.name,
+                        'type': doc_type,
+                        'year': None,
+                        'author': 'Desconhecido',
+                        'title': os.path.splitext(entry.name)[0],
+                        'size': entry.stat().st_size,
+                        'added_date': 'N/A'
+                    }
+
+        self._untracked[doc_type] = untracked
+        # Documentos compactados não têm arquivo no diretório do tipo
+        self._missing[doc_type] = {rel_path for rel_path in tracked - present
+                                   if self._cold_record(rel_path) is None}
+        self._dir_mtimes[doc_type] = mtime
+
+    def _directory_changed(self, doc_type: str, mtime_before: Optional[int],
+                           *rel_paths: str):
+        """
+        Registra na visão da listagem uma alteração feita pelo gerenciador
+
+        Se a visão estava sincronizada antes da alteração, ela é ajustada sem
+        percorrer o diretório novamente; caso contrário, é descartada.
+
+        Args:
+            doc_type: Tipo do documento
+            mtime_before: mtime do diretório antes da alteração
+            rel_paths: Caminhos relativos adicionados, removidos ou renomeados
+        """
+        mtime_after = self._directory_mtime(doc_type)
+        self._snapshot_changed(doc_type, mtime_before, mtime_after, rel_paths)
+
+        if self._dir_mtimes.get(doc_type, -1) != mtime_before or \
+                any(rel_path in self._untracked[doc_type] for rel_path in rel_paths):
+            self._dir_mtimes.pop(doc_type, None)
+            return
+
+        self._missing[doc_type].difference_update(rel_paths)
+        self._dir_mtimes[doc_type] = mtime_after
+
+    def _load_scan_snapshot(self) -> Dict[str, Dict]:
+        """Retrato do disco da última reconciliação (vazio se não houver)"""
+        if self._scan_snapshot is None:
+            try:
+                with open(self.scan_snapshot_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._scan_snapshot = data['directories'] if data.get('version') == 1 else {}
+            except (OSError, ValueError, KeyError):
+                self._scan_snapshot = {}
+        return self._scan_snapshot
+
+    def _save_scan_snapshot(self):
+        """Persiste o retrato do disco, se alterado"""
+        if not self._scan_snapshot_dirty:
+            return
+        tmp_file = self.scan_snapshot_file.with_name(self.scan_snapshot_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'directories': self._scan_snapshot}, f)
+        os.replace(tmp_file, self.scan_snapshot_file)
+        self._scan_snapshot_dirty = False
+
+    def _snapshot_changed(self, doc_type: str, mtime_before: Optional[int],
+                          mtime_after: Optional[int], rel_paths: Iterable[str]):
+        """
+        Ajusta o retrato do disco após uma alteração feita pelo gerenciador
+
+        Apenas os arquivos alterados são consultados. Se o retrato do
+        diretório estava atualizado, ele continua valendo, e a próxima
+        reconciliação não precisa percorrer o diretório por causa de
+        operações do próprio gerenciador.
+        """
+        snapshot = self._load_scan_snapshot().get(doc_type)
+        if snapshot is None:
+            return
+
+        for rel_path in rel_paths:
+            name = os.path.relpath(rel_path, doc_type)
+            try:
+                stat = os.stat(self.base_path / rel_path)
+            except FileNotFoundError:
+                snapshot['entries'].pop(name, None)
+            else:
+                snapshot['entries'][name] = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        if snapshot['mtime_ns'] == mtime_before:
+            snapshot['mtime_ns'] = mtime_after
+        self._scan_snapshot_dirty = True
 
     def _extract_year_from_filename(self, filename: str) -> Optional[int]:
         """
@@ -61,37 +759,26 @@ class DocumentManager:
             filename: Nome do arquivo
 
         Returns:
-            Ano encontrado ou None
+            Primeiro ano entre 1900 e 2099 encontrado, ou None
         """
-        # Procura por padrões de ano (1900-2099)
-        year_patterns = [
-            r'(\d{4})',  # Qualquer sequência de 4 dígitos
-            r'_(\d{4})_',  # Ano entre underscores
-            r'-(\d{4})-',  # Ano entre hífens
-        ]
-
-        for pattern in year_patterns:
-            match = re.search(pattern, filename)
-            if match:
-                year = int(match.group(1))
-                if 1900 <= year <= 2099:
-                    return year
+        for match in _YEAR_RE.finditer(filename):
+            year = int(match.group(1))
+            if 1900 <= year <= 2099:
+                return year
         return None
 
-    def add_document(self, file_path: str, doc_type: str, year: Optional[int] = None,
-                    author: str = "", title: str = "") -> bool:
+    def _prepare_document(self, file_path: str, doc_type: str,
+                          year: Optional[int] = None) -> Tuple[Path, Optional[int]]:
         """
-        Adiciona um novo documento à biblioteca
+        Valida um documento antes da cópia para a biblioteca
 
         Args:
             file_path: Caminho do arquivo a ser adicionado
             doc_type: Tipo do documento (artigos, teses, livros)
             year: Ano de publicação
-            author: Autor do documento
-            title: Título do documento
 
         Returns:
-            True se adicionado com sucesso, False caso contrário
+            Tupla com o caminho de origem e o ano (extraído do nome se ausente)
         """
         source = Path(file_path)
 
@@ -110,33 +797,365 @@ class DocumentManager:
         if year is None:
             year = self._extract_year_from_filename(source.name)
 
-        # Destino do arquivo
-        dest_dir = self.base_path / doc_type
-        dest_file = dest_dir / source.name
+        return source, year
+
+    def _plan_document(self, file_path: str, doc_type: str, year: Optional[int] = None,
+                       author: str = "", title: str = "",
+                       reserved: Optional[Set[Path]] = None) -> Tuple[Path, Path, Dict]:
+        """
+        Valida um documento e escolhe o seu nome de destino
 
-        # Verifica se já existe e renomeia se necessário
-        counter = 1
-        while dest_file.exists():
-            name_without_ext = source.stem
-            dest_file = dest_dir / f"{name_without_ext}_{counter}{file_ext}"
-            counter += 1
+        Args:
+            file_path: Caminho do arquivo a ser adicionado
+            doc_type: Tipo do documento (artigos, teses, livros)
+            year: Ano de publicação
+            author: Autor do documento
+            title: Título do documento
+            reserved: Destinos já escolhidos para outros arquivos do mesmo lote
+                e ainda não copiados
 
-        # Copia o arquivo
-        shutil.copy2(source, dest_file)
+        Returns:
+            Tupla com a origem, o destino e o registro de metadados parcial
+        """
+        source, year = self._prepare_document(file_path, doc_type, year)
+        dest_file = self._free_destination(doc_type, source, reserved)
 
-        # Salva metadados
-        self.metadata[str(dest_file.relative_to(self.base_path))] = {
+        if reserved is not None:
+            reserved.add(dest_file)
+        dest_file.parent.mkdir(exist_ok=True)
+
+        record = {
             'type': doc_type,
             'year': year,
             'author': author,
             'title': title or source.stem,
-            'added_date': datetime.now().isoformat(),
-            'file_size': source.stat().st_size
+            'added_date': datetime.now().isoformat()
         }
+        return source, dest_file, record
+
+    def _free_destination(self, doc_type: str, source: Path,
+                          reserved: Optional[Set[Path]] = None) -> Path:
+        """
+        Destino de um arquivo na biblioteca, com sufixo _N se o nome já estiver em uso
+
+        Args:
+            doc_type: Tipo do documento
+            source: Arquivo de origem (fornece o nome)
+            reserved: Destinos já escolhidos e ainda não copiados
+        """
+        file_ext = source.suffix.lower()
+        dest_file = self._document_path(doc_type, source.name)
+
+        # O maior sufixo registrado para cada nome é lembrado, evitando
+        # testar todos os anteriores
+        if self._name_taken(doc_type, dest_file, reserved):
+            if self._name_counters is None:
+                self._name_counters = self._load_name_counters()
+            key = (doc_type, source.stem, file_ext)
+            counter = self._name_counters.get(key, 1)
+            while True:
+                dest_file = self._document_path(doc_type, f"{source.stem}_{counter}{file_ext}")
+                counter += 1
+                if not self._name_taken(doc_type, dest_file, reserved):
+                    break
+            self._name_counters[key] = counter
+        return dest_file
+
+    def _load_name_counters(self) -> Dict[Tuple[str, str, str], int]:
+        """
+        Próximo sufixo _N de cada nome, pelos documentos registrados
+
+        Percorre apenas os caminhos dos metadados, sem consultar o disco;
+        nomes em uso fora dos metadados continuam sendo conferidos por
+        _name_taken.
+        """
+        counters: Dict[Tuple[str, str, str], int] = {}
+        for rel_path in self.metadata:
+            stem, file_ext = os.path.splitext(os.path.basename(rel_path))
+            match = _SUFFIX_RE.match(stem)
+            if match:
+                key = (rel_path.split('/', 1)[0], match.group(1), file_ext.lower())
+                counters[key] = max(counters.get(key, 1), int(match.group(2)) + 1)
+        return counters
+
+    def _name_taken(self, doc_type: str, dest_file: Path,
+                    reserved: Optional[Set[Path]] = None) -> bool:
+        """Indica se o nome de destino já está em uso no tipo"""
+        if reserved is not None and dest_file in reserved:
+            return True
+        return self._find_document(doc_type, dest_file.name) is not None
+
+    def _copy_document(self, source: Path, dest_file: Path, record: Dict) -> Dict:
+        """
+        Copia o documento para o destino e completa o registro
+
+        Não altera o estado do gerenciador e pode rodar em threads paralelas.
+
+        Args:
+            source: Arquivo de origem
+            dest_file: Destino na biblioteca
+            record: Registro de metadados parcial
+
+        Returns:
+            Registro completo (com tamanho e, na deduplicação, o hash)
+        """
+        try:
+            if self.dedup:
+                record['sha256'], _ = self.blob_store.store(source)
+                self.blob_store.link(record['sha256'], dest_file)
+            else:
+                copy_file(source, dest_file, self.copy_strategy)
+            record['file_size'] = source.stat().st_size
+            self.metrics.add_bytes_copied(record['file_size'])
+        except BaseException:
+            # Não deixa cópias parciais no destino reservado
+            if dest_file.exists():
+                dest_file.unlink()
+            raise
+        return record
+
+    def _inferable_fields(self, year: Optional[int], author: str, title: str) -> Tuple[str, ...]:
+        """Campos não informados na inclusão, a serem lidos do próprio arquivo"""
+        if self.inference_cache is None:
+            return ()
+        given = {'title': title, 'author': author, 'year': year}
+        return tuple(field for field in INFERRED_FIELDS if given[field] in (None, ''))
+
+    def _start_inference(self, source: Path, fields: Tuple[str, ...],
+                         pool: Optional[ProcessPoolExecutor] = None) -> Callable[[], Dict]:
+        """
+        Inicia a leitura dos metadados embutidos em um documento
+
+        O cache é consultado antes; o que não estiver nele é lido no pool de
+        processos, se informado, ou no próprio processo. A duração de cada
+        leitura é registrada em self.metrics como 'infer_metadata.<formato>'.
+
+        Args:
+            source: Arquivo de origem
+            fields: Campos a inferir (nenhum dispensa a leitura)
+            pool: Pool de processos para a leitura
+
+        Returns:
+            Função que devolve os metadados inferidos, aguardando o pool
+        """
+        if not fields or not inference_supported(source):
+            return dict
+        try:
+            key = content_key(source)
+        except OSError:
+            # O erro aparece na cópia
+            return dict
+        cached = self.inference_cache.get(key)
+        if cached is not None:
+            return lambda: cached
+        operation = f"infer_metadata{source.suffix.lower()}"
+
+        def finish(result: Tuple[Dict, float]) -> Dict:
+            metadata, seconds = result
+            self.metrics.observe(operation, seconds)
+            self.inference_cache.put(key, metadata)
+            return metadata
+
+        if pool is None:
+            metadata = finish(infer_worker(str(source)))
+            return lambda: metadata
+        future = pool.submit(infer_worker, str(source))
+        return lambda: finish(future.result())
+
+    @staticmethod
+    def _apply_inference(record: Dict, fields: Tuple[str, ...], metadata: Dict) -> Dict:
+        """Completa os campos não informados do registro com os metadados inferidos"""
+        for field in fields:
+            if metadata.get(field):
+                record[field] = metadata[field]
+        return record
+
+    def _store_document(self, file_path: str, doc_type: str, year: Optional[int] = None,
+                        author: str = "", title: str = "") -> Path:
+        """
+        Copia o documento e registra seus metadados em memória, sem persisti-los
+
+        Args:
+            file_path: Caminho do arquivo a ser adicionado
+            doc_type: Tipo do documento (artigos, teses, livros)
+            year: Ano de publicação
+            author: Autor do documento
+            title: Título do documento
+
+        Returns:
+            Caminho do arquivo de destino
+        """
+        mtime_before = self._directory_mtime(doc_type)
+        source, dest_file, record = self._plan_document(file_path, doc_type, year, author, title)
+        fields = self._inferable_fields(year, author, title)
+        self._apply_inference(record, fields, self._start_inference(source, fields)())
+
+        # Copia o arquivo
+        record = self._copy_document(source, dest_file, record)
+
+        # Registra metadados
+        rel_path = str(dest_file.relative_to(self.base_path))
+        self._set_record(rel_path, record)
+        self._directory_changed(doc_type, mtime_before, rel_path)
+
+        return dest_file
+
+    @instrumented
+    @shared_write
+    def add_document(self, file_path: str, doc_type: str, year: Optional[int] = None,
+                    author: str = "", title: str = "") -> bool:
+        """
+        Adiciona um novo documento à biblioteca
+
+        Args:
+            file_path: Caminho do arquivo a ser adicionado
+            doc_type: Tipo do documento (artigos, teses, livros)
+            year: Ano de publicação
+            author: Autor do documento
+            title: Título do documento
+
+        Returns:
+            True se adicionado com sucesso, False caso contrário
+        """
+        self._store_document(file_path, doc_type, year, author, title)
         self._save_metadata()
 
         return True
 
+    @instrumented
+    @shared_write
+    def add_documents(self, specs: Iterable[Dict], workers: int = 4,
+                      progress: Optional[Callable[[Dict], None]] = None,
+                      inference_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Adiciona um lote de documentos, persistindo os metadados uma única vez
+
+        Cada especificação é um dicionário com as mesmas chaves aceitas por
+        add_document (file_path, doc_type, year, author, title). Erros de um
+        item não interrompem o lote.
+
+        A validação e a escolha dos nomes de destino seguem a ordem do lote;
+        as cópias rodam em um pool de threads limitado e os metadados são
+        registrados na ordem original, à medida que as cópias terminam. Com
+        infer_metadata, os metadados embutidos nos arquivos são lidos em um
+        pool de processos, ao mesmo tempo que as cópias.
+
+        Args:
+            specs: Iterável de especificações de documentos
+            workers: Número de cópias simultâneas
+            progress: Função chamada após cada item com um dicionário contendo
+                'completed', 'failed', 'total' (None se desconhecido),
+                'bytes_copied', 'elapsed_seconds', 'files_per_second' e
+                'mb_per_second'
+            inference_workers: Processos de leitura dos metadados embutidos
+                (None usa o número de CPUs; 0 lê no próprio processo)
+
+        Returns:
+            Lista com o resultado de cada item, na ordem recebida
+        """
+        if workers < 1:
+            raise ValueError("O número de cópias simultâneas deve ser ao menos 1")
+
+        total = len(specs) if hasattr(specs, '__len__') else None
+        results = []
+        added: Dict[str, List[str]] = {}
+        reserved: Set[Path] = set()
+        pending = deque()
+        counters = {'completed': 0, 'failed': 0, 'bytes_copied': 0}
+        start = time.monotonic()
+        mtimes_before = {doc_type: self._directory_mtime(doc_type)
+                         for doc_type in self.SUPPORTED_FORMATS}
+
+        def commit_next():
+            """Registra o item mais antigo do lote, aguardando a sua cópia"""
+            file_path, dest_file, outcome, fields, inference = pending.popleft()
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                record = self._apply_inference(outcome.result(), fields, inference())
+            except (OSError, ValueError) as e:
+                counters['failed'] += 1
+                results.append({
+                    'file_path': file_path,
+                    'success': False,
+                    'filename': None,
+                    'error': str(e)
+                })
+            else:
+                rel_path = str(dest_file.relative_to(self.base_path))
+                self._set_record(rel_path, record)
+                added.setdefault(record['type'], []).append(rel_path)
+                counters['bytes_copied'] += record['file_size']
+                results.append({
+                    'file_path': file_path,
+                    'success': True,
+                    'filename': dest_file.name,
+                    'error': None
+                })
+            finally:
+                if dest_file is not None:
+                    reserved.discard(dest_file)
+
+            counters['completed'] += 1
+            if progress is not None:
+                elapsed = time.monotonic() - start
+                progress({
+                    'completed': counters['completed'],
+                    'failed': counters['failed'],
+                    'total': total,
+                    'bytes_copied': counters['bytes_copied'],
+                    'elapsed_seconds': elapsed,
+                    'files_per_second': counters['completed'] / elapsed if elapsed else 0.0,
+                    'mb_per_second': (counters['bytes_copied'] / (1024 * 1024) / elapsed
+                                      if elapsed else 0.0)
+                })
+
+        infer = self.inference_cache is not None and inference_workers != 0
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool, \
+                    (ProcessPoolExecutor(max_workers=inference_workers) if infer
+                     else nullcontext()) as inference_pool:
+                for spec in specs:
+                    file_path = spec.get('file_path', '')
+                    try:
+                        source, dest_file, record = self._plan_document(
+                            file_path=file_path,
+                            doc_type=spec.get('doc_type', ''),
+                            year=spec.get('year'),
+                            author=spec.get('author', ''),
+                            title=spec.get('title', ''),
+                            reserved=reserved
+                        )
+                    except (OSError, ValueError) as e:
+                        pending.append((file_path, None, e, (), dict))
+                    else:
+                        fields = self._inferable_fields(spec.get('year'), spec.get('author', ''),
+                                                        spec.get('title', ''))
+                        pending.append((file_path, dest_file,
+                                        pool.submit(self.metrics.bind(self._copy_document),
+                                                    source, dest_file, record),
+                                        fields, self._start_inference(source, fields,
+                                                                      inference_pool)))
+
+                    # Limita os itens em andamento, mantendo a ordem de registro
+                    while len(pending) > 2 * workers:
+                        commit_next()
+
+                while pending:
+                    commit_next()
+        finally:
+            # Persiste o que foi copiado, mesmo se o lote for interrompido
+            for doc_type, rel_paths in added.items():
+                self._directory_changed(doc_type, mtimes_before[doc_type], *rel_paths)
+            if added:
+                self._save_metadata()
+            if self.inference_cache is not None:
+                self.inference_cache.save()
+
+        return results
+
+    @instrumented
+    @shared_write
     def remove_document(self, filename: str, doc_type: str) -> bool:
         """
         Remove um documento da biblioteca
@@ -148,22 +1167,36 @@ class DocumentManager:
         Returns:
             True se removido com sucesso, False caso contrário
         """
-        file_path = self.base_path / doc_type / filename
+        file_path = self._find_document(doc_type, filename)
 
-        if not file_path.exists():
+        if file_path is None:
             raise FileNotFoundError(f"Documento não encontrado: {filename}")
 
-        # Remove o arquivo
-        file_path.unlink()
+        # Remove o arquivo (um documento compactado pode não tê-lo)
+        rel_path = str(file_path.relative_to(self.base_path))
+        cold = self._cold_record(rel_path)
+        mtime_before = self._directory_mtime(doc_type)
+        file_path.unlink(missing_ok=cold is not None)
 
         # Remove dos metadados
-        rel_path = str(file_path.relative_to(self.base_path))
         if rel_path in self.metadata:
-            del self.metadata[rel_path]
+            record = self._delete_record(rel_path)
             self._save_metadata()
+            # Apaga o conteúdo quando era a última referência a ele
+            if self.blob_store is not None and record.get('sha256'):
+                self.blob_store.release(record['sha256'])
+        if cold is not None:
+            self.cold_store.remove(cold['cold_file'])
+        self._directory_changed(doc_type, mtime_before, rel_path)
+
+        content_index = self._existing_content_index()
+        if content_index is not None:
+            content_index.remove(rel_path)
 
         return True
 
+    @instrumented
+    @shared_write
     def rename_document(self, old_name: str, new_name: str, doc_type: str) -> bool:
         """
         Renomeia um documento
@@ -176,41 +1209,88 @@ class DocumentManager:
         Returns:
             True se renomeado com sucesso, False caso contrário
         """
-        old_path = self.base_path / doc_type / old_name
+        old_path = self._find_document(doc_type, old_name)
 
-        if not old_path.exists():
+        if old_path is None:
             raise FileNotFoundError(f"Documento não encontrado: {old_name}")
 
         # Garante que a extensão seja mantida
         if not new_name.endswith(old_path.suffix):
             new_name += old_path.suffix
 
-        new_path = self.base_path / doc_type / new_name
+        new_path = self._document_path(doc_type, new_name)
 
-        if new_path.exists():
+        if self._name_taken(doc_type, new_path):
             raise FileExistsError(f"Já existe um arquivo com o nome: {new_name}")
 
-        # Renomeia o arquivo
-        old_path.rename(new_path)
+        # Renomeia o arquivo; o de um documento compactado fica em .cold/ e
+        # acompanha o registro
+        mtime_before = self._directory_mtime(doc_type)
+        if old_path.exists():
+            new_path.parent.mkdir(exist_ok=True)
+            old_path.rename(new_path)
 
         # Atualiza metadados
         old_rel = str(old_path.relative_to(self.base_path))
         new_rel = str(new_path.relative_to(self.base_path))
 
         if old_rel in self.metadata:
-            self.metadata[new_rel] = self.metadata.pop(old_rel)
+            record = dict(self._delete_record(old_rel))
             # Atualiza o título se necessário
-            if self.metadata[new_rel]['title'] == old_path.stem:
-                self.metadata[new_rel]['title'] = new_path.stem
+            if record['title'] == old_path.stem:
+                record['title'] = new_path.stem
+            self._set_record(new_rel, record)
             self._save_metadata()
+        self._directory_changed(doc_type, mtime_before, old_rel, new_rel)
+
+        content_index = self._existing_content_index()
+        if content_index is not None:
+            content_index.rename(old_rel, new_rel)
 
         return True
 
+    @instrumented
+    @shared_read
+    def open_document(self, filename: str, doc_type: str) -> BinaryIO:
+        """
+        Abre um documento para leitura
+
+        Documentos no armazenamento frio são descompactados à medida que o
+        fluxo é lido. A abertura conta como acesso para o armazenamento frio:
+        o atime é atualizado mesmo em sistemas de arquivos que não o mantêm.
+
+        Args:
+            filename: Nome do arquivo
+            doc_type: Tipo do documento
+
+        Returns:
+            Arquivo binário aberto para leitura (feche-o após o uso)
+        """
+        path = self._find_document(doc_type, filename)
+        if path is None:
+            raise FileNotFoundError(f"Documento não encontrado: {filename}")
+
+        cold = None if path.exists() else self._cold_record(str(path.relative_to(self.base_path)))
+        stream = open(path, 'rb') if cold is None else self.cold_store.open(cold['cold_file'])
+        try:
+            fd = stream.fileno()
+            os.utime(fd, ns=(time.time_ns(), os.fstat(fd).st_mtime_ns))
+        except OSError:
+            # Sem permissão para alterar os tempos (biblioteca somente leitura)
+            pass
+        return stream
+
+    @instrumented
+    @shared_read
     def list_documents(self, doc_type: Optional[str] = None,
                       year: Optional[int] = None) -> List[Dict]:
         """
         Lista documentos filtrados por tipo e/ou ano
 
+        Os documentos vêm dos metadados, selecionados pelo índice de facetas;
+        o diretório de cada tipo só é percorrido quando foi alterado por fora
+        do gerenciador.
+
         Args:
             doc_type: Tipo do documento (opcional)
             year: Ano de publicação (opcional)
@@ -218,38 +1298,211 @@ class DocumentManager:
         Returns:
             Lista de documentos com metadados
         """
-        documents = []
+        return [document for _, document in self._iter_entries({'type': doc_type, 'year': year})]
+
+    def _check_filters(self, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Valida os filtros, descartando os vazios"""
+        filters = {name: value for name, value in (filters or {}).items() if value is not None}
+        unknown = set(filters) - set(self.FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Filtro inválido: {sorted(unknown)}. Use: {self.FILTER_FIELDS}")
+        return filters
+
+    def _untracked_matches(self, document: Dict, filters: Dict[str, Any]) -> bool:
+        """Verifica se um arquivo sem metadados atende aos filtros"""
+        return self.facets.matches({
+            'type': document['type'],
+            'author': document['author'],
+            'file_size': document['size'],
+        }, filters)
+
+    @staticmethod
+    def _filter_types(filters: Dict[str, Any]) -> Optional[List[str]]:
+        """Tipos aceitos pelos filtros (None aceita todos)"""
+        doc_types = filters.get('type')
+        if doc_types is None or isinstance(doc_types, (list, tuple, set, frozenset)):
+            return doc_types and list(doc_types)
+        return [doc_types]
+
+    def _iter_entries(self, filters: Dict[str, Any],
+                      selected: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Percorre os documentos que atendem aos filtros, tipo a tipo
+
+        Os documentos registrados são os do bitmap do índice de facetas,
+        menos os que perderam o arquivo; em seguida vêm os arquivos sem
+        metadados que atendem aos filtros.
 
-        # Define quais tipos listar
-        types_to_list = [doc_type] if doc_type else list(self.SUPPORTED_FORMATS.keys())
+        Args:
+            filters: Filtros já validados
+            selected: Bitmap dos documentos registrados (None usa o dos filtros)
+
+        Returns:
+            Iterador de pares (caminho relativo, documento)
+        """
+        types_to_list = self._filter_types(filters)
+        if types_to_list is None:
+            types_to_list = list(self.SUPPORTED_FORMATS)
+        if selected is None:
+            selected = self.facets.select(filters)
 
         for dtype in types_to_list:
-            doc_dir = self.base_path / dtype
-            if not doc_dir.exists():
+            if dtype not in self.SUPPORTED_FORMATS:
                 continue
+            self._reconcile_directory(dtype)
+            missing = self._missing[dtype]
 
-            for file_path in doc_dir.iterdir():
-                if file_path.is_file():
-                    rel_path = str(file_path.relative_to(self.base_path))
-                    metadata = self.metadata.get(rel_path, {})
+            for rel_path in self.facets.keys(selected & self.facets.value_bitmap('type', dtype)):
+                if rel_path not in missing:
+                    yield rel_path, self._to_document(rel_path, self.metadata[rel_path])
 
-                    # Filtra por ano se especificado
-                    doc_year = metadata.get('year')
-                    if year is not None and doc_year != year:
-                        continue
+            # Arquivos presentes no diretório, mas sem metadados
+            for rel_path, document in self._untracked[dtype].items():
+                if self._untracked_matches(document, filters):
+                    yield rel_path, document
 
-                    documents.append({
-                        'filename': file_path.name,
-                        'type': dtype,
-                        'year': doc_year,
-                        'author': metadata.get('author', 'Desconhecido'),
-                        'title': metadata.get('title', file_path.stem),
-                        'size': file_path.stat().st_size,
-                        'added_date': metadata.get('added_date', 'N/A')
-                    })
+    @staticmethod
+    def _sort_key(sort_by: Optional[str], reverse: bool) -> Callable[[Tuple[str, Dict]], Tuple]:
+        """
+        Chave de ordenação de pares (caminho relativo, documento)
+
+        O caminho desempata valores iguais, tornando a ordem total e estável
+        entre páginas. Documentos sem o valor ficam por último nos dois
+        sentidos.
+        """
+        if sort_by is None:
+            return lambda entry: ((0,), entry[0])
+
+        absent = (-1,) if reverse else (1,)
+
+        def key(entry):
+            value = entry[1].get(sort_by)
+            if value is None or value == 'N/A':
+                return absent, entry[0]
+            if sort_by == 'title':
+                value = value.casefold()
+            return (0, value), entry[0]
+        return key
+
+    @staticmethod
+    def _encode_cursor(sort_by: Optional[str], reverse: bool, key: Tuple) -> str:
+        """Cursor opaco que aponta para a posição após a chave informada"""
+        data = json.dumps([sort_by, reverse, list(key[0]), key[1]], ensure_ascii=False)
+        return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: Optional[str], reverse: bool) -> Tuple:
+        """Chave de ordenação guardada no cursor"""
+        try:
+            cursor_sort, cursor_reverse, value, rel_path = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Cursor inválido: {cursor}") from e
+        if cursor_sort != sort_by or cursor_reverse != reverse:
+            raise ValueError("O cursor pertence a outra ordenação")
+        return tuple(value), rel_path
+
+    def _select_entries(self, filters: Optional[Dict[str, Any]], sort_by: Optional[str],
+                        reverse: bool, limit: Optional[int], offset: int,
+                        cursor: Optional[str]) -> Iterator[Tuple[str, Dict]]:
+        """Aplica filtros, ordenação e paginação aos pares (caminho, documento)"""
+        filters = self._check_filters(filters)
+        if sort_by is not None and sort_by not in self.SORT_FIELDS:
+            raise ValueError(f"Ordenação inválida. Use: {self.SORT_FIELDS}")
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ValueError("limit e offset não podem ser negativos")
+
+        entries = self._iter_entries(filters)
+
+        # Sem ordenação nem paginação por cursor: percorre na ordem dos metadados
+        if sort_by is None and limit is None and cursor is None:
+            return islice(entries, offset, None)
+
+        key = self._sort_key(sort_by, reverse)
+        if cursor is not None:
+            after = self._decode_cursor(cursor, sort_by, reverse)
+            if reverse:
+                entries = (entry for entry in entries if key(entry) < after)
+            else:
+                entries = (entry for entry in entries if key(entry) > after)
+
+        if limit is None:
+            return islice(sorted(entries, key=key, reverse=reverse), offset, None)
+
+        # Top-N com heap: O(n log k), sem ordenar todos os documentos
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return iter(select(offset + limit, entries, key=key)[offset:])
+
+    @instrumented
+    @shared_read
+    def iter_documents(self, filters: Optional[Dict[str, Any]] = None,
+                       sort_by: Optional[str] = None, reverse: bool = False,
+                       limit: Optional[int] = None, offset: int = 0,
+                       cursor: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Percorre os documentos sob demanda, com filtros, ordenação e paginação
 
-        return documents
+        Sem ordenação, limite ou cursor, os documentos são gerados à medida
+        que são lidos dos metadados. Com limite, apenas os 'offset + limit'
+        primeiros são selecionados, com um heap. Para paginar, prefira
+        page_documents, que devolve o cursor da página seguinte.
 
+        Args:
+            filters: Dicionário com os campos de FILTER_FIELDS: 'type' e
+                'year' (um valor ou uma coleção), 'author' (trecho do nome,
+                sem diferenciar maiúsculas), 'year_from'/'year_to',
+                'min_size'/'max_size' (bytes) e 'added_from'/'added_to'
+                (datas ISO, que podem ser parciais como '2024-03'); os
+                limites são inclusivos
+            sort_by: 'year', 'size', 'added_date' ou 'title' (None mantém a
+                ordem dos caminhos quando há limite ou cursor)
+            reverse: Ordem decrescente
+            limit: Número máximo de documentos
+            offset: Número de documentos a pular
+            cursor: Posição devolvida por page_documents; só são gerados
+                documentos posteriores a ela
+
+        Returns:
+            Iterador de documentos no formato de list_documents
+        """
+        for _, document in self._select_entries(filters, sort_by, reverse, limit, offset, cursor):
+            yield document
+
+    @instrumented
+    @shared_read
+    def page_documents(self, filters: Optional[Dict[str, Any]] = None,
+                       sort_by: Optional[str] = None, reverse: bool = False,
+                       limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Devolve uma página de documentos e o cursor da seguinte
+
+        O cursor guarda a chave de ordenação do último documento da página
+        (com o caminho como desempate), então documentos incluídos ou
+        removidos entre as chamadas não deslocam as páginas seguintes.
+
+        Args:
+            filters: Filtros aceitos por iter_documents
+            sort_by: Campo de ordenação aceito por iter_documents
+            reverse: Ordem decrescente
+            limit: Tamanho da página
+            cursor: Cursor devolvido pela página anterior (None na primeira)
+
+        Returns:
+            Dicionário com 'documents' e 'next_cursor' (None na última página)
+        """
+        if limit < 1:
+            raise ValueError("O tamanho da página deve ser ao menos 1")
+
+        entries = list(self._select_entries(filters, sort_by, reverse, limit + 1, 0, cursor))
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = self._encode_cursor(sort_by, reverse,
+                                              self._sort_key(sort_by, reverse)(entries[-1]))
+        return {'documents': [document for _, document in entries], 'next_cursor': next_cursor}
+
+    @instrumented
+    @shared_read
     def list_by_type(self) -> Dict[str, List[Dict]]:
         """
         Lista documentos organizados por tipo
@@ -262,90 +1515,639 @@ class DocumentManager:
             result[doc_type] = self.list_documents(doc_type=doc_type)
         return result
 
+    @instrumented
+    @shared_read
     def list_by_year(self) -> Dict[int, List[Dict]]:
         """
         Lista documentos organizados por ano
 
+        Cada ano é lido do seu bitmap no índice de facetas, sem percorrer e
+        agrupar todos os documentos.
+
         Returns:
-            Dicionário com documentos organizados por ano
+            Dicionário com documentos organizados por ano, do mais recente ao
+            mais antigo, e 'Sem ano' por último
         """
-        all_docs = self.list_documents()
-        result = {}
+        years = sorted((year for year in self.facets.facet_counts(
+            self.facets.select(), ['year'])['year'] if year is not None), reverse=True)
 
-        for doc in all_docs:
-            year = doc.get('year')
-            if year:
-                if year not in result:
-                    result[year] = []
-                result[year].append(doc)
-
-        # Adiciona documentos sem ano
-        docs_without_year = [d for d in all_docs if not d.get('year')]
+        result = {}
+        for year in years:
+            documents = self.list_documents(year=year)
+            if documents:
+                result[year] = documents
+
+        # Documentos sem ano, inclusive os arquivos sem metadados
+        docs_without_year = [document for _, document in self._iter_entries(
+            {}, self.facets.value_bitmap('year', None))]
         if docs_without_year:
             result['Sem ano'] = docs_without_year
 
-        return dict(sorted(result.items(), reverse=True))
+        return result
 
-    def search_documents(self, query: str) -> List[Dict]:
+    @instrumented
+    @shared_read
+    def query_documents(self, filters: Optional[Dict[str, Any]] = None,
+                        facets: Iterable[str] = ('type', 'year'),
+                        sort_by: Optional[str] = None, reverse: bool = False,
+                        limit: Optional[int] = 50, offset: int = 0) -> Dict:
+        """
+        Consulta com filtros combinados e contagens por faceta
+
+        Os filtros são respondidos por interseção dos bitmaps do índice de
+        facetas, e as contagens pela contagem de bits de cada valor dentro do
+        resultado, sem percorrer os documentos.
+
+        Args:
+            filters: Filtros aceitos por iter_documents, por exemplo
+                {'type': ['artigos', 'teses'], 'year_from': 2015,
+                'min_size': 1_000_000, 'added_from': '2024-01'}
+            facets: Campos de FACET_FIELDS a contar no resultado. 'size'
+                agrupa por potências de 2 (limite inferior em bytes) e
+                'added_date' por mês
+            sort_by: Campo de ordenação aceito por iter_documents
+            reverse: Ordem decrescente
+            limit: Número máximo de documentos devolvidos (None devolve todos)
+            offset: Número de documentos a pular
+
+        Returns:
+            Dicionário com 'total' (documentos que atendem aos filtros),
+            'documents' (a página pedida) e 'facets' ({campo: {valor: contagem}})
+        """
+        filters = self._check_filters(filters)
+        facets = list(facets)
+        unknown = set(facets) - set(self.FACET_FIELDS)
+        if unknown:
+            raise ValueError(f"Faceta inválida: {sorted(unknown)}. Use: {self.FACET_FIELDS}")
+
+        documents = list(self._select_entries(filters, sort_by, reverse, limit, offset, None))
+
+        # Documentos registrados sem arquivo saem do resultado; arquivos sem
+        # metadados que atendem aos filtros entram nas contagens
+        selected = self.facets.select(filters)
+        untracked = []
+        doc_types = self._filter_types(filters)
+        for doc_type in self.SUPPORTED_FORMATS:
+            if doc_types is not None and doc_type not in doc_types:
+                continue
+            self._reconcile_directory(doc_type)
+            if self._missing[doc_type]:
+                selected &= ~self.facets.bitmap(self._missing[doc_type])
+            untracked.extend(
+                {'type': doc_type, 'author': document['author'], 'file_size': document['size']}
+                for document in self._untracked[doc_type].values()
+                if self._untracked_matches(document, filters))
+
+        return {
+            'total': self.facets.count(selected) + len(untracked),
+            'documents': [document for _, document in documents],
+            'facets': self.facets.facet_counts(selected, facets, untracked)
+        }
+
+    @instrumented
+    @shared_read
+    def search_documents(self, query: str, limit: Optional[int] = None) -> List[Dict]:
         """
         Busca documentos por título, autor ou nome do arquivo
 
+        A busca usa o índice invertido: cada termo da consulta deve iniciar
+        alguma palavra do título, do autor ou do nome do arquivo, ou ser
+        parecido com ela (trigramas, sem considerar acentos), e todos os
+        termos precisam ser encontrados no mesmo documento. Os resultados vêm
+        do mais para o menos parecido com a consulta. Arquivos sem metadados
+        são comparados pelo nome, com a mesma pontuação. Uma consulta sem
+        termos devolve todos os documentos, como list_documents.
+
         Args:
             query: Termo de busca
+            limit: Número máximo de resultados (None devolve todos)
 
         Returns:
             Lista de documentos encontrados
         """
-        all_docs = self.list_documents()
-        query_lower = query.lower()
+        if not tokenize(query):
+            return self.list_documents()[:limit]
+
+        missing = set()
+        untracked = []
+        for doc_type in self.SUPPORTED_FORMATS:
+            self._reconcile_directory(doc_type)
+            missing |= self._missing[doc_type]
+            for rel_path, document in self._untracked[doc_type].items():
+                score = self.search_index.score(query, rel_path, document)
+                if score:
+                    untracked.append((rel_path, score, document))
+
+        results = [(rel_path, score, None)
+                   for rel_path, score in self.search_index.rank(query, limit, exclude=missing)]
+        if untracked:
+            results = sorted(results + untracked, key=lambda item: (-item[1], item[0]))[:limit]
+        return [document or self._to_document(rel_path, self.metadata[rel_path])
+                for rel_path, _, document in results]
+
+    @instrumented
+    @shared_read
+    def index_content(self, workers: Optional[int] = None, background: bool = False):
+        """
+        Indexa o conteúdo textual dos documentos novos ou alterados
 
-        results = []
-        for doc in all_docs:
-            if (query_lower in doc['filename'].lower() or
-                query_lower in doc['title'].lower() or
-                query_lower in doc['author'].lower()):
-                results.append(doc)
+        O texto de arquivos .txt, .pdf, .epub e .docx é extraído em blocos por
+        um pool de processos. Documentos removidos da biblioteca saem do
+        índice. Documentos no armazenamento frio mantêm a indexação feita
+        antes da compactação (o conteúdo não muda ao compactar).
+
+        Documentos cuja extração falhou não entram no índice e são tentados
+        de novo na próxima indexação; content_index.errors associa cada um à
+        mensagem de erro.
+
+        Args:
+            workers: Número de processos de extração (None usa o número de
+                CPUs; 0 extrai no próprio processo)
+            background: Se True, a indexação roda em segundo plano
+
+        Returns:
+            Número de documentos indexados, ou um Future com esse número
+            quando background=True
+        """
+        documents, cold = [], []
+        for rel_path, record in self.metadata.items():
+            if record.get('cold_file'):
+                cold.append(rel_path)
+            else:
+                documents.append((rel_path, str(self.base_path / rel_path)))
+
+        if background:
+            if self._content_executor is None:
+                self._content_executor = ThreadPoolExecutor(max_workers=1)
+            return self._content_executor.submit(self.content_index.update, documents, workers,
+                                                 keep=cold)
+
+        return self.content_index.update(documents, workers, keep=cold)
+
+    @instrumented
+    @shared_read
+    def search_content(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Busca documentos pelo conteúdo, do mais ao menos relevante
+
+        Args:
+            query: Termos de busca
+            limit: Número máximo de resultados
+
+        Returns:
+            Lista de documentos encontrados, cada um com a chave 'score'
+        """
+        content_index = self._existing_content_index()
+        if content_index is None:
+            return []
 
+        results = []
+        for rel_path, score in content_index.search(query, limit):
+            if rel_path in self.metadata:
+                document = self._to_document(rel_path, self.metadata[rel_path])
+                document['score'] = round(score, 4)
+                results.append(document)
         return results
 
+    @instrumented
+    @shared_read
     def get_statistics(self) -> Dict:
         """
         Retorna estatísticas sobre a biblioteca
 
+        Os agregados são mantidos a cada alteração; apenas arquivos incluídos
+        ou removidos por fora do gerenciador são ajustados na consulta. O
+        tamanho lógico (total_size_*) soma os documentos originais; o físico
+        (physical_size_*) é o espaço ocupado, com deduplicação e compactação.
+
         Returns:
             Dicionário com estatísticas
         """
-        all_docs = self.list_documents()
+        statistics = self.statistics
+        for doc_type in self.SUPPORTED_FORMATS:
+            self._reconcile_directory(doc_type)
+            if not (self._missing[doc_type] or self._untracked[doc_type]):
+                continue
+            if statistics is self.statistics:
+                statistics = self.statistics.copy()
+            for rel_path in self._missing[doc_type]:
+                statistics.remove(rel_path, self.metadata[rel_path])
+            for rel_path, doc in self._untracked[doc_type].items():
+                statistics.add(rel_path, {'type': doc_type, 'file_size': doc['size']})
+
+        stats = statistics.as_dict()
+
+        # Converte bytes para MB
+        stats['total_size_mb'] = round(stats['total_size_bytes'] / (1024 * 1024), 2)
+        stats['physical_size_mb'] = round(stats['physical_size_bytes'] / (1024 * 1024), 2)
+
+        return stats
+
+    @instrumented
+    @shared_write
+    def verify_statistics(self, repair: bool = True) -> Dict:
+        """
+        Recalcula as estatísticas a partir dos metadados e compara com os
+        agregados mantidos incrementalmente
+
+        Args:
+            repair: Se True, substitui os agregados divergentes pelos recalculados
+
+        Returns:
+            Dicionário com 'consistent' (bool) e 'drift', que mapeia cada campo
+            divergente para os valores 'expected' (recalculado) e 'actual'
+        """
+        expected = self.metadata.statistics()
+        actual = self.statistics.as_dict()
 
-        stats = {
-            'total_documents': len(all_docs),
-            'by_type': {},
-            'by_year': {},
-            'total_size_bytes': 0,
-            'oldest_year': None,
-            'newest_year': None
+        drift = {
+            field: {'expected': value, 'actual': actual[field]}
+            for field, value in expected.items()
+            if actual[field] != value
         }
 
-        years = []
-        for doc in all_docs:
-            # Por tipo
-            doc_type = doc['type']
-            stats['by_type'][doc_type] = stats['by_type'].get(doc_type, 0) + 1
+        if drift and repair:
+            self.statistics.rebuild(self.metadata.items())
+            self.statistics.save(self.statistics_file, self.metadata.fingerprint())
+
+        return {'consistent': not drift, 'drift': drift}
+
+    @instrumented
+    @shared_write
+    def reconcile(self, full: bool = False) -> Dict:
+        """
+        Sincroniza os metadados com os arquivos presentes no disco
+
+        Arquivos incluídos por fora do gerenciador são registrados (com o ano
+        extraído do nome), metadados de arquivos apagados são descartados e
+        arquivos substituídos ou alterados têm o tamanho atualizado.
+        Documentos no armazenamento frio não têm arquivo no diretório do
+        tipo e são mantidos.
+
+        A comparação usa um retrato persistido do disco: diretórios cujo
+        mtime não mudou desde a última reconciliação não são percorridos, e
+        nos demais apenas as entradas novas ou com outro inode são
+        consultadas com stat. Assim, execuções repetidas custam o
+        proporcional às alterações. Com full=True todos os arquivos e
+        registros são conferidos, o que também detecta conteúdo alterado no
+        próprio arquivo (que não muda o mtime do diretório).
 
-            # Por ano
-            year = doc.get('year')
-            if year:
-                years.append(year)
-                stats['by_year'][year] = stats['by_year'].get(year, 0) + 1
+        Args:
+            full: Confere todos os arquivos, ignorando o retrato salvo
 
-            # Tamanho total
-            stats['total_size_bytes'] += doc['size']
+        Returns:
+            Dicionário com os caminhos relativos 'added', 'removed' e
+            'updated', e os tipos cujos diretórios foram percorridos em
+            'scanned'
+        """
+        snapshots = self._load_scan_snapshot()
+        report = {'added': [], 'removed': [], 'updated': [], 'scanned': []}
+        released = []
+
+        for doc_type, extensions in self.SUPPORTED_FORMATS.items():
+            mtime = self._directory_mtime(doc_type)
+            snapshot = snapshots.get(doc_type)
+            if not full and snapshot is not None and snapshot['mtime_ns'] == mtime:
+                continue
+            report['scanned'].append(doc_type)
+
+            previous_entries = snapshot['entries'] if snapshot is not None and not full else {}
+            entries = {}
+            changed = []
+            if mtime is not None:
+                for name, entry in self._scan_type_files(doc_type):
+                    if entry.name.startswith('.') or \
+                            os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                    previous = previous_entries.get(name)
+                    # O inode vem da própria listagem do diretório, sem stat
+                    if previous is not None and previous[0] == entry.inode():
+                        entries[name] = previous
+                        continue
+                    stat = entry.stat()
+                    entries[name] = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+                    changed.append(name)
+
+            # Registros sem arquivo: no retrato anterior, ou todos na primeira vez
+            if snapshot is None or full:
+                candidates = list(self.facets.keys(self.facets.select({'type': doc_type})))
+            else:
+                candidates = [os.path.join(doc_type, name) for name in previous_entries
+                              if name not in entries]
+            for rel_path in candidates:
+                if os.path.relpath(rel_path, doc_type) in entries or rel_path not in self.metadata \
+                        or self._cold_record(rel_path) is not None:
+                    continue
+                record = self._delete_record(rel_path)
+                if record.get('sha256'):
+                    released.append(record['sha256'])
+                report['removed'].append(rel_path)
+
+            for name in changed:
+                rel_path = os.path.join(doc_type, name)
+                inode, size, _ = entries[name]
+                record = self.metadata.get(rel_path)
+                if record is None:
+                    filename = os.path.basename(name)
+                    self._set_record(rel_path, {
+                        'type': doc_type,
+                        'year': self._extract_year_from_filename(filename),
+                        'author': "",
+                        'title': os.path.splitext(filename)[0],
+                        'added_date': datetime.now().isoformat(),
+                        'file_size': size
+                    })
+                    report['added'].append(rel_path)
+                    continue
+
+                record = dict(record)
+                replaced = False
+                if record.get('sha256') and self.blob_store is not None:
+                    # Arquivo substituído: deixou de ser um link para o blob
+                    blob = self.blob_store.blob_path(record['sha256'])
+                    replaced = not blob.exists() or blob.stat().st_ino != inode
+                if record.get('file_size') == size and not replaced:
+                    continue
+                self._delete_record(rel_path)
+                if replaced:
+                    released.append(record.pop('sha256'))
+                record['file_size'] = size
+                self._set_record(rel_path, record)
+                report['updated'].append(rel_path)
+
+            snapshots[doc_type] = {'mtime_ns': mtime, 'entries': entries}
+            self._scan_snapshot_dirty = True
+            # A visão da listagem é recalculada na próxima consulta
+            self._dir_mtimes.pop(doc_type, None)
+
+        if report['added'] or report['removed'] or report['updated']:
+            self._save_metadata()
+        self._save_scan_snapshot()
 
-        if years:
-            stats['oldest_year'] = min(years)
-            stats['newest_year'] = max(years)
+        if self.blob_store is not None:
+            for digest in released:
+                self.blob_store.release(digest)
+        content_index = self._existing_content_index()
+        if content_index is not None:
+            for rel_path in report['removed']:
+                content_index.remove(rel_path)
 
-        # Converte bytes para MB
-        stats['total_size_mb'] = round(stats['total_size_bytes'] / (1024 * 1024), 2)
+        return report
 
-        return stats
+    @instrumented
+    @shared_write
+    def migrate_layout(self, layout: str) -> int:
+        """
+        Converte a organização dos arquivos da biblioteca
+
+        Move cada arquivo para o caminho do novo layout (no mesmo sistema de
+        arquivos, sem copiar o conteúdo) e atualiza as chaves dos metadados,
+        os índices e o índice de conteúdo. Arquivos sem metadados também são
+        movidos. Se for interrompida, basta executá-la novamente.
+
+        Args:
+            layout: Novo layout ('flat' ou 'sharded')
+
+        Returns:
+            Número de arquivos movidos
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"Layout inválido. Use: {self.LAYOUTS}")
+
+        self.layout = layout
+        content_index = self._existing_content_index()
+        moved = 0
+
+        for doc_type in self.SUPPORTED_FORMATS:
+            # Documentos registrados: move o arquivo e troca a chave (os
+            # compactados só trocam a chave)
+            for rel_path, record in list(self.metadata.query(doc_type)):
+                target = self._document_path(doc_type, os.path.basename(rel_path))
+                new_rel = str(target.relative_to(self.base_path))
+                if new_rel == rel_path:
+                    continue
+                source = self.base_path / rel_path
+                if source.exists() and not target.exists():
+                    target.parent.mkdir(exist_ok=True)
+                    source.rename(target)
+                    moved += 1
+                elif not target.exists() and not record.get('cold_file'):
+                    # Arquivo ausente: o registro permanece para reconcile()
+                    continue
+                self._set_record(new_rel, self._delete_record(rel_path))
+                if content_index is not None:
+                    content_index.rename(rel_path, new_rel)
+
+            # Arquivos sem metadados
+            for name, entry in list(self._scan_type_files(doc_type, include_shards=True)):
+                target = self._document_path(doc_type, entry.name)
+                if Path(entry.path) != target and not target.exists():
+                    target.parent.mkdir(exist_ok=True)
+                    os.rename(entry.path, target)
+                    moved += 1
+
+            if layout == 'flat':
+                with os.scandir(self.base_path / doc_type) as entries:
+                    shards = [entry.path for entry in entries
+                              if self._is_shard(entry.name) and entry.is_dir()]
+                for shard in shards:
+                    try:
+                        os.rmdir(shard)
+                    except OSError:
+                        # Ainda contém arquivos (nomes repetidos não movidos)
+                        pass
+
+        self._save_metadata()
+        save_library_config(self.base_path, layout=layout)
+
+        # As visões do disco são refeitas na próxima consulta
+        self._dir_mtimes.clear()
+        self._scan_snapshot = {}
+        self._scan_snapshot_dirty = True
+        self._save_scan_snapshot()
+        return moved
+
+    @instrumented
+    def tier_documents(self) -> Dict:
+        """
+        Move documentos entre a biblioteca e o armazenamento frio
+
+        Documentos não acessados há cold_after_days dias são compactados em
+        .cold/ com o compactador configurado e o original é apagado; os
+        compactados com outro compactador são compactados novamente, e os
+        acessados dentro do período voltam ao diretório do tipo. Documentos
+        deduplicados, formatos já compactados e arquivos cujo início não
+        compacta ao menos 10% ficam como estão.
+
+        A compactação roda fora da trava de escrita: cada documento é
+        registrado depois, sob a trava, se não tiver sido alterado nesse
+        meio-tempo. Deve ser executada periodicamente (comando 'tier' da CLI).
+
+        Returns:
+            Dicionário com os caminhos relativos 'compressed', 'recompressed'
+            e 'restored', o número de documentos em que a compactação não
+            compensa em 'skipped' e a redução do espaço ocupado, em bytes,
+            em 'saved_bytes'
+        """
+        if self.cold_storage is None:
+            raise ValueError("Armazenamento frio não configurado (use cold_storage)")
+
+        report = {'compressed': [], 'recompressed': [], 'restored': [],
+                  'skipped': 0, 'saved_bytes': 0}
+        steps = {'compress': ('compressed', self._compress_cold),
+                 'recompress': ('recompressed', self._recompress_cold),
+                 'restore': ('restored', self._restore_cold)}
+        threshold = time.time() - self.cold_after_days * 86400
+        with self.write_lock():
+            plan = self._plan_tiering(threshold)
+
+        for action, rel_path, record in plan:
+            if action == 'compress' and not self._probe_compression(rel_path):
+                report['skipped'] += 1
+                continue
+            key, step = steps[action]
+            saved = step(rel_path, record)
+            if saved is not None:
+                report[key].append(rel_path)
+                report['saved_bytes'] += saved
+        return report
+
+    def _plan_tiering(self, threshold: float) -> List[Tuple[str, str, Dict]]:
+        """
+        Documentos a mover entre os armazenamentos
+
+        Args:
+            threshold: Instante (epoch) antes do qual um acesso é antigo
+
+        Returns:
+            Lista de (ação, caminho relativo, registro), com a ação
+            'compress', 'recompress' ou 'restore'
+        """
+        plan = []
+        for rel_path, record in self.metadata.items():
+            path = self.base_path / rel_path
+            if record.get('cold_file'):
+                try:
+                    accessed = self.cold_store.path(record['cold_file']).stat().st_atime
+                except FileNotFoundError:
+                    continue
+                # O original de volta ao diretório (ex.: restauração
+                # interrompida) também encerra o armazenamento frio
+                if accessed >= threshold or path.exists():
+                    plan.append(('restore', rel_path, record))
+                elif codec_of(record['cold_file']) != self.cold_storage:
+                    plan.append(('recompress', rel_path, record))
+                continue
+
+            if record.get('sha256'):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_atime < threshold and \
+                    (rel_path, stat.st_size, stat.st_mtime_ns) not in self._incompressible:
+                plan.append(('compress', rel_path, record))
+        return plan
+
+    def _probe_compression(self, rel_path: str) -> bool:
+        """Indica se compactar o documento compensa, lembrando os que não compensam"""
+        path = self.base_path / rel_path
+        try:
+            stat = path.stat()
+            worth = worth_compressing(path)
+            # A leitura da amostra não conta como acesso
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        except FileNotFoundError:
+            return False
+        if not worth:
+            self._incompressible.add((rel_path, stat.st_size, stat.st_mtime_ns))
+        return worth
+
+    def _compress_cold(self, rel_path: str, record: Dict) -> Optional[int]:
+        """
+        Compacta um documento para o armazenamento frio e apaga o original
+
+        Returns:
+            Bytes economizados, ou None se o documento mudou ou não diminuiu
+        """
+        path = self.base_path / rel_path
+        try:
+            before = path.stat()
+            name, stored_size = self.cold_store.compress(path, self.cold_storage)
+        except FileNotFoundError:
+            return None
+        if stored_size >= before.st_size:
+            self.cold_store.remove(name)
+            self._incompressible.add((rel_path, before.st_size, before.st_mtime_ns))
+            return None
+
+        with self.write_lock():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                stat = None
+            if stat is None or self.metadata.get(rel_path) != record or \
+                    (stat.st_ino, stat.st_size, stat.st_mtime_ns) != \
+                    (before.st_ino, before.st_size, before.st_mtime_ns):
+                self.cold_store.remove(name)
+                return None
+
+            doc_type = record['type']
+            mtime_before = self._directory_mtime(doc_type)
+            self._delete_record(rel_path)
+            self._set_record(rel_path, dict(record, cold_file=name, stored_size=stored_size))
+            self._save_metadata()
+            # O original só é apagado depois de registrado o arquivo compactado
+            path.unlink()
+            self._directory_changed(doc_type, mtime_before, rel_path)
+        return stat.st_size - stored_size
+
+    def _recompress_cold(self, rel_path: str, record: Dict) -> Optional[int]:
+        """
+        Compacta novamente um documento com o compactador configurado
+
+        Returns:
+            Bytes economizados (negativo se aumentou), ou None se o documento mudou
+        """
+        try:
+            name, stored_size = self.cold_store.recompress(record['cold_file'], self.cold_storage)
+        except FileNotFoundError:
+            return None
+
+        with self.write_lock():
+            if self.metadata.get(rel_path) != record:
+                self.cold_store.remove(name)
+                return None
+            self._delete_record(rel_path)
+            self._set_record(rel_path, dict(record, cold_file=name, stored_size=stored_size))
+            self._save_metadata()
+        self.cold_store.remove(record['cold_file'])
+        return record['stored_size'] - stored_size
+
+    def _restore_cold(self, rel_path: str, record: Dict) -> Optional[int]:
+        """
+        Devolve um documento do armazenamento frio ao diretório do tipo
+
+        Returns:
+            Bytes economizados (negativo), ou None se o documento mudou
+        """
+        path = self.base_path / rel_path
+        with self.write_lock():
+            if self.metadata.get(rel_path) != record:
+                return None
+
+            doc_type = record['type']
+            mtime_before = self._directory_mtime(doc_type)
+            if not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                self.cold_store.restore(record['cold_file'], path)
+            restored = dict(record)
+            del restored['cold_file']
+            stored_size = restored.pop('stored_size')
+            self._delete_record(rel_path)
+            self._set_record(rel_path, restored)
+            self._save_metadata()
+            self.cold_store.remove(record['cold_file'])
+            self._directory_changed(doc_type, mtime_before, rel_path)
+        return stored_size - record['file_size']
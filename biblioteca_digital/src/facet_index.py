@@ -0,0 +1,620 @@
+"""
+Módulo de índices de facetas
+Responde filtros combinados e contagens por faceta com operações de bitmap
+"""
+
+import os
+import sys
+import json
+import base64
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from record_store import decode_date, encode_date, pack_array, unpack_array
+
+# Campos guardados por documento, na ordem das colunas persistidas
+COLUMNS = ['type', 'year', 'author', 'size', 'added_date']
+
+# Colunas guardadas como códigos de uma tabela de valores distintos
+_CODED = ['type', 'year', 'author']
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(bitmap: int) -> int:
+        return bin(bitmap).count('1')
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """
+    Posições dos bits ligados de um bitmap, em ordem crescente
+
+    Palavras de 64 bits zeradas são puladas sem examinar os bits.
+    """
+    if bitmap <= 0:
+        return
+    data = bitmap.to_bytes((bitmap.bit_length() + 63) // 64 * 8, 'little')
+    for i, word in enumerate(memoryview(data).cast('Q')):
+        if not word:
+            continue
+        # Relido em little-endian: independe da ordem de bytes da máquina
+        word = int.from_bytes(data[i * 8:i * 8 + 8], 'little')
+        base = i * 64
+        while word:
+            low = word & -word
+            yield base + low.bit_length() - 1
+            word ^= low
+
+
+def to_bitmap(slots: Iterable[int]) -> int:
+    """Bitmap com os bits das posições informadas ligados"""
+    slots = list(slots)
+    if not slots:
+        return 0
+    data = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        data[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(data, 'little')
+
+
+def _pack_bitmap(bitmap: int) -> str:
+    """Bitmap como texto (base64, little-endian)"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    return base64.b64encode(data).decode('ascii')
+
+
+def _unpack_bitmap(text: str) -> int:
+    """Bitmap gravado por _pack_bitmap"""
+    return int.from_bytes(base64.b64decode(text), 'little')
+
+
+class _ValueTable:
+    """Valores distintos de uma coluna, referenciados por código"""
+
+    def __init__(self, values: Iterable = ()):
+        self.values: List = list(values)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value: Any) -> int:
+        """Código de um valor, incluído na tabela se for novo"""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def _as_list(value: Any) -> List:
+    """Normaliza um valor único ou uma coleção de valores aceitos"""
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+def _as_date(value: Any) -> str:
+    """Limite de data como texto ISO ('2024', '2024-03', '2024-03-15', date)"""
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _size_bucket(size: int) -> int:
+    """Faixa de tamanho: potências de 2 (0, 1, 2-3, 4-7, ...)"""
+    return size.bit_length()
+
+
+def _month_bucket(added_date: str) -> str:
+    """Faixa de data de adição: o mês ('2024-03')"""
+    return added_date[:7]
+
+
+# Faixa de cada campo agrupado
+_BUCKETS = {'size': _size_bucket, 'added_date': _month_bucket}
+
+
+def _facet_value(facet: str, bucket: Any) -> Any:
+    """Valor exibido nas contagens de uma faixa ('size': limite inferior)"""
+    if facet == 'size':
+        return 1 << (bucket - 1) if bucket else 0
+    return bucket
+
+
+class FacetIndex:
+    """
+    Índices por valor dos campos dos metadados, para filtros e facetas
+
+    Cada documento ocupa uma posição (slot); cada valor de tipo e de ano
+    guarda um bitmap (um inteiro do Python) com as posições dos documentos
+    que o têm, assim como cada faixa de tamanho (potências de 2) e cada mês
+    de adição. Filtros combinados viram OR entre valores aceitos e AND entre
+    campos, feitos em C sobre palavras de máquina; as contagens de cada
+    faceta são a contagem de bits da interseção com o resultado.
+
+    Autores têm muitos valores distintos e poucos documentos cada, então
+    guardam arrays de posições, convertidos em bitmap só na consulta. Faixas
+    de tamanho e meses que o limite de um filtro corta ao meio têm os
+    valores exatos conferidos apenas nos documentos já selecionados.
+
+    Os valores de cada documento ficam em arrays: tipo, ano e autor como
+    códigos de tabelas de valores distintos; tamanho e data de adição como
+    inteiros (a data em microssegundos, como no CompactRecordStore). Colunas
+    e bitmaps são persistidos como estão, e carregar o índice só percorre os
+    documentos para agrupar as posições por autor.
+
+    As posições seguem a ordem de inclusão e não são reaproveitadas, para
+    que os resultados sigam a ordem dos metadados; quando metade delas fica
+    vaga, o índice é compactado.
+    """
+
+    FORMAT_VERSION = 2
+
+    # Filtros aceitos por select (valores únicos ou coleções em 'type' e 'year';
+    # limites inclusivos nos demais; 'author' é um trecho do nome)
+    FILTERS = ['type', 'year', 'author', 'year_from', 'year_to',
+               'min_size', 'max_size', 'added_from', 'added_to']
+    # Campos com contagens por valor em facet_counts
+    FACETS = ['type', 'year', 'author', 'size', 'added_date']
+
+    def __init__(self):
+        """Inicializa um índice vazio"""
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._tables = {column: _ValueTable() for column in _CODED}
+        self._codes = {column: array('I') for column in _CODED}
+        self._file_sizes = array('q')
+        self._dates = array('q')
+        # Datas que a coluna não representa (textos fora do formato ISO)
+        self._odd_dates: Dict[int, str] = {}
+        self._live = 0
+        self._types: Dict[Optional[str], int] = {}
+        self._years: Dict[Optional[int], int] = {}
+        self._sizes: Dict[int, int] = {}
+        self._months: Dict[str, int] = {}
+        self._authors: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slots
+
+    @staticmethod
+    def _values(record: Dict) -> Tuple:
+        """Valores indexados de um registro, na ordem de COLUMNS"""
+        added_date = record.get('added_date')
+        return (
+            record.get('type'),
+            record.get('year') or None,
+            record.get('author', 'Desconhecido') or '',
+            record.get('file_size') or 0,
+            added_date if added_date and added_date != 'N/A' else None,
+        )
+
+    def _append(self, key: str, values: Tuple) -> int:
+        """Grava os valores de um documento na próxima posição das colunas"""
+        slot = len(self._keys)
+        self._slots[key] = slot
+        self._keys.append(key)
+        for column, value in zip(_CODED, values):
+            self._codes[column].append(self._tables[column].encode(value))
+        self._file_sizes.append(values[3])
+        added_date = encode_date(values[4])
+        if added_date is None:
+            self._odd_dates[slot] = values[4]
+            added_date = encode_date(None)
+        self._dates.append(added_date)
+        self._authors.setdefault(values[2], array('I')).append(slot)
+        return slot
+
+    def _date(self, slot: int) -> Optional[str]:
+        """Data de adição de uma posição"""
+        added_date = decode_date(self._dates[slot])
+        return self._odd_dates.get(slot) if added_date is None else added_date
+
+    def _row(self, slot: int) -> Tuple:
+        """Valores de uma posição, na ordem de COLUMNS"""
+        tables, codes = self._tables, self._codes
+        return (tables['type'].values[codes['type'][slot]],
+                tables['year'].values[codes['year'][slot]],
+                tables['author'].values[codes['author'][slot]],
+                self._file_sizes[slot],
+                self._date(slot))
+
+    def _insert(self, key: str, values: Tuple):
+        """Ocupa a próxima posição com um documento"""
+        slot = self._append(key, values)
+        bit = 1 << slot
+        self._live |= bit
+
+        doc_type, year, author, size, added_date = values
+        self._types[doc_type] = self._types.get(doc_type, 0) | bit
+        self._years[year] = self._years.get(year, 0) | bit
+        bucket = _size_bucket(size)
+        self._sizes[bucket] = self._sizes.get(bucket, 0) | bit
+        if added_date is not None:
+            month = _month_bucket(added_date)
+            self._months[month] = self._months.get(month, 0) | bit
+
+    @staticmethod
+    def _clear_bit(bitmaps: Dict, value: Any, bit: int):
+        """Desliga um bit no bitmap de um valor, descartando bitmaps vazios"""
+        remaining = bitmaps[value] & ~bit
+        if remaining:
+            bitmaps[value] = remaining
+        else:
+            del bitmaps[value]
+
+    def add(self, key: str, record: Dict):
+        """
+        Indexa (ou reindexa) um documento
+
+        Args:
+            key: Caminho relativo do documento
+            record: Registro de metadados do documento
+        """
+        if key in self._slots:
+            self.remove(key)
+        self._insert(key, self._values(record))
+
+    def remove(self, key: str, record: Dict = None):
+        """
+        Remove um documento do índice
+
+        Args:
+            key: Caminho relativo do documento
+            record: Registro de metadados (não utilizado; aceito para manter a
+                mesma assinatura dos demais índices)
+        """
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        self._keys[slot] = None
+        self._live &= ~bit
+
+        doc_type, year, author, size, added_date = self._row(slot)
+        self._odd_dates.pop(slot, None)
+        self._clear_bit(self._types, doc_type, bit)
+        self._clear_bit(self._years, year, bit)
+        self._clear_bit(self._sizes, _size_bucket(size), bit)
+        if added_date is not None:
+            self._clear_bit(self._months, _month_bucket(added_date), bit)
+        slots = self._authors[author]
+        del slots[bisect_left(slots, slot)]
+        if not slots:
+            del self._authors[author]
+
+        vacant = len(self._keys) - len(self._slots)
+        if vacant > 1024 and vacant * 2 > len(self._keys):
+            self._compact()
+
+    def _rows(self) -> Iterator[Tuple[str, Tuple]]:
+        """Pares (chave, valores) dos documentos, na ordem das posições"""
+        for slot, key in enumerate(self._keys):
+            if key is not None:
+                yield key, self._row(slot)
+
+    def _reset(self, rows: Iterable[Tuple[str, Tuple]]):
+        """
+        Reconstrói os índices a partir de pares (chave, valores)
+
+        As posições de cada valor são reunidas antes de montar os bitmaps,
+        cada um de uma só vez (ligar bit a bit copiaria o inteiro inteiro a
+        cada documento).
+        """
+        self.__init__()
+        slots_by = {'type': {}, 'year': {}, 'size': {}, 'added_date': {}}
+        for key, values in rows:
+            slot = self._append(key, values)
+            doc_type, year, author, size, added_date = values
+            slots_by['type'].setdefault(doc_type, []).append(slot)
+            slots_by['year'].setdefault(year, []).append(slot)
+            slots_by['size'].setdefault(_size_bucket(size), []).append(slot)
+            if added_date is not None:
+                slots_by['added_date'].setdefault(_month_bucket(added_date), []).append(slot)
+
+        self._live = (1 << len(self._keys)) - 1
+        self._types = {value: to_bitmap(slots) for value, slots in slots_by['type'].items()}
+        self._years = {value: to_bitmap(slots) for value, slots in slots_by['year'].items()}
+        self._sizes = {value: to_bitmap(slots) for value, slots in slots_by['size'].items()}
+        self._months = {value: to_bitmap(slots)
+                        for value, slots in slots_by['added_date'].items()}
+
+    def _compact(self):
+        """Renumera as posições, eliminando as vagas"""
+        self._reset(list(self._rows()))
+
+    def rebuild(self, items: Iterable[Tuple[str, Dict]]):
+        """
+        Reconstrói o índice a partir de todos os documentos
+
+        Args:
+            items: Pares (caminho relativo, registro)
+        """
+        self._reset((key, self._values(record)) for key, record in items)
+
+    def keys(self, bitmap: Optional[int] = None) -> Iterator[str]:
+        """
+        Chaves dos documentos de um bitmap, na ordem de inclusão
+
+        Args:
+            bitmap: Resultado de select (None percorre todos)
+        """
+        keys = self._keys
+        for slot in iter_bits(self._live if bitmap is None else bitmap):
+            yield keys[slot]
+
+    def bitmap(self, keys: Iterable[str]) -> int:
+        """Bitmap dos documentos indexados entre as chaves informadas"""
+        slots = self._slots
+        return to_bitmap(slots[key] for key in keys if key in slots)
+
+    def _exact_range(self, column: str, buckets: Dict, bucket_of, low: Any, high: Any,
+                     candidates: int) -> int:
+        """
+        Documentos entre dois limites inclusivos de um campo com faixas
+
+        Faixas inteiramente dentro dos limites entram pelo bitmap; as que
+        contêm um dos limites têm os valores conferidos um a um, apenas entre
+        os candidatos.
+        """
+        low_bucket = bucket_of(low) if low is not None else None
+        high_bucket = bucket_of(high) if high is not None else None
+        whole = 0
+        partial = 0
+        for bucket, bitmap in buckets.items():
+            if (low is not None and bucket < low_bucket) or \
+                    (high is not None and bucket > high_bucket):
+                continue
+            if bucket == low_bucket or bucket == high_bucket:
+                partial |= bitmap
+            else:
+                whole |= bitmap
+
+        partial &= candidates
+        if partial:
+            value_of = self._file_sizes.__getitem__ if column == 'size' else self._date
+
+            def within(value):
+                return (low is None or value >= low) and (high is None or value <= high)
+
+            partial = to_bitmap(slot for slot in iter_bits(partial) if within(value_of(slot)))
+        return (whole & candidates) | partial
+
+    def select(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Bitmap dos documentos que atendem a todos os filtros
+
+        Args:
+            filters: Dicionário com as chaves de FILTERS: 'type' e 'year'
+                aceitam um valor ou uma coleção (qualquer deles serve);
+                'author' é um trecho do nome, sem diferenciar maiúsculas;
+                'year_from'/'year_to' e 'min_size'/'max_size' são limites
+                inclusivos; 'added_from'/'added_to' são datas ISO inclusivas
+                e podem ser parciais ('2024', '2024-03')
+
+        Returns:
+            Bitmap de posições (use keys para obter os caminhos)
+        """
+        filters = {name: value for name, value in (filters or {}).items()
+                   if value is not None and name in self.FILTERS}
+        result = self._live
+
+        if 'type' in filters:
+            accepted = 0
+            for doc_type in _as_list(filters['type']):
+                accepted |= self._types.get(doc_type, 0)
+            result &= accepted
+
+        if 'year' in filters:
+            accepted = 0
+            for year in _as_list(filters['year']):
+                accepted |= self._years.get(year, 0)
+            result &= accepted
+
+        year_from, year_to = filters.get('year_from'), filters.get('year_to')
+        if year_from is not None or year_to is not None:
+            accepted = 0
+            for year, bitmap in self._years.items():
+                if year is not None and (year_from is None or year >= year_from) \
+                        and (year_to is None or year <= year_to):
+                    accepted |= bitmap
+            result &= accepted
+
+        author = filters.get('author')
+        if author and result:
+            author = author.casefold()
+            result &= to_bitmap(slot for name, slots in self._authors.items()
+                                if author in name.casefold() for slot in slots)
+
+        min_size, max_size = filters.get('min_size'), filters.get('max_size')
+        if (min_size is not None or max_size is not None) and result:
+            result = self._exact_range('size', self._sizes, _size_bucket,
+                                       min_size, max_size, result)
+
+        added_from, added_to = filters.get('added_from'), filters.get('added_to')
+        if (added_from is not None or added_to is not None) and result:
+            if added_from is not None:
+                added_from = _as_date(added_from)
+            if added_to is not None:
+                # '2024-03' inclui todo o mês: qualquer data que comece por ele
+                added_to = _as_date(added_to) + '\uffff'
+            result = self._exact_range('added_date', self._months, _month_bucket,
+                                       added_from, added_to, result)
+
+        return result
+
+    def matches(self, record: Dict, filters: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Verifica se um registro avulso (fora do índice) atende aos filtros
+
+        Usa a mesma semântica de select; serve para documentos que ainda não
+        têm metadados.
+        """
+        doc_type, year, author, size, added_date = self._values(record)
+        filters = filters or {}
+
+        def get(name):
+            return filters.get(name)
+
+        if get('type') is not None and doc_type not in _as_list(get('type')):
+            return False
+        if get('year') is not None and year not in _as_list(get('year')):
+            return False
+        if (get('year_from') is not None or get('year_to') is not None) and (
+                year is None or (get('year_from') is not None and year < get('year_from'))
+                or (get('year_to') is not None and year > get('year_to'))):
+            return False
+        if get('author') and get('author').casefold() not in author.casefold():
+            return False
+        if get('min_size') is not None and size < get('min_size'):
+            return False
+        if get('max_size') is not None and size > get('max_size'):
+            return False
+        if get('added_from') is not None or get('added_to') is not None:
+            if added_date is None:
+                return False
+            if get('added_from') is not None and added_date < _as_date(get('added_from')):
+                return False
+            if get('added_to') is not None and added_date > _as_date(get('added_to')) + '\uffff':
+                return False
+        return True
+
+    def value_bitmap(self, field: str, value: Any) -> int:
+        """
+        Bitmap dos documentos com um valor exato de 'type' ou 'year'
+
+        Diferente de select, aceita None (documentos sem o valor).
+        """
+        return {'type': self._types, 'year': self._years}[field].get(value, 0)
+
+    def count(self, bitmap: int) -> int:
+        """Número de documentos de um bitmap"""
+        return _popcount(bitmap)
+
+    def facet_counts(self, bitmap: int, facets: Iterable[str],
+                     records: Iterable[Dict] = ()) -> Dict[str, Dict]:
+        """
+        Contagem de documentos por valor, restrita a um resultado
+
+        Args:
+            bitmap: Resultado de select
+            facets: Campos de FACETS a contar. 'size' agrupa por potências
+                de 2, identificadas pelo limite inferior em bytes, e
+                'added_date' por mês ('2024-03')
+            records: Registros avulsos (fora do índice) somados às contagens
+
+        Returns:
+            Dicionário campo -> {valor: contagem}, sem valores zerados; o ano
+            ausente aparece como None
+        """
+        facets = list(facets)
+        counts: Dict[str, Dict] = {}
+        for facet in facets:
+            if facet not in self.FACETS:
+                raise ValueError(f"Faceta inválida. Use: {self.FACETS}")
+            if facet == 'author':
+                authors, codes = self._tables['author'].values, self._codes['author']
+                counts[facet] = {authors[code]: total for code, total in
+                                 Counter(codes[slot] for slot in iter_bits(bitmap)).items()}
+                continue
+
+            bitmaps = {'type': self._types, 'year': self._years,
+                       'size': self._sizes, 'added_date': self._months}[facet]
+            values = {}
+            for value, value_bitmap in bitmaps.items():
+                total = _popcount(bitmap & value_bitmap)
+                if total:
+                    values[_facet_value(facet, value)] = total
+            counts[facet] = values
+
+        for record in records:
+            for facet, value in zip(COLUMNS, self._values(record)):
+                if facet not in counts or value is None and facet == 'added_date':
+                    continue
+                if facet in ('size', 'added_date'):
+                    value = _facet_value(facet, _BUCKETS[facet](value))
+                counts[facet][value] = counts[facet].get(value, 0) + 1
+        return counts
+
+    def save(self, index_file: Path, fingerprint: str):
+        """
+        Persiste o índice em disco
+
+        Grava as tabelas de valores, as colunas e os bitmaps como estão
+        (posições vagas como null nas chaves); apenas as posições por autor
+        são refeitas ao carregar.
+
+        Args:
+            index_file: Caminho do arquivo do índice
+            fingerprint: Identificação do estado dos metadados indexados
+        """
+        index_file = Path(index_file)
+        tmp_file = index_file.with_name(index_file.name + '.tmp')
+        columns = {column: pack_array(self._codes[column]) for column in _CODED}
+        columns['size'] = pack_array(self._file_sizes)
+        columns['added_date'] = pack_array(self._dates)
+        bitmaps = {'type': self._types, 'year': self._years,
+                   'size': self._sizes, 'added_date': self._months}
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.FORMAT_VERSION,
+                'fingerprint': fingerprint,
+                'keys': self._keys,
+                'values': {column: self._tables[column].values for column in _CODED},
+                'columns': columns,
+                'odd_dates': self._odd_dates,
+                'live': _pack_bitmap(self._live),
+                # Pares [valor, bitmap]: os valores incluem None e inteiros
+                'bitmaps': {facet: [[value, _pack_bitmap(bitmap)]
+                                    for value, bitmap in values.items()]
+                            for facet, values in bitmaps.items()}
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+
+    def load(self, index_file: Path, fingerprint: str) -> bool:
+        """
+        Carrega o índice persistido, se corresponder aos metadados atuais
+
+        Args:
+            index_file: Caminho do arquivo do índice
+            fingerprint: Identificação do estado atual dos metadados
+
+        Returns:
+            True se o índice foi carregado, False se precisa ser reconstruído
+        """
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        if data.get('version') != self.FORMAT_VERSION or data.get('fingerprint') != fingerprint:
+            return False
+
+        self.__init__()
+        # Caminhos internados, como no armazenamento de metadados
+        self._keys = [key if key is None else sys.intern(key) for key in data['keys']]
+        self._slots = {key: slot for slot, key in enumerate(self._keys) if key is not None}
+        self._tables = {column: _ValueTable(data['values'][column]) for column in _CODED}
+        self._codes = {column: unpack_array('I', data['columns'][column]) for column in _CODED}
+        self._file_sizes = unpack_array('q', data['columns']['size'])
+        self._dates = unpack_array('q', data['columns']['added_date'])
+        self._odd_dates = {int(slot): value for slot, value in data['odd_dates'].items()}
+        self._live = _unpack_bitmap(data['live'])
+
+        bitmaps = {facet: {value: _unpack_bitmap(bitmap) for value, bitmap in values}
+                   for facet, values in data['bitmaps'].items()}
+        self._types = bitmaps['type']
+        self._years = bitmaps['year']
+        self._sizes = bitmaps['size']
+        self._months = bitmaps['added_date']
+
+        authors, codes = self._tables['author'].values, self._codes['author']
+        for slot in iter_bits(self._live):
+            self._authors.setdefault(authors[codes[slot]], array('I')).append(slot)
+        return True
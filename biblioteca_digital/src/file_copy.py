@@ -0,0 +1,144 @@
+"""
+Módulo de cópia de arquivos
+Usa as cópias do kernel (reflink, copy_file_range, sendfile) quando disponíveis
+"""
+
+import os
+import errno
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl FICLONE (_IOW(0x94, 9, int)): compartilha os blocos do arquivo de
+# origem (copy-on-write) em btrfs, xfs e similares
+FICLONE = 0x40049409
+
+# Maior trecho pedido ao kernel por chamada
+_MAX_CHUNK = 1024 * 1024 * 1024
+
+# Erros que indicam estratégia indisponível para o par de arquivos, e não
+# falha de leitura ou gravação. EINVAL, EBADF e EPERM só são aceitos como
+# indisponibilidade no reflink e no copy_file_range, que os usam para tipos de
+# arquivo e sistemas de arquivos sem suporte; nas demais estratégias são
+# falhas reais. A cópia convencional, última opção, nunca é pulada
+_PROBE_ERRNOS = {
+    errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.ENOTTY,
+    errno.EOPNOTSUPP, errno.EBADF, errno.EPERM,
+}
+_UNSUPPORTED_ERRNOS: Dict[str, Set[int]] = {
+    'reflink': _PROBE_ERRNOS,
+    'copy_file_range': _PROBE_ERRNOS,
+    'sendfile': {errno.ENOSYS, errno.EXDEV, errno.ENOTSOCK, errno.EOPNOTSUPP},
+    'shutil': set(),
+}
+
+
+def _short_copy(name: str, copied: int, size: int) -> OSError:
+    """
+    Erro para uma cópia do kernel que parou antes do fim
+
+    Sem nenhum byte copiado, a chamada é tratada como indisponível para o
+    par de arquivos (alguns sistemas de arquivos devolvem 0 em vez de um
+    erro), e a estratégia 'auto' passa para a seguinte. Depois de copiar
+    parte do arquivo, indica que a origem terminou antes do esperado.
+    """
+    if copied == 0:
+        return OSError(errno.EOPNOTSUPP, f"{name} não copiou nenhum dado")
+    return OSError(errno.EIO, f"{name} terminou após {copied} de {size} bytes")
+
+
+def _reflink(src_fd: int, dst_fd: int, size: int):
+    """Clona os blocos da origem (sem copiar dados)"""
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "FICLONE indisponível nesta plataforma")
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int):
+    """Copia dentro do kernel com copy_file_range"""
+    if not hasattr(os, 'copy_file_range'):
+        raise OSError(errno.ENOSYS, "copy_file_range indisponível nesta plataforma")
+    remaining = size
+    while remaining > 0:
+        copied = os.copy_file_range(src_fd, dst_fd, min(remaining, _MAX_CHUNK))
+        if copied == 0:
+            raise _short_copy('copy_file_range', size - remaining, size)
+        remaining -= copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int):
+    """Copia dentro do kernel com sendfile"""
+    if not hasattr(os, 'sendfile'):
+        raise OSError(errno.ENOSYS, "sendfile indisponível nesta plataforma")
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, min(size - offset, _MAX_CHUNK))
+        if sent == 0:
+            raise _short_copy('sendfile', offset, size)
+        offset += sent
+
+
+def _userspace(src_fd: int, dst_fd: int, size: int):
+    """Cópia convencional, com buffers em espaço de usuário"""
+    with open(src_fd, 'rb', closefd=False) as src, open(dst_fd, 'wb', closefd=False) as dst:
+        shutil.copyfileobj(src, dst)
+
+
+# Em ordem de preferência para a estratégia 'auto'
+STRATEGIES: Dict[str, Callable[[int, int, int], None]] = {
+    'reflink': _reflink,
+    'copy_file_range': _copy_file_range,
+    'sendfile': _sendfile,
+    'shutil': _userspace,
+}
+
+COPY_STRATEGIES = ['auto'] + list(STRATEGIES)
+
+
+def copy_file(source: Path, dest: Path, strategy: str = 'auto') -> str:
+    """
+    Copia um arquivo preservando permissões e datas, como shutil.copy2
+
+    Na estratégia 'auto' tenta, em ordem, o reflink, copy_file_range,
+    sendfile e a cópia convencional, passando para a seguinte quando o
+    sistema operacional ou o sistema de arquivos não oferece a anterior.
+    Uma estratégia forçada que não esteja disponível gera OSError.
+
+    Args:
+        source: Arquivo de origem
+        dest: Arquivo de destino (sobrescrito se existir)
+        strategy: 'auto', 'reflink', 'copy_file_range', 'sendfile' ou 'shutil'
+
+    Returns:
+        Nome da estratégia que realizou a cópia
+    """
+    if strategy not in COPY_STRATEGIES:
+        raise ValueError(f"Estratégia de cópia inválida. Use: {COPY_STRATEGIES}")
+
+    candidates = list(STRATEGIES) if strategy == 'auto' else [strategy]
+
+    with open(source, 'rb') as src, open(dest, 'wb') as dst:
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        size = os.fstat(src_fd).st_size
+        for name in candidates:
+            try:
+                STRATEGIES[name](src_fd, dst_fd, size)
+            except OSError as e:
+                if (strategy != 'auto' or name == candidates[-1]
+                        or e.errno not in _UNSUPPORTED_ERRNOS.get(name, ())):
+                    raise
+                # Descarta o que a tentativa anterior possa ter gravado
+                os.ftruncate(dst_fd, 0)
+                os.lseek(dst_fd, 0, os.SEEK_SET)
+                os.lseek(src_fd, 0, os.SEEK_SET)
+                continue
+            used = name
+            break
+
+    shutil.copystat(source, dest)
+    return used
@@ -0,0 +1,100 @@
+"""
+Módulo de trava entre processos
+Coordena os processos que escrevem na mesma biblioteca com fcntl.flock
+"""
+
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Sem fcntl (Windows) o acesso compartilhado não está disponível
+    fcntl = None
+
+
+class FileLock:
+    """
+    Trava exclusiva sobre um arquivo, válida entre processos
+
+    Usa flock, que é associado ao arquivo aberto: duas instâncias se
+    excluem mesmo no mesmo processo, e a trava é liberada pelo sistema se o
+    processo terminar sem liberá-la. Dentro de uma instância a trava é
+    reentrante, de modo que operações que chamam outras operações não
+    travam a si mesmas.
+    """
+
+    def __init__(self, lock_file: Path):
+        """
+        Inicializa a trava (o arquivo só é aberto no primeiro uso)
+
+        Args:
+            lock_file: Arquivo usado como trava; é criado se não existir
+
+        Raises:
+            ValueError: Se a plataforma não oferecer fcntl
+        """
+        if fcntl is None:
+            raise ValueError("Acesso compartilhado requer fcntl "
+                             "(disponível apenas em sistemas POSIX)")
+        self.lock_file = Path(lock_file)
+        self._fd = None
+        self._depth = 0
+        self._thread_lock = threading.RLock()
+
+    @property
+    def held(self) -> bool:
+        """Indica se a trava está com esta instância"""
+        return self._depth > 0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Obtém a trava
+
+        Args:
+            blocking: Se False, desiste em vez de aguardar quem está com ela
+
+        Returns:
+            True se a trava foi obtida
+        """
+        if not self._thread_lock.acquire(blocking):
+            return False
+        try:
+            if self._depth == 0:
+                if self._fd is None:
+                    self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    operation = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                    fcntl.flock(self._fd, operation)
+                except BlockingIOError:
+                    self._thread_lock.release()
+                    return False
+            self._depth += 1
+            return True
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self):
+        """Libera a trava (a última liberação a devolve aos outros processos)"""
+        if self._depth == 0:
+            raise RuntimeError("Trava liberada sem ter sido obtida")
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def close(self):
+        """Fecha o arquivo da trava"""
+        with self._thread_lock:
+            if self._fd is not None and self._depth == 0:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
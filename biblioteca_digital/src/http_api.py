@@ -0,0 +1,359 @@
+"""
+API HTTP somente leitura da biblioteca
+
+Servidor da biblioteca padrão (http.server) que expõe o catálogo em JSON:
+
+    GET /documents   lista paginada, com os filtros de query_documents
+    GET /search      busca (?q=termos&limit=N)
+    GET /stats       estatísticas
+    GET /by-year     documentos agrupados por ano
+    GET /by-type     documentos agrupados por tipo
+    GET /files/<tipo>/<arquivo>   download do documento, com suporte a Range
+
+As conexões são mantidas abertas entre requisições (HTTP/1.1). As
+respostas JSON levam um ETag derivado da geração dos metadados e do mtime
+dos diretórios; com If-None-Match igual, a resposta é 304 sem consultar o
+gerenciador. Os downloads são enviados em partes com socket.sendfile, sem
+carregar o arquivo em memória; os do armazenamento frio são descompactados
+em blocos durante o envio.
+"""
+
+import os
+import json
+import uuid
+import zlib
+import mimetypes
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from document_manager import DocumentManager
+
+# Tipos de conteúdo dos formatos de livros que o mimetypes não conhece
+mimetypes.add_type('application/epub+zip', '.epub')
+mimetypes.add_type('application/x-mobipocket-ebook', '.mobi')
+mimetypes.add_type('application/vnd.amazon.ebook', '.azw3')
+
+# Limite de documentos por página em /documents
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 50
+
+# Bloco de envio dos documentos do armazenamento frio (descompactados na hora)
+STREAM_CHUNK_SIZE = 256 * 1024
+
+# Filtros numéricos de /documents
+INTEGER_FILTERS = {'year', 'year_from', 'year_to', 'min_size', 'max_size'}
+# Filtros que aceitam vários valores (?type=artigos&type=teses)
+MULTI_VALUE_FILTERS = {'type', 'year'}
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Interpreta um cabeçalho Range com um único intervalo de bytes
+
+    Args:
+        header: Valor do cabeçalho (ex.: 'bytes=0-99', 'bytes=100-', 'bytes=-50')
+        size: Tamanho do arquivo
+
+    Returns:
+        Par (início, fim inclusivo), ou None se o cabeçalho deve ser ignorado
+        (formato desconhecido ou vários intervalos)
+
+    Raises:
+        ValueError: Se o intervalo não puder ser atendido
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, dash, last = spec.strip().partition('-')
+    if not dash or not (first.isdigit() or last.isdigit()):
+        return None
+    if first.isdigit() and last and not last.isdigit():
+        return None
+
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Intervalo vazio")
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Intervalo fora do arquivo")
+    return start, min(end, size - 1)
+
+
+class LibraryHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP com uma thread por conexão, sobre um DocumentManager"""
+
+    daemon_threads = True
+
+    def __init__(self, manager: DocumentManager, address: Tuple[str, int] = ('127.0.0.1', 8080)):
+        """
+        Inicializa o servidor
+
+        Args:
+            manager: Gerenciador de documentos; as consultas são feitas uma de
+                cada vez, pois ele não é seguro para várias threads
+            address: Par (host, porta); porta 0 escolhe uma porta livre
+        """
+        self.manager = manager
+        self.lock = threading.Lock()
+        # Distingue ETags de execuções diferentes do servidor, já que a
+        # geração dos metadados recomeça em cada uma
+        self.instance = uuid.uuid4().hex[:8]
+        super().__init__(address, LibraryRequestHandler)
+
+    def catalog_etag(self) -> str:
+        """ETag das respostas JSON no estado atual da biblioteca"""
+        with self.lock:
+            # Com outros processos escrevendo, a geração só avança ao
+            # incorporar as alterações deles
+            if self.manager.shared:
+                self.manager.refresh()
+            state = [str(self.manager.generation)]
+            state.extend(str(self.manager._directory_mtime(doc_type))
+                         for doc_type in self.manager.SUPPORTED_FORMATS)
+        return f'"{self.instance}-{zlib.crc32(":".join(state).encode()):08x}-{state[0]}"'
+
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    """Atende as requisições GET e HEAD da API"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BibliotecaDigital/1.0'
+    # Conexões ociosas são fechadas após esse tempo (segundos)
+    timeout = 30
+
+    server: LibraryHTTPServer
+
+    def log_message(self, format: str, *args):
+        """Silencia o log de cada requisição"""
+
+    def do_HEAD(self):
+        """Responde como ao GET, sem o corpo"""
+        self.handle_request(send_body=False)
+
+    def do_GET(self):
+        """Responde com o recurso pedido"""
+        self.handle_request(send_body=True)
+
+    def handle_request(self, send_body: bool):
+        """Encaminha a requisição para o recurso correspondente"""
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        path = url.path.rstrip('/') or '/'
+        try:
+            if path.startswith('/files/'):
+                self.send_file(path[len('/files/'):], send_body)
+                return
+            views = {
+                '/': self.view_index,
+                '/documents': self.view_documents,
+                '/search': self.view_search,
+                '/stats': self.view_stats,
+                '/by-year': self.view_by_year,
+                '/by-type': self.view_by_type,
+            }
+            if path not in views:
+                self.send_json({'error': f"Recurso não encontrado: {url.path}"},
+                               send_body, HTTPStatus.NOT_FOUND)
+                return
+
+            etag = self.server.catalog_etag()
+            if self.etag_matches(etag):
+                self.send_not_modified(etag)
+                return
+            with self.server.lock:
+                data = views[path](query)
+            self.send_json(data, send_body, etag=etag)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, send_body, HTTPStatus.BAD_REQUEST)
+
+    def etag_matches(self, etag: str) -> bool:
+        """Indica se o cliente já tem a representação com esse ETag"""
+        header = self.headers.get('If-None-Match')
+        if header is None:
+            return False
+        candidates = [tag.strip() for tag in header.split(',')]
+        return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    def send_not_modified(self, etag: str):
+        """Responde 304: a representação do cliente continua válida"""
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_json(self, data: Any, send_body: bool, status: HTTPStatus = HTTPStatus.OK,
+                  etag: Optional[str] = None):
+        """Envia uma resposta JSON com Content-Length, mantendo a conexão aberta"""
+        body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # O cliente pode guardar a resposta, mas deve revalidá-la
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    @staticmethod
+    def single(query: Dict[str, List[str]], name: str,
+               default: Optional[str] = None) -> Optional[str]:
+        """Último valor de um parâmetro da consulta, ou o padrão se ausente"""
+        values = query.get(name)
+        return values[-1] if values else default
+
+    @classmethod
+    def integer(cls, query: Dict[str, List[str]], name: str,
+                default: Optional[int] = None) -> Optional[int]:
+        """Parâmetro inteiro da consulta; ValueError se não for um número"""
+        value = cls.single(query, name)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Parâmetro '{name}' deve ser um número inteiro") from None
+
+    def view_index(self, query: Dict[str, List[str]]) -> Dict:
+        """Lista dos recursos disponíveis"""
+        return {'resources': ['/documents', '/search', '/stats', '/by-year', '/by-type',
+                              '/files/<tipo>/<arquivo>']}
+
+    def view_documents(self, query: Dict[str, List[str]]) -> Dict:
+        """Página de documentos: filtros, sort, reverse, limit e cursor"""
+        filters: Dict[str, Any] = {}
+        for field in DocumentManager.FILTER_FIELDS:
+            values = query.get(field)
+            if not values:
+                continue
+            if field in INTEGER_FILTERS:
+                values = [self.integer({field: [value]}, field) for value in values]
+            filters[field] = values if field in MULTI_VALUE_FILTERS else values[-1]
+
+        limit = self.integer(query, 'limit', DEFAULT_PAGE_SIZE)
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"O limite deve estar entre 1 e {MAX_PAGE_SIZE}")
+        sort_by = self.single(query, 'sort')
+        if sort_by is not None and sort_by not in DocumentManager.SORT_FIELDS:
+            raise ValueError(f"Ordenação inválida. Use: {DocumentManager.SORT_FIELDS}")
+
+        return self.server.manager.page_documents(
+            filters or None, sort_by=sort_by,
+            reverse=self.single(query, 'reverse', '') in ('1', 'true'),
+            limit=limit, cursor=self.single(query, 'cursor'))
+
+    def view_search(self, query: Dict[str, List[str]]) -> Dict:
+        """Busca por título, autor e nome: q e limit"""
+        terms = (self.single(query, 'q') or '').strip()
+        if not terms:
+            raise ValueError("Informe os termos de busca em 'q'")
+        limit = self.integer(query, 'limit', DEFAULT_PAGE_SIZE)
+        return {'query': terms,
+                'documents': self.server.manager.search_documents(terms, limit=limit)}
+
+    def view_stats(self, query: Dict[str, List[str]]) -> Dict:
+        """Estatísticas da biblioteca"""
+        return self.server.manager.get_statistics()
+
+    def view_by_year(self, query: Dict[str, List[str]]) -> Dict:
+        """Documentos agrupados por ano"""
+        return {str(year): documents
+                for year, documents in self.server.manager.list_by_year().items()}
+
+    def view_by_type(self, query: Dict[str, List[str]]) -> Dict:
+        """Documentos agrupados por tipo"""
+        return self.server.manager.list_by_type()
+
+    def send_file(self, rel_path: str, send_body: bool):
+        """Envia um documento, inteiro ou o intervalo pedido em Range"""
+        doc_type, _, filename = unquote(rel_path).partition('/')
+        manager = self.server.manager
+        if doc_type not in manager.SUPPORTED_FORMATS or not filename or \
+                '/' in filename or '\\' in filename or filename in ('.', '..'):
+            self.send_json({'error': "Documento não encontrado"}, send_body, HTTPStatus.NOT_FOUND)
+            return
+        try:
+            with self.server.lock:
+                path = manager._find_document(doc_type, filename)
+                if path is None:
+                    raise FileNotFoundError(filename)
+                # Documentos compactados são descompactados durante o envio
+                cold = None if path.exists() else \
+                    manager._cold_record(str(path.relative_to(manager.base_path)))
+                f = manager.open_document(filename, doc_type)
+        except FileNotFoundError:
+            self.send_json({'error': f"Documento não encontrado: {filename}"},
+                           send_body, HTTPStatus.NOT_FOUND)
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size if cold is None else cold['file_size']
+            etag = f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            if self.etag_matches(etag):
+                self.send_not_modified(etag)
+                return
+
+            start, end = 0, size - 1
+            status = HTTPStatus.OK
+            header = self.headers.get('Range')
+            # If-Range: o intervalo só vale se o arquivo não mudou
+            if header and self.headers.get('If-Range', etag) == etag:
+                try:
+                    requested = parse_range(header, size)
+                except ValueError:
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header('Content-Range', f"bytes */{size}")
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if requested is not None:
+                    start, end = requested
+                    status = HTTPStatus.PARTIAL_CONTENT
+
+            length = end - start + 1 if size else 0
+            content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+            self.end_headers()
+            if send_body and length:
+                if cold is None:
+                    self.connection.sendfile(f, offset=start, count=length)
+                else:
+                    self.send_stream(f, start, length)
+
+    def send_stream(self, f, start: int, length: int):
+        """Envia length bytes de um fluxo a partir de start, em blocos"""
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(length, STREAM_CHUNK_SIZE))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            length -= len(chunk)
+
+
+def create_server(manager: DocumentManager, host: str = '127.0.0.1',
+                  port: int = 8080) -> LibraryHTTPServer:
+    """
+    Cria o servidor da API (use serve_forever para atendê-lo)
+
+    Args:
+        manager: Gerenciador de documentos
+        host: Endereço de escuta
+        port: Porta (0 escolhe uma porta livre)
+    """
+    return LibraryHTTPServer(manager, (host, port))
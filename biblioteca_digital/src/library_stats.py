@@ -0,0 +1,232 @@
+"""
+Módulo de estatísticas da biblioteca
+Mantém agregados atualizados a cada alteração, sem percorrer os documentos
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class LibraryStatistics:
+    """
+    Agregados da biblioteca mantidos incrementalmente
+
+    Guarda o total de documentos, as contagens por tipo e por ano, o tamanho
+    total, o período coberto e, para documentos armazenados por conteúdo
+    (com 'sha256' no registro), quantos bytes são cópias de um mesmo
+    conteúdo. Documentos no armazenamento frio (com 'stored_size' no
+    registro) contam o tamanho original no total e o compactado no espaço
+    ocupado. Cada inclusão ou remoção ajusta os contadores em tempo
+    constante; o ano mais antigo e o mais recente só são recalculados quando
+    o último documento de um desses anos sai.
+    """
+
+    FORMAT_VERSION = 3
+
+    def __init__(self):
+        """Inicializa agregados vazios"""
+        self.total_documents = 0
+        self.total_size_bytes = 0
+        self.by_type: Dict[str, int] = {}
+        self.by_year: Dict[int, int] = {}
+        self.oldest_year: Optional[int] = None
+        self.newest_year: Optional[int] = None
+        self.blob_refs: Dict[str, int] = {}
+        self.duplicate_size_bytes = 0
+        self.compressed_documents = 0
+        self.compressed_size_bytes = 0
+        self.compressed_stored_bytes = 0
+
+    def add(self, key: str, record: Dict):
+        """
+        Contabiliza um documento
+
+        Args:
+            key: Caminho relativo do documento
+            record: Registro de metadados do documento
+        """
+        self.total_documents += 1
+        self.total_size_bytes += record.get('file_size') or 0
+
+        doc_type = record.get('type')
+        self.by_type[doc_type] = self.by_type.get(doc_type, 0) + 1
+
+        year = record.get('year')
+        if year:
+            self.by_year[year] = self.by_year.get(year, 0) + 1
+            if self.oldest_year is None or year < self.oldest_year:
+                self.oldest_year = year
+            if self.newest_year is None or year > self.newest_year:
+                self.newest_year = year
+
+        digest = record.get('sha256')
+        if digest:
+            refs = self.blob_refs.get(digest, 0)
+            if refs:
+                self.duplicate_size_bytes += record.get('file_size') or 0
+            self.blob_refs[digest] = refs + 1
+
+        stored = record.get('stored_size')
+        if stored is not None:
+            self.compressed_documents += 1
+            self.compressed_size_bytes += record.get('file_size') or 0
+            self.compressed_stored_bytes += stored
+
+    def remove(self, key: str, record: Dict):
+        """
+        Descontabiliza um documento
+
+        Args:
+            key: Caminho relativo do documento
+            record: Registro de metadados do documento
+        """
+        self.total_documents -= 1
+        self.total_size_bytes -= record.get('file_size') or 0
+
+        doc_type = record.get('type')
+        self.by_type[doc_type] = self.by_type.get(doc_type, 0) - 1
+        if self.by_type[doc_type] <= 0:
+            del self.by_type[doc_type]
+
+        year = record.get('year')
+        if year and year in self.by_year:
+            self.by_year[year] -= 1
+            if self.by_year[year] <= 0:
+                del self.by_year[year]
+                if year in (self.oldest_year, self.newest_year):
+                    self._update_period()
+
+        digest = record.get('sha256')
+        if digest and digest in self.blob_refs:
+            self.blob_refs[digest] -= 1
+            if self.blob_refs[digest]:
+                self.duplicate_size_bytes -= record.get('file_size') or 0
+            else:
+                del self.blob_refs[digest]
+
+        stored = record.get('stored_size')
+        if stored is not None:
+            self.compressed_documents -= 1
+            self.compressed_size_bytes -= record.get('file_size') or 0
+            self.compressed_stored_bytes -= stored
+
+    def _update_period(self):
+        """Recalcula o ano mais antigo e o mais recente"""
+        self.oldest_year = min(self.by_year) if self.by_year else None
+        self.newest_year = max(self.by_year) if self.by_year else None
+
+    def rebuild(self, items: Iterable[Tuple[str, Dict]]):
+        """
+        Recalcula os agregados a partir de todos os documentos
+
+        Args:
+            items: Pares (caminho relativo, registro)
+        """
+        self.__init__()
+        for key, record in items:
+            self.add(key, record)
+
+    def copy(self) -> 'LibraryStatistics':
+        """Cópia independente dos agregados"""
+        other = LibraryStatistics()
+        other.total_documents = self.total_documents
+        other.total_size_bytes = self.total_size_bytes
+        other.by_type = dict(self.by_type)
+        other.by_year = dict(self.by_year)
+        other.oldest_year = self.oldest_year
+        other.newest_year = self.newest_year
+        other.blob_refs = dict(self.blob_refs)
+        other.duplicate_size_bytes = self.duplicate_size_bytes
+        other.compressed_documents = self.compressed_documents
+        other.compressed_size_bytes = self.compressed_size_bytes
+        other.compressed_stored_bytes = self.compressed_stored_bytes
+        return other
+
+    def as_dict(self) -> Dict:
+        """
+        Agregados no formato de DocumentManager.get_statistics
+
+        'total_size_bytes' é o tamanho lógico (dos documentos originais) e
+        'physical_size_bytes' o espaço ocupado, sem o conteúdo duplicado e
+        com os documentos do armazenamento frio pelo tamanho compactado.
+        'dedup_ratio' é a razão entre o tamanho lógico e o deduplicado, e
+        'compression_ratio', entre o original e o compactado dos documentos
+        no armazenamento frio (1.0 quando não há ganho ou documentos).
+
+        Returns:
+            Dicionário com estatísticas
+        """
+        deduplicated = self.total_size_bytes - self.duplicate_size_bytes
+        physical_size = deduplicated - self.compressed_size_bytes + self.compressed_stored_bytes
+        return {
+            'total_documents': self.total_documents,
+            'by_type': dict(self.by_type),
+            'by_year': dict(self.by_year),
+            'total_size_bytes': self.total_size_bytes,
+            'oldest_year': self.oldest_year,
+            'newest_year': self.newest_year,
+            'physical_size_bytes': physical_size,
+            'dedup_ratio': round(self.total_size_bytes / deduplicated, 2) if deduplicated else 1.0,
+            'compressed_documents': self.compressed_documents,
+            'compression_ratio': (
+                round(self.compressed_size_bytes / self.compressed_stored_bytes, 2)
+                if self.compressed_stored_bytes else 1.0
+            )
+        }
+
+    def save(self, stats_file: Path, fingerprint: str):
+        """
+        Persiste os agregados em disco
+
+        Args:
+            stats_file: Caminho do arquivo de estatísticas
+            fingerprint: Identificação do estado dos metadados contabilizados
+        """
+        stats_file = Path(stats_file)
+        tmp_file = stats_file.with_name(stats_file.name + '.tmp')
+        data = self.as_dict()
+        data['blob_refs'] = self.blob_refs
+        data['duplicate_size_bytes'] = self.duplicate_size_bytes
+        data['compressed_size_bytes'] = self.compressed_size_bytes
+        data['compressed_stored_bytes'] = self.compressed_stored_bytes
+        data['version'] = self.FORMAT_VERSION
+        data['fingerprint'] = fingerprint
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_file, stats_file)
+
+    def load(self, stats_file: Path, fingerprint: str) -> bool:
+        """
+        Carrega os agregados persistidos, se corresponderem aos metadados
+
+        Args:
+            stats_file: Caminho do arquivo de estatísticas
+            fingerprint: Identificação do estado atual dos metadados
+
+        Returns:
+            True se carregados, False se precisam ser recalculados
+        """
+        try:
+            with open(stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        if data.get('version') != self.FORMAT_VERSION or data.get('fingerprint') != fingerprint:
+            return False
+
+        self.total_documents = data['total_documents']
+        self.total_size_bytes = data['total_size_bytes']
+        self.by_type = data['by_type']
+        # Chaves JSON são texto; os anos voltam a ser inteiros
+        self.by_year = {int(year): count for year, count in data['by_year'].items()}
+        self.oldest_year = data['oldest_year']
+        self.newest_year = data['newest_year']
+        self.blob_refs = data['blob_refs']
+        self.duplicate_size_bytes = data['duplicate_size_bytes']
+        self.compressed_documents = data['compressed_documents']
+        self.compressed_size_bytes = data['compressed_size_bytes']
+        self.compressed_stored_bytes = data['compressed_stored_bytes']
+        return True
@@ -0,0 +1,341 @@
+"""
+Módulo de inferência de metadados
+Lê título, autor e ano dos metadados embutidos nos documentos: dicionário
+Info e pacote XMP do PDF, pacote OPF do EPUB e docProps/core.xml do DOCX
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from xml.etree import ElementTree
+
+from text_extraction import EXTRACTION_ERRORS, unescape_pdf_string
+
+# Trecho lido do início e do fim de cada arquivo. Os metadados do PDF ficam
+# em um desses trechos (o XMP perto do início, o trailer e em geral o
+# dicionário Info perto do fim); no EPUB e no DOCX o diretório central do
+# ZIP fica no fim e só o membro com os metadados é lido
+HEADER_SIZE = 64 * 1024
+
+FIELDS = ('title', 'author', 'year')
+
+_DC_NS = '{http://purl.org/dc/elements/1.1/}'
+_DCTERMS_NS = '{http://purl.org/dc/terms/}'
+_OPF_NS = '{http://www.idpf.org/2007/opf}'
+_RDF_NS = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}'
+_XMP_NS = '{http://ns.adobe.com/xap/1.0/}'
+_CONTAINER_NS = '{urn:oasis:names:tc:opendocument:xmlns:container}'
+
+_YEAR_RE = re.compile(r'(?<!\d)(\d{4})(?!\d)')
+
+
+def _year(text: Optional[str]) -> Optional[int]:
+    """Primeiro ano plausível (1900-2099) de uma data"""
+    for match in _YEAR_RE.finditer(text or ''):
+        year = int(match.group(1))
+        if 1900 <= year <= 2099:
+            return year
+    return None
+
+
+def _clean(text: Optional[str]) -> str:
+    """Remove espaços repetidos e nas pontas"""
+    return ' '.join((text or '').split())
+
+
+def _result(title: Optional[str], authors, date: Optional[str]) -> Dict:
+    """Monta o resultado apenas com os campos encontrados"""
+    result = {}
+    title = _clean(title)
+    if title:
+        result['title'] = title
+    author = '; '.join(name for name in (_clean(a) for a in authors) if name)
+    if author:
+        result['author'] = author
+    year = _year(date)
+    if year is not None:
+        result['year'] = year
+    return result
+
+
+def _read_ends(path: Path) -> Tuple[int, bytes, bytes]:
+    """Tamanho do arquivo e os trechos inicial e final (vazio se o arquivo for pequeno)"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(HEADER_SIZE)
+        tail = b''
+        if size > HEADER_SIZE:
+            f.seek(max(HEADER_SIZE, size - HEADER_SIZE))
+            tail = f.read(HEADER_SIZE)
+    return size, head, tail
+
+
+def content_key(path) -> str:
+    """
+    Chave de cache do conteúdo de um documento
+
+    SHA-256 do formato, do tamanho e dos trechos inicial e final do arquivo,
+    que contêm os metadados de todos os formatos suportados (no ZIP, o
+    diretório central traz o CRC do membro com os metadados). Não exige ler o
+    arquivo inteiro.
+    """
+    path = Path(path)
+    size, head, tail = _read_ends(path)
+    digest = hashlib.sha256(f"{path.suffix.lower()}:{size}:".encode())
+    digest.update(head)
+    digest.update(tail)
+    return digest.hexdigest()
+
+
+_PDF_INFO_REF_RE = re.compile(rb'/Info\s+(\d+)\s+(\d+)\s+R')
+_PDF_DICT_RE = re.compile(rb'<<(.*?)>>', re.DOTALL)
+_PDF_OBJ_DICT_RE = re.compile(rb'\s*<<(.*?)>>', re.DOTALL)
+_PDF_VALUE_RE = r'/%s\s*(\((?:\\.|[^\\()])*\)|<[0-9A-Fa-f\s]*>)'
+_PDF_TITLE_RE = re.compile((_PDF_VALUE_RE % 'Title').encode(), re.DOTALL)
+_PDF_AUTHOR_RE = re.compile((_PDF_VALUE_RE % 'Author').encode(), re.DOTALL)
+_PDF_DATE_RE = re.compile((_PDF_VALUE_RE % 'CreationDate').encode(), re.DOTALL)
+_XMP_RE = re.compile(rb'<x:xmpmeta\b.*?</x:xmpmeta>', re.DOTALL)
+
+
+def _pdf_string(token: bytes) -> str:
+    """Decodifica uma string do PDF, literal ou hexadecimal"""
+    if token.startswith(b'('):
+        raw = unescape_pdf_string(token[1:-1])
+    else:
+        digits = re.sub(rb'\s', b'', token[1:-1])
+        if len(digits) % 2:
+            digits += b'0'
+        raw = bytes.fromhex(digits.decode('ascii'))
+    if raw.startswith(b'\xfe\xff'):
+        return raw[2:].decode('utf-16-be', errors='replace')
+    if raw.startswith(b'\xef\xbb\xbf'):
+        return raw[3:].decode('utf-8', errors='replace')
+    return raw.decode('latin-1')
+
+
+def _pdf_info(data: bytes) -> Dict:
+    """Campos do dicionário Info encontrado nos trechos lidos"""
+    dictionary = None
+    # O último trailer lido é o da revisão mais recente
+    references = _PDF_INFO_REF_RE.findall(data)
+    if references:
+        # Busca literal: uma expressão regular iniciada por dígitos seria
+        # tentada em cada posição dos trechos lidos
+        marker = b'%s %s obj' % references[-1]
+        start = data.find(marker)
+        while start > 0 and data[start - 1:start].isdigit():
+            start = data.find(marker, start + 1)
+        match = _PDF_OBJ_DICT_RE.match(data, start + len(marker)) if start != -1 else None
+        if match:
+            dictionary = match.group(1)
+    if dictionary is None:
+        # Sem referência (ou objeto comprimido): um dicionário com as chaves
+        # típicas do Info; /Title sozinho também aparece nos marcadores
+        for match in _PDF_DICT_RE.finditer(data):
+            candidate = match.group(1)
+            if (b'/CreationDate' in candidate or b'/Producer' in candidate) and \
+                    (b'/Title' in candidate or b'/Author' in candidate):
+                dictionary = candidate
+                break
+    if dictionary is None:
+        return {}
+
+    values = {}
+    for field, pattern in (('title', _PDF_TITLE_RE), ('author', _PDF_AUTHOR_RE),
+                           ('date', _PDF_DATE_RE)):
+        match = pattern.search(dictionary)
+        values[field] = _pdf_string(match.group(1)) if match else None
+    # Datas do PDF: D:AAAAMMDDHHmmSS...
+    date = re.match(r'\s*(?:D:)?(\d{4})', values['date'] or '')
+    return _result(values['title'], [values['author'] or ''], date and date.group(1))
+
+
+def _xmp(data: bytes) -> Dict:
+    """Campos do pacote XMP (Dublin Core e xmp:CreateDate)"""
+    match = _XMP_RE.search(data)
+    if match is None:
+        return {}
+    try:
+        root = ElementTree.fromstring(match.group(0))
+    except ElementTree.ParseError:
+        return {}
+
+    def items(tag: str):
+        element = root.find(f'.//{_DC_NS}{tag}')
+        if element is None:
+            return []
+        return [li.text or '' for li in element.iter(f'{_RDF_NS}li')]
+
+    date = None
+    for description in root.iter(f'{_RDF_NS}Description'):
+        date = (description.get(f'{_XMP_NS}CreateDate')
+                or description.findtext(f'{_XMP_NS}CreateDate'))
+        if date:
+            break
+    titles = items('title')
+    return _result(titles[0] if titles else None, items('creator'),
+                   date or next(iter(items('date')), None))
+
+
+def _pdf_metadata(path: Path) -> Dict:
+    """Metadados de um PDF: XMP, completado pelo dicionário Info"""
+    _, head, tail = _read_ends(path)
+    data = head + tail
+    if not head.startswith(b'%PDF'):
+        return {}
+    return {**_pdf_info(data), **_xmp(data)}
+
+
+def _zip_metadata(archive: zipfile.ZipFile, name: str, stop_tag: str) -> ElementTree.Element:
+    """
+    Lê um XML de um membro do ZIP até o fim do elemento stop_tag
+
+    Returns:
+        Elemento stop_tag (com seus filhos)
+    """
+    with archive.open(name) as member:
+        for _, element in ElementTree.iterparse(member, events=('end',)):
+            if element.tag == stop_tag:
+                return element
+    raise ValueError(f"Elemento {stop_tag} ausente em {name}")
+
+
+def _epub_metadata(path: Path) -> Dict:
+    """Metadados do pacote OPF de um EPUB"""
+    with zipfile.ZipFile(path) as archive:
+        container = _zip_metadata(archive, 'META-INF/container.xml', f'{_CONTAINER_NS}rootfiles')
+        rootfile = container.find(f'{_CONTAINER_NS}rootfile')
+        if rootfile is None or not rootfile.get('full-path'):
+            return {}
+        metadata = _zip_metadata(archive, rootfile.get('full-path'), f'{_OPF_NS}metadata')
+    return _result(metadata.findtext(f'{_DC_NS}title'),
+                   [creator.text or '' for creator in metadata.iter(f'{_DC_NS}creator')],
+                   metadata.findtext(f'{_DC_NS}date'))
+
+
+def _docx_metadata(path: Path) -> Dict:
+    """Metadados de docProps/core.xml de um DOCX"""
+    with zipfile.ZipFile(path) as archive:
+        if 'docProps/core.xml' not in archive.namelist():
+            return {}
+        with archive.open('docProps/core.xml') as member:
+            core = ElementTree.parse(member).getroot()
+    return _result(core.findtext(f'{_DC_NS}title'), [core.findtext(f'{_DC_NS}creator') or ''],
+                   core.findtext(f'{_DCTERMS_NS}created'))
+
+
+INFERRERS: Dict[str, Callable[[Path], Dict]] = {
+    '.pdf': _pdf_metadata,
+    '.epub': _epub_metadata,
+    '.docx': _docx_metadata,
+}
+
+
+def supports(path) -> bool:
+    """Indica se há leitura de metadados para o formato do arquivo"""
+    return Path(path).suffix.lower() in INFERRERS
+
+
+def infer_metadata(path) -> Dict:
+    """
+    Lê os metadados embutidos em um documento
+
+    Arquivos corrompidos ou sem metadados resultam em um dicionário vazio.
+
+    Args:
+        path: Caminho do documento (.pdf, .epub ou .docx)
+
+    Returns:
+        Dicionário com as chaves encontradas entre 'title', 'author' (vários
+        autores separados por '; ') e 'year'
+    """
+    path = Path(path)
+    inferrer = INFERRERS.get(path.suffix.lower())
+    if inferrer is None:
+        raise ValueError(f"Formato {path.suffix.lower()} sem leitura de metadados")
+    try:
+        return inferrer(path)
+    except EXTRACTION_ERRORS:
+        return {}
+
+
+def infer_worker(path: str) -> Tuple[Dict, float]:
+    """Lê os metadados de um documento em um processo do pool; devolve também a duração"""
+    start = time.perf_counter()
+    metadata = infer_metadata(path)
+    return metadata, time.perf_counter() - start
+
+
+class InferenceCache:
+    """
+    Cache dos metadados inferidos, indexado por content_key
+
+    Um mesmo conteúdo importado de novo (cópias, reimportações) não é lido
+    outra vez. Persistido em JSON; ao ultrapassar MAX_ENTRIES, as entradas
+    mais antigas são descartadas. Seguro para uso por várias threads.
+    """
+
+    MAX_ENTRIES = 100_000
+
+    def __init__(self, cache_file: Path):
+        """
+        Inicializa o cache (o arquivo só é lido no primeiro uso)
+
+        Args:
+            cache_file: Arquivo JSON do cache
+        """
+        self.cache_file = Path(cache_file)
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._entries = data['entries'] if data.get('version') == 1 else {}
+            except (OSError, ValueError, KeyError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Metadados guardados para a chave, ou None"""
+        with self._lock:
+            metadata = self._load().get(key)
+            if metadata is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return metadata
+
+    def put(self, key: str, metadata: Dict):
+        """Guarda os metadados inferidos de um conteúdo"""
+        with self._lock:
+            entries = self._load()
+            entries.pop(key, None)
+            entries[key] = metadata
+            while len(entries) > self.MAX_ENTRIES:
+                del entries[next(iter(entries))]
+            self._dirty = True
+
+    def save(self):
+        """Persiste o cache, se alterado"""
+        with self._lock:
+            if not self._dirty:
+                return
+            # Temporário por processo: no modo compartilhado outros processos
+            # também gravam o cache (o último a gravar prevalece)
+            tmp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': self._entries}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
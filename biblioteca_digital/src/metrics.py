@@ -0,0 +1,427 @@
+"""
+Métricas e rastreamento das operações do DocumentManager
+
+Cada método público do DocumentManager é executado dentro de um span: a
+duração alimenta um histograma por operação e as funções de rastreamento
+registradas são chamadas no início e no fim de cada span. Também são
+contados os bytes copiados, a duração e o tamanho das gravações de
+metadados e as chamadas ao sistema de arquivos feitas durante cada
+operação, obtidas pelos eventos de auditoria do Python (sys.addaudithook).
+Os eventos de auditoria não incluem stat, então consultas de existência e
+tamanho não entram na contagem.
+
+Os dados podem ser exportados em JSON ou no formato de texto do Prometheus.
+"""
+
+import sys
+import json
+import time
+import inspect
+import threading
+import functools
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Limites superiores (segundos) dos intervalos dos histogramas de duração
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Eventos de auditoria contados como chamadas ao sistema de arquivos
+FILESYSTEM_EVENT_PREFIXES = ('os.', 'shutil.', 'fcntl.', 'mmap.', 'sqlite3.connect')
+
+# Pilha de spans ativos na thread atual, compartilhada por todas as métricas
+_context = threading.local()
+_audit_hook_installed = False
+_audit_hook_lock = threading.Lock()
+
+
+def _active_spans() -> List['Span']:
+    spans = getattr(_context, 'spans', None)
+    if spans is None:
+        spans = _context.spans = []
+    return spans
+
+
+def _audit(event: str, args: Tuple):
+    """Conta eventos do sistema de arquivos na operação ativa da thread"""
+    spans = getattr(_context, 'spans', None)
+    if not spans:
+        return
+    if event == 'open' or event.startswith(FILESYSTEM_EVENT_PREFIXES):
+        span = spans[-1]
+        span.metrics.count_filesystem_call(span.root.name, event)
+
+
+def _install_audit_hook():
+    """Instala o gancho de auditoria uma única vez por processo"""
+    global _audit_hook_installed
+    with _audit_hook_lock:
+        if not _audit_hook_installed:
+            sys.addaudithook(_audit)
+            _audit_hook_installed = True
+
+
+class Histogram:
+    """Histograma de durações com intervalos fixos"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        # Um contador por intervalo, mais o intervalo acima do último limite
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        """Registra uma observação"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estima um quantil pelo limite superior do intervalo que o contém
+
+        Returns:
+            Valor estimado (limitado à maior observação); 0.0 sem observações
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Pares (limite, observações até o limite), terminando em infinito"""
+        pairs = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            cumulative += count
+            pairs.append((bound, cumulative))
+        return pairs
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Resumo do histograma (durações em segundos)"""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'buckets': {('+Inf' if bound == float('inf') else repr(bound)): count
+                        for bound, count in self.cumulative()},
+        }
+
+
+class Span:
+    """Execução de uma operação, entregue às funções de rastreamento"""
+
+    __slots__ = ('metrics', 'name', 'attributes', 'parent', 'root', 'start_time',
+                 'duration', 'error')
+
+    def __init__(self, metrics: 'OperationMetrics', name: str, attributes: Dict[str, Any],
+                 parent: Optional['Span']):
+        self.metrics = metrics
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.root = parent.root if parent is not None else self
+        # Início em segundos desde a época, para correlacionar com outros sistemas
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+
+class OperationMetrics:
+    """
+    Contadores, histogramas e ganchos de rastreamento das operações
+
+    Seguro para uso por várias threads. Uma mesma instância pode ser
+    compartilhada por vários gerenciadores para agregar as métricas.
+    """
+
+    def __init__(self):
+        """Inicializa métricas vazias"""
+        _install_audit_hook()
+        self._lock = threading.Lock()
+        self._hooks: List[Callable[[str, Span], None]] = []
+        self.reset()
+
+    def reset(self):
+        """Zera todos os contadores (os ganchos continuam registrados)"""
+        with self._lock:
+            self._durations: Dict[str, Histogram] = {}
+            self._errors: Dict[str, int] = {}
+            self._filesystem_calls: Dict[str, Dict[str, int]] = {}
+            self.bytes_copied = 0
+            self._metadata_saves = Histogram()
+            self.metadata_snapshots = 0
+            self.metadata_size_bytes = 0
+
+    def add_hook(self, hook: Callable[[str, Span], None]):
+        """
+        Registra uma função de rastreamento
+
+        A função recebe o evento ('start' ou 'end') e o Span. No fim, o span
+        tem a duração em segundos e a exceção, se a operação falhou. Exceções
+        da função são propagadas para quem chamou a operação.
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: Callable[[str, Span], None]):
+        """Remove uma função de rastreamento registrada"""
+        with self._lock:
+            self._hooks = [registered for registered in self._hooks if registered is not hook]
+
+    def _emit(self, event: str, span: Span):
+        for hook in self._hooks:
+            hook(event, span)
+
+    def observe(self, name: str, duration: float, failed: bool = False):
+        """Registra a duração (segundos) de uma operação medida por fora de span()"""
+        with self._lock:
+            histogram = self._durations.get(name)
+            if histogram is None:
+                histogram = self._durations[name] = Histogram()
+            histogram.observe(duration)
+            if failed:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    @contextmanager
+    def span(self, name: str, record: bool = True, **attributes) -> Iterator[Span]:
+        """
+        Executa um trecho como um span
+
+        Args:
+            name: Nome da operação
+            record: Registra a duração no histograma da operação; com False
+                o span só é entregue às funções de rastreamento
+            **attributes: Atributos repassados às funções de rastreamento
+        """
+        spans = _active_spans()
+        span = Span(self, name, attributes, spans[-1] if spans else None)
+        self._emit('start', span)
+        spans.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = e
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            spans.pop()
+            if record:
+                self.observe(name, span.duration, span.error is not None)
+            self._emit('end', span)
+
+    def trace_iterator(self, name: str, iterator: Iterator) -> Iterator:
+        """
+        Acompanha um iterador como uma única operação
+
+        A duração é o tempo gasto gerando os itens, sem contar o tempo do
+        consumidor entre eles, e é registrada quando o iterador termina ou é
+        descartado.
+        """
+        spans = _active_spans()
+        span = Span(self, name, {}, spans[-1] if spans else None)
+        self._emit('start', span)
+        elapsed = 0.0
+        try:
+            while True:
+                spans = _active_spans()
+                spans.append(span)
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    elapsed += time.perf_counter() - start
+                    spans.pop()
+                yield item
+        except GeneratorExit:
+            raise
+        except BaseException as e:
+            span.error = e
+            raise
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            span.duration = elapsed
+            self.observe(name, elapsed, span.error is not None)
+            self._emit('end', span)
+
+    def bind(self, func: Callable) -> Callable:
+        """
+        Associa uma função à operação ativa, para executá-la em outra thread
+
+        As chamadas ao sistema de arquivos feitas pela função são contadas na
+        operação que a criou.
+        """
+        parents = list(_active_spans())
+
+        @functools.wraps(func)
+        def bound(*args, **kwargs):
+            spans = _active_spans()
+            saved = spans[:]
+            spans[:] = parents
+            try:
+                return func(*args, **kwargs)
+            finally:
+                spans[:] = saved
+
+        return bound
+
+    def count_filesystem_call(self, operation: str, call: str):
+        """Conta uma chamada ao sistema de arquivos feita por uma operação"""
+        with self._lock:
+            calls = self._filesystem_calls.setdefault(operation, {})
+            calls[call] = calls.get(call, 0) + 1
+
+    def add_bytes_copied(self, size: int):
+        """Acumula bytes copiados para a biblioteca"""
+        with self._lock:
+            self.bytes_copied += size
+
+    def record_metadata_save(self, duration: float, size_bytes: int, snapshot: bool):
+        """
+        Registra uma gravação de metadados
+
+        Args:
+            duration: Duração em segundos
+            size_bytes: Tamanho dos metadados persistidos após a gravação
+            snapshot: Se um snapshot completo foi gravado
+        """
+        with self._lock:
+            self._metadata_saves.observe(duration)
+            self.metadata_size_bytes = size_bytes
+            if snapshot:
+                self.metadata_snapshots += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Exporta as métricas
+
+        Returns:
+            Dicionário com 'operations' (por operação: 'calls', 'errors' e o
+            histograma de 'duration' em segundos), 'bytes_copied', 'metadata'
+            ('saves', 'snapshots', 'size_bytes' e 'save_duration') e
+            'filesystem_calls' (por operação e por chamada)
+        """
+        with self._lock:
+            operations = {}
+            for name in sorted(self._durations):
+                histogram = self._durations[name]
+                operations[name] = {
+                    'calls': histogram.count,
+                    'errors': self._errors.get(name, 0),
+                    'duration': histogram.as_dict(),
+                }
+            return {
+                'operations': operations,
+                'bytes_copied': self.bytes_copied,
+                'metadata': {
+                    'saves': self._metadata_saves.count,
+                    'snapshots': self.metadata_snapshots,
+                    'size_bytes': self.metadata_size_bytes,
+                    'save_duration': self._metadata_saves.as_dict(),
+                },
+                'filesystem_calls': {
+                    operation: dict(sorted(calls.items()))
+                    for operation, calls in sorted(self._filesystem_calls.items())
+                },
+            }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Exporta as métricas em JSON"""
+        return json.dumps(self.as_dict(), indent=indent, ensure_ascii=False)
+
+    def to_prometheus(self, prefix: str = 'biblioteca') -> str:
+        """
+        Exporta as métricas no formato de texto do Prometheus
+
+        Args:
+            prefix: Prefixo dos nomes das métricas
+        """
+        data = self.as_dict()
+        lines = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def histogram(name: str, summary: Dict, labels: str = ''):
+            separator = ',' if labels else ''
+            for bound, count in summary['buckets'].items():
+                lines.append(f'{prefix}_{name}_bucket{{{labels}{separator}le="{bound}"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ''
+            lines.append(f"{prefix}_{name}_sum{suffix} {summary['sum']!r}")
+            lines.append(f"{prefix}_{name}_count{suffix} {summary['count']}")
+
+        header('operation_duration_seconds', 'histogram',
+               "Duração das operações do DocumentManager")
+        for name, operation in data['operations'].items():
+            histogram('operation_duration_seconds', operation['duration'],
+                      f'operation="{_escape_label(name)}"')
+
+        header('operation_errors_total', 'counter', "Operações que terminaram com exceção")
+        for name, operation in data['operations'].items():
+            lines.append(f'{prefix}_operation_errors_total{{operation="{_escape_label(name)}"}} '
+                         f"{operation['errors']}")
+
+        header('bytes_copied_total', 'counter', "Bytes copiados para a biblioteca")
+        lines.append(f"{prefix}_bytes_copied_total {data['bytes_copied']}")
+
+        header('metadata_save_duration_seconds', 'histogram',
+               "Duração das gravações de metadados")
+        histogram('metadata_save_duration_seconds', data['metadata']['save_duration'])
+
+        header('metadata_snapshots_total', 'counter', "Snapshots completos de metadados gravados")
+        lines.append(f"{prefix}_metadata_snapshots_total {data['metadata']['snapshots']}")
+
+        header('metadata_size_bytes', 'gauge', "Tamanho dos metadados persistidos")
+        lines.append(f"{prefix}_metadata_size_bytes {data['metadata']['size_bytes']}")
+
+        header('filesystem_calls_total', 'counter',
+               "Chamadas ao sistema de arquivos por operação")
+        for operation, calls in data['filesystem_calls'].items():
+            for call, count in calls.items():
+                labels = f'operation="{_escape_label(operation)}",call="{_escape_label(call)}"'
+                lines.append(f'{prefix}_filesystem_calls_total{{{labels}}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    """Escapa o valor de um rótulo do Prometheus"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def instrumented(method: Callable) -> Callable:
+    """
+    Executa um método do DocumentManager como um span de self.metrics
+
+    Métodos geradores são acompanhados com trace_iterator.
+    """
+    name = method.__name__
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            return self.metrics.trace_iterator(name, method(self, *args, **kwargs))
+    else:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(name):
+                return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,314 @@
+"""
+Módulo de armazenamento compacto de registros
+Guarda os metadados em colunas (struct-of-arrays) em vez de um dicionário
+por documento
+"""
+
+import re
+import sys
+import base64
+from array import array
+from collections.abc import ItemsView, MutableMapping, ValuesView
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Marca de campo ausente no registro (diferente de um campo com valor None)
+_ABSENT = object()
+
+# Sentinelas das colunas numéricas: campo ausente e campo None
+_INT_ABSENT = -2 ** 31
+_INT_NONE = -2 ** 31 + 1
+_LONG_ABSENT = -2 ** 63
+_LONG_NONE = -2 ** 63 + 1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Forma que datetime.isoformat() produz para datas sem fuso horário (os
+# microssegundos só aparecem quando não são zero)
+_ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}'
+                       r'(\.(?!000000)[0-9]{6})?')
+
+
+def pack_array(values: array) -> str:
+    """
+    Conteúdo de um array como texto (base64, little-endian)
+
+    Permite guardar colunas e listas de posições em arquivos JSON sem criar
+    um objeto do Python por valor ao carregar.
+    """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode('ascii')
+
+
+def unpack_array(typecode: str, text: str) -> array:
+    """Array gravado por pack_array"""
+    values = array(typecode)
+    values.frombytes(base64.b64decode(text))
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class StringTable:
+    """
+    Tabela de textos repetidos, referenciados por código
+
+    Cada texto distinto é guardado uma única vez (internado); os registros
+    guardam apenas o código, em um array de inteiros. Os códigos 0 e 1 são
+    reservados para campo ausente e None.
+    """
+
+    def __init__(self):
+        """Inicializa a tabela com os códigos reservados"""
+        self.values: List[Any] = [_ABSENT, None]
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: Any) -> Optional[int]:
+        """Código de um valor (None se o valor não for texto)"""
+        if value is _ABSENT:
+            return 0
+        if value is None:
+            return 1
+        if type(value) is not str:
+            return None
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+
+def _encode_int(value: Any, absent: int, none: int, low: int, high: int) -> Optional[int]:
+    """Valor de uma coluna numérica (None se não couber nela)"""
+    if value is _ABSENT:
+        return absent
+    if value is None:
+        return none
+    if type(value) is not int or not low <= value <= high:
+        return None
+    return value
+
+
+def encode_date(value: Any) -> Optional[int]:
+    """
+    Data ISO como microssegundos desde 1970 (None se não for reproduzível)
+
+    Só são convertidas as datas que voltam exatamente ao mesmo texto; as
+    demais ficam como texto nos campos extras.
+    """
+    if value is _ABSENT:
+        return _LONG_ABSENT
+    if value is None:
+        return _LONG_NONE
+    if type(value) is not str or not _ISO_DATE.fullmatch(value):
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def decode_date(value: int) -> Any:
+    """Texto ISO de uma data guardada em microssegundos"""
+    if value == _LONG_ABSENT:
+        return _ABSENT
+    if value == _LONG_NONE:
+        return None
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def _decode_int(value: int, absent: int, none: int) -> Any:
+    """Valor de uma coluna numérica, com as sentinelas convertidas"""
+    if value == absent:
+        return _ABSENT
+    if value == none:
+        return None
+    return value
+
+
+class CompactRecordStore(MutableMapping):
+    """
+    Registros de metadados em colunas, com interface de dicionário
+
+    Cada documento ocupa uma posição nas colunas: tipo e autor são códigos
+    de tabelas de textos internados; ano e tamanho ficam em arrays de
+    inteiros; a data de adição em microssegundos; o título como texto.
+    Campos fora dessas colunas (como 'sha256') e valores que não cabem nelas
+    ficam em um dicionário de extras apenas para os documentos que os têm.
+
+    A leitura de um registro monta um dicionário novo: alterações devem ser
+    feitas reatribuindo o registro, como já exigem os armazenamentos. A
+    ordem de iteração é a de um dicionário (a de inclusão, mantida quando um
+    registro é substituído); posições vagas são eliminadas quando passam de
+    metade do total.
+    """
+
+    FIELDS = ('type', 'year', 'author', 'title', 'added_date', 'file_size')
+    _FIELD_SET = frozenset(FIELDS)
+    # Campos das colunas codificadas, na ordem de _encode, e o código de
+    # campo ausente de cada uma
+    _CODED = (('type', 0), ('author', 0), ('year', _INT_ABSENT),
+              ('file_size', _LONG_ABSENT), ('added_date', _LONG_ABSENT))
+
+    def __init__(self, items: Iterable[Tuple[str, Dict]] = ()):
+        """
+        Inicializa o armazenamento
+
+        Args:
+            items: Pares (chave, registro) iniciais
+        """
+        self._reset()
+        for key, record in items:
+            self[key] = record
+
+    def _reset(self):
+        """Esvazia as colunas"""
+        self._slots: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._types = StringTable()
+        self._authors = StringTable()
+        self._type_codes = array('H')
+        self._author_codes = array('I')
+        self._years = array('i')
+        self._sizes = array('q')
+        self._dates = array('q')
+        self._titles: List[Any] = []
+        self._extras: Dict[int, Dict] = {}
+
+    def _encode(self, record: Dict) -> Tuple[Tuple, Optional[Dict]]:
+        """Valores das colunas de um registro e os seus campos extras"""
+        get = record.get
+        values = [
+            self._types.encode(get('type', _ABSENT)),
+            self._authors.encode(get('author', _ABSENT)),
+            _encode_int(get('year', _ABSENT), _INT_ABSENT, _INT_NONE,
+                        _INT_NONE + 1, 2 ** 31 - 1),
+            _encode_int(get('file_size', _ABSENT), _LONG_ABSENT,
+                        _LONG_NONE, _LONG_NONE + 1, 2 ** 63 - 1),
+            encode_date(get('added_date', _ABSENT)),
+            get('title', _ABSENT),
+        ]
+        extras = None
+        if not record.keys() <= self._FIELD_SET:
+            extras = {key: value for key, value in record.items() if key not in self.FIELDS}
+        if None in values[:5]:
+            # Valores que a coluna não representa vão para os extras
+            extras = extras or {}
+            for i, (field, absent) in enumerate(self._CODED):
+                if values[i] is None:
+                    extras[field] = record[field]
+                    values[i] = absent
+        return values, extras
+
+    def _write(self, slot: int, values: Tuple, extras: Optional[Dict]):
+        """Grava os valores de um registro em uma posição existente"""
+        (self._type_codes[slot], self._author_codes[slot], self._years[slot],
+         self._sizes[slot], self._dates[slot], self._titles[slot]) = values
+        if extras:
+            self._extras[slot] = extras
+        else:
+            self._extras.pop(slot, None)
+
+    def __setitem__(self, key: str, record: Dict):
+        values, extras = self._encode(record)
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._write(slot, values, extras)
+            return
+
+        # Chaves internadas: os índices derivados compartilham os mesmos textos
+        key = sys.intern(key)
+        slot = self._slots[key] = len(self._keys)
+        self._keys.append(key)
+        type_code, author_code, year, size, added_date, title = values
+        self._type_codes.append(type_code)
+        self._author_codes.append(author_code)
+        self._years.append(year)
+        self._sizes.append(size)
+        self._dates.append(added_date)
+        self._titles.append(title)
+        if extras:
+            self._extras[slot] = extras
+
+    def _record(self, slot: int) -> Dict:
+        """Monta o dicionário do registro de uma posição"""
+        fields = (
+            ('type', self._types.values[self._type_codes[slot]]),
+            ('year', _decode_int(self._years[slot], _INT_ABSENT, _INT_NONE)),
+            ('author', self._authors.values[self._author_codes[slot]]),
+            ('title', self._titles[slot]),
+            ('added_date', decode_date(self._dates[slot])),
+            ('file_size', _decode_int(self._sizes[slot], _LONG_ABSENT, _LONG_NONE)),
+        )
+        record = {field: value for field, value in fields if value is not _ABSENT}
+        extras = self._extras.get(slot)
+        if extras:
+            record.update(extras)
+        return record
+
+    def __getitem__(self, key: str) -> Dict:
+        return self._record(self._slots[key])
+
+    def __delitem__(self, key: str):
+        slot = self._slots.pop(key)
+        self._keys[slot] = None
+        self._titles[slot] = _ABSENT
+        self._extras.pop(slot, None)
+
+        vacant = len(self._keys) - len(self._slots)
+        if vacant > 1024 and vacant * 2 > len(self._keys):
+            self._compact()
+
+    def _compact(self):
+        """Renumera as posições e refaz as tabelas, eliminando as vagas"""
+        items = list(self.iter_items())
+        self._reset()
+        for key, record in items:
+            self[key] = record
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self._keys:
+            if key is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key) -> bool:
+        return key in self._slots
+
+    def iter_items(self) -> Iterator[Tuple[str, Dict]]:
+        """Pares (chave, registro) na ordem de inclusão, sem buscar cada chave"""
+        for slot, key in enumerate(self._keys):
+            if key is not None:
+                yield key, self._record(slot)
+
+    def items(self) -> ItemsView:
+        return _ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return _ValuesView(self)
+
+    def clear(self):
+        self._reset()
+
+
+class _ItemsView(ItemsView):
+    """Visão dos pares, percorrida diretamente pelas colunas"""
+
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _ValuesView(ValuesView):
+    """Visão dos registros, percorrida diretamente pelas colunas"""
+
+    def __iter__(self):
+        return (record for _, record in self._mapping.iter_items())
@@ -0,0 +1,524 @@
+"""
+Módulo de índices de busca
+Mantém um índice invertido de termos sobre nome do arquivo, título e autor
+"""
+
+import os
+import re
+import sys
+import json
+import heapq
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from record_store import pack_array, unpack_array
+
+# Termos são sequências alfanuméricas; '_' e '-' separam palavras nos nomes
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Divide um texto em termos normalizados (minúsculos)
+
+    Args:
+        text: Texto de origem
+
+    Returns:
+        Lista de termos na ordem em que aparecem
+    """
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def fold(text: str) -> str:
+    """
+    Remove acentos e normaliza maiúsculas ('João' -> 'joao')
+
+    Args:
+        text: Texto de origem
+
+    Returns:
+        Texto sem marcas diacríticas, em minúsculas
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def trigrams(term: str) -> Set[str]:
+    """
+    Trigramas de um termo, com duas posições de preenchimento no início e
+    uma no fim, de modo que o começo da palavra pese mais
+
+    Args:
+        term: Termo já normalizado
+
+    Returns:
+        Conjunto de trigramas
+    """
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class InvertedIndex:
+    """
+    Índice invertido de termos para a busca de documentos
+
+    Cada documento ocupa uma posição (um número) e cada termo aponta para o
+    array ordenado das posições dos documentos que o contêm no nome do
+    arquivo, no título ou no autor; além do caminho, nada é guardado por
+    documento. Os termos de um documento são extraídos novamente do registro
+    ao removê-lo. Os termos também são mantidos em uma lista ordenada para
+    responder buscas por prefixo com busca binária, de modo que o custo de
+    uma consulta depende do número de termos e documentos correspondentes, e
+    não do tamanho da biblioteca.
+
+    Os arrays são persistidos como estão (em base64), e carregar o índice
+    não percorre os documentos. Para a busca aproximada (rank), o
+    vocabulário, sem acentos, também é indexado por trigramas; esse índice
+    é derivado dos termos e montado na primeira busca aproximada.
+
+    As posições seguem a ordem de inclusão e não são reaproveitadas; quando
+    metade delas fica vaga, o índice é compactado.
+    """
+
+    FORMAT_VERSION = 2
+
+    # Similaridade mínima (coeficiente de Dice entre trigramas) para que um
+    # termo do vocabulário seja aceito como variação de um termo da consulta
+    MIN_SIMILARITY = 0.4
+    # Variações aproximadas consideradas para cada termo da consulta
+    MAX_EXPANSIONS = 16
+
+    def __init__(self):
+        """Inicializa um índice vazio"""
+        self._ids: Dict[str, int] = {}
+        self._keys: List[Optional[str]] = []
+        self._postings: Dict[str, array] = {}
+        self._terms: List[str] = []
+        self._clear_vocabulary()
+
+    def _clear_vocabulary(self):
+        """Esvazia o índice de trigramas do vocabulário (refeito sob demanda)"""
+        # Termos sem acento -> termos originais ('joao' -> {'joão', 'joao'})
+        self._folded: Dict[str, Set[str]] = {}
+        self._folded_terms: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        self._has_vocabulary = False
+
+    def _add_vocabulary_term(self, term: str, sort: bool = True):
+        """Inclui um termo novo no índice de trigramas"""
+        folded = fold(term)
+        originals = self._folded.get(folded)
+        if originals is None:
+            originals = self._folded[folded] = set()
+            if sort:
+                insort(self._folded_terms, folded)
+            grams = trigrams(folded)
+            self._gram_counts[folded] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(folded)
+        originals.add(term)
+
+    def _remove_vocabulary_term(self, term: str):
+        """Retira do índice de trigramas um termo que deixou de existir"""
+        folded = fold(term)
+        originals = self._folded[folded]
+        originals.discard(term)
+        if originals:
+            return
+        del self._folded[folded]
+        del self._folded_terms[bisect_left(self._folded_terms, folded)]
+        del self._gram_counts[folded]
+        for gram in trigrams(folded):
+            terms = self._trigrams[gram]
+            terms.discard(folded)
+            if not terms:
+                del self._trigrams[gram]
+
+    def _ensure_vocabulary(self):
+        """Monta o índice de trigramas a partir dos termos, se necessário"""
+        if self._has_vocabulary:
+            return
+        for term in self._postings:
+            self._add_vocabulary_term(term, sort=False)
+        self._folded_terms = sorted(self._folded)
+        self._has_vocabulary = True
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _document_terms(self, key: str, record: Dict) -> Set[str]:
+        """Extrai os termos indexados de um documento"""
+        terms = set(tokenize(os.path.basename(key)))
+        terms.update(tokenize(record.get('title') or ''))
+        terms.update(tokenize(record.get('author') or ''))
+        return terms
+
+    def add(self, key: str, record: Dict):
+        """
+        Indexa (ou reindexa) um documento
+
+        Args:
+            key: Caminho relativo do documento
+            record: Registro de metadados do documento
+        """
+        if key in self._ids:
+            self.remove(key)
+
+        # Posições crescentes: acrescentar mantém os arrays ordenados
+        doc = self._ids[key] = len(self._keys)
+        self._keys.append(key)
+        for term in self._document_terms(key, record):
+            docs = self._postings.get(term)
+            if docs is None:
+                docs = self._postings[term] = array('I')
+                insort(self._terms, term)
+                if self._has_vocabulary:
+                    self._add_vocabulary_term(term)
+            docs.append(doc)
+
+    def remove(self, key: str, record: Dict = None):
+        """
+        Remove um documento do índice
+
+        Args:
+            key: Caminho relativo do documento
+            record: Registro com que o documento foi indexado, de onde saem os
+                termos a atualizar (sem ele, todos os termos são conferidos)
+        """
+        doc = self._ids.pop(key, None)
+        if doc is None:
+            return
+        self._keys[doc] = None
+
+        terms = self._document_terms(key, record) if record is not None else list(self._terms)
+        for term in terms:
+            docs = self._postings.get(term)
+            if docs is None:
+                continue
+            i = bisect_left(docs, doc)
+            if i == len(docs) or docs[i] != doc:
+                continue
+            del docs[i]
+            if not docs:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+                if self._has_vocabulary:
+                    self._remove_vocabulary_term(term)
+
+        vacant = len(self._keys) - len(self._ids)
+        if vacant > 1024 and vacant * 2 > len(self._keys):
+            self._compact()
+
+    def _compact(self):
+        """Renumera as posições, eliminando as vagas"""
+        renumbered = array('I', bytes(4 * len(self._keys)))
+        keys = []
+        for doc, key in enumerate(self._keys):
+            if key is not None:
+                renumbered[doc] = len(keys)
+                keys.append(key)
+        self._keys = keys
+        self._ids = {key: doc for doc, key in enumerate(keys)}
+        self._postings = {term: array('I', [renumbered[doc] for doc in docs])
+                          for term, docs in self._postings.items()}
+
+    def rebuild(self, items: Iterable[Tuple[str, Dict]]):
+        """
+        Reconstrói o índice a partir de todos os documentos
+
+        Args:
+            items: Pares (caminho relativo, registro)
+        """
+        self._ids = {}
+        self._keys = []
+        self._postings = {}
+        for key, record in items:
+            doc = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            for term in self._document_terms(key, record):
+                docs = self._postings.get(term)
+                if docs is None:
+                    docs = self._postings[term] = array('I')
+                docs.append(doc)
+        self._terms = sorted(self._postings)
+        self._clear_vocabulary()
+
+    def _similar_terms(self, query_term: str) -> List[Tuple[str, float]]:
+        """
+        Termos do vocabulário parecidos com um termo da consulta
+
+        Termos que começam pelo termo da consulta (sem acentos) têm
+        similaridade 1.0; os demais são comparados pelos trigramas em comum,
+        contados apenas para os termos que compartilham algum trigrama.
+
+        Args:
+            query_term: Termo da consulta, já sem acentos
+
+        Returns:
+            Pares (termo original, similaridade), da maior para a menor
+        """
+        matches: Dict[str, float] = {}
+        i = bisect_left(self._folded_terms, query_term)
+        while i < len(self._folded_terms) and self._folded_terms[i].startswith(query_term):
+            for term in self._folded[self._folded_terms[i]]:
+                matches[term] = 1.0
+            i += 1
+
+        grams = trigrams(query_term)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+
+        # Dice >= t exige ao menos t * n / (2 - t) trigramas em comum (n =
+        # trigramas da consulta); os demais termos são descartados sem cálculo
+        n = len(grams)
+        threshold = self.MIN_SIMILARITY
+        min_shared = threshold * n / (2 - threshold)
+        gram_counts = self._gram_counts
+        scored = [(2 * count / (n + gram_counts[folded]), folded)
+                  for folded, count in shared.items() if count >= min_shared]
+        scored = [item for item in scored if item[0] >= threshold]
+        for similarity, folded in heapq.nlargest(self.MAX_EXPANSIONS, scored):
+            for term in self._folded[folded]:
+                matches.setdefault(term, similarity)
+
+        return sorted(matches.items(), key=lambda item: -item[1])
+
+    def rank(self, query: str, limit: Optional[int] = 20,
+             exclude: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Busca tolerante a erros de digitação e acentos, classificada
+
+        Cada termo da consulta é comparado ao vocabulário (prefixos e
+        trigramas, sem acentos) e todos os termos precisam ter alguma
+        correspondência no documento. A pontuação é a média, entre os termos
+        da consulta, da melhor similaridade encontrada no documento.
+
+        Com limite, as combinações de variações são visitadas da maior para
+        a menor pontuação possível, intersectando os conjuntos de documentos
+        de cada uma, até reunir os 'limit' melhores: documentos que só
+        correspondem a variações fracas de termos frequentes nem chegam a ser
+        examinados.
+
+        Args:
+            query: Termos de busca ('Jao Slva' encontra 'João Silva')
+            limit: Número máximo de resultados (None devolve todos)
+            exclude: Documentos a desconsiderar
+
+        Returns:
+            Lista de pares (caminho relativo, pontuação entre 0 e 1), da maior
+            pontuação para a menor
+        """
+        query_terms = list(dict.fromkeys(tokenize(fold(query))))
+        if not query_terms:
+            return []
+        self._ensure_vocabulary()
+
+        # Para cada termo da consulta, variações agrupadas por similaridade
+        levels = []
+        for query_term in query_terms:
+            similar = self._similar_terms(query_term)
+            if not similar:
+                return []
+            groups: List[Tuple[float, List[str]]] = []
+            for term, similarity in similar:
+                if groups and groups[-1][0] == similarity:
+                    groups[-1][1].append(term)
+                else:
+                    groups.append((similarity, [term]))
+            levels.append(groups)
+
+        exclude = {self._ids[key] for key in exclude or () if key in self._ids}
+        if limit is not None:
+            ranked = self._rank_best_first(levels, limit, exclude)
+            if ranked is not None:
+                return ranked
+        return self._rank_all(levels, limit, exclude)
+
+    def score(self, query: str, key: str, record: Dict) -> float:
+        """
+        Pontua um documento avulso (fora do índice) com a semântica de rank
+
+        Serve para arquivos que ainda não têm metadados.
+
+        Args:
+            query: Termos de busca
+            key: Caminho relativo do documento
+            record: Campos do documento ('title' e 'author')
+
+        Returns:
+            Pontuação entre 0 e 1; 0 se algum termo da consulta não tiver
+            correspondência no documento
+        """
+        query_terms = list(dict.fromkeys(tokenize(fold(query))))
+        if not query_terms:
+            return 0.0
+        terms = {fold(term): trigrams(fold(term)) for term in self._document_terms(key, record)}
+
+        total = 0.0
+        for query_term in query_terms:
+            grams = trigrams(query_term)
+            best = 0.0
+            for term, term_grams in terms.items():
+                if term.startswith(query_term):
+                    best = 1.0
+                    break
+                similarity = 2 * len(grams & term_grams) / (len(grams) + len(term_grams))
+                if similarity >= self.MIN_SIMILARITY:
+                    best = max(best, similarity)
+            if not best:
+                return 0.0
+            total += best
+        return total / len(query_terms)
+
+    # Combinações examinadas pela busca do melhor primeiro antes de recorrer
+    # à pontuação de todos os candidatos
+    MAX_COMBINATIONS = 2048
+
+    def _level_docs(self, cache: Dict, levels: List, i: int, j: int) -> Set[int]:
+        """Posições dos documentos com alguma variação do grupo j do termo i"""
+        docs = cache.get((i, j))
+        if docs is None:
+            docs = set().union(*(self._postings[term] for term in levels[i][j][1]))
+            cache[(i, j)] = docs
+        return docs
+
+    def _rank_best_first(self, levels: List, limit: int,
+                         exclude: Set[int]) -> Optional[List[Tuple[str, float]]]:
+        """
+        Seleciona os melhores documentos visitando as combinações de grupos
+        de variações em ordem decrescente de pontuação
+
+        Um documento é encontrado primeiro na combinação das suas melhores
+        variações, então a pontuação dessa combinação é a dele.
+
+        Returns:
+            Lista classificada, ou None se o limite de combinações for atingido
+        """
+        count = len(levels)
+
+        def combination_score(combination):
+            return sum(levels[i][j][0] for i, j in enumerate(combination)) / count
+
+        start = (0,) * count
+        heap = [(-combination_score(start), start)]
+        seen = {start}
+        found: Set[int] = set()
+        results: List[Tuple[float, int]] = []
+        cache: Dict = {}
+        visited = 0
+
+        while heap:
+            negative, combination = heapq.heappop(heap)
+            if len(results) >= limit and -negative < results[limit - 1][0]:
+                break
+            visited += 1
+            if visited > self.MAX_COMBINATIONS:
+                return None
+
+            sets = sorted((self._level_docs(cache, levels, i, j)
+                           for i, j in enumerate(combination)), key=len)
+            docs = sets[0]
+            for other in sets[1:]:
+                docs = docs & other
+                if not docs:
+                    break
+            new_docs = docs - found - exclude if docs else ()
+            if new_docs:
+                found.update(new_docs)
+                results.extend((-negative, doc) for doc in new_docs)
+
+            for i in range(count):
+                if combination[i] + 1 < len(levels[i]):
+                    successor = combination[:i] + (combination[i] + 1,) + combination[i + 1:]
+                    if successor not in seen:
+                        seen.add(successor)
+                        heapq.heappush(heap, (-combination_score(successor), successor))
+
+        keys = self._keys
+        ranked = sorted((-score, keys[doc]) for score, doc in results)[:limit]
+        return [(key, -negative) for negative, key in ranked]
+
+    def _rank_all(self, levels: List, limit: Optional[int],
+                  exclude: Set[int]) -> List[Tuple[str, float]]:
+        """Pontua todos os documentos candidatos e seleciona os melhores"""
+        best_by_term = []
+        for groups in levels:
+            best: Dict[int, float] = {}
+            # Da menor para a maior similaridade: a maior prevalece
+            for similarity, terms in reversed(groups):
+                for term in terms:
+                    best.update(dict.fromkeys(self._postings[term], similarity))
+            best_by_term.append(best)
+
+        # Documentos com alguma correspondência para todos os termos
+        best_by_term.sort(key=len)
+        candidates = best_by_term[0].keys()
+        for best in best_by_term[1:]:
+            candidates = candidates & best.keys()
+            if not candidates:
+                return []
+        candidates = candidates - exclude
+
+        count = len(best_by_term)
+        keys = self._keys
+        scored = ((-sum(best[doc] for best in best_by_term) / count, keys[doc])
+                  for doc in candidates)
+        ranked = sorted(scored) if limit is None else heapq.nsmallest(limit, scored)
+        return [(key, -negative) for negative, key in ranked]
+
+    def save(self, index_file: Path, fingerprint: str):
+        """
+        Persiste o índice em disco
+
+        Grava os caminhos na ordem das posições (posições vagas como null) e
+        o array de posições de cada termo.
+
+        Args:
+            index_file: Caminho do arquivo do índice
+            fingerprint: Identificação do estado dos metadados indexados
+        """
+        index_file = Path(index_file)
+        tmp_file = index_file.with_name(index_file.name + '.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.FORMAT_VERSION,
+                'fingerprint': fingerprint,
+                'keys': self._keys,
+                'postings': {term: pack_array(docs) for term, docs in self._postings.items()}
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, index_file)
+
+    def load(self, index_file: Path, fingerprint: str) -> bool:
+        """
+        Carrega o índice persistido, se corresponder aos metadados atuais
+
+        Args:
+            index_file: Caminho do arquivo do índice
+            fingerprint: Identificação do estado atual dos metadados
+
+        Returns:
+            True se o índice foi carregado, False se precisa ser reconstruído
+        """
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+
+        if data.get('version') != self.FORMAT_VERSION or data.get('fingerprint') != fingerprint:
+            return False
+
+        # Caminhos internados, como no armazenamento de metadados
+        self._keys = [key if key is None else sys.intern(key) for key in data['keys']]
+        self._ids = {key: doc for doc, key in enumerate(self._keys) if key is not None}
+        self._postings = {term: unpack_array('I', docs) for term, docs in data['postings'].items()}
+        self._terms = sorted(self._postings)
+        self._clear_vocabulary()
+        return True
@@ -0,0 +1,266 @@
+"""
+Módulo de extração de texto
+Lê o conteúdo textual dos documentos em blocos, sem carregar o arquivo inteiro
+"""
+
+import re
+import zlib
+import zipfile
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+from xml.etree import ElementTree
+
+CHUNK_SIZE = 1024 * 1024
+
+# Falhas de leitura de um documento (corrompido, cifrado ou com compactação
+# não suportada): tratadas como falha daquele documento, e não da operação
+EXTRACTION_ERRORS = (OSError, ValueError, KeyError, RuntimeError, NotImplementedError,
+                     EOFError, zipfile.BadZipFile, zlib.error, ElementTree.ParseError)
+
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def _txt_chunks(path: Path, chunk_size: int) -> Iterator[str]:
+    """Lê um arquivo de texto em blocos"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def _docx_chunks(path: Path, chunk_size: int) -> Iterator[str]:
+    """Lê o texto de word/document.xml com um parser incremental"""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open('word/document.xml') as document:
+            parts: List[str] = []
+            size = 0
+            for event, element in ElementTree.iterparse(document, events=('end',)):
+                if element.tag == _WORD_NS + 't' and element.text:
+                    parts.append(element.text)
+                    size += len(element.text)
+                elif element.tag == _WORD_NS + 'p':
+                    parts.append('\n')
+                    # Libera os parágrafos já processados
+                    element.clear()
+                if size >= chunk_size:
+                    yield ''.join(parts)
+                    parts = []
+                    size = 0
+            if parts:
+                yield ''.join(parts)
+
+
+class _HTMLTextParser(HTMLParser):
+    """Acumula o texto visível de um documento (X)HTML"""
+
+    SKIPPED_TAGS = {'script', 'style', 'head'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in ('p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def take(self) -> str:
+        """Devolve e descarta o texto acumulado"""
+        text = ''.join(self.parts)
+        self.parts = []
+        return text
+
+
+def _epub_chunks(path: Path, chunk_size: int) -> Iterator[str]:
+    """Lê o texto dos capítulos (X)HTML de um EPUB"""
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if not name.lower().endswith(('.xhtml', '.html', '.htm')):
+                continue
+            parser = _HTMLTextParser()
+            with archive.open(name) as chapter:
+                while True:
+                    data = chapter.read(chunk_size)
+                    if not data:
+                        break
+                    parser.feed(data.decode('utf-8', errors='replace'))
+                    text = parser.take()
+                    if text:
+                        yield text
+            parser.close()
+            text = parser.take()
+            if text:
+                yield text
+
+
+_PDF_TEXT_BLOCK_RE = re.compile(rb'\bBT\b(.*?)\bET\b', re.DOTALL)
+_PDF_STRING_RE = re.compile(rb'\((?:\\.|[^\\()])*\)', re.DOTALL)
+_PDF_ESCAPE_RE = re.compile(rb'\\([0-7]{1,3}|.)', re.DOTALL)
+_PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+_PDF_STREAM_RE = re.compile(rb'stream\r?\n')
+
+
+def _pdf_unescape(match: 're.Match') -> bytes:
+    """Converte uma sequência de escape de string literal do PDF"""
+    value = match.group(1)
+    if value[:1].isdigit():
+        return bytes([int(value, 8) & 0xFF])
+    if value in (b'\n', b'\r'):
+        return b''
+    return _PDF_ESCAPES.get(value, value)
+
+
+def unescape_pdf_string(literal: bytes) -> bytes:
+    """Bytes de uma string literal do PDF (sem os parênteses externos)"""
+    return _PDF_ESCAPE_RE.sub(_pdf_unescape, literal)
+
+
+class _PdfContentParser:
+    """
+    Extrai as strings literais de blocos de texto (BT ... ET) de um fluxo
+    de conteúdo PDF já decodificado, recebido em partes
+    """
+
+    MAX_PENDING = 4 * 1024 * 1024
+
+    def __init__(self):
+        self.buffer = b''
+
+    def _strings(self, block: bytes) -> str:
+        parts = []
+        for literal in _PDF_STRING_RE.findall(block):
+            parts.append(unescape_pdf_string(literal[1:-1]).decode('latin-1'))
+        return ' '.join(parts)
+
+    def feed(self, data: bytes) -> str:
+        """Processa mais bytes e devolve o texto dos blocos completos"""
+        self.buffer += data
+        texts = []
+        end = 0
+        for match in _PDF_TEXT_BLOCK_RE.finditer(self.buffer):
+            texts.append(self._strings(match.group(1)))
+            end = match.end()
+
+        pending = self.buffer[end:]
+        start = pending.rfind(b'BT')
+        if start == -1 or len(pending) - start > self.MAX_PENDING:
+            # Sem bloco aberto (ou bloco grande demais): guarda apenas o
+            # suficiente para reconhecer um operador dividido entre partes
+            pending = pending[-1:]
+        else:
+            pending = pending[start:]
+        self.buffer = pending
+        return '\n'.join(t for t in texts if t)
+
+
+def _pdf_chunks(path: Path, chunk_size: int) -> Iterator[str]:
+    """
+    Leitor básico de PDF: percorre os fluxos (stream ... endstream),
+    descomprime os que usam FlateDecode e extrai as strings de texto
+
+    Fontes com codificações próprias (CID, subconjuntos) não são
+    decodificadas; nesses casos o texto extraído pode ficar incompleto.
+    """
+    lookback = 1024
+    buffer = b''
+    in_stream = False
+    decompressor = None
+    parser = None
+
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(chunk_size)
+            if data:
+                buffer += data
+            elif not buffer:
+                break
+
+            while True:
+                if not in_stream:
+                    match = _PDF_STREAM_RE.search(buffer)
+                    if match is None or buffer[max(0, match.start() - 3):match.start()] == b'end':
+                        if match is not None:
+                            buffer = buffer[match.end():]
+                            continue
+                        buffer = buffer[-lookback:]
+                        break
+                    dictionary = buffer[max(0, match.start() - lookback):match.start()]
+                    dictionary = dictionary[dictionary.rfind(b'<<'):]
+                    if b'/Filter' in dictionary and b'/FlateDecode' not in dictionary:
+                        decompressor = None
+                        parser = None
+                    else:
+                        decompressor = (zlib.decompressobj()
+                                        if b'/FlateDecode' in dictionary else None)
+                        parser = _PdfContentParser()
+                    in_stream = True
+                    buffer = buffer[match.end():]
+                else:
+                    end = buffer.find(b'endstream')
+                    body = buffer if end == -1 else buffer[:end]
+                    if end == -1:
+                        # Preserva um possível 'endstream' dividido entre leituras
+                        body, buffer = body[:-8], body[-8:]
+                    else:
+                        buffer = buffer[end + len(b'endstream'):]
+
+                    if parser is not None and body:
+                        try:
+                            decoded = decompressor.decompress(body) if decompressor else body
+                        except zlib.error:
+                            parser = None
+                        else:
+                            text = parser.feed(decoded)
+                            if text:
+                                yield text
+
+                    if end == -1:
+                        break
+                    in_stream = False
+
+            if not data:
+                break
+
+
+EXTRACTORS: Dict[str, Callable[[Path, int], Iterator[str]]] = {
+    '.txt': _txt_chunks,
+    '.docx': _docx_chunks,
+    '.epub': _epub_chunks,
+    '.pdf': _pdf_chunks,
+}
+
+
+def supports(path) -> bool:
+    """Indica se há extrator para o formato do arquivo"""
+    return Path(path).suffix.lower() in EXTRACTORS
+
+
+def iter_text(path, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Extrai o texto de um documento em blocos
+
+    Args:
+        path: Caminho do documento (.txt, .docx, .epub ou .pdf)
+        chunk_size: Tamanho aproximado de cada leitura, em bytes
+
+    Returns:
+        Iterador de trechos de texto, na ordem do documento
+    """
+    path = Path(path)
+    extractor = EXTRACTORS.get(path.suffix.lower())
+    if extractor is None:
+        raise ValueError(f"Formato {path.suffix.lower()} sem extração de texto")
+    return extractor(path, chunk_size)
@@ -0,0 +1,197 @@
+"""
+Testes unitários para o módulo async_manager
+"""
+
+import unittest
+import asyncio
+import threading
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from async_manager import AsyncDocumentManager
+from document_manager import DocumentManager
+
+
+class TestAsyncDocumentManager(unittest.IsolatedAsyncioTestCase):
+    """Testes para a fachada assíncrona"""
+
+    async def asyncSetUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.base = Path(self.test_dir) / "biblioteca"
+        self.sources = Path(self.test_dir) / "entrada"
+        self.sources.mkdir()
+        self.library = await AsyncDocumentManager.open(str(self.base), journal=True)
+
+    async def asyncTearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        await self.library.close()
+        shutil.rmtree(self.test_dir)
+
+    def make_source(self, name: str, size: int = 100) -> str:
+        path = self.sources / name
+        path.write_bytes(b"x" * size)
+        return str(path)
+
+    def block_copies(self):
+        """Faz as cópias aguardarem um evento; devolve (iniciada, liberar)"""
+        started, release = threading.Event(), threading.Event()
+        copy = self.library.manager._copy_document
+
+        def slow_copy(*args):
+            started.set()
+            release.wait(10)
+            return copy(*args)
+
+        self.library.manager._copy_document = slow_copy
+        return started, release
+
+    async def test_operations(self):
+        """Testa inclusão, renomeação, remoção, listagem, busca e estatísticas"""
+        name = await self.library.add_document(self.make_source("Silva_Redes_2020.pdf"),
+                                               'artigos', author='João Silva')
+        self.assertEqual(name, "Silva_Redes_2020.pdf")
+        again = await self.library.add_document(self.make_source("Silva_Redes_2020.pdf"),
+                                                'artigos')
+        self.assertEqual(again, "Silva_Redes_2020_1.pdf")
+
+        self.assertTrue(await self.library.rename_document(again, "Outro_2021.pdf", 'artigos'))
+        self.assertTrue(await self.library.remove_document("Outro_2021.pdf", 'artigos'))
+
+        documents = await self.library.list_documents()
+        self.assertEqual([d['filename'] for d in documents], ["Silva_Redes_2020.pdf"])
+        self.assertEqual(len(await self.library.search_documents("silva")), 1)
+        self.assertEqual((await self.library.get_statistics())['total_documents'], 1)
+        self.assertEqual(list(await self.library.list_by_year()), [2020])
+        self.assertEqual(self.library.manager.metrics.as_dict()
+                         ['operations']['add_document']['calls'], 2)
+
+        with self.assertRaises(ValueError):
+            await self.library.add_document(self.make_source("livro.epub"), 'artigos')
+        self.assertEqual(list((self.base / AsyncDocumentManager.STAGING_DIR).iterdir()), [])
+
+    async def test_reads_during_slow_copy(self):
+        """Testa que leituras são atendidas enquanto uma cópia está em andamento"""
+        await self.library.add_document(self.make_source("Existente_2019.pdf"), 'artigos')
+        started, release = self.block_copies()
+
+        adding = asyncio.create_task(
+            self.library.add_document(self.make_source("Lento_2024.pdf"), 'artigos'))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+
+        # A cópia está parada: as leituras terminam e não veem o arquivo parcial
+        documents = await asyncio.wait_for(self.library.list_documents(), timeout=5)
+        self.assertEqual([d['filename'] for d in documents], ["Existente_2019.pdf"])
+        stats = await asyncio.wait_for(self.library.get_statistics(), timeout=5)
+        self.assertEqual(stats['total_documents'], 1)
+        await asyncio.wait_for(self.library.search_documents("existente"), timeout=5)
+        self.assertFalse(adding.done())
+
+        release.set()
+        self.assertEqual(await adding, "Lento_2024.pdf")
+        documents = await self.library.list_documents()
+        self.assertEqual(sorted(d['filename'] for d in documents),
+                         ["Existente_2019.pdf", "Lento_2024.pdf"])
+
+    async def test_writers_are_serialized(self):
+        """Testa que uma escrita aguarda a anterior terminar"""
+        started, release = self.block_copies()
+        first = asyncio.create_task(
+            self.library.add_document(self.make_source("Primeiro.pdf"), 'artigos'))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        second = asyncio.create_task(
+            self.library.remove_document("Primeiro.pdf", 'artigos'))
+
+        await asyncio.sleep(0.05)
+        self.assertFalse(second.done())
+        release.set()
+        self.assertEqual(await first, "Primeiro.pdf")
+        self.assertTrue(await second)
+        self.assertEqual(await self.library.list_documents(), [])
+
+    async def test_reads_flow_during_large_ingest(self):
+        """Testa que consultas concorrentes continuam respondendo durante uma importação"""
+        specs = [{'file_path': self.make_source(f"Autor_Documento {i}_{2000 + i % 20}.pdf",
+                                                size=64 * 1024),
+                  'doc_type': 'artigos'} for i in range(150)]
+        ingest = asyncio.create_task(self.library.add_documents(specs))
+
+        reads_during_ingest = 0
+        seen_counts = []
+        while not ingest.done():
+            stats = await self.library.get_statistics()
+            await self.library.search_documents("documento", limit=5)
+            seen_counts.append(stats['total_documents'])
+            reads_during_ingest += 1
+
+        results = await ingest
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertGreater(reads_during_ingest, 1)
+        self.assertEqual(seen_counts, sorted(seen_counts))
+        self.assertLess(seen_counts[0], 150)
+        self.assertEqual((await self.library.get_statistics())['total_documents'], 150)
+
+    async def test_cancelled_add_leaves_no_files(self):
+        """Testa que cancelar uma inclusão não deixa temporários nem registros"""
+        started, release = self.block_copies()
+        adding = asyncio.create_task(
+            self.library.add_document(self.make_source("Cancelado.pdf"), 'artigos'))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        adding.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await adding
+        release.set()
+
+        # A cópia termina na thread e o temporário é apagado em seguida
+        staging = self.base / AsyncDocumentManager.STAGING_DIR
+        for _ in range(100):
+            if not any(staging.iterdir()):
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(list(staging.iterdir()), [])
+        self.assertEqual(await self.library.list_documents(), [])
+
+    async def test_persisted_on_close(self):
+        """Testa que as alterações ficam visíveis para um novo gerenciador"""
+        await self.library.add_document(self.make_source("Persistido_2022.pdf"), 'artigos')
+        await self.library.close()
+        manager = DocumentManager(str(self.base))
+        self.assertEqual([d['filename'] for d in manager.list_documents()],
+                         ["Persistido_2022.pdf"])
+        manager.close()
+        self.library = await AsyncDocumentManager.open(str(self.base))
+
+    async def test_inferred_metadata(self):
+        """Testa a leitura dos metadados embutidos junto com a cópia"""
+        await self.library.close()
+        self.library = await AsyncDocumentManager.open(str(self.base), infer_metadata=True)
+        source = self.sources / "tese.pdf"
+        source.write_bytes(b"%PDF-1.4\n1 0 obj\n<< /Title (Grafos) /Author (Ana Lima) "
+                           b"/CreationDate (D:20190301) >>\nendobj\n"
+                           b"trailer\n<< /Info 1 0 R >>\n%%EOF\n")
+        await self.library.add_document(str(source), 'teses', author='Orientador')
+        document = (await self.library.list_documents())[0]
+        self.assertEqual((document['title'], document['author'], document['year']),
+                         ('Grafos', 'Orientador', 2019))
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestAsyncDocumentManager)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
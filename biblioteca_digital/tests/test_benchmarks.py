@@ -0,0 +1,108 @@
+"""
+Testes unitários para o gerador sintético e a comparação de benchmarks
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src e a raiz do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from document_manager import DocumentManager
+from benchmarks.synthetic import SyntheticLibrary, generate_library
+from benchmarks.suite import compare_results, split_counts, run_suite
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Testes para a biblioteca sintética e a verificação de regressões"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_generator_is_reproducible(self):
+        """Testa que a mesma semente gera os mesmos documentos, sem nomes repetidos"""
+        first = SyntheticLibrary(seed=7).documents({'artigos': 50, 'livros': 20})
+        second = SyntheticLibrary(seed=7).documents({'artigos': 50, 'livros': 20})
+        self.assertEqual(first, second)
+        self.assertEqual(len({(d['type'], d['filename']) for d in first}), 70)
+        self.assertEqual(sum(d['type'] == 'livros' for d in first), 20)
+
+    def test_generated_library(self):
+        """Testa que a biblioteca gerada é lida pelo DocumentManager com os tamanhos esparsos"""
+        base = Path(self.test_dir) / "biblioteca"
+        rel_paths = generate_library(str(base), {'artigos': 30, 'teses': 5, 'livros': 15},
+                                     layout='sharded')
+        self.assertEqual(len(rel_paths), 50)
+
+        manager = DocumentManager(str(base))
+        documents = manager.list_documents()
+        self.assertEqual(len(documents), 50)
+        stats = manager.get_statistics()
+        self.assertEqual(stats['by_type'], {'artigos': 30, 'teses': 5, 'livros': 15})
+        self.assertEqual(stats['total_size_bytes'],
+                         sum((base / rel_path).stat().st_size for rel_path in rel_paths))
+        manager.close()
+
+        with self.assertRaises(ValueError):
+            generate_library(str(base), {'revistas': 1})
+
+    def test_split_counts(self):
+        """Testa a divisão do total entre os tipos"""
+        counts = split_counts(1001, {'artigos': 6, 'teses': 1, 'livros': 3})
+        self.assertEqual(counts, {'artigos': 601, 'teses': 100, 'livros': 300})
+
+    def test_compare_results(self):
+        """Testa a detecção de regressões, com tolerância a ruído"""
+        def results(add, search, stats):
+            return {'version': 1, 'results': {'1000': {
+                'add_document': {'median_ms': add},
+                'search_documents': {'median_ms': search},
+                'get_statistics': {'median_ms': stats},
+            }}}
+
+        comparisons = compare_results(results(2.0, 1.0, 0.02), results(2.2, 1.5, 0.04),
+                                      threshold=0.2)
+        flagged = {item['scenario'] for item in comparisons if item['regression']}
+        self.assertEqual(flagged, {'search_documents'})
+        self.assertEqual(len(comparisons), 3)
+
+        with self.assertRaises(ValueError):
+            compare_results({'version': 0, 'results': {}}, results(1, 1, 1))
+
+    def test_run_suite(self):
+        """Testa que a suíte produz estatísticas para todos os cenários"""
+        data = run_suite([40], operations=3, repeat=1, work_dir=self.test_dir)
+        scenarios = data['results']['40']
+        for scenario in ['add_document', 'rename_document', 'remove_document',
+                         'list_documents', 'list_by_year', 'search_documents',
+                         'get_statistics']:
+            self.assertIn(scenario, scenarios)
+            self.assertGreater(scenarios[scenario]['runs'], 0)
+        self.assertEqual(scenarios['add_document']['runs'], 3)
+        self.assertEqual(compare_results(data, data)[0]['change'], 0.0)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestBenchmarks)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
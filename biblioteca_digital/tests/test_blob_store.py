@@ -0,0 +1,138 @@
+"""
+Testes unitários para o armazenamento por conteúdo (deduplicação)
+"""
+
+import unittest
+import tempfile
+import shutil
+import hashlib
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from blob_store import BlobStore
+from document_manager import DocumentManager
+
+
+class TestBlobStore(unittest.TestCase):
+    """Testes para o repositório de blobs e o modo deduplicado"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.content = b"PDF repetido " * 100
+        self.source = self.test_dir / "artigo_2020.pdf"
+        self.source.write_bytes(self.content)
+        self.other = self.test_dir / "outro_2021.pdf"
+        self.other.write_bytes(b"Outro conteudo")
+        self.manager = DocumentManager(str(self.test_dir / "biblioteca"), dedup=True)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_store_hashes_while_copying(self):
+        """Testa o hash calculado durante a cópia e a reutilização do blob"""
+        store = BlobStore(self.test_dir / "blobs")
+        digest, is_new = store.store(self.source)
+
+        self.assertEqual(digest, hashlib.sha256(self.content).hexdigest())
+        self.assertTrue(is_new)
+        self.assertEqual(store.blob_path(digest).read_bytes(), self.content)
+        self.assertEqual(store.store(self.source), (digest, False))
+        self.assertEqual([p.name for p in store.root.iterdir()], [digest[:2]])
+
+    def test_duplicates_share_one_blob(self):
+        """Testa que documentos idênticos compartilham o mesmo conteúdo"""
+        self.manager.add_document(str(self.source), 'artigos')
+        self.manager.add_document(str(self.source), 'artigos')
+        self.manager.add_document(str(self.source), 'teses')
+
+        docs = self.manager.list_documents()
+        self.assertEqual(sorted(d['filename'] for d in docs),
+                         ['artigo_2020.pdf', 'artigo_2020.pdf', 'artigo_2020_1.pdf'])
+
+        stored = self.manager.base_path / 'artigos' / 'artigo_2020_1.pdf'
+        self.assertEqual(stored.read_bytes(), self.content)
+        # Blob + três documentos apontam para o mesmo inode
+        self.assertEqual(stored.stat().st_nlink, 4)
+
+    def test_statistics_report_dedup_ratio(self):
+        """Testa o tamanho físico e a razão de deduplicação"""
+        for _ in range(3):
+            self.manager.add_document(str(self.source), 'artigos')
+        self.manager.add_document(str(self.other), 'artigos')
+
+        stats = self.manager.get_statistics()
+        logical = 3 * len(self.content) + len(b"Outro conteudo")
+        physical = len(self.content) + len(b"Outro conteudo")
+        self.assertEqual(stats['total_size_bytes'], logical)
+        self.assertEqual(stats['physical_size_bytes'], physical)
+        self.assertEqual(stats['dedup_ratio'], round(logical / physical, 2))
+
+    def test_remove_releases_last_reference(self):
+        """Testa que o blob só é apagado com a última referência"""
+        self.manager.add_document(str(self.source), 'artigos')
+        self.manager.add_document(str(self.source), 'teses')
+        digest = hashlib.sha256(self.content).hexdigest()
+        blob = self.manager.blob_store.blob_path(digest)
+
+        self.manager.remove_document('artigo_2020.pdf', 'artigos')
+        self.assertTrue(blob.exists())
+        self.assertEqual(self.manager.get_statistics()['dedup_ratio'], 1.0)
+
+        self.manager.rename_document('artigo_2020.pdf', 'final', 'teses')
+        self.manager.remove_document('final.pdf', 'teses')
+        self.assertFalse(blob.exists())
+
+    def test_reopened_library_keeps_dedup(self):
+        """Testa que a deduplicação fica registrada e os blobs são liberados ao reabrir"""
+        self.manager.add_document(str(self.source), 'artigos')
+        self.manager.add_document(str(self.source), 'artigos')
+        blob = self.manager.blob_store.blob_path(hashlib.sha256(self.content).hexdigest())
+        self.manager.close()
+
+        self.manager = DocumentManager(str(self.test_dir / "biblioteca"))
+        self.assertTrue(self.manager.dedup)
+        self.manager.add_document(str(self.source), 'teses')
+        self.assertEqual(blob.stat().st_nlink, 4)
+
+        self.manager.remove_document('artigo_2020.pdf', 'artigos')
+        self.manager.remove_document('artigo_2020_1.pdf', 'artigos')
+        self.manager.close()
+
+        # Mesmo com a deduplicação desligada, os blobs existentes são liberados
+        self.manager = DocumentManager(str(self.test_dir / "biblioteca"), dedup=False)
+        self.manager.remove_document('artigo_2020.pdf', 'teses')
+        self.assertFalse(blob.exists())
+
+    def test_default_mode_copies(self):
+        """Testa que sem deduplicação os arquivos são cópias independentes"""
+        manager = DocumentManager(str(self.test_dir / "simples"))
+        manager.add_document(str(self.source), 'artigos')
+
+        stored = manager.base_path / 'artigos' / 'artigo_2020.pdf'
+        self.assertEqual(stored.stat().st_nlink, 1)
+        self.assertNotIn('sha256', manager.metadata['artigos/artigo_2020.pdf'])
+        self.assertFalse((manager.base_path / '.blobs').exists())
+        manager.close()
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestBlobStore)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,147 @@
+"""
+Testes unitários para os comandos não interativos da CLI
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import io
+import contextlib
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cli import build_parser, run_batch, run_command, run_convert_metadata
+from document_manager import DocumentManager
+
+
+class TestBatchCLI(unittest.TestCase):
+    """Testes para os comandos com saída NDJSON e o modo batch"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.base = Path(self.test_dir) / "biblioteca"
+        self.manager = DocumentManager(str(self.base), journal=True)
+        self.source = Path(self.test_dir) / "Silva_Redes Neurais_2020.pdf"
+        self.source.write_bytes(b"conteudo")
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def run_lines(self, *lines, **options):
+        """Executa linhas no modo batch e devolve o código e os objetos emitidos"""
+        output = io.StringIO()
+        exit_code = run_batch(self.manager, lines, stream=output, **options)
+        return exit_code, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_single_command(self):
+        """Testa um comando avulso, com sucesso e com erro"""
+        args = build_parser().parse_args(['--data', str(self.base), 'add', str(self.source),
+                                          'artigos', '--author', 'João Silva'])
+        self.assertEqual(args.data, self.base)
+        output = io.StringIO()
+        self.assertTrue(run_command(self.manager, args, output))
+        self.assertEqual(json.loads(output.getvalue()), {
+            'ok': True, 'command': 'add', 'type': 'artigos',
+            'filename': 'Silva_Redes Neurais_2020.pdf', 'source': str(self.source)
+        })
+
+        args = build_parser().parse_args(['rm', 'teses', 'inexistente.pdf'])
+        output = io.StringIO()
+        self.assertFalse(run_command(self.manager, args, output))
+        record = json.loads(output.getvalue())
+        self.assertFalse(record['ok'])
+        self.assertEqual(record['command'], 'rm')
+
+    def test_batch_session(self):
+        """Testa vários comandos no mesmo processo, com metadados consolidados ao final"""
+        exit_code, records = self.run_lines(
+            f'add "{self.source}" artigos --author "João Silva"',
+            '# comentário',
+            '',
+            'ls --type artigos',
+            'mv artigos "Silva_Redes Neurais_2020.pdf" Redes_2020.pdf',
+            'search redes',
+            'stats',
+        )
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(records[0]['filename'], 'Silva_Redes Neurais_2020.pdf')
+        self.assertEqual(records[1]['author'], 'João Silva')
+        self.assertEqual(records[2]['new_name'], 'Redes_2020.pdf')
+        self.assertEqual(records[3]['filename'], 'Redes_2020.pdf')
+        self.assertEqual(records[4]['total_documents'], 1)
+        self.assertEqual(len(records), 5)
+
+        # O diário foi incorporado ao metadata.json
+        self.assertFalse(Path(str(self.manager.metadata_file) + '.journal').exists())
+        self.assertIn('artigos/Redes_2020.pdf',
+                      json.loads(self.manager.metadata_file.read_text(encoding='utf-8')))
+
+    def test_batch_errors(self):
+        """Testa que erros são reportados com a linha e não interrompem o lote"""
+        exit_code, records = self.run_lines('bogus', 'rm artigos nada.pdf', 'stats')
+        self.assertEqual(exit_code, 1)
+        self.assertEqual([record.get('line') for record in records[:2]], [1, 2])
+        self.assertFalse(records[0]['ok'])
+        self.assertEqual(records[1]['command'], 'rm')
+        self.assertEqual(records[2]['total_documents'], 0)
+
+        exit_code, records = self.run_lines('rm artigos nada.pdf', 'stats', stop_on_error=True)
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(len(records), 1)
+
+    def test_batch_import(self):
+        """Testa a importação de um manifesto, com um resultado por item"""
+        manifest = Path(self.test_dir) / "manifesto.json"
+        manifest.write_text(json.dumps([
+            {'file_path': str(self.source), 'doc_type': 'artigos'},
+            {'file_path': str(Path(self.test_dir) / 'faltando.pdf'), 'doc_type': 'artigos'},
+        ]), encoding='utf-8')
+
+        exit_code, records = self.run_lines(f'import "{manifest}" --workers 2')
+        self.assertEqual(exit_code, 1)
+        self.assertEqual([record['ok'] for record in records], [True, False, False])
+        self.assertEqual(records[0]['filename'], 'Silva_Redes Neurais_2020.pdf')
+        self.assertIn('1 de 2', records[2]['error'])
+
+    def test_convert_metadata_switches_backend(self):
+        """Testa que, após a conversão, os demais comandos usam o novo formato"""
+        self.manager.add_document(str(self.source), 'artigos')
+        self.manager.close()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(run_convert_metadata(self.base, 'binary'), 0)
+
+        self.manager = DocumentManager(str(self.base), journal=True)
+        self.assertEqual(self.manager.backend, 'binary')
+        args = build_parser().parse_args(['rm', 'artigos', 'Silva_Redes Neurais_2020.pdf'])
+        self.assertTrue(run_command(self.manager, args, io.StringIO()))
+        self.manager.close()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_convert_metadata(self.base, 'json')
+        self.manager = DocumentManager(str(self.base))
+        self.assertEqual(self.manager.backend, 'json')
+        self.assertEqual(self.manager.list_documents(), [])
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestBatchCLI)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
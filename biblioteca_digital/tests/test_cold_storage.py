@@ -0,0 +1,347 @@
+"""
+Testes unitários para o armazenamento frio (documentos compactados)
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+import http.client
+import time
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cold_storage import CODECS, ColdStore, worth_compressing
+from document_manager import DocumentManager
+from http_api import create_server
+
+TEXT = b"Notas sobre redes neurais e grafos na biblioteca digital. " * 2000
+
+
+def age(path: Path, days: float = 60):
+    """Faz o último acesso ao arquivo parecer antigo, mantendo o mtime"""
+    stat = path.stat()
+    os.utime(path, ns=(int((time.time() - days * 86400) * 1e9), stat.st_mtime_ns))
+
+
+class TestColdStore(unittest.TestCase):
+    """Testes para o repositório de arquivos compactados"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.store = ColdStore(self.test_dir / ".cold")
+        self.source = self.test_dir / "notas.txt"
+        self.source.write_bytes(TEXT)
+        age(self.source)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_codecs(self):
+        """Testa compactação, leitura em fluxo com posicionamento e restauração"""
+        for codec, suffix in CODECS.items():
+            with self.subTest(codec=codec):
+                name, stored_size = self.store.compress(self.source, codec)
+                self.assertTrue(name.endswith(suffix))
+                self.assertEqual(self.store.path(name).stat().st_size, stored_size)
+                self.assertLess(stored_size, len(TEXT) // 10)
+
+                with self.store.open(name) as f:
+                    self.assertEqual(f.read(100), TEXT[:100])
+                    f.seek(70000)
+                    self.assertEqual(f.read(50), TEXT[70000:70050])
+                    f.seek(10)
+                    self.assertEqual(f.read(), TEXT[10:])
+
+                dest = self.test_dir / f"restaurado.{codec}"
+                self.store.restore(name, dest)
+                self.assertEqual(dest.read_bytes(), TEXT)
+                self.assertEqual(dest.stat().st_mtime_ns, self.source.stat().st_mtime_ns)
+
+                other, _ = self.store.recompress(name, 'zlib' if codec != 'zlib' else 'gzip')
+                with self.store.open(other) as f:
+                    self.assertEqual(f.read(), TEXT)
+                self.assertTrue(self.store.remove(name))
+                self.assertFalse(self.store.remove(name))
+
+        with self.assertRaises(ValueError):
+            self.store.compress(self.source, 'bz2')
+
+    def test_worth_compressing(self):
+        """Testa a estimativa pela extensão e por uma amostra do conteúdo"""
+        self.assertTrue(worth_compressing(self.source))
+        random_file = self.test_dir / "aleatorio.pdf"
+        random_file.write_bytes(os.urandom(64 * 1024))
+        self.assertFalse(worth_compressing(random_file))
+        epub = self.test_dir / "livro.epub"
+        epub.write_bytes(TEXT)
+        self.assertFalse(worth_compressing(epub))
+
+
+class TestColdTier(unittest.TestCase):
+    """Testes para o armazenamento frio no gerenciador"""
+
+    backend = 'json'
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.base = self.test_dir / "biblioteca"
+        self.manager = self.open_manager()
+        for name, doc_type, content in [("notas_2019.txt", 'artigos', TEXT),
+                                        ("Tese_Grafos_2020.pdf", 'teses', b"%PDF-1.4\n" + TEXT),
+                                        ("livro_2018.epub", 'livros', TEXT)]:
+            source = self.test_dir / name
+            source.write_bytes(content)
+            self.manager.add_document(str(source), doc_type)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def open_manager(self, **options) -> DocumentManager:
+        options.setdefault('cold_storage', 'lzma')
+        return DocumentManager(str(self.base), backend=self.backend, **options)
+
+    def reopen(self, **options):
+        self.manager.close()
+        self.manager = self.open_manager(**options)
+
+    def age_all(self):
+        for doc_type in DocumentManager.SUPPORTED_FORMATS:
+            for path in (self.base / doc_type).iterdir():
+                age(path)
+
+    def read(self, filename: str, doc_type: str) -> bytes:
+        with self.manager.open_document(filename, doc_type) as f:
+            return f.read()
+
+    def cold_files(self):
+        return sorted(p.name for p in (self.base / ".cold").rglob('*') if p.is_file())
+
+    def test_compress_cold_documents(self):
+        """Testa a compactação dos documentos sem acesso e a leitura transparente"""
+        self.assertEqual(self.manager.tier_documents()['compressed'], [])
+        self.age_all()
+        report = self.manager.tier_documents()
+
+        self.assertEqual(sorted(report['compressed']),
+                         [os.path.join('artigos', 'notas_2019.txt'),
+                          os.path.join('teses', 'Tese_Grafos_2020.pdf')])
+        self.assertEqual(report['skipped'], 1)
+        self.assertGreater(report['saved_bytes'], len(TEXT))
+        self.assertFalse((self.base / 'artigos' / 'notas_2019.txt').exists())
+        self.assertEqual(len(self.cold_files()), 2)
+
+        # Listagem e busca não percebem a compactação
+        documents = {d['filename']: d for d in self.manager.list_documents()}
+        self.assertEqual(documents['notas_2019.txt']['size'], len(TEXT))
+        self.assertEqual(len(self.manager.search_documents("grafos")), 1)
+
+        stats = self.manager.get_statistics()
+        logical = 3 * len(TEXT) + len(b"%PDF-1.4\n")
+        self.assertEqual(stats['total_size_bytes'], logical)
+        self.assertEqual(stats['physical_size_bytes'], logical - report['saved_bytes'])
+        self.assertEqual(stats['compressed_documents'], 2)
+        self.assertGreater(stats['compression_ratio'], 10)
+        self.assertLess(stats['physical_size_mb'], stats['total_size_mb'])
+        self.assertTrue(self.manager.verify_statistics(repair=False)['consistent'])
+
+        # Sem acessos nada muda numa segunda execução, e o estado sobrevive
+        # à reabertura
+        self.assertEqual(self.manager.tier_documents()['skipped'], 0)
+        self.reopen()
+        report = self.manager.tier_documents()
+        self.assertEqual((report['compressed'], report['restored']), ([], []))
+        self.assertEqual(self.manager.get_statistics(), stats)
+        self.assertEqual(self.read("notas_2019.txt", 'artigos'), TEXT)
+        self.assertEqual(self.read("Tese_Grafos_2020.pdf", 'teses'), b"%PDF-1.4\n" + TEXT)
+
+    def test_restore_after_access(self):
+        """Testa que um documento acessado dentro do período volta ao diretório"""
+        self.age_all()
+        self.manager.tier_documents()
+        self.read("notas_2019.txt", 'artigos')
+
+        report = self.manager.tier_documents()
+        self.assertEqual(report['restored'], [os.path.join('artigos', 'notas_2019.txt')])
+        self.assertLess(report['saved_bytes'], 0)
+        self.assertEqual((self.base / 'artigos' / 'notas_2019.txt').read_bytes(), TEXT)
+        self.assertEqual(self.manager.get_statistics()['compressed_documents'], 1)
+        self.assertEqual(len(self.cold_files()), 1)
+        self.assertEqual(self.manager.tier_documents()['restored'], [])
+
+    def test_recompress_with_other_codec(self):
+        """Testa a recompactação ao trocar o compactador"""
+        self.age_all()
+        self.manager.tier_documents()
+        self.reopen(cold_storage='gzip')
+
+        report = self.manager.tier_documents()
+        self.assertEqual(len(report['recompressed']), 2)
+        self.assertTrue(all(name.endswith('.gz') for name in self.cold_files()))
+        self.assertEqual(self.read("notas_2019.txt", 'artigos'), TEXT)
+        self.assertTrue(self.manager.verify_statistics(repair=False)['consistent'])
+
+    def test_operations_on_cold_documents(self):
+        """Testa reconciliação, renomeação, nomes repetidos e remoção de compactados"""
+        self.age_all()
+        self.manager.tier_documents()
+
+        report = self.manager.reconcile(full=True)
+        self.assertEqual(report['removed'], [])
+        self.assertEqual(len(self.manager.list_documents()), 3)
+
+        self.assertTrue(self.manager.rename_document("notas_2019.txt", "resumo_2019.txt",
+                                                     'artigos'))
+        self.assertEqual(self.read("resumo_2019.txt", 'artigos'), TEXT)
+        with self.assertRaises(FileNotFoundError):
+            self.manager.open_document("notas_2019.txt", 'artigos')
+
+        source = self.test_dir / "resumo_2019.txt"
+        source.write_bytes(b"outro")
+        self.manager.add_document(str(source), 'artigos')
+
+        self.assertTrue(self.manager.remove_document("resumo_2019.txt", 'artigos'))
+        self.assertEqual(len(self.cold_files()), 1)
+        self.assertEqual(sorted(d['filename'] for d in self.manager.list_documents('artigos')),
+                         ["resumo_2019_1.txt"])
+        self.assertTrue(self.manager.verify_statistics(repair=False)['consistent'])
+
+    def test_migrate_layout(self):
+        """Testa que a conversão de layout mantém os documentos compactados"""
+        self.age_all()
+        self.manager.tier_documents()
+        self.manager.migrate_layout('sharded')
+
+        self.assertEqual(len(self.manager.list_documents()), 3)
+        self.assertEqual(self.read("notas_2019.txt", 'artigos'), TEXT)
+        self.read("Tese_Grafos_2020.pdf", 'teses')
+        self.manager.tier_documents()
+        shard = DocumentManager._shard("Tese_Grafos_2020.pdf")
+        self.assertTrue((self.base / 'teses' / shard / "Tese_Grafos_2020.pdf").exists())
+
+    def test_changed_during_compression(self):
+        """Testa que um documento alterado durante a compactação não é registrado"""
+        self.age_all()
+        path = self.base / 'artigos' / 'notas_2019.txt'
+        compress = self.manager.cold_store.compress
+
+        def compress_and_change(source, codec):
+            result = compress(source, codec)
+            if Path(source) == path:
+                path.write_bytes(b"alterado" * 1000)
+            return result
+
+        self.manager.cold_store.compress = compress_and_change
+        report = self.manager.tier_documents()
+        self.assertEqual(report['compressed'], [os.path.join('teses', 'Tese_Grafos_2020.pdf')])
+        self.assertEqual(path.read_bytes(), b"alterado" * 1000)
+        self.assertEqual(len(self.cold_files()), 1)
+
+    def test_content_index_kept(self):
+        """Testa que a indexação de conteúdo é mantida para os compactados"""
+        self.manager.index_content(workers=0)
+        self.age_all()
+        self.manager.tier_documents()
+        self.assertEqual(self.manager.index_content(workers=0), 0)
+        self.assertEqual([d['filename'] for d in self.manager.search_content("neurais")][:1],
+                         ["notas_2019.txt"])
+
+    def test_configuration(self):
+        """Testa os erros de configuração e que a leitura independe dela"""
+        with self.assertRaises(ValueError):
+            self.open_manager(cold_storage='bz2')
+        with self.assertRaises(ValueError):
+            self.open_manager(cold_after_days=-1)
+
+        self.age_all()
+        self.manager.tier_documents()
+        self.reopen(cold_storage=None)
+        self.assertEqual(self.read("notas_2019.txt", 'artigos'), TEXT)
+        with self.assertRaises(ValueError):
+            self.manager.tier_documents()
+
+
+class TestColdTierSqlite(TestColdTier):
+    """Os mesmos testes com o backend SQLite"""
+
+    backend = 'sqlite'
+
+
+class TestColdTierBinary(TestColdTier):
+    """Os mesmos testes com o backend binário"""
+
+    backend = 'binary'
+
+
+class TestColdDownload(unittest.TestCase):
+    """Testes para o download de documentos compactados pela API HTTP"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = DocumentManager(os.path.join(self.test_dir, "biblioteca"),
+                                       cold_storage='zlib')
+        source = Path(self.test_dir) / "notas_2019.txt"
+        source.write_bytes(TEXT)
+        self.manager.add_document(str(source), 'artigos')
+        age(self.manager.base_path / 'artigos' / 'notas_2019.txt')
+        self.manager.tier_documents()
+
+        self.server = create_server(self.manager, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=5)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_download_and_ranges(self):
+        """Testa download completo e por intervalo de um documento compactado"""
+        self.conn.request('GET', '/files/artigos/notas_2019.txt')
+        response = self.conn.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Length'), str(len(TEXT)))
+        self.assertEqual(response.read(), TEXT)
+
+        self.conn.request('GET', '/files/artigos/notas_2019.txt', headers={'Range': 'bytes=-100'})
+        response = self.conn.getresponse()
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.read(), TEXT[-100:])
+        self.assertEqual(response.getheader('Content-Range'),
+                         f"bytes {len(TEXT) - 100}-{len(TEXT) - 1}/{len(TEXT)}")
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestColdStore))
+    suite.addTests(loader.loadTestsFromTestCase(TestColdTier))
+    suite.addTests(loader.loadTestsFromTestCase(TestColdTierSqlite))
+    suite.addTests(loader.loadTestsFromTestCase(TestColdTierBinary))
+    suite.addTests(loader.loadTestsFromTestCase(TestColdDownload))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
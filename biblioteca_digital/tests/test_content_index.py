@@ -0,0 +1,248 @@
+"""
+Testes unitários para a extração de texto e o índice de conteúdo
+"""
+
+import unittest
+import tempfile
+import shutil
+import zipfile
+import zlib
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from text_extraction import iter_text
+from content_index import count_terms
+from document_manager import DocumentManager
+
+
+def write_pdf(path: Path, text: str):
+    """Cria um PDF mínimo com um fluxo de conteúdo comprimido"""
+    content = f"BT /F1 12 Tf 72 712 Td ({text}) Tj ET".encode('latin-1')
+    stream = zlib.compress(content)
+    path.write_bytes(
+        b"%PDF-1.4\n1 0 obj\n<< /Length " + str(len(stream)).encode() +
+        b" /Filter /FlateDecode >>\nstream\n" + stream + b"\nendstream\nendobj\n%%EOF\n"
+    )
+
+
+def write_docx(path: Path, paragraphs):
+    """Cria um DOCX mínimo com os parágrafos informados"""
+    body = ''.join(f'<w:p><w:r><w:t>{p}</w:t></w:r></w:p>' for p in paragraphs)
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(
+            'word/document.xml',
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        )
+
+
+def mark_encrypted(path: Path):
+    """Marca as entradas de um ZIP como cifradas (bit 0 das flags)"""
+    data = bytearray(path.read_bytes())
+    for signature, offset in ((b'PK\x03\x04', 6), (b'PK\x01\x02', 8)):
+        start = data.find(signature)
+        while start != -1:
+            data[start + offset] |= 0x01
+            start = data.find(signature, start + 4)
+    path.write_bytes(bytes(data))
+
+
+def write_epub(path: Path, chapters):
+    """Cria um EPUB mínimo com um arquivo XHTML por capítulo"""
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('mimetype', 'application/epub+zip')
+        for i, chapter in enumerate(chapters):
+            archive.writestr(
+                f'OEBPS/cap{i}.xhtml',
+                f'<html><head><title>Ignorado</title></head><body><p>{chapter}</p></body></html>'
+            )
+
+
+class TestTextExtraction(unittest.TestCase):
+    """Testes para os extratores de texto"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_txt_streaming(self):
+        """Testa leitura de texto em blocos sem dividir termos"""
+        path = self.test_dir / "texto.txt"
+        path.write_text("biblioteca " * 1000, encoding='utf-8')
+
+        self.assertGreater(len(list(iter_text(path, chunk_size=7))), 1)
+        counts, length = count_terms(str(path), chunk_size=7)
+        self.assertEqual(counts, {'biblioteca': 1000})
+        self.assertEqual(length, 1000)
+
+    def test_pdf(self):
+        """Testa extração de texto de fluxo FlateDecode"""
+        path = self.test_dir / "artigo.pdf"
+        write_pdf(path, "Redes neurais \\(profundas\\)")
+
+        for chunk_size in (5, 1024):
+            text = ''.join(iter_text(path, chunk_size=chunk_size))
+            self.assertEqual(text, "Redes neurais (profundas)")
+
+    def test_docx(self):
+        """Testa extração de texto de DOCX"""
+        path = self.test_dir / "tese.docx"
+        write_docx(path, ["Introdução", "Metodologia"])
+
+        self.assertEqual(''.join(iter_text(path)).split(), ["Introdução", "Metodologia"])
+
+    def test_epub(self):
+        """Testa extração de texto de EPUB, ignorando o cabeçalho HTML"""
+        path = self.test_dir / "livro.epub"
+        write_epub(path, ["Capítulo um", "Capítulo dois"])
+
+        text = ''.join(iter_text(path))
+        self.assertIn("Capítulo dois", text)
+        self.assertNotIn("Ignorado", text)
+
+    def test_unsupported_format(self):
+        """Testa formato sem extrator"""
+        with self.assertRaises(ValueError):
+            iter_text(self.test_dir / "livro.mobi")
+
+
+class TestContentIndex(unittest.TestCase):
+    """Testes para a indexação de conteúdo pelo DocumentManager"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.manager = DocumentManager(str(self.test_dir / "biblioteca"))
+
+        sources = self.test_dir / "origem"
+        sources.mkdir()
+        (sources / "notas.txt").write_text(
+            "Aprendizado de máquina. Máquina de vetores de suporte.", encoding='utf-8')
+        (sources / "resumo.txt").write_text(
+            "Uma menção a máquina entre muitas outras palavras sobre bibliotecas "
+            "digitais, catalogação e preservação.", encoding='utf-8')
+        write_pdf(sources / "artigo.pdf", "Catalogacao automatica de acervos")
+        write_epub(sources / "livro.epub", ["Preservação digital de longo prazo"])
+        write_docx(sources / "tese.docx", ["Estudo sobre preservação"])
+
+        self.manager.add_documents([
+            {'file_path': str(sources / "notas.txt"), 'doc_type': 'artigos'},
+            {'file_path': str(sources / "resumo.txt"), 'doc_type': 'artigos'},
+            {'file_path': str(sources / "artigo.pdf"), 'doc_type': 'artigos'},
+            {'file_path': str(sources / "livro.epub"), 'doc_type': 'livros'},
+            {'file_path': str(sources / "tese.docx"), 'doc_type': 'teses'},
+        ])
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_search_before_indexing(self):
+        """Testa busca de conteúdo sem índice criado"""
+        self.assertEqual(self.manager.search_content("máquina"), [])
+
+    def test_ranked_results(self):
+        """Testa ranking: mais ocorrências em texto curto vêm primeiro"""
+        self.assertEqual(self.manager.index_content(workers=0), 5)
+
+        results = self.manager.search_content("máquina")
+        self.assertEqual([r['filename'] for r in results], ["notas.txt", "resumo.txt"])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+
+        self.assertEqual(self.manager.search_content("catalogacao")[0]['filename'], "artigo.pdf")
+        self.assertEqual({r['type'] for r in self.manager.search_content("preservação")},
+                         {'artigos', 'livros', 'teses'})
+
+    def test_process_pool_and_incremental_update(self):
+        """Testa a extração em processos e a reindexação apenas do que mudou"""
+        self.assertEqual(self.manager.index_content(workers=2), 5)
+        self.assertEqual(self.manager.index_content(workers=2), 0)
+
+        stored = self.test_dir / "biblioteca" / "artigos" / "notas.txt"
+        stored.write_text("Conteúdo totalmente novo", encoding='utf-8')
+        os.utime(stored, ns=(0, 0))
+        self.assertEqual(self.manager.index_content(workers=0), 1)
+        self.assertEqual(self.manager.search_content("totalmente")[0]['filename'], "notas.txt")
+
+    def test_failed_extraction_reported_and_retried(self):
+        """Testa que falhas de extração são informadas e não ficam gravadas"""
+        self.manager.index_content(workers=0)
+        stored = self.test_dir / "biblioteca" / "teses" / "tese.docx"
+        stored.write_bytes(b"nao e um zip")
+
+        self.assertEqual(self.manager.index_content(workers=0), 0)
+        self.assertEqual(list(self.manager.content_index.errors), ["teses/tese.docx"])
+        self.assertEqual(len(self.manager.search_content("estudo")), 0)
+        self.assertEqual(self.manager.index_content(workers=0), 0)
+        self.assertIn("teses/tese.docx", self.manager.content_index.errors)
+
+        write_docx(stored, ["Estudo corrigido"])
+        self.assertEqual(self.manager.index_content(workers=0), 1)
+        self.assertEqual(self.manager.content_index.errors, {})
+        self.assertEqual(self.manager.search_content("corrigido")[0]['filename'], "tese.docx")
+
+    def test_encrypted_container_reported(self):
+        """Testa que um DOCX cifrado falha sozinho, sem interromper a indexação"""
+        stored = self.test_dir / "biblioteca" / "teses" / "tese.docx"
+        mark_encrypted(stored)
+
+        for workers in (0, 2):
+            with self.subTest(workers=workers):
+                self.manager.index_content(workers=workers)
+                self.assertEqual(list(self.manager.content_index.errors), ["teses/tese.docx"])
+                self.assertIn("encrypted", self.manager.content_index.errors["teses/tese.docx"])
+        self.assertEqual(len(self.manager.search_content("preservação")), 2)
+
+    def test_background_indexing(self):
+        """Testa a indexação em segundo plano"""
+        future = self.manager.index_content(workers=0, background=True)
+        self.assertEqual(future.result(timeout=30), 5)
+        self.assertEqual(len(self.manager.search_content("digital")), 1)
+
+    def test_remove_and_rename_update_index(self):
+        """Testa a manutenção do índice ao remover e renomear"""
+        self.manager.index_content(workers=0)
+
+        self.manager.rename_document("notas.txt", "aula", 'artigos')
+        self.assertEqual(self.manager.search_content("suporte")[0]['filename'], "aula.txt")
+        self.assertEqual(self.manager.index_content(workers=0), 0)
+
+        self.manager.remove_document("aula.txt", 'artigos')
+        self.assertEqual(self.manager.search_content("suporte"), [])
+
+    def test_index_persists(self):
+        """Testa que o índice de conteúdo é reaproveitado em nova instância"""
+        self.manager.index_content(workers=0)
+        base_path = self.manager.base_path
+        self.manager.close()
+
+        self.manager = DocumentManager(str(base_path))
+        self.assertEqual(len(self.manager.search_content("preservação")), 3)
+        self.assertEqual(self.manager.index_content(workers=0), 0)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestTextExtraction)
+    suite.addTests(loader.loadTestsFromTestCase(TestContentIndex))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -5,9 +5,11 @@ Testes unitários para o módulo DocumentManager
 import unittest
 import tempfile
 import shutil
+import json
 from pathlib import Path
 import sys
 import os
+from unittest import mock
 
 # Adiciona o diretório src ao path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -18,11 +20,14 @@ from document_manager import DocumentManager
 class TestDocumentManager(unittest.TestCase):
     """Testes para a classe DocumentManager"""
 
+    backend = 'json'
+    layout = None
+
     def setUp(self):
         """Configura ambiente de teste antes de cada teste"""
         # Cria diretório temporário para testes
         self.test_dir = tempfile.mkdtemp()
-        self.manager = DocumentManager(self.test_dir)
+        self.manager = DocumentManager(self.test_dir, backend=self.backend, layout=self.layout)
 
         # Cria arquivos de teste
         self.test_files = {}
@@ -33,8 +38,14 @@ class TestDocumentManager(unittest.TestCase):
 
     def tearDown(self):
         """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
         shutil.rmtree(self.test_dir)
 
+    def rel_path(self, doc_type, filename):
+        """Caminho relativo de um documento no layout do gerenciador"""
+        path = self.manager._document_path(doc_type, filename)
+        return str(path.relative_to(self.test_dir))
+
     def test_initialization(self):
         """Testa inicialização do DocumentManager"""
         self.assertIsInstance(self.manager, DocumentManager)
@@ -209,6 +220,21 @@ class TestDocumentManager(unittest.TestCase):
         self.assertEqual(len(by_year[2023]), 1)
         self.assertEqual(len(by_year[2022]), 1)
 
+    def test_list_by_year_without_year(self):
+        """Testa o grupo 'Sem ano' depois dos anos, do mais recente ao mais antigo"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2021)
+        undated = Path(self.test_dir) / "sem_data.epub"
+        undated.write_text("Livro")
+        self.manager.add_document(str(undated), 'livros')
+        older = Path(self.test_dir) / "antigo_1999.txt"
+        older.write_text("Artigo")
+        self.manager.add_document(str(older), 'artigos')
+
+        by_year = self.manager.list_by_year()
+
+        self.assertEqual(list(by_year), [2021, 1999, 'Sem ano'])
+        self.assertEqual([d['filename'] for d in by_year['Sem ano']], ["sem_data.epub"])
+
     def test_search_documents_by_title(self):
         """Testa busca por título"""
         self.manager.add_document(
@@ -246,6 +272,27 @@ class TestDocumentManager(unittest.TestCase):
         results = self.manager.search_documents("inexistente")
         self.assertEqual(len(results), 0)
 
+    def test_search_documents_untracked_file(self):
+        """Testa busca de arquivos sem metadados pelo nome"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        (Path(self.test_dir) / 'artigos' / 'relatorio.pdf').write_text("Externo")
+
+        results = self.manager.search_documents("relatorio")
+        self.assertEqual([d['filename'] for d in results], ['relatorio.pdf'])
+        self.assertEqual(results[0]['author'], 'Desconhecido')
+        self.assertEqual(len(self.manager.search_documents("relatório")), 1)
+        self.assertEqual(self.manager.search_documents("inexistente"), [])
+
+    def test_search_documents_empty_query(self):
+        """Testa que a busca vazia devolve todos os documentos"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2022)
+        (Path(self.test_dir) / 'artigos' / 'relatorio.pdf').write_text("Externo")
+
+        results = self.manager.search_documents("")
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results, self.manager.list_documents())
+
     def test_get_statistics_empty(self):
         """Testa estatísticas com biblioteca vazia"""
         stats = self.manager.get_statistics()
@@ -277,6 +324,8 @@ class TestDocumentManager(unittest.TestCase):
             ("artigo-2022-final.pdf", 2022),
             ("tese_2021_versao2.pdf", 2021),
             ("livro2020.pdf", 2020),
+            ("relatorio_0042_2019.pdf", 2019),
+            ("processo_123456_2018.pdf", 2018),
             ("sem_ano.pdf", None)
         ]
 
@@ -317,7 +366,7 @@ class TestDocumentManager(unittest.TestCase):
         )
 
         # Cria novo manager com mesmo diretório
-        new_manager = DocumentManager(self.test_dir)
+        new_manager = DocumentManager(self.test_dir, backend=self.backend)
 
         # Verifica se metadados foram carregados
         docs = new_manager.list_documents()
@@ -325,12 +374,447 @@ class TestDocumentManager(unittest.TestCase):
         self.assertEqual(docs[0]['author'], "Autor Teste")
         self.assertEqual(docs[0]['title'], "Título Teste")
 
+    def test_add_documents_batch(self):
+        """Testa adição em lote com resultados por item"""
+        results = self.manager.add_documents([
+            {'file_path': self.test_files['.pdf'], 'doc_type': 'artigos', 'author': "Autor A"},
+            {'file_path': '/caminho/inexistente.pdf', 'doc_type': 'artigos'},
+            {'file_path': self.test_files['.epub'], 'doc_type': 'livros', 'year': 2020},
+            {'file_path': self.test_files['.epub'], 'doc_type': 'artigos'},
+        ])
+
+        self.assertEqual([r['success'] for r in results], [True, False, True, False])
+        self.assertIn("inexistente", results[1]['error'])
+        self.assertEqual(results[0]['filename'], "test_file_2023.pdf")
+
+        docs = self.manager.list_documents()
+        self.assertEqual(len(docs), 2)
+        livros = self.manager.list_documents(doc_type='livros')
+        self.assertEqual(livros[0]['year'], 2020)
+
+    def test_add_documents_saves_metadata_once(self):
+        """Testa que o lote persiste os metadados uma única vez"""
+        calls = []
+        original_save = self.manager._save_metadata
+
+        def counting_save():
+            calls.append(1)
+            original_save()
+
+        self.manager._save_metadata = counting_save
+        self.manager.add_documents(
+            {'file_path': self.test_files['.pdf'], 'doc_type': 'artigos'} for _ in range(5)
+        )
+
+        self.assertEqual(len(calls), 1)
+        new_manager = DocumentManager(self.test_dir, backend=self.backend)
+        self.assertEqual(len(new_manager.list_documents(doc_type='artigos')), 5)
+
+    def test_add_documents_parallel_keeps_order(self):
+        """Testa que as cópias paralelas preservam a ordem dos nomes e resultados"""
+        specs = [{'file_path': self.test_files['.pdf'], 'doc_type': 'artigos',
+                  'title': f"Cópia {i}"}
+                 for i in range(12)]
+        specs.insert(5, {'file_path': '/caminho/inexistente.pdf', 'doc_type': 'artigos'})
+
+        results = self.manager.add_documents(specs, workers=4)
+
+        self.assertEqual(len(results), 13)
+        self.assertFalse(results[5]['success'])
+        filenames = [r['filename'] for r in results if r['success']]
+        self.assertEqual(filenames[0], "test_file_2023.pdf")
+        self.assertEqual(filenames[1:], [f"test_file_2023_{i}.pdf" for i in range(1, 12)])
+
+        docs = {d['filename']: d for d in self.manager.list_documents(doc_type='artigos')}
+        self.assertEqual(docs["test_file_2023_3.pdf"]['title'], "Cópia 3")
+        self.assertEqual(self.manager.get_statistics()['total_documents'], 12)
+
+    def test_add_documents_reports_progress(self):
+        """Testa o callback de progresso da importação em lote"""
+        updates = []
+        self.manager.add_documents([
+            {'file_path': self.test_files['.pdf'], 'doc_type': 'artigos'},
+            {'file_path': '/caminho/inexistente.pdf', 'doc_type': 'artigos'},
+            {'file_path': self.test_files['.epub'], 'doc_type': 'livros'},
+        ], workers=2, progress=updates.append)
+
+        self.assertEqual([u['completed'] for u in updates], [1, 2, 3])
+        self.assertEqual(updates[-1]['total'], 3)
+        self.assertEqual(updates[-1]['failed'], 1)
+        self.assertEqual(updates[-1]['bytes_copied'], 2 * len("Conteúdo de teste".encode()))
+        self.assertIn('files_per_second', updates[-1])
+        self.assertIn('mb_per_second', updates[-1])
+
+    def test_add_documents_invalid_workers(self):
+        """Testa a validação do número de cópias simultâneas"""
+        with self.assertRaises(ValueError):
+            self.manager.add_documents([], workers=0)
+
+    def test_listing_does_not_scan_unchanged_directories(self):
+        """Testa que a listagem usa os metadados sem percorrer o diretório"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.list_documents()
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2022)
+
+        with mock.patch('document_manager.os.scandir', side_effect=AssertionError):
+            docs = self.manager.list_documents()
+            stats = self.manager.get_statistics()
+
+        self.assertEqual(len(docs), 2)
+        self.assertEqual(stats['total_documents'], 2)
+
+    def test_listing_reflects_external_changes(self):
+        """Testa arquivos adicionados e removidos por fora do gerenciador"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2022)
+        self.assertEqual(len(self.manager.list_documents()), 2)
+
+        self.manager._document_path('livros', 'test_file_2023.epub').unlink()
+        (Path(self.test_dir) / 'artigos' / 'externo.pdf').write_text("Externo")
+
+        docs = {d['filename']: d for d in self.manager.list_documents()}
+        self.assertEqual(set(docs), {'test_file_2023.pdf', 'externo.pdf'})
+        self.assertEqual(docs['externo.pdf']['author'], 'Desconhecido')
+        self.assertEqual(docs['externo.pdf']['size'], len("Externo"))
+        self.assertEqual(self.manager.search_documents("test"), [docs['test_file_2023.pdf']])
+
+    def add_sample_documents(self):
+        """Adiciona documentos com anos, autores e tamanhos variados"""
+        samples = [
+            ("Cálculo", "Ana Souza", 2015, 'artigos', "x" * 30),
+            ("biologia", "Bruno Lima", 2020, 'artigos', "x" * 10),
+            ("Álgebra", "Ana Souza", 2018, 'livros', "x" * 50),
+            ("Direito", "Carla Dias", None, 'teses', "x" * 20),
+            ("Economia", "Bruno Lima", 2020, 'livros', "x" * 40),
+        ]
+        for i, (title, author, year, doc_type, content) in enumerate(samples):
+            source = Path(self.test_dir) / f"amostra_{i}.pdf"
+            source.write_text(content)
+            self.manager.add_document(str(source), doc_type, year=year,
+                                      author=author, title=title)
+
+    def test_iter_documents_lazy_and_filtered(self):
+        """Testa a iteração sob demanda com filtros"""
+        self.add_sample_documents()
+
+        documents = self.manager.iter_documents()
+        self.assertNotIsInstance(documents, list)
+        self.assertEqual(len(list(documents)), 5)
+
+        titles = {d['title'] for d in self.manager.iter_documents({'author': "ana"})}
+        self.assertEqual(titles, {"Cálculo", "Álgebra"})
+        titles = {d['title'] for d in self.manager.iter_documents({'type': 'livros', 'year': 2020})}
+        self.assertEqual(titles, {"Economia"})
+
+        with self.assertRaises(ValueError):
+            list(self.manager.iter_documents({'editora': "X"}))
+        with self.assertRaises(ValueError):
+            list(self.manager.iter_documents(sort_by='autor'))
+
+    def test_iter_documents_sorted_top_n(self):
+        """Testa a ordenação e a seleção dos primeiros documentos"""
+        self.add_sample_documents()
+
+        by_size = [d['size'] for d in
+                   self.manager.iter_documents(sort_by='size', reverse=True, limit=3)]
+        self.assertEqual(by_size, [50, 40, 30])
+        by_title = [d['title'] for d in self.manager.iter_documents(sort_by='title')]
+        self.assertEqual(by_title, ["biologia", "Cálculo", "Direito", "Economia", "Álgebra"])
+        by_year = [d['year'] for d in
+                   self.manager.iter_documents(sort_by='year', limit=2, offset=2)]
+        self.assertEqual(by_year, [2020, 2020])
+        # Documentos sem ano ficam por último nos dois sentidos
+        newest = [d['year'] for d in self.manager.iter_documents(sort_by='year', reverse=True)]
+        self.assertEqual(newest, [2020, 2020, 2018, 2015, None])
+
+        with mock.patch('document_manager.sorted', create=True, side_effect=AssertionError):
+            list(self.manager.iter_documents(sort_by='year', limit=2))
+
+    def test_page_documents_cursor(self):
+        """Testa a paginação estável por cursor"""
+        self.add_sample_documents()
+
+        page = self.manager.page_documents(sort_by='year', limit=2)
+        self.assertEqual([d['year'] for d in page['documents']], [2015, 2018])
+        self.assertIsNotNone(page['next_cursor'])
+
+        # Uma inclusão antes do cursor não desloca as páginas seguintes
+        source = Path(self.test_dir) / "antigo.pdf"
+        source.write_text("antigo")
+        self.manager.add_document(str(source), 'artigos', year=1990)
+
+        seen = []
+        cursor = page['next_cursor']
+        while cursor:
+            page = self.manager.page_documents(sort_by='year', limit=2, cursor=cursor)
+            seen.extend(d['year'] for d in page['documents'])
+            cursor = page['next_cursor']
+        self.assertEqual(seen, [2020, 2020, None])
+
+        cursor = self.manager.page_documents(sort_by='year', limit=1)['next_cursor']
+        with self.assertRaises(ValueError):
+            self.manager.page_documents(sort_by='title', cursor=cursor)
+        with self.assertRaises(ValueError):
+            self.manager.page_documents(sort_by='year', cursor="inválido")
+
+    def test_reconcile_registers_and_drops(self):
+        """Testa o registro de arquivos novos e a remoção de metadados órfãos"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2022)
+        self.manager._document_path('livros', 'test_file_2023.epub').unlink()
+        (Path(self.test_dir) / 'teses' / 'tese_externa_2019.pdf').write_text("Tese")
+        (Path(self.test_dir) / 'teses' / 'anotacoes.xyz').write_text("Ignorado")
+
+        report = self.manager.reconcile()
+
+        self.assertEqual(report['added'], [os.path.join('teses', 'tese_externa_2019.pdf')])
+        self.assertEqual(report['removed'], [self.rel_path('livros', 'test_file_2023.epub')])
+        self.assertEqual(report['updated'], [])
+        teses = self.manager.list_documents(doc_type='teses')
+        self.assertEqual(sorted(d['filename'] for d in teses),
+                         ['anotacoes.xyz', 'tese_externa_2019.pdf'])
+        registered = self.manager.metadata[os.path.join('teses', 'tese_externa_2019.pdf')]
+        self.assertEqual(registered['year'], 2019)
+        self.assertEqual(registered['file_size'], len("Tese"))
+        self.assertEqual(len(self.manager.metadata), 2)
+        self.assertTrue(self.manager.verify_statistics()['consistent'])
+
+    def test_reconcile_repeat_skips_unchanged_directories(self):
+        """Testa que uma nova reconciliação só percorre diretórios alterados"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.reconcile()
+        # Alterações do próprio gerenciador mantêm o retrato atualizado
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2022)
+        self.manager.remove_document('test_file_2023.pdf', 'artigos')
+
+        with mock.patch('document_manager.os.scandir', side_effect=AssertionError):
+            report = self.manager.reconcile()
+        self.assertEqual(report, {'added': [], 'removed': [], 'updated': [], 'scanned': []})
+
+        (Path(self.test_dir) / 'artigos' / 'externo.pdf').write_text("Externo")
+        report = self.manager.reconcile()
+        self.assertEqual(report['scanned'], ['artigos'])
+        self.assertEqual(report['added'], [os.path.join('artigos', 'externo.pdf')])
+
+    def test_reconcile_snapshot_persisted(self):
+        """Testa que o retrato do disco vale para uma nova instância"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.reconcile()
+        self.manager.close()
+
+        self.manager = DocumentManager(self.test_dir, backend=self.backend)
+        with mock.patch('document_manager.os.scandir', side_effect=AssertionError):
+            self.assertEqual(self.manager.reconcile()['scanned'], [])
+
+    def test_reconcile_full_detects_modified_content(self):
+        """Testa a atualização do tamanho de arquivos alterados no lugar"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.reconcile()
+        dest = self.manager._document_path('artigos', 'test_file_2023.pdf')
+        with open(dest, 'a') as f:
+            f.write(" com mais texto")
+
+        self.assertEqual(self.manager.reconcile()['updated'], [])
+        report = self.manager.reconcile(full=True)
+        self.assertEqual(report['updated'], [self.rel_path('artigos', 'test_file_2023.pdf')])
+        self.assertEqual(self.manager.list_documents()[0]['size'], dest.stat().st_size)
+        self.assertEqual(self.manager.get_statistics()['total_size_bytes'], dest.stat().st_size)
+
+    def test_statistics_maintained_incrementally(self):
+        """Testa a atualização das estatísticas a cada alteração"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2020)
+        self.manager.rename_document('test_file_2023.pdf', 'renomeado', 'artigos')
+        self.manager.remove_document('test_file_2023.epub', 'livros')
+
+        stats = self.manager.get_statistics()
+        self.assertEqual(stats['total_documents'], 1)
+        self.assertEqual(stats['by_type'], {'artigos': 1})
+        self.assertEqual(stats['by_year'], {2023: 1})
+        self.assertEqual(stats['oldest_year'], 2023)
+        self.assertEqual(stats['newest_year'], 2023)
+        self.assertTrue(self.manager.verify_statistics()['consistent'])
+
+    def test_statistics_persisted(self):
+        """Testa que as estatísticas são recarregadas em nova instância"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.close()
+
+        self.manager = DocumentManager(self.test_dir, backend=self.backend)
+        stats = self.manager.get_statistics()
+        self.assertEqual(stats['total_documents'], 1)
+        self.assertEqual(stats['by_year'], {2023: 1})
+
+    def test_verify_statistics_reports_drift(self):
+        """Testa a detecção e correção de divergências nas estatísticas"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+        self.manager.statistics.total_documents += 2
+        self.manager.statistics.by_year[1990] = 1
+
+        report = self.manager.verify_statistics()
+        self.assertFalse(report['consistent'])
+        self.assertEqual(report['drift']['total_documents'], {'expected': 1, 'actual': 3})
+        self.assertIn('by_year', report['drift'])
+
+        self.assertTrue(self.manager.verify_statistics()['consistent'])
+        self.assertEqual(self.manager.get_statistics()['total_documents'], 1)
+
+
+class TestDocumentManagerSharded(TestDocumentManager):
+    """Executa os mesmos testes com os arquivos em subdiretórios de fragmento"""
+
+    layout = 'sharded'
+
+    def test_files_stored_in_shards(self):
+        """Testa que os documentos ficam em subdiretórios de fragmento"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+
+        shard = DocumentManager._shard('test_file_2023.pdf')
+        self.assertTrue((Path(self.test_dir) / 'artigos' / shard / 'test_file_2023.pdf').exists())
+        self.assertEqual(self.manager.list_documents()[0]['filename'], 'test_file_2023.pdf')
+
+    def test_duplicate_names_resolved_without_rescanning(self):
+        """Testa que cada nome repetido consulta o disco um número constante de vezes"""
+        for _ in range(5):
+            self.manager.add_document(self.test_files['.pdf'], 'artigos')
+
+        # Uma nova instância (outro processo) parte dos sufixos registrados
+        self.manager.close()
+        self.manager = DocumentManager(self.test_dir, backend=self.backend)
+        with mock.patch.object(self.manager, '_find_document',
+                               wraps=self.manager._find_document) as find:
+            self.manager.add_document(self.test_files['.pdf'], 'artigos')
+        self.assertEqual(find.call_count, 2)
+        self.assertTrue(self.manager._document_path('artigos', 'test_file_2023_5.pdf').exists())
+
+    def test_layout_mismatch(self):
+        """Testa a recusa em abrir a biblioteca com outro layout"""
+        with self.assertRaises(ValueError):
+            DocumentManager(self.test_dir, backend=self.backend, layout='flat')
+        self.assertEqual(DocumentManager(self.test_dir, backend=self.backend).layout, 'sharded')
+
+    def test_legacy_layout_file(self):
+        """Testa a leitura do layout.json de versões anteriores"""
+        legacy_dir = Path(tempfile.mkdtemp())
+        try:
+            (legacy_dir / "layout.json").write_text(json.dumps({'layout': 'sharded'}))
+            manager = DocumentManager(str(legacy_dir))
+            self.assertEqual(manager.layout, 'sharded')
+            manager.close()
+            self.assertFalse((legacy_dir / "layout.json").exists())
+            self.assertEqual(json.loads((legacy_dir / "library.json").read_text())['layout'],
+                             'sharded')
+        finally:
+            shutil.rmtree(legacy_dir)
+
+    def test_migrate_layout(self):
+        """Testa a conversão de uma biblioteca entre os layouts"""
+        self.manager.migrate_layout('flat')
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023, author="Autor")
+        self.manager.add_document(self.test_files['.epub'], 'livros', year=2020)
+        (Path(self.test_dir) / 'teses' / 'externa.pdf').write_text("Externa")
+        self.assertTrue((Path(self.test_dir) / 'artigos' / 'test_file_2023.pdf').exists())
+
+        moved = self.manager.migrate_layout('sharded')
+
+        self.assertEqual(moved, 3)
+        self.assertTrue(self.manager._document_path('teses', 'externa.pdf').exists())
+        docs = {d['filename']: d for d in self.manager.list_documents()}
+        self.assertEqual(set(docs), {'test_file_2023.pdf', 'test_file_2023.epub', 'externa.pdf'})
+        self.assertEqual(docs['test_file_2023.pdf']['author'], "Autor")
+        self.assertEqual(len(self.manager.search_documents("autor")), 1)
+        self.assertTrue(self.manager.remove_document('test_file_2023.epub', 'livros'))
+
+        self.manager.close()
+        self.manager = DocumentManager(self.test_dir, backend=self.backend)
+        self.assertEqual(self.manager.layout, 'sharded')
+        self.assertEqual(len(self.manager.metadata), 1)
+        self.assertEqual(self.manager.reconcile()['added'],
+                         [str(self.manager._document_path('teses', 'externa.pdf')
+                              .relative_to(self.test_dir))])
+
+
+class TestDocumentManagerSqlite(TestDocumentManager):
+    """Executa os mesmos testes com o backend de metadados SQLite"""
+
+    backend = 'sqlite'
+
+    def test_metadata_in_database(self):
+        """Testa que os metadados são gravados no banco e não no JSON"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+
+        self.assertTrue((Path(self.test_dir) / 'metadata.db').exists())
+        self.assertFalse((Path(self.test_dir) / 'metadata.json').exists())
+
+    def test_migration_from_json(self):
+        """Testa a migração única de um metadata.json existente"""
+        json_dir = tempfile.mkdtemp()
+        try:
+            json_manager = DocumentManager(json_dir)
+            json_manager.add_document(self.test_files['.pdf'], 'artigos',
+                                      author="João Silva", title="Título")
+            json_manager.add_document(self.test_files['.epub'], 'livros', year=1999)
+
+            sqlite_manager = DocumentManager(json_dir, backend='sqlite')
+            docs = sqlite_manager.list_documents(doc_type='artigos')
+            self.assertEqual(len(docs), 1)
+            self.assertEqual(docs[0]['author'], "João Silva")
+            self.assertEqual(docs[0]['year'], 2023)
+            self.assertEqual(len(sqlite_manager.search_documents("joão")), 1)
+            self.assertEqual(sqlite_manager.get_statistics()['oldest_year'], 1999)
+            sqlite_manager.close()
+        finally:
+            shutil.rmtree(json_dir)
+
+    def test_backend_recorded(self):
+        """Testa que o backend fica registrado e é usado ao reabrir"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos')
+        self.manager.close()
+
+        self.manager = DocumentManager(self.test_dir)
+        self.assertEqual(self.manager.backend, 'sqlite')
+        self.assertEqual(len(self.manager.list_documents()), 1)
+        with self.assertRaises(ValueError):
+            DocumentManager(self.test_dir, backend='json')
+
+    def test_invalid_backend(self):
+        """Testa criação com backend inválido"""
+        with self.assertRaises(ValueError):
+            DocumentManager(self.test_dir, backend='invalido')
+
+
+class TestDocumentManagerBinary(TestDocumentManager):
+    """Executa os mesmos testes com o backend de metadados binário (mmap)"""
+
+    backend = 'binary'
+
+    def test_metadata_in_binary_file(self):
+        """Testa que os metadados são gravados no metadata.bin e não no JSON"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023)
+
+        self.assertTrue((Path(self.test_dir) / 'metadata.bin').exists())
+        self.assertFalse((Path(self.test_dir) / 'metadata.json').exists())
+
+    def test_indexes_loaded_on_first_use(self):
+        """Testa que abrir a biblioteca não carrega os índices"""
+        self.manager.add_document(self.test_files['.pdf'], 'artigos', year=2023, author="Ana")
+        self.manager.close()
+
+        reopened = DocumentManager(self.test_dir, backend='binary')
+        self.assertEqual(reopened._loaded_indexes, set())
+        self.assertEqual(len(reopened.search_documents("ana")), 1)
+        self.assertNotIn(id(reopened._statistics), reopened._loaded_indexes)
+        reopened.close()
+
 
 def run_tests():
     """Executa todos os testes"""
     # Cria suite de testes
     loader = unittest.TestLoader()
     suite = loader.loadTestsFromTestCase(TestDocumentManager)
+    suite.addTests(loader.loadTestsFromTestCase(TestDocumentManagerSharded))
+    suite.addTests(loader.loadTestsFromTestCase(TestDocumentManagerSqlite))
+    suite.addTests(loader.loadTestsFromTestCase(TestDocumentManagerBinary))
 
     # Executa testes com verbosidade
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,180 @@
+"""
+Testes unitários para o módulo facet_index
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from facet_index import FacetIndex, iter_bits, to_bitmap
+from document_manager import DocumentManager
+
+
+class TestFacetIndex(unittest.TestCase):
+    """Testes para o índice de facetas"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.index = FacetIndex()
+        self.records = {
+            'artigos/redes_2020.pdf': {'type': 'artigos', 'year': 2020, 'author': 'João Silva',
+                                       'file_size': 1500, 'added_date': '2024-01-10T09:00:00'},
+            'artigos/grafos_2015.pdf': {'type': 'artigos', 'year': 2015, 'author': 'Ana Costa',
+                                        'file_size': 300, 'added_date': '2024-03-05T12:00:00'},
+            'teses/tese_2018.pdf': {'type': 'teses', 'year': 2018, 'author': 'João Pereira',
+                                    'file_size': 90000, 'added_date': '2024-03-20T08:30:00'},
+            'livros/python.epub': {'type': 'livros', 'year': None, 'author': 'Maria Souza',
+                                   'file_size': 2048, 'added_date': 'N/A'},
+        }
+        for key, record in self.records.items():
+            self.index.add(key, record)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def select(self, **filters):
+        """Chaves selecionadas pelos filtros, ordenadas"""
+        return sorted(self.index.keys(self.index.select(filters)))
+
+    def test_bitmap_helpers(self):
+        """Testa a conversão entre posições e bitmaps"""
+        slots = [0, 3, 63, 64, 200]
+        self.assertEqual(list(iter_bits(to_bitmap(slots))), slots)
+        self.assertEqual(list(iter_bits(0)), [])
+
+    def test_select_combines_filters(self):
+        """Testa OR entre valores de um campo e AND entre campos"""
+        self.assertEqual(self.select(type=['artigos', 'teses'], year_from=2016),
+                         ['artigos/redes_2020.pdf', 'teses/tese_2018.pdf'])
+        self.assertEqual(self.select(year=[2015, 2018]),
+                         ['artigos/grafos_2015.pdf', 'teses/tese_2018.pdf'])
+        self.assertEqual(self.select(author='joão', year_to=2019), ['teses/tese_2018.pdf'])
+        self.assertEqual(self.select(type='livros', year_from=2000), [])
+        self.assertEqual(len(self.select()), 4)
+
+    def test_select_size_and_date_ranges(self):
+        """Testa limites inclusivos de tamanho e de data de adição"""
+        self.assertEqual(self.select(min_size=1500, max_size=2048),
+                         ['artigos/redes_2020.pdf', 'livros/python.epub'])
+        self.assertEqual(self.select(min_size=2049), ['teses/tese_2018.pdf'])
+        self.assertEqual(self.select(added_from='2024-03'),
+                         ['artigos/grafos_2015.pdf', 'teses/tese_2018.pdf'])
+        self.assertEqual(self.select(added_from='2024-01-10', added_to='2024-03-05'),
+                         ['artigos/grafos_2015.pdf', 'artigos/redes_2020.pdf'])
+        self.assertEqual(self.select(added_to='2024'), self.select(added_from='2000'))
+
+    def test_facet_counts(self):
+        """Testa as contagens por valor restritas ao resultado"""
+        counts = self.index.facet_counts(self.index.select({'author': 'joão'}),
+                                         ['type', 'year', 'author', 'size', 'added_date'])
+        self.assertEqual(counts['type'], {'artigos': 1, 'teses': 1})
+        self.assertEqual(counts['year'], {2020: 1, 2018: 1})
+        self.assertEqual(counts['author'], {'João Silva': 1, 'João Pereira': 1})
+        self.assertEqual(counts['size'], {1024: 1, 65536: 1})
+        self.assertEqual(counts['added_date'], {'2024-01': 1, '2024-03': 1})
+
+        with self.assertRaises(ValueError):
+            self.index.facet_counts(0, ['title'])
+
+    def test_updates_and_compaction(self):
+        """Testa remoções, reinclusões e a renumeração das posições"""
+        self.index.remove('artigos/grafos_2015.pdf')
+        self.index.add('teses/tese_2018.pdf', dict(self.records['teses/tese_2018.pdf'], year=2019))
+        self.assertEqual(self.select(type='artigos'), ['artigos/redes_2020.pdf'])
+        self.assertEqual(self.select(year=2019), ['teses/tese_2018.pdf'])
+        self.assertEqual(self.select(year=2018), [])
+
+        for i in range(3000):
+            self.index.add(f'artigos/extra_{i}.pdf', {'type': 'artigos', 'year': 2001})
+        for i in range(3000):
+            self.index.remove(f'artigos/extra_{i}.pdf')
+        self.assertLess(len(self.index._keys), 3000)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.select(type='artigos'), ['artigos/redes_2020.pdf'])
+
+    def test_save_and_load(self):
+        """Testa a persistência com a identificação dos metadados"""
+        index_file = Path(self.test_dir) / "facet_index.json"
+        self.index.save(index_file, "v1")
+
+        loaded = FacetIndex()
+        self.assertFalse(loaded.load(index_file, "v2"))
+        self.assertTrue(loaded.load(index_file, "v1"))
+        self.assertEqual(list(loaded.keys()), list(self.index.keys()))
+        self.assertEqual(sorted(loaded.keys(loaded.select({'min_size': 1000}))),
+                         self.select(min_size=1000))
+
+    def test_dates_outside_iso_format(self):
+        """Testa datas de adição que a coluna em microssegundos não representa"""
+        self.index.add('artigos/antigo.pdf', {'type': 'artigos', 'file_size': 10,
+                                              'added_date': '2024-03-07 10:00'})
+        index_file = Path(self.test_dir) / "facet_index.json"
+        self.index.save(index_file, "v1")
+        loaded = FacetIndex()
+        self.assertTrue(loaded.load(index_file, "v1"))
+
+        for index in (self.index, loaded):
+            self.assertEqual(sorted(index.keys(index.select({'added_from': '2024-03-06',
+                                                             'added_to': '2024-03'}))),
+                             ['artigos/antigo.pdf', 'teses/tese_2018.pdf'])
+            self.assertEqual(index.facet_counts(index.select(), ['added_date'])['added_date'],
+                             {'2024-01': 1, '2024-03': 3})
+        loaded.remove('artigos/antigo.pdf')
+        self.assertEqual(loaded._odd_dates, {})
+
+    def test_document_manager_query(self):
+        """Testa filtros combinados e facetas no DocumentManager"""
+        manager = DocumentManager(self.test_dir)
+        sources = Path(self.test_dir) / "origem"
+        sources.mkdir()
+        for name, doc_type, year, size in [("a_2010.pdf", 'artigos', 2010, 100),
+                                           ("b_2020.pdf", 'artigos', 2020, 5000),
+                                           ("c_2021.pdf", 'teses', 2021, 7000),
+                                           ("d.epub", 'livros', None, 50)]:
+            (sources / name).write_bytes(b"x" * size)
+            manager.add_document(str(sources / name), doc_type, year=year, author="Ana")
+
+        result = manager.query_documents({'type': ['artigos', 'teses'], 'min_size': 1000},
+                                         facets=['type', 'year'], sort_by='year')
+        self.assertEqual(result['total'], 2)
+        self.assertEqual([d['filename'] for d in result['documents']], ["b_2020.pdf", "c_2021.pdf"])
+        self.assertEqual(result['facets'], {'type': {'artigos': 1, 'teses': 1},
+                                            'year': {2020: 1, 2021: 1}})
+
+        # Arquivos sem metadados entram nas contagens; arquivos apagados saem
+        (Path(self.test_dir) / "livros" / "avulso.epub").write_bytes(b"y" * 10)
+        os.remove(Path(self.test_dir) / "artigos" / "a_2010.pdf")
+        result = manager.query_documents(facets=['type'], limit=1)
+        self.assertEqual(result['total'], 4)
+        self.assertEqual(len(result['documents']), 1)
+        self.assertEqual(result['facets']['type'], {'artigos': 1, 'teses': 1, 'livros': 2})
+
+        with self.assertRaises(ValueError):
+            manager.query_documents({'title': 'x'})
+        with self.assertRaises(ValueError):
+            manager.query_documents(facets=['title'])
+        manager.close()
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestFacetIndex)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
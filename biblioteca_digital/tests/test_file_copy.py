@@ -0,0 +1,157 @@
+"""
+Testes unitários para as estratégias de cópia de arquivos
+"""
+
+import unittest
+import tempfile
+import shutil
+import errno
+from pathlib import Path
+import sys
+import os
+from unittest import mock
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import file_copy
+from file_copy import COPY_STRATEGIES, copy_file
+from document_manager import DocumentManager
+
+
+class TestFileCopy(unittest.TestCase):
+    """Testes para copy_file e sua integração com o DocumentManager"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.content = os.urandom(3 * 1024 * 1024 + 17)
+        self.source = self.test_dir / "livro_2019.pdf"
+        self.source.write_bytes(self.content)
+        os.utime(self.source, (1_500_000_000, 1_500_000_000))
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_auto_copies_content_and_metadata(self):
+        """Testa a cópia automática preservando conteúdo e datas"""
+        dest = self.test_dir / "copia.pdf"
+        used = copy_file(self.source, dest)
+
+        self.assertIn(used, COPY_STRATEGIES)
+        self.assertEqual(dest.read_bytes(), self.content)
+        self.assertEqual(dest.stat().st_mtime, self.source.stat().st_mtime)
+
+    def test_each_strategy_copies_or_reports_unsupported(self):
+        """Testa cada estratégia forçada: copia ou falha com OSError"""
+        for strategy in COPY_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                dest = self.test_dir / f"copia_{strategy}.pdf"
+                try:
+                    used = copy_file(self.source, dest, strategy)
+                except OSError:
+                    self.assertIn(strategy, ('reflink', 'copy_file_range', 'sendfile'))
+                    continue
+                if strategy != 'auto':
+                    self.assertEqual(used, strategy)
+                self.assertEqual(dest.read_bytes(), self.content)
+
+    def test_falls_back_when_unsupported(self):
+        """Testa a passagem para a estratégia seguinte após erro de suporte"""
+        def failing(src_fd, dst_fd, size):
+            os.write(dst_fd, b"parcial")
+            raise OSError(errno.EXDEV, "sem suporte")
+
+        strategies = dict(file_copy.STRATEGIES, reflink=failing,
+                          copy_file_range=failing, sendfile=failing)
+        dest = self.test_dir / "copia.pdf"
+        with mock.patch.dict(file_copy.STRATEGIES, strategies):
+            used = copy_file(self.source, dest)
+
+        self.assertEqual(used, 'shutil')
+        self.assertEqual(dest.read_bytes(), self.content)
+
+    def test_io_errors_are_not_hidden(self):
+        """Testa que erros de gravação não disparam a estratégia seguinte"""
+        def failing(src_fd, dst_fd, size):
+            raise OSError(errno.ENOSPC, "sem espaço")
+
+        with mock.patch.dict(file_copy.STRATEGIES, {'reflink': failing}):
+            with self.assertRaises(OSError):
+                copy_file(self.source, self.test_dir / "copia.pdf")
+
+    def test_last_strategy_error_is_raised(self):
+        """Testa que a falha da última estratégia chega a quem chamou"""
+        def unsupported(src_fd, dst_fd, size):
+            raise OSError(errno.EOPNOTSUPP, "sem suporte")
+
+        def denied(src_fd, dst_fd, size):
+            raise OSError(errno.EPERM, "sem permissão")
+
+        strategies = dict(file_copy.STRATEGIES, reflink=unsupported,
+                          copy_file_range=unsupported, sendfile=unsupported, shutil=denied)
+        with mock.patch.dict(file_copy.STRATEGIES, strategies):
+            with self.assertRaises(PermissionError):
+                copy_file(self.source, self.test_dir / "copia.pdf")
+
+        # EPERM só indica estratégia indisponível no reflink e no copy_file_range
+        strategies.update(sendfile=denied, shutil=file_copy.STRATEGIES['shutil'])
+        with mock.patch.dict(file_copy.STRATEGIES, strategies):
+            with self.assertRaises(PermissionError):
+                copy_file(self.source, self.test_dir / "copia.pdf")
+            strategies.update(reflink=denied, copy_file_range=denied, sendfile=unsupported)
+            file_copy.STRATEGIES.update(strategies)
+            self.assertEqual(copy_file(self.source, self.test_dir / "copia.pdf"), 'shutil')
+
+    def test_kernel_copy_stopping_early_fails(self):
+        """Testa que um retorno 0 antes do fim não passa por cópia completa"""
+        for strategy, call in (('copy_file_range', 'copy_file_range'), ('sendfile', 'sendfile')):
+            with self.subTest(strategy=strategy):
+                dest = self.test_dir / f"copia_{strategy}.pdf"
+                # Origem que encolhe durante a cópia: um trecho e depois fim
+                with mock.patch.object(file_copy.os, call, side_effect=[1024, 0], create=True):
+                    with self.assertRaises(OSError) as ctx:
+                        copy_file(self.source, dest, strategy)
+                self.assertEqual(ctx.exception.errno, errno.EIO)
+
+                # Nenhum byte copiado: a estratégia 'auto' passa para a seguinte
+                with mock.patch.object(file_copy.os, call, return_value=0, create=True):
+                    strategies = {name: file_copy.STRATEGIES[name]
+                                  for name in (strategy, 'shutil')}
+                    with mock.patch.dict(file_copy.STRATEGIES, strategies, clear=True):
+                        self.assertEqual(copy_file(self.source, dest), 'shutil')
+                self.assertEqual(dest.read_bytes(), self.content)
+
+    def test_invalid_strategy(self):
+        """Testa a rejeição de estratégias desconhecidas"""
+        with self.assertRaises(ValueError):
+            copy_file(self.source, self.test_dir / "copia.pdf", 'mmap')
+        with self.assertRaises(ValueError):
+            DocumentManager(str(self.test_dir / "biblioteca"), copy_strategy='mmap')
+
+    def test_manager_uses_forced_strategy(self):
+        """Testa a estratégia configurada no DocumentManager"""
+        manager = DocumentManager(str(self.test_dir / "biblioteca"), copy_strategy='shutil')
+        with mock.patch('document_manager.copy_file', wraps=copy_file) as copy:
+            manager.add_document(str(self.source), 'livros')
+        manager.close()
+
+        copy.assert_called_once()
+        self.assertEqual(copy.call_args[0][2], 'shutil')
+        self.assertEqual((self.test_dir / "biblioteca" / "livros" / "livro_2019.pdf").read_bytes(),
+                         self.content)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestFileCopy)
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,195 @@
+"""
+Testes unitários para o módulo http_api
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import threading
+import http.client
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from http_api import create_server, parse_range
+from document_manager import DocumentManager
+
+
+class TestParseRange(unittest.TestCase):
+    """Testes para a interpretação do cabeçalho Range"""
+
+    def test_forms(self):
+        """Testa intervalos fechados, abertos, sufixos e cabeçalhos ignorados"""
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=990-5000', 1000), (990, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(parse_range('items=0-1', 1000))
+        self.assertIsNone(parse_range('bytes=abc', 1000))
+        for header in ('bytes=1000-', 'bytes=5-1', 'bytes=-0'):
+            with self.assertRaises(ValueError):
+                parse_range(header, 1000)
+
+
+class TestHTTPAPI(unittest.TestCase):
+    """Testes para a API HTTP somente leitura"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = DocumentManager(os.path.join(self.test_dir, "biblioteca"))
+        self.content = bytes(range(256)) * 40
+        for name, doc_type, author in [("Silva_Redes_2020.pdf", 'artigos', 'João Silva'),
+                                       ("Python_Avançado_2018.epub", 'livros', 'Maria Souza')]:
+            source = Path(self.test_dir) / name
+            source.write_bytes(self.content)
+            self.manager.add_document(str(source), doc_type, author=author)
+
+        self.server = create_server(self.manager, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=5)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def request(self, path: str, headers=None, method: str = 'GET'):
+        """Faz uma requisição na conexão persistente; devolve (resposta, corpo)"""
+        self.conn.request(method, path, headers=headers or {})
+        response = self.conn.getresponse()
+        return response, response.read()
+
+    def get_json(self, path: str):
+        response, body = self.request(path)
+        self.assertEqual(response.status, 200, body)
+        self.assertEqual(response.getheader('Content-Type'), 'application/json; charset=utf-8')
+        return json.loads(body)
+
+    def test_views(self):
+        """Testa listagem, filtros, busca, estatísticas e agrupamentos"""
+        page = self.get_json('/documents?sort=year')
+        self.assertEqual([d['filename'] for d in page['documents']],
+                         ["Python_Avançado_2018.epub", "Silva_Redes_2020.pdf"])
+        page = self.get_json('/documents?type=artigos&type=teses&year_from=2019')
+        self.assertEqual([d['filename'] for d in page['documents']], ["Silva_Redes_2020.pdf"])
+        page = self.get_json('/documents?limit=1&sort=title')
+        self.assertIsNotNone(page['next_cursor'])
+
+        results = self.get_json('/search?q=silva')
+        self.assertEqual([d['author'] for d in results['documents']], ['João Silva'])
+        self.assertEqual(self.get_json('/stats')['total_documents'], 2)
+        self.assertEqual(sorted(self.get_json('/by-year')), ['2018', '2020'])
+        self.assertEqual(len(self.get_json('/by-type')['livros']), 1)
+        self.assertIn('/documents', self.get_json('/')['resources'])
+
+    def test_errors(self):
+        """Testa recursos inexistentes e parâmetros inválidos"""
+        self.assertEqual(self.request('/nada')[0].status, 404)
+        self.assertEqual(self.request('/search')[0].status, 400)
+        self.assertEqual(self.request('/documents?year=abc')[0].status, 400)
+        self.assertEqual(self.request('/documents?limit=0')[0].status, 400)
+        self.assertEqual(self.request('/documents?sort=cor')[0].status, 400)
+        self.assertEqual(self.request('/files/artigos/nada.pdf')[0].status, 404)
+        self.assertEqual(self.request('/files/artigos/..%2F..%2Fmetadata.json')[0].status, 404)
+        self.assertEqual(self.request('/files/revistas/a.pdf')[0].status, 404)
+
+    def test_keep_alive(self):
+        """Testa várias requisições na mesma conexão"""
+        self.get_json('/stats')
+        sock = self.conn.sock
+        self.assertIsNotNone(sock)
+        self.get_json('/documents')
+        self.request('/nada')
+        self.request('/files/artigos/Silva_Redes_2020.pdf', {'Range': 'bytes=0-9'})
+        self.get_json('/stats')
+        self.assertIs(self.conn.sock, sock)
+
+    def test_etag(self):
+        """Testa respostas 304 e a mudança do ETag quando a biblioteca muda"""
+        response, _ = self.request('/stats')
+        etag = response.getheader('ETag')
+        self.assertTrue(etag)
+
+        response, body = self.request('/stats', {'If-None-Match': etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b'')
+        response, _ = self.request('/documents', {'If-None-Match': f'"outro", {etag}'})
+        self.assertEqual(response.status, 304)
+
+        with self.server.lock:
+            self.manager.remove_document("Silva_Redes_2020.pdf", 'artigos')
+        response, body = self.request('/stats', {'If-None-Match': etag})
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.getheader('ETag'), etag)
+        self.assertEqual(json.loads(body)['total_documents'], 1)
+
+        # Arquivos incluídos por fora do gerenciador também mudam o ETag
+        etag = response.getheader('ETag')
+        (self.manager.base_path / "teses" / "Externa_2021.pdf").write_bytes(b"x")
+        response, body = self.request('/stats', {'If-None-Match': etag})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(body)['total_documents'], 2)
+
+    def test_download_and_ranges(self):
+        """Testa download completo, intervalos, HEAD e If-Range"""
+        path = '/files/livros/Python_Avan%C3%A7ado_2018.epub'
+        response, body = self.request(path)
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response.getheader('Accept-Ranges'), 'bytes')
+        self.assertEqual(response.getheader('Content-Type'), 'application/epub+zip')
+        etag = response.getheader('ETag')
+
+        response, body = self.request(path, {'Range': 'bytes=100-199'})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(body, self.content[100:200])
+        self.assertEqual(response.getheader('Content-Range'), f"bytes 100-199/{len(self.content)}")
+
+        response, body = self.request(path, {'Range': 'bytes=-10'})
+        self.assertEqual(body, self.content[-10:])
+
+        response, body = self.request(path, {'Range': f'bytes={len(self.content)}-'})
+        self.assertEqual(response.status, 416)
+        self.assertEqual(response.getheader('Content-Range'), f"bytes */{len(self.content)}")
+
+        response, body = self.request(path, {'Range': 'bytes=0-9', 'If-Range': '"antigo"'})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(body), len(self.content))
+
+        response, body = self.request(path, {'If-None-Match': etag})
+        self.assertEqual(response.status, 304)
+
+        response, body = self.request(path, method='HEAD')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Length'), str(len(self.content)))
+        self.assertEqual(body, b'')
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestParseRange))
+    suite.addTests(loader.loadTestsFromTestCase(TestHTTPAPI))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
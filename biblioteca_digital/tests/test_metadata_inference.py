@@ -0,0 +1,304 @@
+"""
+Testes unitários para o módulo metadata_inference
+"""
+
+import unittest
+import tempfile
+import shutil
+import zipfile
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from metadata_inference import InferenceCache, content_key, infer_metadata, HEADER_SIZE
+from document_manager import DocumentManager
+
+XMP = """<?xpacket begin="" id="W5M0MpCehiHzreSzNTczkc9d"?>
+<x:xmpmeta xmlns:x="adobe:ns:meta/">
+ <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+  <rdf:Description rdf:about="" xmlns:dc="http://purl.org/dc/elements/1.1/"
+      xmlns:xmp="http://ns.adobe.com/xap/1.0/" xmp:CreateDate="2017-03-01T10:00:00Z">
+   <dc:title><rdf:Alt><rdf:li xml:lang="x-default">Redes &amp; Grafos</rdf:li></rdf:Alt></dc:title>
+   <dc:creator><rdf:Seq><rdf:li>Ana Lima</rdf:li><rdf:li>Rui Costa</rdf:li></rdf:Seq></dc:creator>
+  </rdf:Description>
+ </rdf:RDF>
+</x:xmpmeta>
+<?xpacket end="w"?>"""
+
+
+def make_pdf(path: Path, info: bytes = b'', xmp: str = '', padding: int = 0):
+    """Grava um PDF mínimo com dicionário Info e pacote XMP opcionais"""
+    parts = [b'%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Outlines 2 0 R >>\nendobj\n',
+             b'2 0 obj\n<< /Title (Capitulo 1) /Parent 1 0 R >>\nendobj\n']
+    if xmp:
+        data = xmp.encode('utf-8')
+        parts.append(b'3 0 obj\n<< /Type /Metadata /Subtype /XML /Length %d >>\nstream\n'
+                     % len(data)
+                     + data + b'\nendstream\nendobj\n')
+    parts.append(b'4 0 obj\n<< /Length %d >>\nstream\n' % padding + b'x' * padding
+                 + b'\nendstream\nendobj\n')
+    if info:
+        parts.append(b'5 0 obj\n<< ' + info + b' >>\nendobj\n')
+    parts.append(b'trailer\n<< /Root 1 0 R' + (b' /Info 5 0 R' if info else b'')
+                 + b' >>\n%%EOF\n')
+    path.write_bytes(b''.join(parts))
+
+
+def make_epub(path: Path, opf_path: str = 'OEBPS/content.opf'):
+    """Grava um EPUB mínimo com o pacote OPF em opf_path"""
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('mimetype', 'application/epub+zip')
+        archive.writestr('META-INF/container.xml', f"""<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="{opf_path}" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>""")
+        archive.writestr(opf_path, """<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:title>  Python
+      Avançado </dc:title>
+    <dc:creator>Maria Souza</dc:creator>
+    <dc:creator>José Alves</dc:creator>
+    <dc:date>2018-05</dc:date>
+  </metadata>
+  <manifest/>
+</package>""")
+
+
+def make_docx(path: Path, created: str = '2021-09-10T08:00:00Z'):
+    """Grava um DOCX mínimo com docProps/core.xml"""
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('word/document.xml', '<w:document/>')
+        archive.writestr('docProps/core.xml', f"""<?xml version="1.0"?>
+<cp:coreProperties
+    xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"
+    xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/">
+  <dc:title>Aprendizado de Máquina</dc:title>
+  <dc:creator>Carla Dias</dc:creator>
+  <dcterms:created>{created}</dcterms:created>
+</cp:coreProperties>""")
+
+
+def mark_encrypted(path: Path):
+    """Marca as entradas de um ZIP como cifradas (bit 0 das flags)"""
+    data = bytearray(path.read_bytes())
+    for signature, offset in ((b'PK\x03\x04', 6), (b'PK\x01\x02', 8)):
+        start = data.find(signature)
+        while start != -1:
+            data[start + offset] |= 0x01
+            start = data.find(signature, start + 4)
+    path.write_bytes(bytes(data))
+
+
+class TestInferMetadata(unittest.TestCase):
+    """Testes para a leitura dos metadados embutidos"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_pdf_info(self):
+        """Testa o dicionário Info com escapes, UTF-16 e data de criação"""
+        path = self.test_dir / "a.pdf"
+        make_pdf(path, info=b"/Title <FEFF0052006500640065007300200031> "
+                            b"/Author (Jo\\343o \\(Silva\\)) /CreationDate (D:20200115120000Z)",
+                 padding=3 * HEADER_SIZE)
+        self.assertEqual(infer_metadata(path),
+                         {'title': 'Redes 1', 'author': 'João (Silva)', 'year': 2020})
+
+    def test_pdf_xmp_takes_precedence(self):
+        """Testa o XMP no início do arquivo, completado pelo Info"""
+        path = self.test_dir / "b.pdf"
+        make_pdf(path, info=b"/Title (Antigo) /Producer (Teste)", xmp=XMP, padding=3 * HEADER_SIZE)
+        self.assertEqual(infer_metadata(path),
+                         {'title': 'Redes & Grafos', 'author': 'Ana Lima; Rui Costa',
+                          'year': 2017})
+
+    def test_pdf_without_metadata(self):
+        """Testa que o título de um marcador não é tomado como título do documento"""
+        path = self.test_dir / "c.pdf"
+        make_pdf(path)
+        self.assertEqual(infer_metadata(path), {})
+        (self.test_dir / "d.pdf").write_bytes(b"x" * 100)
+        self.assertEqual(infer_metadata(self.test_dir / "d.pdf"), {})
+
+    def test_epub_and_docx(self):
+        """Testa o pacote OPF do EPUB e o core.xml do DOCX"""
+        make_epub(self.test_dir / "e.epub")
+        self.assertEqual(infer_metadata(self.test_dir / "e.epub"),
+                         {'title': 'Python Avançado', 'author': 'Maria Souza; José Alves',
+                          'year': 2018})
+        make_docx(self.test_dir / "f.docx")
+        self.assertEqual(infer_metadata(self.test_dir / "f.docx"),
+                         {'title': 'Aprendizado de Máquina', 'author': 'Carla Dias', 'year': 2021})
+
+    def test_invalid_files(self):
+        """Testa arquivos corrompidos e formatos sem leitura de metadados"""
+        (self.test_dir / "g.epub").write_bytes(b"nao e zip")
+        self.assertEqual(infer_metadata(self.test_dir / "g.epub"), {})
+        with zipfile.ZipFile(self.test_dir / "h.docx", 'w') as archive:
+            archive.writestr('docProps/core.xml', '<cp:coreProperties')
+        self.assertEqual(infer_metadata(self.test_dir / "h.docx"), {})
+        make_docx(self.test_dir / "cifrado.docx")
+        mark_encrypted(self.test_dir / "cifrado.docx")
+        self.assertEqual(infer_metadata(self.test_dir / "cifrado.docx"), {})
+        with self.assertRaises(ValueError):
+            infer_metadata(self.test_dir / "i.txt")
+
+    def test_content_key(self):
+        """Testa que a chave depende do conteúdo e do formato, não do nome"""
+        make_docx(self.test_dir / "a.docx")
+        shutil.copy(self.test_dir / "a.docx", self.test_dir / "b.docx")
+        make_docx(self.test_dir / "c.docx", created='2022-01-01T00:00:00Z')
+        shutil.copy(self.test_dir / "a.docx", self.test_dir / "a.epub")
+        key = content_key(self.test_dir / "a.docx")
+        self.assertEqual(key, content_key(self.test_dir / "b.docx"))
+        self.assertNotEqual(key, content_key(self.test_dir / "c.docx"))
+        self.assertNotEqual(key, content_key(self.test_dir / "a.epub"))
+
+
+class TestInferenceCache(unittest.TestCase):
+    """Testes para o cache dos metadados inferidos"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_persistence_and_eviction(self):
+        """Testa a gravação, a releitura e o descarte das entradas mais antigas"""
+        cache_file = self.test_dir / "cache.json"
+        cache = InferenceCache(cache_file)
+        cache.MAX_ENTRIES = 2
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', {'title': 'A'})
+        cache.put('b', {})
+        cache.put('c', {'year': 2020})
+        cache.save()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        reopened = InferenceCache(cache_file)
+        self.assertIsNone(reopened.get('a'))
+        self.assertEqual(reopened.get('b'), {})
+        self.assertEqual(reopened.get('c'), {'year': 2020})
+
+        cache_file.write_text("{corrompido", encoding='utf-8')
+        self.assertIsNone(InferenceCache(cache_file).get('c'))
+
+
+class TestManagerInference(unittest.TestCase):
+    """Testes para a inferência na inclusão de documentos"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.base = str(self.test_dir / "biblioteca")
+        self.manager = DocumentManager(self.base, infer_metadata=True)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def record(self, rel_path: str) -> dict:
+        return self.manager.metadata[rel_path]
+
+    def test_add_document(self):
+        """Testa os campos inferidos e a prioridade dos valores informados"""
+        make_epub(self.test_dir / "livro_2010.epub")
+        self.manager.add_document(str(self.test_dir / "livro_2010.epub"), 'livros')
+        record = self.record('livros/livro_2010.epub')
+        self.assertEqual((record['title'], record['author'], record['year']),
+                         ('Python Avançado', 'Maria Souza; José Alves', 2018))
+
+        make_docx(self.test_dir / "artigo.docx")
+        self.manager.add_document(str(self.test_dir / "artigo.docx"), 'artigos',
+                                  year=1999, title="Informado")
+        record = self.record('artigos/artigo.docx')
+        self.assertEqual((record['title'], record['author'], record['year']),
+                         ('Informado', 'Carla Dias', 1999))
+        self.assertEqual(self.manager.search_documents("carla")[0]['filename'], "artigo.docx")
+        operations = self.manager.metrics.as_dict()['operations']
+        self.assertEqual(operations['infer_metadata.docx']['calls'], 1)
+
+    def test_unreadable_file_does_not_stop_import(self):
+        """Testa que um arquivo cifrado é incluído sem os metadados embutidos"""
+        make_docx(self.test_dir / "cifrado_2012.docx")
+        mark_encrypted(self.test_dir / "cifrado_2012.docx")
+        self.manager.add_document(str(self.test_dir / "cifrado_2012.docx"), 'artigos')
+        record = self.record('artigos/cifrado_2012.docx')
+        self.assertEqual((record['title'], record['year']), ('cifrado_2012', 2012))
+
+    def test_disabled_by_default(self):
+        """Testa que sem infer_metadata os metadados embutidos são ignorados"""
+        make_docx(self.test_dir / "artigo_2015.docx")
+        manager = DocumentManager(str(self.test_dir / "outra"))
+        manager.add_document(str(self.test_dir / "artigo_2015.docx"), 'artigos')
+        record = manager.metadata['artigos/artigo_2015.docx']
+        self.assertEqual((record['title'], record['author'], record['year']),
+                         ('artigo_2015', '', 2015))
+        manager.close()
+
+    def test_add_documents_with_process_pool(self):
+        """Testa a importação em lote com o pool de processos e o cache"""
+        make_docx(self.test_dir / "a.docx")
+        make_epub(self.test_dir / "b.epub")
+        make_pdf(self.test_dir / "c.pdf", xmp=XMP)
+        shutil.copy(self.test_dir / "a.docx", self.test_dir / "copia.docx")
+        specs = [
+            {'file_path': str(self.test_dir / "a.docx"), 'doc_type': 'artigos'},
+            {'file_path': str(self.test_dir / "b.epub"), 'doc_type': 'livros'},
+            {'file_path': str(self.test_dir / "c.pdf"), 'doc_type': 'teses',
+             'author': 'Orientador'},
+            {'file_path': str(self.test_dir / "nada.pdf"), 'doc_type': 'teses'},
+        ]
+        results = self.manager.add_documents(specs, workers=2, inference_workers=2)
+        self.assertEqual([r['success'] for r in results], [True, True, True, False])
+        self.assertEqual(self.record('artigos/a.docx')['title'], 'Aprendizado de Máquina')
+        self.assertEqual(self.record('livros/b.epub')['year'], 2018)
+        record = self.record('teses/c.pdf')
+        self.assertEqual((record['title'], record['author']), ('Redes & Grafos', 'Orientador'))
+        operations = self.manager.metrics.as_dict()['operations']
+        self.assertEqual({name for name in operations if name.startswith('infer_metadata.')},
+                         {'infer_metadata.docx', 'infer_metadata.epub', 'infer_metadata.pdf'})
+
+        # O mesmo conteúdo com outro nome vem do cache, também em outra sessão
+        self.manager.close()
+        self.manager = DocumentManager(self.base, infer_metadata=True)
+        self.manager.add_documents([{'file_path': str(self.test_dir / "copia.docx"),
+                                     'doc_type': 'artigos'}], inference_workers=0)
+        self.assertEqual(self.record('artigos/copia.docx')['author'], 'Carla Dias')
+        self.assertEqual(self.manager.inference_cache.hits, 1)
+        self.assertNotIn('infer_metadata.docx', self.manager.metrics.as_dict()['operations'])
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestInferMetadata))
+    suite.addTests(loader.loadTestsFromTestCase(TestInferenceCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestManagerInference))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
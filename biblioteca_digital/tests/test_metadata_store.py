@@ -0,0 +1,231 @@
+"""
+Testes unitários para o módulo metadata_store
+"""
+
+import json
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+import os
+from unittest import mock
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from metadata_store import (JsonMetadataStore, MmapMetadataStore, binary_to_json,
+                            iter_json_object, json_to_binary)
+from document_manager import DocumentManager
+
+
+class TestJsonMetadataStore(unittest.TestCase):
+    """Testes para o armazenamento de metadados com diário"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.metadata_file = Path(self.test_dir) / "metadata.json"
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_snapshot_mode_writes_metadata_file(self):
+        """Testa que o modo padrão reescreve o metadata.json"""
+        store = JsonMetadataStore(self.metadata_file)
+        store['artigos/a.pdf'] = {'title': 'A'}
+        store.flush()
+
+        self.assertTrue(self.metadata_file.exists())
+        self.assertFalse(store.journal_file.exists())
+        self.assertEqual(JsonMetadataStore(self.metadata_file)['artigos/a.pdf'], {'title': 'A'})
+
+    def test_journal_mode_appends_without_snapshot(self):
+        """Testa que o modo diário apenas anexa registros"""
+        store = JsonMetadataStore(self.metadata_file, journal=True)
+        store['artigos/a.pdf'] = {'title': 'A'}
+        store['artigos/b.pdf'] = {'title': 'B'}
+        del store['artigos/a.pdf']
+        store.flush()
+
+        self.assertFalse(self.metadata_file.exists())
+        lines = store.journal_file.read_text(encoding='utf-8').splitlines()
+        self.assertEqual(len(lines), 3)
+
+        reloaded = JsonMetadataStore(self.metadata_file, journal=True)
+        self.assertEqual(dict(reloaded), {'artigos/b.pdf': {'title': 'B'}})
+
+    def test_replay_on_top_of_snapshot(self):
+        """Testa a aplicação do diário sobre o último snapshot"""
+        store = JsonMetadataStore(self.metadata_file, journal=True)
+        store['artigos/a.pdf'] = {'title': 'A'}
+        store.compact()
+        store['artigos/a.pdf'] = {'title': 'A2'}
+        store.flush()
+
+        reloaded = JsonMetadataStore(self.metadata_file, journal=True)
+        self.assertEqual(reloaded['artigos/a.pdf'], {'title': 'A2'})
+        self.assertEqual(reloaded.journal_size, 1)
+
+    def test_snapshot_is_read_record_by_record(self):
+        """Testa a leitura do snapshot um registro por vez"""
+        for text in ['{}', ' {\n} ', '{"a": {"x": [1, {"y": null}]}, "b\\u00e9":"c" ,"d": 3.5}']:
+            self.assertEqual(list(iter_json_object(text)), list(json.loads(text).items()))
+        for text in ['', '[]', '{"a" 1}', '{"a": 1,}', '{"a": 1} x', '{"a": 1', '{"a": tru}']:
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_json_object(text))
+
+        self.metadata_file.write_text('{"artigos/a.pdf": {"title": "A"}, "artigos/b.pdf": ',
+                                      encoding='utf-8')
+        self.assertEqual(len(JsonMetadataStore(self.metadata_file)), 0)
+
+    def test_truncated_journal_line_is_ignored(self):
+        """Testa recuperação de uma gravação interrompida no diário"""
+        store = JsonMetadataStore(self.metadata_file, journal=True)
+        store['artigos/a.pdf'] = {'title': 'A'}
+        store.flush()
+        with open(store.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op": "set", "key": "artigos/b.p')
+
+        reloaded = JsonMetadataStore(self.metadata_file, journal=True)
+        self.assertEqual(list(reloaded), ['artigos/a.pdf'])
+
+    def test_automatic_compaction(self):
+        """Testa a compactação automática ao atingir o limite"""
+        store = JsonMetadataStore(self.metadata_file, journal=True, compact_threshold=3)
+        for i in range(3):
+            store[f'artigos/{i}.pdf'] = {'title': str(i)}
+            store.flush()
+
+        self.assertEqual(store.journal_size, 0)
+        self.assertFalse(store.journal_file.exists())
+        self.assertEqual(len(JsonMetadataStore(self.metadata_file)), 3)
+
+    def test_snapshot_mode_folds_leftover_journal(self):
+        """Testa que abrir sem diário incorpora o diário existente"""
+        store = JsonMetadataStore(self.metadata_file, journal=True)
+        store['artigos/a.pdf'] = {'title': 'A'}
+        store.flush()
+
+        reloaded = JsonMetadataStore(self.metadata_file)
+        self.assertIn('artigos/a.pdf', reloaded)
+        self.assertFalse(reloaded.journal_file.exists())
+
+    def test_document_manager_journal_mode(self):
+        """Testa o DocumentManager operando no modo diário"""
+        source = Path(self.test_dir) / "origem_2021.pdf"
+        source.write_text("Conteúdo de teste")
+
+        manager = DocumentManager(self.test_dir, journal=True)
+        manager.add_document(str(source), 'artigos', author="Autor")
+        manager.rename_document("origem_2021.pdf", "renomeado", 'artigos')
+
+        reloaded = DocumentManager(self.test_dir, journal=True)
+        docs = reloaded.list_documents()
+        self.assertEqual(len(docs), 1)
+        self.assertEqual(docs[0]['filename'], "renomeado.pdf")
+        self.assertEqual(docs[0]['title'], "renomeado")
+        self.assertEqual(docs[0]['year'], 2021)
+
+        reloaded.compact_metadata()
+        self.assertFalse(reloaded.metadata.journal_file.exists())
+        self.assertEqual(len(DocumentManager(self.test_dir).list_documents()), 1)
+
+
+class TestMmapMetadataStore(unittest.TestCase):
+    """Testes para o armazenamento binário mapeado em memória"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.binary_file = Path(self.test_dir) / "metadata.bin"
+        self.records = {
+            'teses/t.pdf': {'type': 'teses', 'year': 2018, 'title': 'Tese'},
+            'artigos/ação.pdf': {'type': 'artigos', 'year': None, 'author': 'João'},
+            'artigos/b.pdf': {'type': 'artigos', 'file_size': 10},
+        }
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_lookup_and_iteration(self):
+        """Testa a busca binária na tabela e a iteração em ordem de chave"""
+        store = MmapMetadataStore(self.binary_file)
+        for key, record in self.records.items():
+            store[key] = record
+        store.flush()
+        store.close()
+
+        store = MmapMetadataStore(self.binary_file)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store['artigos/ação.pdf'], self.records['artigos/ação.pdf'])
+        self.assertNotIn('artigos/c.pdf', store)
+        with mock.patch.object(store, '_record_at', wraps=store._record_at) as decode:
+            self.assertEqual(list(store), sorted(self.records))
+        decode.assert_not_called()
+        self.assertEqual(dict(store.items()), self.records)
+        store.close()
+
+    def test_journal_overlay(self):
+        """Testa alterações no diário sobre o arquivo binário"""
+        store = MmapMetadataStore(self.binary_file, journal=True)
+        store['artigos/b.pdf'] = self.records['artigos/b.pdf']
+        store.compact()
+        size = self.binary_file.stat().st_size
+
+        store['teses/t.pdf'] = self.records['teses/t.pdf']
+        store['artigos/b.pdf'] = {'type': 'artigos', 'file_size': 20}
+        del store['teses/t.pdf']
+        store.flush()
+        store.close()
+        self.assertEqual(self.binary_file.stat().st_size, size)
+
+        reopened = MmapMetadataStore(self.binary_file, journal=True)
+        self.assertEqual(reopened.journal_size, 3)
+        self.assertEqual(dict(reopened.items()),
+                         {'artigos/b.pdf': {'type': 'artigos', 'file_size': 20}})
+        reopened['artigos/novo.pdf'] = {'type': 'artigos'}
+        self.assertEqual(list(reopened), ['artigos/b.pdf', 'artigos/novo.pdf'])
+        self.assertEqual(list(reopened), [key for key, _ in reopened.items()])
+        del reopened['artigos/novo.pdf']
+        with self.assertRaises(KeyError):
+            del reopened['teses/t.pdf']
+        reopened.close()
+
+    def test_invalid_file(self):
+        """Testa a rejeição de um arquivo que não está no formato binário"""
+        self.binary_file.write_bytes(b"{}" * 40)
+        with self.assertRaises(ValueError):
+            MmapMetadataStore(self.binary_file)
+
+    def test_conversion_round_trip(self):
+        """Testa a conversão de metadata.json para binário e de volta"""
+        json_file = Path(self.test_dir) / "metadata.json"
+        source = JsonMetadataStore(json_file)
+        for key, record in self.records.items():
+            source[key] = record
+        source.flush()
+
+        self.assertEqual(json_to_binary(json_file, self.binary_file), 3)
+        json_file.unlink()
+        self.assertEqual(binary_to_json(self.binary_file, json_file), 3)
+        self.assertEqual(dict(JsonMetadataStore(json_file).items()), self.records)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestJsonMetadataStore)
+    suite.addTests(loader.loadTestsFromTestCase(TestMmapMetadataStore))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,160 @@
+"""
+Testes unitários para o módulo metrics
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from metrics import Histogram, OperationMetrics
+from document_manager import DocumentManager
+
+
+class TestHistogram(unittest.TestCase):
+    """Testes para o histograma de durações"""
+
+    def test_buckets_and_quantiles(self):
+        """Testa a contagem cumulativa e a estimativa de quantis"""
+        histogram = Histogram(buckets=(0.001, 0.01, 0.1))
+        for value in [0.0005, 0.002, 0.003, 0.05, 0.5]:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(),
+                         [(0.001, 1), (0.01, 3), (0.1, 4), (float('inf'), 5)])
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(1.0), 0.5)
+        self.assertAlmostEqual(histogram.as_dict()['mean'], 0.1111)
+        self.assertEqual(Histogram().quantile(0.5), 0.0)
+
+
+class TestOperationMetrics(unittest.TestCase):
+    """Testes para as métricas do DocumentManager"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.manager = DocumentManager(os.path.join(self.test_dir, "biblioteca"))
+        self.source = Path(self.test_dir) / "Silva_Redes_2020.pdf"
+        self.source.write_bytes(b"x" * 1000)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.manager.close()
+        shutil.rmtree(self.test_dir)
+
+    def test_operation_counters(self):
+        """Testa chamadas, erros, bytes copiados e gravações de metadados"""
+        self.manager.add_document(str(self.source), 'artigos', author='João Silva')
+        self.manager.list_documents()
+        self.manager.list_documents('artigos')
+        with self.assertRaises(ValueError):
+            self.manager.add_document(str(self.source), 'revistas')
+
+        data = self.manager.metrics.as_dict()
+        self.assertEqual(data['operations']['list_documents']['calls'], 2)
+        self.assertEqual(data['operations']['add_document']['calls'], 2)
+        self.assertEqual(data['operations']['add_document']['errors'], 1)
+        self.assertEqual(data['bytes_copied'], 1000)
+        self.assertEqual(data['metadata']['saves'], 1)
+        self.assertEqual(data['metadata']['snapshots'], 1)
+        self.assertEqual(data['metadata']['size_bytes'], self.manager.metadata_file.stat().st_size)
+        self.assertNotIn('metadata.save', data['operations'])
+
+    def test_filesystem_calls(self):
+        """Testa a contagem de chamadas ao sistema de arquivos, inclusive nas cópias em threads"""
+        self.manager.add_documents([{'file_path': str(self.source), 'doc_type': 'artigos'}])
+        self.manager.rename_document('Silva_Redes_2020.pdf', 'Redes_2020.pdf', 'artigos')
+
+        calls = self.manager.metrics.as_dict()['filesystem_calls']
+        self.assertGreater(calls['add_documents'].get('open', 0), 0)
+        self.assertGreater(calls['rename_document'].get('os.rename', 0), 0)
+        self.assertEqual(self.manager.metrics.as_dict()['bytes_copied'], 1000)
+
+    def test_hooks_receive_nested_spans(self):
+        """Testa os ganchos de rastreamento, com spans aninhados e erros"""
+        events = []
+
+        def hook(event, span):
+            events.append((event, span.name, span.parent.name if span.parent else None,
+                           type(span.error).__name__ if span.error else None))
+
+        self.manager.metrics.add_hook(hook)
+        self.manager.add_document(str(self.source), 'artigos')
+        with self.assertRaises(FileNotFoundError):
+            self.manager.remove_document('inexistente.pdf', 'artigos')
+        self.manager.metrics.remove_hook(hook)
+        self.manager.list_documents()
+
+        self.assertEqual(events[:4], [
+            ('start', 'add_document', None, None),
+            ('start', 'metadata.save', 'add_document', None),
+            ('end', 'metadata.save', 'add_document', None),
+            ('end', 'add_document', None, None),
+        ])
+        self.assertEqual(events[-1], ('end', 'remove_document', None, 'FileNotFoundError'))
+        self.assertNotIn('list_documents', [name for _, name, _, _ in events])
+
+    def test_iterator_operations(self):
+        """Testa que iter_documents é medido ao ser consumido"""
+        self.manager.add_document(str(self.source), 'artigos')
+        iterator = self.manager.iter_documents()
+        self.assertNotIn('iter_documents', self.manager.metrics.as_dict()['operations'])
+        self.assertEqual(len(list(iterator)), 1)
+        self.assertEqual(self.manager.metrics.as_dict()['operations']['iter_documents']['calls'], 1)
+
+    def test_exports(self):
+        """Testa as exportações em JSON e no formato do Prometheus"""
+        self.manager.add_document(str(self.source), 'artigos')
+        self.manager.search_documents('redes')
+
+        data = json.loads(self.manager.metrics.to_json())
+        self.assertIn('search_documents', data['operations'])
+
+        text = self.manager.metrics.to_prometheus()
+        self.assertIn('# TYPE biblioteca_operation_duration_seconds histogram', text)
+        self.assertIn('biblioteca_operation_duration_seconds_bucket'
+                      '{operation="search_documents",le="+Inf"} 1', text)
+        self.assertIn('biblioteca_operation_duration_seconds_count{operation="add_document"} 1',
+                      text)
+        self.assertIn('biblioteca_bytes_copied_total 1000', text)
+        self.assertIn('biblioteca_metadata_snapshots_total 1', text)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_shared_metrics(self):
+        """Testa que uma instância compartilhada agrega vários gerenciadores"""
+        metrics = OperationMetrics()
+        managers = [DocumentManager(os.path.join(self.test_dir, name), metrics=metrics)
+                    for name in ('a', 'b')]
+        for manager in managers:
+            manager.get_statistics()
+            manager.close()
+        self.assertEqual(metrics.as_dict()['operations']['get_statistics']['calls'], 2)
+
+        metrics.reset()
+        self.assertEqual(metrics.as_dict()['operations'], {})
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestHistogram))
+    suite.addTests(loader.loadTestsFromTestCase(TestOperationMetrics))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
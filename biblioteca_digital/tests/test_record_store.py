@@ -0,0 +1,111 @@
+"""
+Testes unitários para o módulo record_store
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from record_store import CompactRecordStore
+from metadata_store import JsonMetadataStore
+
+
+class TestCompactRecordStore(unittest.TestCase):
+    """Testes para o armazenamento de registros em colunas"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.records = {
+            'artigos/redes_2020.pdf': {
+                'type': 'artigos', 'year': 2020, 'author': 'João Silva', 'title': 'Redes',
+                'added_date': '2024-01-10T09:00:00.123456', 'file_size': 1500, 'sha256': 'ab12'
+            },
+            'livros/python.epub': {
+                'type': 'livros', 'year': None, 'author': '', 'title': 'Python',
+                'added_date': 'N/A', 'file_size': None
+            },
+            'teses/antiga.pdf': {'year': '1999', 'file_size': 2 ** 70,
+                                 'added_date': '2024-01-10T09:00:00+00:00'},
+        }
+        self.store = CompactRecordStore(self.records.items())
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def test_round_trip(self):
+        """Testa que os registros voltam iguais, inclusive valores fora das colunas"""
+        self.assertEqual(dict(self.store.items()), self.records)
+        self.assertEqual(list(self.store), list(self.records))
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(list(self.store.values()), list(self.records.values()))
+
+    def test_shares_repeated_strings(self):
+        """Testa que tipos e autores repetidos ocupam uma única entrada"""
+        for i in range(100):
+            self.store[f'artigos/extra_{i}.pdf'] = {'type': 'artigos', 'author': 'João Silva'}
+        self.assertEqual(len(self.store._types), 2 + 2)
+        self.assertEqual(len(self.store._authors), 2 + 2)
+
+    def test_dict_semantics(self):
+        """Testa substituição (mantém a posição), remoção e cópias independentes"""
+        self.store['artigos/redes_2020.pdf'] = {'type': 'teses'}
+        self.assertEqual(list(self.store)[0], 'artigos/redes_2020.pdf')
+        self.assertEqual(self.store['artigos/redes_2020.pdf'], {'type': 'teses'})
+
+        record = self.store['livros/python.epub']
+        record['title'] = 'Alterado'
+        self.assertEqual(self.store['livros/python.epub']['title'], 'Python')
+
+        del self.store['livros/python.epub']
+        self.assertNotIn('livros/python.epub', self.store)
+        with self.assertRaises(KeyError):
+            self.store['livros/python.epub']
+
+    def test_compaction_keeps_order(self):
+        """Testa a eliminação de posições vagas"""
+        for i in range(3000):
+            self.store[f'artigos/extra_{i}.pdf'] = {'type': 'artigos', 'year': 2000 + i % 20}
+        for i in range(3000):
+            if i != 1500:
+                del self.store[f'artigos/extra_{i}.pdf']
+        self.assertLess(len(self.store._keys), 3000)
+        self.assertEqual(list(self.store), list(self.records) + ['artigos/extra_1500.pdf'])
+        self.assertEqual(self.store['artigos/extra_1500.pdf'], {'type': 'artigos', 'year': 2000})
+
+    def test_json_store_snapshot_format(self):
+        """Testa que o metadata.json continua no formato de json.dump(indent=4)"""
+        metadata_file = Path(self.test_dir) / "metadata.json"
+        store = JsonMetadataStore(metadata_file)
+        for key, record in self.records.items():
+            store[key] = record
+        store.flush()
+
+        text = metadata_file.read_text(encoding='utf-8')
+        self.assertEqual(json.loads(text), self.records)
+        self.assertEqual(text, json.dumps(json.loads(text), indent=4, ensure_ascii=False))
+        self.assertEqual(dict(JsonMetadataStore(metadata_file).items()), self.records)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestCompactRecordStore)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,190 @@
+"""
+Testes unitários para o módulo search_index
+"""
+
+import unittest
+import tempfile
+import shutil
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from search_index import InvertedIndex, fold, tokenize, trigrams
+from document_manager import DocumentManager
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Testes para o índice invertido de busca"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.index = InvertedIndex()
+        self.index.add('artigos/Silva_Redes_2020.pdf',
+                       {'title': 'Redes Neurais', 'author': 'João Silva'})
+        self.index.add('livros/python_2019.epub',
+                       {'title': 'Python Programming', 'author': 'Maria Souza'})
+        self.index.add('teses/tese_2018.pdf',
+                       {'title': 'Programação Paralela', 'author': 'João Pereira'})
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    def found(self, query: str, index: InvertedIndex = None) -> set:
+        """Caminhos encontrados por rank, sem limite"""
+        return {key for key, _ in (index or self.index).rank(query, None)}
+
+    def test_tokenize(self):
+        """Testa a divisão de textos em termos"""
+        self.assertEqual(tokenize("Silva_Redes-2020.pdf"), ['silva', 'redes', '2020', 'pdf'])
+        self.assertEqual(tokenize("João  Silva"), ['joão', 'silva'])
+        self.assertEqual(tokenize(""), [])
+
+    def test_single_term(self):
+        """Testa busca por um termo em título, autor e nome do arquivo"""
+        self.assertEqual(self.found("silva"), {'artigos/Silva_Redes_2020.pdf'})
+        self.assertEqual(self.found("Python"), {'livros/python_2019.epub'})
+        # Anos próximos também são parecidos, mas só o exato tem pontuação 1
+        self.assertEqual(self.index.rank("2018")[0], ('teses/tese_2018.pdf', 1.0))
+        self.assertLess(self.index.rank("2018")[1][1], 1.0)
+
+    def test_prefix_matching(self):
+        """Testa busca por prefixo"""
+        self.assertEqual(self.found("prog"),
+                         {'livros/python_2019.epub', 'teses/tese_2018.pdf'})
+
+    def test_multi_term_and(self):
+        """Testa que todos os termos precisam ser encontrados"""
+        self.assertEqual(self.found("joão prog"), {'teses/tese_2018.pdf'})
+        self.assertEqual(self.found("joão python"), set())
+
+    def test_remove(self):
+        """Testa remoção de documentos do índice"""
+        self.index.remove('teses/tese_2018.pdf')
+
+        self.assertEqual(self.found("joão"), {'artigos/Silva_Redes_2020.pdf'})
+        self.assertEqual(self.found("paralela"), set())
+        self.assertEqual(len(self.index), 2)
+
+    def test_remove_with_record_and_compaction(self):
+        """Testa a remoção pelos termos do registro e a renumeração das posições"""
+        record = {'title': 'Programação Paralela', 'author': 'João Pereira'}
+        self.index.remove('teses/tese_2018.pdf', record)
+        self.assertEqual(self.found("paralela"), set())
+
+        for i in range(3000):
+            self.index.add(f'artigos/extra_{i}.pdf', {'title': 'Extra', 'author': 'Ana'})
+        for i in range(3000):
+            self.index.remove(f'artigos/extra_{i}.pdf', {'title': 'Extra', 'author': 'Ana'})
+        self.assertLess(len(self.index._keys), 3000)
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.found("extra"), set())
+        self.assertEqual(self.found("silva"), {'artigos/Silva_Redes_2020.pdf'})
+        self.assertEqual(self.index.rank("pyton")[0][0], 'livros/python_2019.epub')
+
+    def test_fold_and_trigrams(self):
+        """Testa a remoção de acentos e a geração de trigramas"""
+        self.assertEqual(fold("João Programação"), "joao programacao")
+        self.assertEqual(trigrams("silva"), {'  s', ' si', 'sil', 'ilv', 'lva', 'va '})
+
+    def test_rank_tolerates_typos_and_accents(self):
+        """Testa a busca aproximada por trigramas"""
+        results = self.index.rank("Jao Slva")
+        self.assertEqual(results[0][0], 'artigos/Silva_Redes_2020.pdf')
+        self.assertEqual(len(results), 1)
+
+        results = self.index.rank("programacao")
+        self.assertEqual(results[0], ('teses/tese_2018.pdf', 1.0))
+        self.assertEqual(self.index.rank("xyzw"), [])
+
+    def test_rank_orders_by_similarity(self):
+        """Testa que correspondências exatas vêm antes das aproximadas"""
+        self.index.add('artigos/artigo_2021.pdf', {'title': 'Redes', 'author': 'Maria Sousa'})
+
+        results = self.index.rank("souza")
+        self.assertEqual([key for key, _ in results],
+                         ['livros/python_2019.epub', 'artigos/artigo_2021.pdf'])
+        self.assertEqual(results[0][1], 1.0)
+        self.assertLess(results[1][1], 1.0)
+
+        self.assertEqual(len(self.index.rank("souza", limit=1)), 1)
+        self.assertEqual(self.index.rank("souza", exclude={'livros/python_2019.epub'})[0][0],
+                         'artigos/artigo_2021.pdf')
+
+    def test_rank_follows_removals(self):
+        """Testa que termos removidos deixam de ser sugeridos"""
+        self.index.remove('artigos/Silva_Redes_2020.pdf')
+        self.assertEqual(self.index.rank("slva"), [])
+
+        index_file = Path(self.test_dir) / "search_index.json"
+        self.index.save(index_file, "v1")
+        loaded = InvertedIndex()
+        loaded.load(index_file, "v1")
+        self.assertEqual(loaded.rank("paralel"), self.index.rank("paralel"))
+
+    def test_save_and_load(self):
+        """Testa persistência do índice com identificação dos metadados"""
+        index_file = Path(self.test_dir) / "search_index.json"
+        self.index.save(index_file, "v1")
+
+        loaded = InvertedIndex()
+        self.assertTrue(loaded.load(index_file, "v1"))
+        # O vocabulário de trigramas só é montado na primeira busca
+        self.assertFalse(loaded._has_vocabulary)
+        self.assertEqual(self.found("prog", loaded), self.found("prog"))
+        self.assertEqual(loaded.rank("Jao Slva"), self.index.rank("Jao Slva"))
+
+        self.assertFalse(InvertedIndex().load(index_file, "v2"))
+        self.assertFalse(InvertedIndex().load(Path(self.test_dir) / "ausente.json", "v1"))
+
+    def test_document_manager_keeps_index_updated(self):
+        """Testa a manutenção incremental pelo DocumentManager"""
+        source = Path(self.test_dir) / "origem.pdf"
+        source.write_text("Conteúdo de teste")
+
+        manager = DocumentManager(self.test_dir)
+        manager.add_document(str(source), 'artigos', author="Ana Costa")
+        self.assertEqual(len(manager.search_documents("costa")), 1)
+
+        manager.rename_document("origem.pdf", "final", 'artigos')
+        self.assertEqual(manager.search_documents("origem"), [])
+        self.assertEqual(manager.search_documents("final costa")[0]['filename'], "final.pdf")
+
+        self.assertEqual(manager.search_documents("Ana Csta")[0]['filename'], "final.pdf")
+
+        manager.remove_document("final.pdf", 'artigos')
+        self.assertEqual(manager.search_documents("costa"), [])
+
+    def test_document_manager_loads_persisted_index(self):
+        """Testa que o índice persistido é reutilizado na inicialização"""
+        source = Path(self.test_dir) / "origem.pdf"
+        source.write_text("Conteúdo de teste")
+
+        manager = DocumentManager(self.test_dir, journal=True)
+        manager.add_document(str(source), 'artigos', author="Ana Costa")
+        manager.close()
+
+        index_file = Path(self.test_dir) / "search_index.json"
+        reopened = DocumentManager(self.test_dir, journal=True)
+        self.assertTrue(InvertedIndex().load(index_file, reopened.metadata.fingerprint()))
+        self.assertEqual(len(reopened.search_documents("ana")), 1)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = loader.loadTestsFromTestCase(TestInvertedIndex)
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
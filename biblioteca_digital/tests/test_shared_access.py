@@ -0,0 +1,252 @@
+"""
+Testes unitários para o acesso de vários processos à mesma biblioteca
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+from pathlib import Path
+import sys
+import os
+
+# Adiciona o diretório src e a raiz do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from metadata_store import JsonMetadataStore, MmapMetadataStore, SqliteMetadataStore
+from document_manager import DocumentManager
+from file_lock import FileLock
+from benchmarks.concurrency import run_stress
+
+
+class TestStoreRefresh(unittest.TestCase):
+    """Testes para a detecção de alterações gravadas por outra instância"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        shutil.rmtree(self.test_dir)
+
+    @staticmethod
+    def record(title: str) -> dict:
+        return {'type': 'artigos', 'year': 2020, 'author': 'Silva', 'title': title,
+                'added_date': '2024-01-01T00:00:00', 'file_size': 100}
+
+    def check_incremental(self, writer, reader):
+        """Alterações do escritor chegam ao leitor como diferenças"""
+        a, a2, b = self.record('A'), self.record('A2'), self.record('B')
+        self.assertEqual(reader.refresh(), [])
+        writer['artigos/a.pdf'] = a
+        writer['artigos/b.pdf'] = b
+        writer.flush()
+        self.assertEqual(reader.refresh(), [('artigos/a.pdf', None, a),
+                                            ('artigos/b.pdf', None, b)])
+        self.assertEqual(reader.refresh(), [])
+
+        writer['artigos/a.pdf'] = a2
+        del writer['artigos/b.pdf']
+        writer.flush()
+        self.assertEqual(reader.refresh(), [('artigos/a.pdf', a, a2),
+                                            ('artigos/b.pdf', b, None)])
+        self.assertEqual(dict(reader.items()), {'artigos/a.pdf': a2})
+
+    def test_json_journal(self):
+        """Testa a leitura incremental do diário e a releitura após compactação"""
+        metadata_file = self.test_dir / "metadata.json"
+        writer = JsonMetadataStore(metadata_file, journal=True)
+        reader = JsonMetadataStore(metadata_file, journal=True)
+        self.check_incremental(writer, reader)
+
+        writer.compact()
+        writer['artigos/c.pdf'] = self.record('C')
+        writer.flush()
+        self.assertIsNone(reader.refresh())
+        self.assertEqual(sorted(reader), ['artigos/a.pdf', 'artigos/c.pdf'])
+        self.assertEqual(reader.fingerprint(), writer.fingerprint())
+
+        writer['artigos/d.pdf'] = self.record('D')
+        writer.flush()
+        self.assertEqual(reader.refresh(), [('artigos/d.pdf', None, self.record('D'))])
+
+    def test_binary_journal(self):
+        """Testa o backend binário: diário incremental e novo arquivo mapeado"""
+        metadata_file = self.test_dir / "metadata.bin"
+        writer = MmapMetadataStore(metadata_file, journal=True)
+        reader = MmapMetadataStore(metadata_file, journal=True)
+        self.check_incremental(writer, reader)
+
+        writer.compact()
+        self.assertIsNone(reader.refresh())
+        self.assertEqual(reader['artigos/a.pdf'], self.record('A2'))
+        writer.close()
+        reader.close()
+
+    def test_sqlite_change_log(self):
+        """Testa o registro de alterações do SQLite e o seu descarte"""
+        db_file = self.test_dir / "metadata.db"
+        writer = SqliteMetadataStore(db_file)
+        reader = SqliteMetadataStore(db_file)
+        self.check_incremental(writer, reader)
+
+        writer.CHANGE_LOG_GENERATIONS = 2
+        for i in range(3):
+            writer[f'teses/{i}.pdf'] = self.record(str(i))
+            writer.flush()
+        # As gerações que o leitor não viu foram descartadas do registro
+        self.assertIsNone(reader.refresh())
+        self.assertEqual(reader.refresh(), [])
+        writer.close()
+        reader.close()
+
+    def test_interrupted_write_is_discarded(self):
+        """Testa que restos de uma gravação interrompida não escondem as seguintes"""
+        metadata_file = self.test_dir / "metadata.json"
+        writer = JsonMetadataStore(metadata_file, journal=True)
+        reader = JsonMetadataStore(metadata_file, journal=True)
+        writer['artigos/a.pdf'] = {'title': 'A'}
+        writer.flush()
+        with open(writer.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op": "set", "key": "artigos/x.p')
+
+        self.assertEqual([key for key, _, _ in reader.refresh()], ['artigos/a.pdf'])
+        writer['artigos/b.pdf'] = {'title': 'B'}
+        writer.flush()
+        self.assertEqual(reader.refresh(), [('artigos/b.pdf', None, {'title': 'B'})])
+        self.assertEqual(sorted(JsonMetadataStore(metadata_file, journal=True)),
+                         ['artigos/a.pdf', 'artigos/b.pdf'])
+
+
+class TestSharedManagers(unittest.TestCase):
+    """Testes para dois gerenciadores no modo compartilhado"""
+
+    def setUp(self):
+        """Configura ambiente de teste antes de cada teste"""
+        self.test_dir = tempfile.mkdtemp()
+        self.base = os.path.join(self.test_dir, "biblioteca")
+        self.sources = Path(self.test_dir) / "entrada"
+        self.sources.mkdir()
+        self.first = DocumentManager(self.base, shared=True)
+        self.second = DocumentManager(self.base, shared=True)
+
+    def tearDown(self):
+        """Limpa ambiente de teste após cada teste"""
+        self.first.close()
+        self.second.close()
+        shutil.rmtree(self.test_dir)
+
+    def make_source(self, name: str) -> str:
+        path = self.sources / name
+        path.write_bytes(b"x" * 100)
+        return str(path)
+
+    def test_changes_are_visible_to_the_other_manager(self):
+        """Testa listagem, busca e estatísticas após alterações do outro gerenciador"""
+        self.assertTrue(self.first.journal)
+        self.assertEqual(self.second.get_statistics()['total_documents'], 0)
+        self.assertEqual(self.second.search_documents("redes"), [])
+
+        self.first.add_document(self.make_source("Silva_Redes_2020.pdf"), 'artigos',
+                                author='João Silva')
+        generation = self.second.generation
+        self.assertEqual([d['filename'] for d in self.second.list_documents()],
+                         ["Silva_Redes_2020.pdf"])
+        self.assertGreater(self.second.generation, generation)
+        self.assertEqual(len(self.second.search_documents("redes")), 1)
+        self.assertEqual(self.second.get_statistics()['total_documents'], 1)
+        self.assertEqual(list(self.second.list_by_year()), [2020])
+
+        self.second.rename_document("Silva_Redes_2020.pdf", "Redes_2021.pdf", 'artigos')
+        self.assertEqual([d['filename'] for d in self.first.list_documents()],
+                         ["Redes_2021.pdf"])
+        self.assertEqual(self.first.search_documents("silva")[0]['filename'], "Redes_2021.pdf")
+        self.assertTrue(self.first.verify_statistics(repair=False)['consistent'])
+
+    def test_same_name_from_both_managers(self):
+        """Testa que inclusões com o mesmo nome não se sobrescrevem"""
+        self.first.add_document(self.make_source("Comum_2020.pdf"), 'artigos')
+        self.second.add_document(self.make_source("Comum_2020.pdf"), 'artigos')
+        names = sorted(d['filename'] for d in DocumentManager(self.base).list_documents())
+        self.assertEqual(names, ["Comum_2020.pdf", "Comum_2020_1.pdf"])
+
+    def test_compaction_by_the_other_manager(self):
+        """Testa que a releitura após uma compactação mantém índices corretos"""
+        self.second.search_documents("documento")
+        self.first.metadata.compact_threshold = 2
+        for i in range(5):
+            self.first.add_document(self.make_source(f"Documento {i}_2019.pdf"), 'teses')
+
+        self.assertEqual(len(self.second.search_documents("documento")), 5)
+        self.assertEqual(self.second.get_statistics()['by_type']['teses'], 5)
+        self.second.remove_document("Documento 0_2019.pdf", 'teses')
+        self.assertEqual(len(self.first.list_documents('teses')), 4)
+
+    def test_writers_wait_for_the_lock(self):
+        """Testa que uma escrita aguarda a trava de outro gerenciador"""
+        source = self.make_source("Espera_2022.pdf")
+        finished = threading.Event()
+
+        def add():
+            self.second.add_document(source, 'livros')
+            finished.set()
+
+        with self.first.write_lock():
+            thread = threading.Thread(target=add)
+            thread.start()
+            self.assertFalse(finished.wait(0.2))
+            # As leituras não dependem da trava
+            self.assertEqual(self.second.list_documents(), [])
+        thread.join(5)
+        self.assertTrue(finished.is_set())
+        self.assertEqual(len(self.first.list_documents('livros')), 1)
+
+    def test_lock_is_reentrant(self):
+        """Testa a trava reentrante e o erro ao liberá-la sem tê-la obtido"""
+        lock = FileLock(Path(self.test_dir) / "teste.lock")
+        with lock:
+            with lock:
+                self.assertTrue(lock.held)
+            self.assertTrue(lock.held)
+        self.assertFalse(lock.held)
+        with self.assertRaises(RuntimeError):
+            lock.release()
+        lock.close()
+
+
+class TestWriterProcesses(unittest.TestCase):
+    """Teste de carga com vários processos escritores"""
+
+    def test_no_lost_updates(self):
+        """Testa que nenhuma alteração se perde com escritores simultâneos"""
+        for backend in DocumentManager.METADATA_BACKENDS:
+            with self.subTest(backend=backend):
+                result = run_stress(writers=3, operations=30, backend=backend,
+                                    compact_threshold=10)
+                self.assertEqual(result['lost'], [])
+                self.assertEqual(result['unexpected'], [])
+                self.assertEqual(result['untracked'], [])
+                self.assertTrue(result['reader_consistent'])
+                self.assertGreater(result['ops_per_second'], 0)
+
+
+def run_tests():
+    """Executa todos os testes"""
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+
+    suite.addTests(loader.loadTestsFromTestCase(TestStoreRefresh))
+    suite.addTests(loader.loadTestsFromTestCase(TestSharedManagers))
+    suite.addTests(loader.loadTestsFromTestCase(TestWriterProcesses))
+
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)